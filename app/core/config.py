@@ -196,6 +196,8 @@ class Settings(BaseSettings):
     TUSHARE_QUOTES_SYNC_CRON: str = Field(default="*/5 9-15 * * 1-5")  # 交易时间每5分钟
     TUSHARE_HISTORICAL_SYNC_ENABLED: bool = Field(default=True)
     TUSHARE_HISTORICAL_SYNC_CRON: str = Field(default="0 16 * * 1-5")  # 工作日16点
+    TUSHARE_HISTORICAL_SYNC_MODE: str = Field(default="auto", description="历史数据同步方式 (auto/by_symbol/by_date)")
+    TUSHARE_BY_DATE_LOOKBACK_DAYS: int = Field(default=60, ge=5, le=750, description="按交易日同步时检查缺失的最近交易日数")
     TUSHARE_FINANCIAL_SYNC_ENABLED: bool = Field(default=True)
     TUSHARE_FINANCIAL_SYNC_CRON: str = Field(default="0 3 * * 0")  # 周日凌晨3点
     TUSHARE_STATUS_CHECK_ENABLED: bool = Field(default=True)
@@ -276,6 +278,16 @@ class Settings(BaseSettings):
     NEWS_SYNC_HOURS_BACK: int = Field(default=24)
     NEWS_SYNC_MAX_PER_SOURCE: int = Field(default=50)
 
+    # 技术因子快照（stock_factor_snapshot，供数据库筛选直接查询技术指标）
+    FACTOR_SNAPSHOT_ENABLED: bool = Field(default=True, description="启用每日技术因子快照")
+    FACTOR_SNAPSHOT_CRON: str = Field(default="30 18 * * 1-5", description="技术因子快照CRON表达式")  # 工作日日K线同步完成后
+    FACTOR_SNAPSHOT_RETENTION_DAYS: int = Field(default=30, ge=0, description="技术因子快照保留天数（0 表示不清理）")
+
+    # 筛选结果集（Redis 服务端缓存，翻页/重新排序不再重复筛选）
+    SCREENING_RESULT_SET_ENABLED: bool = Field(default=True, description="启用筛选结果集缓存")
+    SCREENING_RESULT_SET_TTL_SECONDS: int = Field(default=300, ge=10, description="筛选结果集过期时间（秒）")
+    SCREENING_RESULT_SET_MAX_ITEMS: int = Field(default=5000, ge=100, description="单个筛选结果集最多物化条目数")
+
     @property
     def is_production(self) -> bool:
         """是否为生产环境"""
@@ -59,6 +59,7 @@ from app.worker.baostock_sync_service import (
     run_baostock_historical_sync,
     run_baostock_status_check
 )
+from app.worker.factor_snapshot_service import run_factor_snapshot_job
 # 港股和美股改为按需获取+缓存模式，不再需要定时同步任务
 # from app.worker.hk_sync_service import ...
 # from app.worker.us_sync_service import ...
@@ -525,6 +526,19 @@ async def lifespan(app: FastAPI):
         else:
             logger.info(f"🔍 BaoStock状态检查已配置: {settings.BAOSTOCK_STATUS_CHECK_CRON}")
 
+        # 技术因子快照任务（依赖当日日K线已入库）
+        scheduler.add_job(
+            run_factor_snapshot_job,
+            CronTrigger.from_crontab(settings.FACTOR_SNAPSHOT_CRON, timezone=settings.TIMEZONE),
+            id="factor_snapshot",
+            name="技术因子快照"
+        )
+        if not settings.FACTOR_SNAPSHOT_ENABLED:
+            scheduler.pause_job("factor_snapshot")
+            logger.info(f"⏸️ 技术因子快照已添加但暂停: {settings.FACTOR_SNAPSHOT_CRON}")
+        else:
+            logger.info(f"🧮 技术因子快照已配置: {settings.FACTOR_SNAPSHOT_CRON}")
+
         # 新闻数据同步任务配置（使用AKShare同步所有股票新闻）
         logger.info("🔄 配置新闻数据同步任务...")
 
@@ -58,6 +58,10 @@ class ScreeningRequest(BaseModel):
     # 优化选项
     use_database_optimization: bool = Field(True, description="是否使用数据库优化")
 
+    # 服务端结果集
+    cursor: Optional[str] = Field(None, description="上次返回的结果集游标，用于翻页/重新排序")
+    refresh: bool = Field(False, description="忽略已有结果集，重新筛选")
+
 
 class ScreeningResponse(BaseModel):
     """筛选响应"""
@@ -66,6 +70,7 @@ class ScreeningResponse(BaseModel):
     took_ms: Optional[int] = Field(None, description="耗时(毫秒)")
     optimization_used: Optional[str] = Field(None, description="使用的优化方式")
     source: Optional[str] = Field(None, description="数据源")
+    cursor: Optional[str] = Field(None, description="结果集游标")
 
 
 class FieldInfo(BaseModel):
@@ -262,6 +267,24 @@ BASIC_FIELDS_INFO = {
     ),
 
     # 技术指标字段
+    "ma5": FieldInfo(
+        name="ma5",
+        display_name="5日均线",
+        field_type=FieldType.TECHNICAL,
+        data_type="number",
+        description="5日移动平均线",
+        unit="元",
+        supported_operators=[OperatorType.GT, OperatorType.LT, OperatorType.GTE, OperatorType.LTE, OperatorType.BETWEEN]
+    ),
+    "ma10": FieldInfo(
+        name="ma10",
+        display_name="10日均线",
+        field_type=FieldType.TECHNICAL,
+        data_type="number",
+        description="10日移动平均线",
+        unit="元",
+        supported_operators=[OperatorType.GT, OperatorType.LT, OperatorType.GTE, OperatorType.LTE, OperatorType.BETWEEN]
+    ),
     "ma20": FieldInfo(
         name="ma20",
         display_name="20日均线",
@@ -271,6 +294,33 @@ BASIC_FIELDS_INFO = {
         unit="元",
         supported_operators=[OperatorType.GT, OperatorType.LT, OperatorType.GTE, OperatorType.LTE, OperatorType.BETWEEN]
     ),
+    "ma60": FieldInfo(
+        name="ma60",
+        display_name="60日均线",
+        field_type=FieldType.TECHNICAL,
+        data_type="number",
+        description="60日移动平均线",
+        unit="元",
+        supported_operators=[OperatorType.GT, OperatorType.LT, OperatorType.GTE, OperatorType.LTE, OperatorType.BETWEEN]
+    ),
+    "ema12": FieldInfo(
+        name="ema12",
+        display_name="12日指数均线",
+        field_type=FieldType.TECHNICAL,
+        data_type="number",
+        description="12日指数移动平均线",
+        unit="元",
+        supported_operators=[OperatorType.GT, OperatorType.LT, OperatorType.GTE, OperatorType.LTE, OperatorType.BETWEEN]
+    ),
+    "ema26": FieldInfo(
+        name="ema26",
+        display_name="26日指数均线",
+        field_type=FieldType.TECHNICAL,
+        data_type="number",
+        description="26日指数移动平均线",
+        unit="元",
+        supported_operators=[OperatorType.GT, OperatorType.LT, OperatorType.GTE, OperatorType.LTE, OperatorType.BETWEEN]
+    ),
     "rsi14": FieldInfo(
         name="rsi14",
         display_name="RSI指标",
@@ -334,4 +384,40 @@ BASIC_FIELDS_INFO = {
         unit="",
         supported_operators=[OperatorType.GT, OperatorType.LT, OperatorType.GTE, OperatorType.LTE, OperatorType.BETWEEN]
     ),
+    "boll_mid": FieldInfo(
+        name="boll_mid",
+        display_name="布林中轨",
+        field_type=FieldType.TECHNICAL,
+        data_type="number",
+        description="布林带中轨（20日）",
+        unit="元",
+        supported_operators=[OperatorType.GT, OperatorType.LT, OperatorType.GTE, OperatorType.LTE, OperatorType.BETWEEN]
+    ),
+    "boll_upper": FieldInfo(
+        name="boll_upper",
+        display_name="布林上轨",
+        field_type=FieldType.TECHNICAL,
+        data_type="number",
+        description="布林带上轨（20日，2倍标准差）",
+        unit="元",
+        supported_operators=[OperatorType.GT, OperatorType.LT, OperatorType.GTE, OperatorType.LTE, OperatorType.BETWEEN]
+    ),
+    "boll_lower": FieldInfo(
+        name="boll_lower",
+        display_name="布林下轨",
+        field_type=FieldType.TECHNICAL,
+        data_type="number",
+        description="布林带下轨（20日，2倍标准差）",
+        unit="元",
+        supported_operators=[OperatorType.GT, OperatorType.LT, OperatorType.GTE, OperatorType.LTE, OperatorType.BETWEEN]
+    ),
+    "atr14": FieldInfo(
+        name="atr14",
+        display_name="ATR指标",
+        field_type=FieldType.TECHNICAL,
+        data_type="number",
+        description="14日平均真实波幅",
+        unit="元",
+        supported_operators=[OperatorType.GT, OperatorType.LT, OperatorType.GTE, OperatorType.LTE, OperatorType.BETWEEN]
+    ),
 }
@@ -3,6 +3,7 @@
 提供缓存统计、清理等功能
 """
 from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.responses import PlainTextResponse
 from typing import Optional
 from datetime import datetime, timedelta
 
@@ -209,3 +210,58 @@ async def get_cache_backend_info(current_user: dict = Depends(get_current_user))
             detail=f"获取缓存后端信息失败: {str(e)}"
         )
 
+
+@router.get("/metrics")
+async def get_cache_metrics(current_user: dict = Depends(get_current_user)):
+    """
+    获取缓存观测指标
+
+    按 (backend, data_type, market) 返回命中/未命中次数、查找与解码耗时（p50/p95）
+    以及读写字节数，用于根据实际数据调整 TTL。
+
+    Returns:
+        dict: 缓存指标
+    """
+    try:
+        from tradingagents.dataflows.cache.metrics import get_cache_metrics as get_metrics_collector
+
+        metrics = get_metrics_collector()
+
+        return ok(
+            data={
+                "series": metrics.snapshot(),
+                "backends": metrics.summary()
+            },
+            message="获取缓存指标成功"
+        )
+
+    except Exception as e:
+        logger.error(f"获取缓存指标失败: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"获取缓存指标失败: {str(e)}"
+        )
+
+
+@router.get("/metrics/prometheus", response_class=PlainTextResponse)
+async def get_cache_metrics_prometheus(current_user: dict = Depends(get_current_user)):
+    """
+    以 Prometheus 文本格式导出缓存指标
+
+    Returns:
+        str: Prometheus exposition format 文本
+    """
+    try:
+        from tradingagents.dataflows.cache.metrics import get_cache_metrics as get_metrics_collector
+
+        return PlainTextResponse(
+            get_metrics_collector().to_prometheus(),
+            media_type="text/plain; version=0.0.4; charset=utf-8"
+        )
+
+    except Exception as e:
+        logger.error(f"导出缓存指标失败: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"导出缓存指标失败: {str(e)}"
+        )
@@ -10,6 +10,7 @@ from pydantic import BaseModel
 
 from app.services.multi_source_basics_sync_service import get_multi_source_sync_service
 from app.services.data_sources.manager import DataSourceManager
+from tradingagents.dataflows.resilience import get_resilience_status
 
 logger = logging.getLogger(__name__)
 
@@ -44,6 +45,7 @@ async def get_data_sources_status():
         manager = DataSourceManager()
         available_adapters = manager.get_available_adapters()
         all_adapters = manager.adapters
+        breakers = get_resilience_status()["breakers"]
 
         status_list = []
         for adapter in all_adapters:
@@ -60,7 +62,9 @@ async def get_data_sources_status():
                 "name": adapter.name,
                 "priority": adapter.priority,
                 "available": is_available,
-                "description": descriptions.get(adapter.name, f"{adapter.name}数据源")
+                "description": descriptions.get(adapter.name, f"{adapter.name}数据源"),
+                # 熔断器状态（本进程内该数据源尚无调用记录时为 None）
+                "circuit_breaker": breakers.get(adapter.name),
             }
 
             # 添加 Token 来源信息（仅 Tushare）
@@ -85,6 +89,19 @@ async def get_data_sources_status():
         raise HTTPException(status_code=500, detail=f"Failed to get data sources status: {str(e)}")
 
 
+@router.get("/sources/resilience")
+async def get_data_sources_resilience():
+    """获取数据源熔断器状态与对冲请求统计（含港股/美股数据源）"""
+    try:
+        return SyncResponse(
+            success=True,
+            message="Data source resilience status retrieved successfully",
+            data=get_resilience_status()
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get data source resilience status: {str(e)}")
+
+
 @router.get("/sources/current")
 async def get_current_data_source():
     """获取当前正在使用的数据源（优先级最高且可用的）"""
@@ -34,10 +34,13 @@ class ScreeningRequest(BaseModel):
     order_by: Optional[List[OrderByItem]] = None
     limit: int = Field(50, ge=1, le=500)
     offset: int = Field(0, ge=0)
+    cursor: Optional[str] = Field(None, description="上次返回的结果集游标")
+    refresh: bool = Field(False, description="忽略已有结果集，重新筛选")
 
 class ScreeningResponse(BaseModel):
     total: int
     items: List[dict]
+    cursor: Optional[str] = None
 
 # 服务实例
 svc = ScreeningService()
@@ -172,7 +175,9 @@ async def run_screening(req: ScreeningRequest, user: dict = Depends(get_current_
             limit=req.limit,
             offset=req.offset,
             order_by=[{"field": o.field, "direction": o.direction} for o in (req.order_by or [])],
-            use_database_optimization=True
+            use_database_optimization=True,
+            cursor=req.cursor,
+            refresh=req.refresh
         )
 
         logger.info(f"[screening] 筛选完成: total={result.get('total')}, "
@@ -182,7 +187,7 @@ async def run_screening(req: ScreeningRequest, user: dict = Depends(get_current_
             sample = result['items'][:3]
             logger.info(f"[screening] 返回样例(前3条): {sample}")
 
-        return ScreeningResponse(total=result["total"], items=result["items"])
+        return ScreeningResponse(total=result["total"], items=result["items"], cursor=result.get("cursor"))
 
     except Exception as e:
         logger.error(f"[screening] 处理失败: {e}", exc_info=True)
@@ -211,7 +216,9 @@ async def enhanced_screening(req: NewScreeningRequest, user: dict = Depends(get_
             limit=req.limit,
             offset=req.offset,
             order_by=req.order_by,
-            use_database_optimization=req.use_database_optimization
+            use_database_optimization=req.use_database_optimization,
+            cursor=req.cursor,
+            refresh=req.refresh
         )
 
         logger.info(f"[enhanced_screening] 筛选完成: total={result.get('total')}, "
@@ -222,7 +229,8 @@ async def enhanced_screening(req: NewScreeningRequest, user: dict = Depends(get_
             items=result["items"],
             took_ms=result.get("took_ms"),
             optimization_used=result.get("optimization_used"),
-            source=result.get("source")
+            source=result.get("source"),
+            cursor=result.get("cursor")
         )
 
     except Exception as e:
@@ -21,6 +21,15 @@ from app.models.config import (
 logger = logging.getLogger(__name__)
 
 
+async def _invalidate_datasource_routing():
+    """配置写入后使数据源路由表失效（本进程立即失效，启用 pub/sub 时广播到其他进程）"""
+    try:
+        from tradingagents.dataflows.datasource_routing import invalidate_datasource_routing
+        await asyncio.to_thread(invalidate_datasource_routing)
+    except Exception as e:
+        logger.warning(f"⚠️ 数据源路由表失效通知失败: {e}")
+
+
 class ConfigService:
     """配置管理服务类"""
 
@@ -197,6 +206,7 @@ class ConfigService:
                 return False
 
             await groupings_collection.insert_one(grouping.model_dump())
+            await _invalidate_datasource_routing()
             return True
         except Exception as e:
             print(f"❌ 添加数据源到分类失败: {e}")
@@ -212,6 +222,7 @@ class ConfigService:
                 "data_source_name": data_source_name,
                 "market_category_id": category_id
             })
+            await _invalidate_datasource_routing()
             return result.deleted_count > 0
         except Exception as e:
             print(f"❌ 从分类中移除数据源失败: {e}")
@@ -280,6 +291,7 @@ class ConfigService:
                     else:
                         logger.warning(f"⚠️ [优先级同步] 未找到匹配的数据源配置: {data_source_name}")
 
+            await _invalidate_datasource_routing()
             return result.modified_count > 0
         except Exception as e:
             logger.error(f"❌ 更新数据源分组关系失败: {e}")
@@ -352,6 +364,7 @@ class ConfigService:
             else:
                 print(f"⚠️ [优先级同步] 未找到激活的系统配置")
 
+            await _invalidate_datasource_routing()
             return True
         except Exception as e:
             print(f"❌ 更新分类数据源排序失败: {e}")
@@ -552,6 +565,7 @@ class ConfigService:
 
             insert_result = await config_collection.insert_one(config_dict)
             print(f"📝 新配置ID: {insert_result.inserted_id}")
+            await _invalidate_datasource_routing()
 
             # 验证保存结果
             saved_config = await config_collection.find_one({"_id": insert_result.inserted_id})
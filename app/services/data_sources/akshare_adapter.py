@@ -206,22 +206,21 @@ class AKShareAdapter(DataSourceAdapter):
             return None
 
         try:
-            import akshare as ak  # type: ignore
-
-            # 根据 source 参数选择接口
-            if source == "sina":
-                df = ak.stock_zh_a_spot()  # 新浪财经接口
-                logger.info("使用 AKShare 新浪财经接口获取实时行情")
-            else:  # 默认使用东方财富
-                df = ak.stock_zh_a_spot_em()  # 东方财富接口
-                logger.info("使用 AKShare 东方财富接口获取实时行情")
-
-            if df is None or getattr(df, "empty", True):
+            from tradingagents.dataflows.providers.china.spot_snapshot import (
+                SINA, EASTMONEY, get_spot_snapshot_service,
+            )
+
+            # 根据 source 参数选择接口：sina（新浪财经）或 eastmoney（东方财富，默认）
+            # 全市场快照在进程内共享，与 AKShareProvider 等调用方复用同一份下载结果
+            api = SINA if source == "sina" else EASTMONEY
+            snapshot = get_spot_snapshot_service().get(api, allow_stale=False)
+            if snapshot is None or not len(snapshot):
                 logger.warning(f"AKShare {source} 返回空数据")
                 return None
+            logger.info(f"使用 AKShare {api} 全市场快照获取实时行情（{snapshot.age:.0f}秒前下载）")
+            df = snapshot.frame
 
             # 列名兼容（两个接口的列名可能不同）
-            code_col = next((c for c in ["代码", "code", "symbol", "股票代码"] if c in df.columns), None)
             price_col = next((c for c in ["最新价", "现价", "最新价(元)", "price", "最新", "trade"] if c in df.columns), None)
             pct_col = next((c for c in ["涨跌幅", "涨跌幅(%)", "涨幅", "pct_chg", "changepercent"] if c in df.columns), None)
             amount_col = next((c for c in ["成交额", "成交额(元)", "amount", "成交额(万元)", "amount(万元)"] if c in df.columns), None)
@@ -231,36 +230,13 @@ class AKShareAdapter(DataSourceAdapter):
             pre_close_col = next((c for c in ["昨收", "昨收(元)", "pre_close", "昨收价", "settlement"] if c in df.columns), None)
             volume_col = next((c for c in ["成交量", "成交量(手)", "volume", "成交量(股)", "vol"] if c in df.columns), None)
 
-            if not code_col or not price_col:
-                logger.error(f"AKShare {source} 缺少必要列: code={code_col}, price={price_col}, columns={list(df.columns)}")
+            if not price_col:
+                logger.error(f"AKShare {source} 缺少必要列: code={snapshot.code_column}, price={price_col}, columns={list(df.columns)}")
                 return None
 
             result: Dict[str, Dict[str, Optional[float]]] = {}
-            for _, row in df.iterrows():  # type: ignore
-                code_raw = row.get(code_col)
-                if not code_raw:
-                    continue
-                # 标准化股票代码：处理交易所前缀（如 sz000001, sh600036）
-                code_str = str(code_raw).strip()
-
-                # 如果代码长度超过6位，去掉前面的交易所前缀（如 sz, sh）
-                if len(code_str) > 6:
-                    # 去掉前面的非数字字符（通常是2个字符的交易所代码）
-                    code_str = ''.join(filter(str.isdigit, code_str))
-
-                # 如果是纯数字，移除前导0后补齐到6位
-                if code_str.isdigit():
-                    code_clean = code_str.lstrip('0') or '0'  # 移除前导0，如果全是0则保留一个0
-                    code = code_clean.zfill(6)  # 补齐到6位
-                else:
-                    # 如果不是纯数字，尝试提取数字部分
-                    code_digits = ''.join(filter(str.isdigit, code_str))
-                    if code_digits:
-                        code = code_digits.zfill(6)
-                    else:
-                        # 无法提取有效代码，跳过
-                        continue
-
+            # 快照已按标准化的 6 位代码建立索引（sz000001 -> 000001）
+            for code, row in snapshot.items():
                 close = self._safe_float(row.get(price_col))
                 pct = self._safe_float(row.get(pct_col)) if pct_col else None
                 amt = self._safe_float(row.get(amount_col)) if amount_col else None
@@ -8,6 +8,7 @@ from typing import Any, Dict, List, Optional, Tuple
 from datetime import datetime
 
 from app.core.database import get_mongo_db
+from app.services.screening.compiler import compile_conditions
 # from app.models.screening import ScreeningCondition  # 避免循环导入
 
 logger = logging.getLogger(__name__)
@@ -46,6 +47,18 @@ class DatabaseScreeningService:
             "volume_ratio": "volume_ratio",    # 量比
         }
         
+        # 技术因子字段（来自每日生成的 stock_factor_snapshot）
+        self.factor_collection_name = "stock_factor_snapshot"
+        self.factor_fields = {
+            name: name for name in (
+                "close", "pct_chg", "amount",
+                "ma5", "ma10", "ma20", "ma60", "ema12", "ema26",
+                "dif", "dea", "macd_hist", "rsi14",
+                "boll_mid", "boll_upper", "boll_lower", "atr14",
+                "kdj_k", "kdj_d", "kdj_j",
+            )
+        }
+
         # 支持的操作符
         self.operators = {
             ">": "$gt",
@@ -75,7 +88,7 @@ class DatabaseScreeningService:
             operator = condition.get("operator") if isinstance(condition, dict) else condition.operator
             
             # 检查字段是否支持
-            if field not in self.basic_fields:
+            if field not in self.basic_fields and field not in self.factor_fields:
                 logger.debug(f"字段 {field} 不支持数据库筛选")
                 return False
             
@@ -83,8 +96,34 @@ class DatabaseScreeningService:
             if operator not in self.operators:
                 logger.debug(f"操作符 {operator} 不支持数据库筛选")
                 return False
-        
+
+        # 技术因子条件需要因子快照已生成
+        if self._uses_factor_fields(conditions):
+            return await self._get_latest_factor_date() is not None
+
         return True
+
+    def _condition_field(self, condition) -> Optional[str]:
+        return condition.get("field") if isinstance(condition, dict) else condition.field
+
+    def _uses_factor_fields(self, conditions: List[Dict[str, Any]],
+                            order_by: Optional[List[Dict[str, str]]] = None) -> bool:
+        """条件或排序是否涉及技术因子（基础信息中没有的字段）"""
+        fields = [self._condition_field(c) for c in conditions]
+        fields += [o.get("field") for o in (order_by or [])]
+        return any(f in self.factor_fields and f not in self.basic_fields for f in fields)
+
+    async def _get_latest_factor_date(self) -> Optional[str]:
+        """因子快照中的最新交易日（集合为空时返回 None）"""
+        try:
+            db = get_mongo_db()
+            doc = await db[self.factor_collection_name].find_one(
+                {}, projection={"_id": 0, "trade_date": 1}, sort=[("trade_date", -1)]
+            )
+            return doc.get("trade_date") if doc else None
+        except Exception as e:
+            logger.warning(f"⚠️ 获取因子快照交易日失败: {e}")
+            return None
     
     async def screen_stocks(
         self,
@@ -136,6 +175,10 @@ class DatabaseScreeningService:
                 source = enabled_sources[0] if enabled_sources else 'tushare'
                 logger.info(f"✅ [database_screening] 最终使用的数据源: {source}")
 
+            # 涉及技术因子：以因子快照为主表，一次聚合完成筛选、关联、排序和分页
+            if self._uses_factor_fields(conditions, order_by):
+                return await self._screen_with_factor_snapshot(conditions, limit, offset, order_by, source)
+
             # 构建查询条件
             query = await self._build_query(conditions)
 
@@ -181,46 +224,96 @@ class DatabaseScreeningService:
             logger.error(f"❌ 数据库筛选失败: {e}")
             raise Exception(f"数据库筛选失败: {str(e)}")
     
-    async def _build_query(self, conditions: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """构建MongoDB查询条件"""
-        query = {}
-        
-        for condition in conditions:
-            field = condition.get("field") if isinstance(condition, dict) else condition.field
-            operator = condition.get("operator") if isinstance(condition, dict) else condition.operator
-            value = condition.get("value") if isinstance(condition, dict) else condition.value
-            
-            # 映射字段名
-            db_field = self.basic_fields.get(field)
-            if not db_field:
-                continue
-            
-            # 处理不同操作符
-            if operator == "between":
-                # between操作需要两个值
-                if isinstance(value, list) and len(value) == 2:
-                    query[db_field] = {
-                        "$gte": value[0],
-                        "$lte": value[1]
-                    }
-            elif operator == "contains":
-                # 字符串包含（不区分大小写）
-                query[db_field] = {
-                    "$regex": str(value),
-                    "$options": "i"
-                }
-            elif operator in self.operators:
-                # 标准操作符
-                mongo_op = self.operators[operator]
-                query[db_field] = {mongo_op: value}
-            
+    async def _screen_with_factor_snapshot(
+        self,
+        conditions: List[Dict[str, Any]],
+        limit: int,
+        offset: int,
+        order_by: Optional[List[Dict[str, str]]],
+        source: str,
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        基于 stock_factor_snapshot 的技术因子筛选
+
+        因子条件在快照集合上按 (trade_date, 因子) 索引过滤，
+        基础信息条件通过 $lookup 关联 stock_basic_info。
+        """
+        trade_date = await self._get_latest_factor_date()
+        if trade_date is None:
+            raise Exception("技术因子快照尚未生成")
+
+        factor_conditions = [c for c in conditions if self._condition_field(c) in self.factor_fields
+                             and self._condition_field(c) not in self.basic_fields]
+        basic_conditions = [c for c in conditions if self._condition_field(c) in self.basic_fields]
+
+        factor_query = await self._build_query(factor_conditions, self.factor_fields)
+        factor_query["trade_date"] = trade_date
+        basic_query = await self._build_query(basic_conditions)
+        basic_query["source"] = source
+
+        sort_conditions = self._build_sort_conditions(order_by, with_factors=True)
+        pipeline = [
+            {"$match": factor_query},
+            {"$lookup": {
+                "from": self.collection_name,
+                "let": {"code": "$code"},
+                "pipeline": [
+                    {"$match": {"$expr": {"$eq": ["$code", "$$code"]}, **basic_query}},
+                    {"$limit": 1},
+                ],
+                "as": "basic",
+            }},
+            {"$unwind": "$basic"},
+            {"$facet": {
+                "total": [{"$count": "count"}],
+                "items": [{"$sort": dict(sort_conditions)}, {"$skip": offset}, {"$limit": limit}]
+                if sort_conditions else [{"$skip": offset}, {"$limit": limit}],
+            }},
+        ]
+        logger.info(f"📋 因子快照查询: trade_date={trade_date}, 因子条件={factor_query}, 基础条件={basic_query}")
+
+        db = get_mongo_db()
+        facets = await db[self.factor_collection_name].aggregate(pipeline).to_list(length=1)
+        facet = facets[0] if facets else {}
+        total_count = facet.get("total", [{}])[0].get("count", 0) if facet.get("total") else 0
+
+        results = []
+        codes = []
+        for doc in facet.get("items", []):
+            basic = doc.pop("basic", {}) or {}
+            results.append(self._format_result(basic, factors=doc))
+            codes.append(doc.get("code"))
+
+        if codes:
+            await self._enrich_with_financial_data(results, codes)
+
+        logger.info(f"✅ 因子快照筛选完成: 总数={total_count}, 返回={len(results)}, 交易日={trade_date}")
+        return results, total_count
+
+    async def _build_query(self, conditions: List[Dict[str, Any]],
+                           field_map: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """
+        构建MongoDB查询条件
+
+        条件列表编译为缓存的查询计划，field_map 中字段的条件下推为过滤条件，其余字段忽略。
+        """
+        field_map = field_map if field_map is not None else self.basic_fields
+        plan = compile_conditions(conditions, allowed_ops=self.operators.keys())
+        query, _ = plan.to_mongo_filter(field_map)
         return query
     
-    def _build_sort_conditions(self, order_by: Optional[List[Dict[str, str]]]) -> List[Tuple[str, int]]:
-        """构建排序条件"""
+    def _build_sort_conditions(self, order_by: Optional[List[Dict[str, str]]],
+                               with_factors: bool = False) -> List[Tuple[str, int]]:
+        """
+        构建排序条件
+
+        Args:
+            with_factors: 因子快照聚合中使用，基础信息字段位于 basic 子文档
+        """
+        prefix = "basic." if with_factors else ""
         if not order_by:
             # 默认按总市值降序排序
-            return [("total_mv", -1)]
+            return [(f"{prefix}total_mv", -1)]
         
         sort_conditions = []
         for order in order_by:
@@ -228,8 +321,11 @@ class DatabaseScreeningService:
             direction = order.get("direction", "desc")
             
             # 映射字段名
-            db_field = self.basic_fields.get(field)
-            if not db_field:
+            if with_factors and field in self.factor_fields and field not in self.basic_fields:
+                db_field = self.factor_fields[field]
+            elif field in self.basic_fields:
+                db_field = f"{prefix}{self.basic_fields[field]}"
+            else:
                 continue
             
             # 映射排序方向
@@ -309,8 +405,15 @@ class DatabaseScreeningService:
             logger.warning(f"⚠️ 填充财务数据失败: {e}")
             # 不抛出异常，允许继续返回基础数据
 
-    def _format_result(self, doc: Dict[str, Any]) -> Dict[str, Any]:
-        """格式化查询结果，统一使用后端字段名"""
+    def _format_result(self, doc: Dict[str, Any], factors: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        格式化查询结果，统一使用后端字段名
+
+        Args:
+            doc: stock_basic_info 文档
+            factors: stock_factor_snapshot 文档（技术因子筛选时提供）
+        """
+        factors = factors or {}
         # 根据股票代码推断市场类型
         code = doc.get("code", "")
         market_type = "A股"  # 默认A股
@@ -348,20 +451,21 @@ class DatabaseScreeningService:
             "turnover_rate": doc.get("turnover_rate"),
             "volume_ratio": doc.get("volume_ratio"),
 
-            # 交易数据（基础信息筛选时为None，需要实时数据）
-            "close": None,                          # 收盘价
-            "pct_chg": None,                        # 涨跌幅(%)
-            "amount": None,                         # 成交额
-
-            # 技术指标（基础信息筛选时为None）
-            "ma20": None,
-            "rsi14": None,
-            "kdj_k": None,
-            "kdj_d": None,
-            "kdj_j": None,
-            "dif": None,
-            "dea": None,
-            "macd_hist": None,
+            # 交易数据（来自因子快照，基础信息筛选时为None，需要实时数据）
+            "close": factors.get("close"),          # 收盘价
+            "pct_chg": factors.get("pct_chg"),      # 涨跌幅(%)
+            "amount": factors.get("amount"),        # 成交额
+
+            # 技术指标（来自因子快照，基础信息筛选时为None）
+            "ma20": factors.get("ma20"),
+            "rsi14": factors.get("rsi14"),
+            "kdj_k": factors.get("kdj_k"),
+            "kdj_d": factors.get("kdj_d"),
+            "kdj_j": factors.get("kdj_j"),
+            "dif": factors.get("dif"),
+            "dea": factors.get("dea"),
+            "macd_hist": factors.get("macd_hist"),
+            "trade_date": factors.get("trade_date"),
 
             # 元数据
             "source": doc.get("source", "database"),
@@ -19,6 +19,8 @@ from app.services.enhanced_screening.utils import (
     convert_conditions_to_traditional_format as _convert_to_traditional_util,
 )
 from app.core.database import get_mongo_db
+from app.services.screening.compiler import normalize_conditions
+from app.services.screening.result_set import get_screening_result_store
 
 
 class EnhancedScreeningService:
@@ -32,6 +34,108 @@ class EnhancedScreeningService:
         self.db_supported_fields = set(BASIC_FIELDS_INFO.keys())
 
     async def screen_stocks(
+        self,
+        conditions: List[ScreeningCondition],
+        market: str = "CN",
+        date: Optional[str] = None,
+        adj: str = "qfq",
+        limit: int = 50,
+        offset: int = 0,
+        order_by: Optional[List[Dict[str, str]]] = None,
+        use_database_optimization: bool = True,
+        cursor: Optional[str] = None,
+        refresh: bool = False
+    ) -> Dict[str, Any]:
+        """
+        智能股票筛选（带服务端结果集）
+
+        首次请求把完整有序结果物化到 Redis 结果集并返回游标（cursor），
+        之后相同条件的翻页/重新排序直接从结果集读取；refresh=True 强制重新筛选。
+
+        Args:
+            conditions: 筛选条件列表
+            market: 市场
+            date: 交易日期
+            adj: 复权方式
+            limit: 返回数量限制
+            offset: 偏移量
+            order_by: 排序条件
+            use_database_optimization: 是否使用数据库优化
+            cursor: 上次返回的结果集游标（与当前条件计算出的结果集ID不一致时忽略）
+            refresh: 忽略已有结果集，重新筛选
+
+        Returns:
+            Dict: 筛选结果
+        """
+        store = get_screening_result_store()
+        if not store.enabled:
+            return await self._execute_screen(conditions, market, date, adj, limit, offset,
+                                              order_by, use_database_optimization)
+
+        start_time = time.time()
+        try:
+            # 结果集ID始终由规范化后的请求计算；客户端游标只用于校验，不直接作为 Redis 键
+            result_id = await store.make_id({
+                "conditions": normalize_conditions(conditions),
+                "market": market,
+                "date": date,
+                "adj": adj,
+                "use_database_optimization": use_database_optimization,
+            })
+            if cursor and cursor != result_id:
+                logger.info(f"ℹ️ 筛选游标与当前条件/数据版本不匹配，已忽略: {cursor[:64]!r}")
+            if not refresh:
+                page = await store.get_page(result_id, order_by, offset, limit)
+                if page is not None:
+                    meta = page["meta"]
+                    logger.info(f"📦 筛选结果集命中: {result_id}, offset={offset}, limit={limit}")
+                    return {
+                        "total": page["total"],
+                        "items": page["items"],
+                        "took_ms": int((time.time() - start_time) * 1000),
+                        "optimization_used": meta.get("optimization_used"),
+                        "source": meta.get("source"),
+                        "analysis": meta.get("analysis"),
+                        "cursor": result_id,
+                        "cached": True,
+                    }
+        except Exception as e:
+            logger.warning(f"⚠️ 读取筛选结果集失败，直接执行筛选: {e}")
+            return await self._execute_screen(conditions, market, date, adj, limit, offset,
+                                              order_by, use_database_optimization)
+
+        # 超出物化范围的深分页直接筛选
+        if offset + limit > store.max_items:
+            return await self._execute_screen(conditions, market, date, adj, limit, offset,
+                                              order_by, use_database_optimization)
+
+        # 物化完整有序结果（最多 max_items 条）后返回当前页
+        result = await self._execute_screen(conditions, market, date, adj, store.max_items, 0,
+                                            order_by, use_database_optimization)
+        if result.get("source") == "error":
+            return result
+
+        items = result.get("items", [])
+        total = result.get("total", 0)
+        try:
+            await store.save(result_id, items, total, order_by, meta={
+                "optimization_used": result.get("optimization_used"),
+                "source": result.get("source"),
+                "analysis": result.get("analysis"),
+            })
+        except Exception as e:
+            logger.warning(f"⚠️ 保存筛选结果集失败: {e}")
+            result_id = None
+
+        return {
+            **result,
+            "items": items[offset:offset + limit],
+            "took_ms": int((time.time() - start_time) * 1000),
+            "cursor": result_id,
+            "cached": False,
+        }
+
+    async def _execute_screen(
         self,
         conditions: List[ScreeningCondition],
         market: str = "CN",
@@ -64,10 +168,11 @@ class EnhancedScreeningService:
             # 分析筛选条件
             analysis = self._analyze_conditions(conditions)
 
-            # 决定使用哪种筛选方式
+            # 决定使用哪种筛选方式：技术指标条件可由因子快照（stock_factor_snapshot）直接查询
             if (use_database_optimization and
                 analysis["can_use_database"] and
-                not analysis["needs_technical_indicators"]):
+                (not analysis["needs_technical_indicators"] or
+                 await self.db_service.can_handle_conditions(conditions))):
 
                 # 使用数据库优化筛选
                 result = await self._screen_with_database(
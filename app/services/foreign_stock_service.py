@@ -10,6 +10,7 @@ import logging
 import json
 import re
 import asyncio
+import functools
 from collections import defaultdict
 
 # 复用现有缓存系统
@@ -18,6 +19,9 @@ from tradingagents.dataflows.cache import get_cache
 # 复用现有数据源提供者
 from tradingagents.dataflows.providers.hk.hk_stock import HKStockProvider
 
+# 降级链熔断与对冲请求
+from tradingagents.dataflows.resilience import acall_with_fallback
+
 logger = logging.getLogger(__name__)
 
 
@@ -205,20 +209,14 @@ class ForeignStockService:
 
             logger.info(f"📊 [HK有效数据源] {valid_priority} (股票: {code})")
 
-            for source_name in valid_priority:
-                source_key = source_name.lower()
-                handler_name, handler_func = source_handlers[source_key]
-                try:
-                    # 🔥 使用 asyncio.to_thread 避免阻塞事件循环
-                    quote_data = await asyncio.to_thread(handler_func, code)
-                    data_source = handler_name
-
-                    if quote_data:
-                        logger.info(f"✅ {data_source}获取港股行情成功: {code}")
-                        break
-                except Exception as e:
-                    logger.warning(f"⚠️ {source_name}获取失败 ({code}): {e}")
-                    continue
+            # 🔥 在线程中按优先级调用（避免阻塞事件循环），跳过已熔断的数据源，可选对冲请求
+            quote_data, data_source = await acall_with_fallback(
+                [(source_handlers[name.lower()][0], functools.partial(source_handlers[name.lower()][1], code))
+                 for name in valid_priority],
+                op="hk_quote",
+            )
+            if quote_data:
+                logger.info(f"✅ {data_source}获取港股行情成功: {code}")
 
             if not quote_data:
                 raise Exception(f"无法获取港股{code}的行情数据：所有数据源均失败")
@@ -376,20 +374,14 @@ class ForeignStockService:
 
             logger.info(f"📊 [US有效数据源] {valid_priority} (股票: {code})")
 
-            for source_name in valid_priority:
-                source_key = source_name.lower()
-                handler_name, handler_func = source_handlers[source_key]
-                try:
-                    # 🔥 使用 asyncio.to_thread 避免阻塞事件循环
-                    quote_data = await asyncio.to_thread(handler_func, code)
-                    data_source = handler_name
-
-                    if quote_data:
-                        logger.info(f"✅ {data_source}获取美股行情成功: {code}")
-                        break
-                except Exception as e:
-                    logger.warning(f"⚠️ {source_name}获取失败 ({code}): {e}")
-                    continue
+            # 🔥 在线程中按优先级调用（避免阻塞事件循环），跳过已熔断的数据源，可选对冲请求
+            quote_data, data_source = await acall_with_fallback(
+                [(source_handlers[name.lower()][0], functools.partial(source_handlers[name.lower()][1], code))
+                 for name in valid_priority],
+                op="us_quote",
+            )
+            if quote_data:
+                logger.info(f"✅ {data_source}获取美股行情成功: {code}")
 
             if not quote_data:
                 raise Exception(f"无法获取美股{code}的行情数据：所有数据源均失败")
@@ -573,21 +565,14 @@ class ForeignStockService:
 
         logger.info(f"📊 [HK基础信息有效数据源] {valid_priority}")
 
-        for source_name in valid_priority:
-            source_key = source_name.lower()
-            handler_name, handler_func = source_handlers[source_key]
-            try:
-                # 🔥 使用 asyncio.to_thread 避免阻塞事件循环
-                import asyncio
-                info_data = await asyncio.to_thread(handler_func, code)
-                data_source = handler_name
-
-                if info_data:
-                    logger.info(f"✅ {data_source}获取港股基础信息成功: {code}")
-                    break
-            except Exception as e:
-                logger.warning(f"⚠️ {source_name}获取基础信息失败: {e}")
-                continue
+        # 🔥 在线程中按优先级调用（避免阻塞事件循环），跳过已熔断的数据源，可选对冲请求
+        info_data, data_source = await acall_with_fallback(
+            [(source_handlers[name.lower()][0], functools.partial(source_handlers[name.lower()][1], code))
+             for name in valid_priority],
+            op="hk_info",
+        )
+        if info_data:
+            logger.info(f"✅ {data_source}获取港股基础信息成功: {code}")
 
         if not info_data:
             raise Exception(f"无法获取港股{code}的基础信息：所有数据源均失败")
@@ -652,21 +637,14 @@ class ForeignStockService:
 
         logger.info(f"📊 [US基础信息有效数据源] {valid_priority}")
 
-        for source_name in valid_priority:
-            source_key = source_name.lower()
-            handler_name, handler_func = source_handlers[source_key]
-            try:
-                # 🔥 使用 asyncio.to_thread 避免阻塞事件循环
-                import asyncio
-                info_data = await asyncio.to_thread(handler_func, code)
-                data_source = handler_name
-
-                if info_data:
-                    logger.info(f"✅ {data_source}获取美股基础信息成功: {code}")
-                    break
-            except Exception as e:
-                logger.warning(f"⚠️ {source_name}获取基础信息失败: {e}")
-                continue
+        # 🔥 在线程中按优先级调用（避免阻塞事件循环），跳过已熔断的数据源，可选对冲请求
+        info_data, data_source = await acall_with_fallback(
+            [(source_handlers[name.lower()][0], functools.partial(source_handlers[name.lower()][1], code))
+             for name in valid_priority],
+            op="us_info",
+        )
+        if info_data:
+            logger.info(f"✅ {data_source}获取美股基础信息成功: {code}")
 
         if not info_data:
             raise Exception(f"无法获取美股{code}的基础信息：所有数据源均失败")
@@ -756,21 +734,14 @@ class ForeignStockService:
 
         logger.info(f"📊 [HK K线有效数据源] {valid_priority}")
 
-        for source_name in valid_priority:
-            source_key = source_name.lower()
-            handler_name, handler_func = source_handlers[source_key]
-            try:
-                # 🔥 使用 asyncio.to_thread 避免阻塞事件循环
-                import asyncio
-                kline_data = await asyncio.to_thread(handler_func, code, period, limit)
-                data_source = handler_name
-
-                if kline_data:
-                    logger.info(f"✅ {data_source}获取港股K线成功: {code}")
-                    break
-            except Exception as e:
-                logger.warning(f"⚠️ {source_name}获取K线失败: {e}")
-                continue
+        # 🔥 在线程中按优先级调用（避免阻塞事件循环），跳过已熔断的数据源，可选对冲请求
+        kline_data, data_source = await acall_with_fallback(
+            [(source_handlers[name.lower()][0], functools.partial(source_handlers[name.lower()][1], code, period, limit))
+             for name in valid_priority],
+            op="hk_kline",
+        )
+        if kline_data:
+            logger.info(f"✅ {data_source}获取港股K线成功: {code}")
 
         if not kline_data:
             raise Exception(f"无法获取港股{code}的K线数据：所有数据源均失败")
@@ -833,21 +804,14 @@ class ForeignStockService:
 
         logger.info(f"📊 [US K线有效数据源] {valid_priority}")
 
-        for source_name in valid_priority:
-            source_key = source_name.lower()
-            handler_name, handler_func = source_handlers[source_key]
-            try:
-                # 🔥 使用 asyncio.to_thread 避免阻塞事件循环
-                import asyncio
-                kline_data = await asyncio.to_thread(handler_func, code, period, limit)
-                data_source = handler_name
-
-                if kline_data:
-                    logger.info(f"✅ {data_source}获取美股K线成功: {code}")
-                    break
-            except Exception as e:
-                logger.warning(f"⚠️ {source_name}获取K线失败: {e}")
-                continue
+        # 🔥 在线程中按优先级调用（避免阻塞事件循环），跳过已熔断的数据源，可选对冲请求
+        kline_data, data_source = await acall_with_fallback(
+            [(source_handlers[name.lower()][0], functools.partial(source_handlers[name.lower()][1], code, period, limit))
+             for name in valid_priority],
+            op="us_kline",
+        )
+        if kline_data:
+            logger.info(f"✅ {data_source}获取美股K线成功: {code}")
 
         if not kline_data:
             raise Exception(f"无法获取美股{code}的K线数据：所有数据源均失败")
@@ -5,7 +5,7 @@
 """
 import asyncio
 import logging
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 from typing import Dict, Any, List, Optional, Union
 import pandas as pd
 from motor.motor_asyncio import AsyncIOMotorDatabase
@@ -14,6 +14,9 @@ from app.core.database import get_database
 
 logger = logging.getLogger(__name__)
 
+# 同步状态集合中标记"已从历史数据重建"的占位记录
+SYNC_STATE_MARKER = "__rebuilt__"
+
 
 class HistoricalDataService:
     """统一历史数据管理服务"""
@@ -22,12 +25,15 @@ class HistoricalDataService:
         """初始化服务"""
         self.db = None
         self.collection = None
+        self.sync_state = None
         
     async def initialize(self):
         """初始化数据库连接"""
         try:
             self.db = get_database()
             self.collection = self.db.stock_daily_quotes
+            # 同步状态：每个 (数据源, 周期, 股票) 已入库的最新交易日，写入历史数据后增量维护
+            self.sync_state = self.db.historical_sync_state
 
             # 🔥 确保索引存在（提升查询和 upsert 性能）
             await self._ensure_indexes()
@@ -62,6 +68,13 @@ class HistoricalDataService:
                 ("trade_date", -1)
             ], name="symbol_date_index", background=True)
 
+            # 5. 同步状态唯一索引
+            await self.sync_state.create_index([
+                ("data_source", 1),
+                ("period", 1),
+                ("symbol", 1)
+            ], unique=True, name="source_period_symbol_unique", background=True)
+
             logger.info("✅ 历史数据索引检查完成")
         except Exception as e:
             # 索引创建失败不应该阻止服务启动
@@ -104,18 +117,7 @@ class HistoricalDataService:
             # ⏱️ 性能监控：单位转换
             convert_start = datetime.now()
             # 🔥 在 DataFrame 层面做单位转换（向量化操作，比逐行快得多）
-            if data_source == "tushare":
-                # 成交额：千元 -> 元
-                if 'amount' in data.columns:
-                    data['amount'] = data['amount'] * 1000
-                elif 'turnover' in data.columns:
-                    data['turnover'] = data['turnover'] * 1000
-
-                # 成交量：手 -> 股
-                if 'volume' in data.columns:
-                    data['volume'] = data['volume'] * 100
-                elif 'vol' in data.columns:
-                    data['vol'] = data['vol'] * 100
+            self._convert_units(data, data_source)
 
             # 🔥 港股/美股数据：添加 pre_close 字段（从前一天的 close 获取）
             if market in ["HK", "US"] and 'pre_close' not in data.columns and 'close' in data.columns:
@@ -131,6 +133,8 @@ class HistoricalDataService:
             operations = []
             saved_count = 0
             batch_size = 200  # 进一步减小批量大小，避免超时（从500改为200）
+            batch_latest = None  # 当前批次的最新交易日
+            latest_saved = None  # 已成功写入的最新交易日（用于维护同步状态）
 
             for date_index, row in data.iterrows():
                 try:
@@ -151,6 +155,7 @@ class HistoricalDataService:
                         replacement=doc,
                         upsert=True
                     ))
+                    batch_latest = max(batch_latest or doc["trade_date"], doc["trade_date"])
 
                     # 批量执行（每200条）
                     if len(operations) >= batch_size:
@@ -159,7 +164,10 @@ class HistoricalDataService:
                         batch_write_duration = (datetime.now() - batch_write_start).total_seconds()
                         logger.debug(f"   批量写入 {len(operations)} 条，耗时 {batch_write_duration:.2f}秒")
                         saved_count += batch_saved
+                        if batch_saved:
+                            latest_saved = max(latest_saved or batch_latest, batch_latest)
                         operations = []
+                        batch_latest = None
 
                 except Exception as e:
                     # 获取日期信息用于错误日志
@@ -173,11 +181,17 @@ class HistoricalDataService:
             final_write_start = datetime.now()
             # 执行剩余操作
             if operations:
-                saved_count += await self._execute_bulk_write_with_retry(
+                batch_saved = await self._execute_bulk_write_with_retry(
                     symbol, operations
                 )
+                saved_count += batch_saved
+                if batch_saved:
+                    latest_saved = max(latest_saved or batch_latest, batch_latest)
             final_write_duration = (datetime.now() - final_write_start).total_seconds()
 
+            if latest_saved:
+                await self._advance_sync_state({symbol: latest_saved}, data_source, period)
+
             total_duration = (datetime.now() - total_start).total_seconds()
             logger.info(
                 f"✅ {symbol} 历史数据保存完成: {saved_count}条记录，"
@@ -190,6 +204,105 @@ class HistoricalDataService:
             logger.error(f"❌ 保存历史数据失败 {symbol}: {e}")
             return 0
 
+    def _convert_units(self, data: pd.DataFrame, data_source: str) -> None:
+        """统一单位（原地修改）：Tushare 成交额 千元 -> 元，成交量 手 -> 股"""
+        if data_source == "tushare":
+            # 成交额：千元 -> 元
+            if 'amount' in data.columns:
+                data['amount'] = data['amount'] * 1000
+            elif 'turnover' in data.columns:
+                data['turnover'] = data['turnover'] * 1000
+
+            # 成交量：手 -> 股
+            if 'volume' in data.columns:
+                data['volume'] = data['volume'] * 100
+            elif 'vol' in data.columns:
+                data['vol'] = data['vol'] * 100
+
+    async def save_cross_section(
+        self,
+        data: pd.DataFrame,
+        data_source: str,
+        market: str = "CN",
+        period: str = "daily",
+        symbol_column: str = "symbol"
+    ) -> int:
+        """
+        保存横截面数据（同一交易日多只股票），拆分为每只股票一条记录并批量写入
+
+        Args:
+            data: 包含股票代码列和 trade_date/date 列的 DataFrame
+            data_source: 数据源 (tushare/akshare/baostock)
+            market: 市场类型
+            period: 数据周期
+            symbol_column: 股票代码列名
+
+        Returns:
+            保存的记录数量
+        """
+        if self.collection is None:
+            await self.initialize()
+
+        if data is None or data.empty:
+            return 0
+
+        try:
+            from pymongo import ReplaceOne
+
+            start = datetime.now()
+            data = data.copy()
+            self._convert_units(data, data_source)
+
+            operations = []
+            saved_count = 0
+            batch_size = 1000
+            label = f"横截面({len(data)}只)"
+            batch_latest: Dict[str, str] = {}
+            latest_saved: Dict[str, str] = {}
+
+            async def flush():
+                batch_saved = await self._execute_bulk_write_with_retry(label, operations)
+                if batch_saved:
+                    for sym, trade_date in batch_latest.items():
+                        latest_saved[sym] = max(latest_saved.get(sym, trade_date), trade_date)
+                operations.clear()
+                batch_latest.clear()
+                return batch_saved
+
+            for _, row in data.iterrows():
+                try:
+                    doc = self._standardize_record(str(row[symbol_column]), row, data_source, market, period)
+                    operations.append(ReplaceOne(
+                        filter={
+                            "symbol": doc["symbol"],
+                            "trade_date": doc["trade_date"],
+                            "data_source": doc["data_source"],
+                            "period": doc["period"]
+                        },
+                        replacement=doc,
+                        upsert=True
+                    ))
+                    batch_latest[doc["symbol"]] = max(batch_latest.get(doc["symbol"], doc["trade_date"]), doc["trade_date"])
+                except Exception as e:
+                    logger.error(f"❌ 处理横截面记录失败 {row.get(symbol_column)}: {e}")
+                    continue
+
+                if len(operations) >= batch_size:
+                    saved_count += await flush()
+
+            if operations:
+                saved_count += await flush()
+
+            await self._advance_sync_state(latest_saved, data_source, period)
+
+            duration = (datetime.now() - start).total_seconds()
+            logger.info(f"✅ 横截面数据保存完成: {saved_count}/{len(data)}条记录，耗时 {duration:.2f}秒")
+            return saved_count
+
+        except Exception as e:
+            logger.error(f"❌ 保存横截面数据失败: {e}")
+            return 0
+
     async def _execute_bulk_write_with_retry(
         self,
         symbol: str,
@@ -448,6 +561,147 @@ class HistoricalDataService:
             logger.error(f"❌ 获取最新日期失败 {symbol}: {e}")
             return None
     
+    async def get_latest_dates(self, data_source: str, period: str = "daily") -> Optional[Dict[str, str]]:
+        """
+        批量获取每只股票已入库的最新交易日：{symbol: trade_date}
+
+        一次读取同步状态集合；该数据源/周期还没有建立过同步状态时（如升级前已有的历史数据），
+        先用一次 $group 聚合从历史数据重建。失败返回 None。
+        """
+        if self.collection is None:
+            await self.initialize()
+
+        try:
+            latest: Dict[str, str] = {}
+            built = False
+            cursor = self.sync_state.find(
+                {"data_source": data_source, "period": period},
+                {"_id": 0, "symbol": 1, "last_trade_date": 1}
+            )
+            async for doc in cursor:
+                if doc["symbol"] == SYNC_STATE_MARKER:
+                    built = True
+                elif doc.get("last_trade_date"):
+                    latest[doc["symbol"]] = doc["last_trade_date"]
+
+            if not built:
+                latest = await self.rebuild_sync_state(data_source, period)
+            return latest
+
+        except Exception as e:
+            logger.error(f"❌ 获取最新日期失败 {data_source}-{period}: {e}")
+            return None
+
+    async def rebuild_sync_state(self, data_source: str, period: str = "daily") -> Dict[str, str]:
+        """用一次 $group 聚合从历史数据重建同步状态"""
+        if self.collection is None:
+            await self.initialize()
+
+        start = datetime.now()
+        pipeline = [
+            {"$match": {"data_source": data_source, "period": period}},
+            {"$group": {"_id": "$symbol", "last_trade_date": {"$max": "$trade_date"}}}
+        ]
+        latest = {}
+        async for doc in self.collection.aggregate(pipeline, allowDiskUse=True):
+            if doc["_id"] and doc.get("last_trade_date"):
+                latest[doc["_id"]] = doc["last_trade_date"]
+
+        await self._advance_sync_state(latest, data_source, period, raise_errors=True)
+        await self.sync_state.update_one(
+            {"data_source": data_source, "period": period, "symbol": SYNC_STATE_MARKER},
+            {"$set": {"rebuilt_at": datetime.utcnow(), "symbols": len(latest)}},
+            upsert=True
+        )
+        duration = (datetime.now() - start).total_seconds()
+        logger.info(f"✅ 重建同步状态 {data_source}-{period}: {len(latest)}只股票，耗时 {duration:.2f}秒")
+        return latest
+
+    async def _advance_sync_state(
+        self,
+        latest: Dict[str, str],
+        data_source: str,
+        period: str,
+        raise_errors: bool = False
+    ) -> None:
+        """写入历史数据后推进同步状态（$max，只前进不回退）"""
+        if not latest or self.sync_state is None:
+            return
+
+        from pymongo import UpdateOne
+
+        now = datetime.utcnow()
+        operations = [
+            UpdateOne(
+                {"data_source": data_source, "period": period, "symbol": symbol},
+                {"$max": {"last_trade_date": trade_date}, "$set": {"updated_at": now}},
+                upsert=True
+            )
+            for symbol, trade_date in latest.items() if trade_date
+        ]
+        try:
+            for i in range(0, len(operations), 1000):
+                await self.sync_state.bulk_write(operations[i:i + 1000], ordered=False)
+        except Exception as e:
+            # 状态落后只会导致下次多同步几天（upsert 幂等），不影响数据正确性
+            logger.warning(f"⚠️ 更新同步状态失败 {data_source}-{period}: {e}")
+            if raise_errors:
+                raise
+
+    async def get_incremental_start_dates(
+        self,
+        symbols: List[str],
+        data_source: str,
+        period: str = "daily",
+        use_list_date: bool = True
+    ) -> Optional[Dict[str, str]]:
+        """
+        批量计算增量同步的起始日期 (YYYY-MM-DD)
+
+        - 已有数据的股票：最新交易日的下一天
+        - 没有数据的股票：上市日期（use_list_date=True 时，一次查询 stock_basic_info）
+
+        没有数据且没有上市日期的股票不出现在结果中，由调用方按单只股票的逻辑处理。失败返回 None。
+        """
+        latest = await self.get_latest_dates(data_source, period)
+        if latest is None:
+            return None
+
+        start_dates: Dict[str, str] = {}
+        missing = []
+        for symbol in symbols:
+            latest_date = latest.get(symbol)
+            if not latest_date:
+                missing.append(symbol)
+                continue
+            try:
+                next_date = datetime.strptime(latest_date, '%Y-%m-%d') + timedelta(days=1)
+                start_dates[symbol] = next_date.strftime('%Y-%m-%d')
+            except ValueError:
+                start_dates[symbol] = latest_date
+
+        if missing and use_list_date:
+            try:
+                cursor = self.db.stock_basic_info.find(
+                    {"code": {"$in": missing}},
+                    {"_id": 0, "code": 1, "list_date": 1}
+                )
+                async for doc in cursor:
+                    list_date = doc.get("list_date")
+                    if not list_date or doc.get("code") in start_dates:
+                        continue
+                    if isinstance(list_date, str):
+                        # 格式可能是 "20100101" 或 "2010-01-01"
+                        if len(list_date) == 8 and list_date.isdigit():
+                            list_date = f"{list_date[:4]}-{list_date[4:6]}-{list_date[6:]}"
+                    else:
+                        list_date = list_date.strftime('%Y-%m-%d')
+                    start_dates[doc["code"]] = list_date
+            except Exception as e:
+                logger.warning(f"⚠️ 批量获取上市日期失败: {e}")
+
+        return start_dates
+
     async def get_data_statistics(self) -> Dict[str, Any]:
         """获取数据统计信息"""
         if self.collection is None:
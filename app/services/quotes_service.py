@@ -1,5 +1,5 @@
 """
-QuotesService: 提供A股批量实时快照获取（AKShare东方财富 spot 接口），带内存TTL缓存。
+QuotesService: 提供A股批量实时快照获取（AKShare东方财富 spot 接口，进程内共享的全市场快照），带内存TTL缓存。
 - 不使用通达信（TDX）作为兜底数据源。
 - 仅用于筛选返回前对 items 进行行情富集。
 """
@@ -60,13 +60,15 @@ class QuotesService:
         不同版本可能有差异，做多列名兼容。
         """
         try:
-            import akshare as ak  # 已在项目中使用，不额外安装
-            df = ak.stock_zh_a_spot_em()
-            if df is None or getattr(df, "empty", True):
+            # 使用进程内共享的全市场快照，避免与行情入库/数据源重复下载
+            from tradingagents.dataflows.providers.china.spot_snapshot import EASTMONEY, get_spot_snapshot_service
+            snapshot = get_spot_snapshot_service().get(EASTMONEY)
+            if snapshot is None or not len(snapshot):
                 logger.warning("AKShare spot 返回空数据")
                 return {}
+            df = snapshot.frame
             # 兼容常见列名
-            code_col = next((c for c in ["代码", "代码code", "symbol", "股票代码"] if c in df.columns), None)
+            code_col = snapshot.code_column
             price_col = next((c for c in ["最新价", "现价", "最新价(元)", "price", "最新"] if c in df.columns), None)
             pct_col = next((c for c in ["涨跌幅", "涨跌幅(%)", "涨幅", "pct_chg"] if c in df.columns), None)
             amount_col = next((c for c in ["成交额", "成交额(元)", "amount", "成交额(万元)"] if c in df.columns), None)
@@ -76,18 +78,8 @@ class QuotesService:
                 return {}
 
             result: Dict[str, Dict[str, Optional[float]]] = {}
-            for _, row in df.iterrows():  # type: ignore
-                code_raw = row.get(code_col)
-                if not code_raw:
-                    continue
-                # 标准化股票代码：移除前导0，然后补齐到6位
-                code_str = str(code_raw).strip()
-                # 如果是纯数字，移除前导0后补齐到6位
-                if code_str.isdigit():
-                    code_clean = code_str.lstrip('0') or '0'  # 移除前导0，如果全是0则保留一个0
-                    code = code_clean.zfill(6)  # 补齐到6位
-                else:
-                    code = code_str.zfill(6)
+            # 快照已按标准化的 6 位代码建立索引
+            for code, row in snapshot.items():
                 close = _safe_float(row.get(price_col))
                 pct = _safe_float(row.get(pct_col)) if pct_col else None
                 amt = _safe_float(row.get(amount_col)) if amount_col else None
@@ -0,0 +1,345 @@
+"""
+筛选条件 DSL 编译器
+
+把条件树一次性解析为不可变的类型化查询计划（ConditionPlan），之后：
+- to_mongo_filter(): 生成可下推到 MongoDB 的过滤条件，并返回无法下推的剩余条件
+- mask(): 对任意列式数据（面板横截面、DataFrame 最近一行、基本面快照）做向量化求值
+- fields / projection(): 条件涉及的最小字段集合
+
+计划按规范化后的条件哈希缓存，重复筛选不再重复解析。
+
+条件树格式：
+    叶子: {"field": "rsi14", "op": ">", "value": 70} / {"field": "ma5", "op": "cross_up", "right_field": "ma20"}
+    分组: {"logic": "AND" | "OR", "children": [...]}
+"""
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from enum import Enum
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+# 可下推到 MongoDB 的操作符
+MONGO_OPS = {">": "$gt", "<": "$lt", ">=": "$gte", "<=": "$lte", "==": "$eq", "!=": "$ne",
+             "in": "$in", "not_in": "$nin"}
+CROSS_OPS = {"cross_up", "cross_down"}
+
+# 取值函数：(字段, 是否取前一根K线) -> 长度为 size 的 float 数组
+ValueGetter = Callable[[str, bool], np.ndarray]
+
+
+@dataclass(frozen=True)
+class Predicate:
+    """叶子条件"""
+    field: str
+    op: str
+    value: Any = None
+    right_field: Optional[str] = None
+    # 字段/操作符不合法时为 False：叶子恒为假（或 skip_unknown 时恒为真）
+    valid: bool = True
+    constant: Optional[bool] = None
+
+    @property
+    def pushable(self) -> bool:
+        return (self.valid and self.constant is None and self.right_field is None
+                and (self.op in MONGO_OPS or self.op in ("between", "contains")))
+
+    def mongo(self, field_map: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        db_field = field_map.get(self.field)
+        if db_field is None or not self.pushable:
+            return None
+        if self.op == "between":
+            if isinstance(self.value, (list, tuple)) and len(self.value) == 2:
+                return {db_field: {"$gte": self.value[0], "$lte": self.value[1]}}
+            return None
+        if self.op == "contains":
+            return {db_field: {"$regex": str(self.value), "$options": "i"}}
+        value = list(self.value) if isinstance(self.value, tuple) else self.value
+        return {db_field: {MONGO_OPS[self.op]: value}}
+
+
+@dataclass(frozen=True)
+class Group:
+    """分组条件"""
+    logic: str
+    children: Tuple[Union["Group", Predicate], ...]
+
+
+Node = Union[Group, Predicate]
+
+
+def _to_float(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass(frozen=True)
+class ConditionPlan:
+    """编译后的条件计划"""
+    root: Optional[Node]
+    fields: Tuple[str, ...]
+
+    @property
+    def needs_previous(self) -> bool:
+        """是否包含需要前一根K线的交叉条件"""
+        return any(p.op in CROSS_OPS for p in self.predicates())
+
+    def predicates(self) -> List[Predicate]:
+        out: List[Predicate] = []
+
+        def walk(node: Optional[Node]):
+            if isinstance(node, Group):
+                for c in node.children:
+                    walk(c)
+            elif node is not None:
+                out.append(node)
+
+        walk(self.root)
+        return out
+
+    def projection(self, field_map: Optional[Dict[str, str]] = None) -> Dict[str, int]:
+        """MongoDB 投影（仅包含条件涉及的字段）"""
+        field_map = field_map or {}
+        return {field_map.get(f, f): 1 for f in self.fields}
+
+    # --- MongoDB 下推 ---
+    def to_mongo_filter(self, field_map: Dict[str, str]) -> Tuple[Dict[str, Any], Optional[Node]]:
+        """
+        生成 MongoDB 过滤条件
+
+        AND 分组中可下推的子条件合并为过滤条件，其余作为剩余条件；
+        OR 分组仅在全部子条件可下推时整体下推。
+
+        Returns:
+            (过滤条件, 剩余条件节点或 None)
+        """
+        def split(node: Optional[Node]) -> Tuple[List[Dict[str, Any]], Optional[Node]]:
+            if node is None:
+                return [], None
+            if isinstance(node, Predicate):
+                query = node.mongo(field_map)
+                return ([query], None) if query is not None else ([], node)
+            if node.logic == "AND":
+                filters: List[Dict[str, Any]] = []
+                residual: List[Node] = []
+                for child in node.children:
+                    child_filters, child_residual = split(child)
+                    filters.extend(child_filters)
+                    if child_residual is not None:
+                        residual.append(child_residual)
+                rest = None if not residual else residual[0] if len(residual) == 1 else Group("AND", tuple(residual))
+                return filters, rest
+            parts = [split(child) for child in node.children]
+            if parts and all(rest is None for _, rest in parts):
+                return [{"$or": [_merge(f) for f, _ in parts]}], None
+            return [], node
+
+        filters, residual = split(self.root)
+        return _merge(filters), residual
+
+    # --- 向量化求值 ---
+    def mask(self, get: ValueGetter, size: int, node: Optional[Node] = None) -> np.ndarray:
+        """
+        向量化求值
+
+        Args:
+            get: 取值函数 (字段, 是否取前一根K线) -> float 数组，缺失值为 NaN
+            size: 数组长度（标的数）
+            node: 只求值某个子树（如 to_mongo_filter 返回的剩余条件），默认整棵树
+
+        Returns:
+            布尔数组
+        """
+        cache: Dict[Tuple[str, bool], np.ndarray] = {}
+
+        def values(name: str, previous: bool = False) -> np.ndarray:
+            key = (name, previous)
+            if key not in cache:
+                cache[key] = np.asarray(get(name, previous), dtype=float)
+            return cache[key]
+
+        def leaf(p: Predicate) -> np.ndarray:
+            if p.constant is not None:
+                return np.full(size, p.constant, dtype=bool)
+            if p.op in CROSS_OPS:
+                a0, a1 = values(p.field), values(p.field, True)
+                b0, b1 = values(p.right_field), values(p.right_field, True)
+                valid = ~(np.isnan(a0) | np.isnan(a1) | np.isnan(b0) | np.isnan(b1))
+                if p.op == "cross_up":
+                    return valid & (a1 <= b1) & (a0 > b0)
+                return valid & (a1 >= b1) & (a0 < b0)
+
+            left = values(p.field)
+            valid = ~np.isnan(left)
+            if p.op == "between":
+                lo_hi = p.value if isinstance(p.value, tuple) and len(p.value) == 2 else (None, None)
+                lo, hi = _to_float(lo_hi[0]), _to_float(lo_hi[1])
+                if lo is None or hi is None:
+                    return np.zeros(size, dtype=bool)
+                return valid & (left >= lo) & (left <= hi)
+            if p.op in ("in", "not_in"):
+                options = [v for v in (_to_float(x) for x in (p.value if isinstance(p.value, tuple) else ())) if v is not None]
+                hit = np.isin(left, options)
+                return valid & (hit if p.op == "in" else ~hit)
+            if p.op not in MONGO_OPS:
+                return np.zeros(size, dtype=bool)
+
+            if p.right_field is not None:
+                right: Any = values(p.right_field)
+            else:
+                right = _to_float(p.value)
+                if right is None:
+                    return np.zeros(size, dtype=bool)
+            with np.errstate(invalid="ignore"):
+                if p.op == ">":
+                    return valid & (left > right)
+                if p.op == "<":
+                    return valid & (left < right)
+                if p.op == ">=":
+                    return valid & (left >= right)
+                if p.op == "<=":
+                    return valid & (left <= right)
+                if p.op == "==":
+                    return valid & (left == right)
+                return valid & (left != right)
+
+        def walk(n: Optional[Node]) -> np.ndarray:
+            if n is None:
+                return np.ones(size, dtype=bool)
+            if isinstance(n, Predicate):
+                return leaf(n)
+            flags = [walk(c) for c in n.children]
+            if n.logic == "OR":
+                return np.logical_or.reduce(flags) if flags else np.zeros(size, dtype=bool)
+            return np.logical_and.reduce(flags) if flags else np.ones(size, dtype=bool)
+
+        return walk(self.root if node is None else node)
+
+    def matches(self, get_scalar: Callable[[str, bool], Any]) -> bool:
+        """单个标的求值（get_scalar 返回标量）"""
+        return bool(self.mask(lambda name, previous: np.array([_scalar(get_scalar(name, previous))]), 1)[0])
+
+
+def _scalar(value: Any) -> float:
+    v = _to_float(value)
+    return np.nan if v is None else v
+
+
+def _merge(filters: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """合并多个过滤条件（同字段的操作符合并，冲突时退化为 $and）"""
+    merged: Dict[str, Any] = {}
+    extra: List[Dict[str, Any]] = []
+    for f in filters:
+        for key, cond in f.items():
+            if key not in merged:
+                merged[key] = dict(cond) if isinstance(cond, dict) else cond
+            elif (isinstance(merged[key], dict) and isinstance(cond, dict)
+                  and not key.startswith("$") and not set(merged[key]) & set(cond)):
+                merged[key].update(cond)
+            else:
+                extra.append({key: cond})
+    if extra:
+        merged.setdefault("$and", []).extend(extra)
+    return merged
+
+
+# --- 解析 ---
+def _freeze(value: Any) -> Any:
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _parse(node: Dict[str, Any], allowed_fields: Optional[frozenset], allowed_ops: Optional[frozenset],
+           skip_unknown: bool, fields: List[str]) -> Optional[Node]:
+    if not node:
+        return None
+    if node.get("op") == "group" or "children" in node:
+        logic = "OR" if (node.get("logic") or "AND").upper() == "OR" else "AND"
+        children = tuple(c for c in (_parse(child, allowed_fields, allowed_ops, skip_unknown, fields)
+                                     for child in node.get("children", [])) if c is not None)
+        return Group(logic, children)
+
+    field = node.get("field")
+    op = node.get("op")
+    right_field = node.get("right_field") or None
+    field_ok = isinstance(field, str) and (allowed_fields is None or field in allowed_fields)
+    right_ok = right_field is None or (isinstance(right_field, str)
+                                       and (allowed_fields is None or right_field in allowed_fields))
+    if field_ok:
+        fields.append(field)
+    if right_field is not None and right_ok:
+        fields.append(right_field)
+
+    if not field_ok:
+        return Predicate(str(field), str(op), valid=False, constant=bool(skip_unknown))
+    if (allowed_ops is not None and op not in allowed_ops) or not right_ok \
+            or (op in CROSS_OPS and right_field is None):
+        return Predicate(field, str(op), valid=False, constant=False)
+    return Predicate(field, op, value=_freeze(node.get("value")), right_field=right_field)
+
+
+@lru_cache(maxsize=512)
+def _compile_cached(key: str) -> ConditionPlan:
+    payload = json.loads(key)
+    allowed_fields = frozenset(payload["fields"]) if payload["fields"] is not None else None
+    allowed_ops = frozenset(payload["ops"]) if payload["ops"] is not None else None
+    fields: List[str] = []
+    root = _parse(payload["node"], allowed_fields, allowed_ops, payload["skip_unknown"], fields)
+    return ConditionPlan(root=root, fields=tuple(dict.fromkeys(fields)))
+
+
+def normalize_conditions(node: Any) -> Any:
+    """把 ScreeningCondition 列表等输入规范化为条件树（列表视为 AND 分组，operator 视为 op）"""
+    if isinstance(node, (list, tuple)):
+        return {"logic": "AND", "children": [normalize_conditions(c) for c in node]}
+    if not isinstance(node, dict):
+        node = {
+            "field": getattr(node, "field", None),
+            "op": getattr(node, "operator", None),
+            "value": getattr(node, "value", None),
+        }
+    if "operator" in node and "op" not in node:
+        node = {**{k: v for k, v in node.items() if k != "operator"}, "op": node["operator"]}
+    if isinstance(node.get("op"), Enum):
+        node = {**node, "op": node["op"].value}
+    if "children" in node:
+        node = {**node, "children": [normalize_conditions(c) for c in node.get("children", [])]}
+    return node
+
+
+def compile_conditions(
+    node: Any,
+    allowed_fields: Optional[Iterable[str]] = None,
+    allowed_ops: Optional[Iterable[str]] = None,
+    skip_unknown: bool = False,
+) -> ConditionPlan:
+    """
+    编译条件树（按规范化哈希缓存）
+
+    Args:
+        node: 条件树 / 条件列表 / ScreeningCondition 列表
+        allowed_fields: 允许的字段，None 表示不限制
+        allowed_ops: 允许的操作符，None 表示不限制
+        skip_unknown: 不在 allowed_fields 中的叶子视为真（用于只评估部分字段的场景）
+
+    Returns:
+        ConditionPlan
+    """
+    key = json.dumps({
+        "node": normalize_conditions(node) or {},
+        "fields": sorted(allowed_fields) if allowed_fields is not None else None,
+        "ops": sorted(allowed_ops) if allowed_ops is not None else None,
+        "skip_unknown": bool(skip_unknown),
+    }, sort_keys=True, ensure_ascii=False, default=str)
+    return _compile_cached(key)
+
+
+def plan_cache_info():
+    """查询计划缓存命中统计"""
+    return _compile_cached.cache_info()
@@ -0,0 +1,180 @@
+"""
+筛选结果集（Redis 服务端缓存 + 游标分页）
+
+首次筛选把完整的有序结果物化到 Redis，返回游标；后续翻页与重新排序直接从结果集读取，
+不再重新执行筛选。结果集键由 条件哈希 + 数据版本 组成，排序视图按排序规格单独保存：
+
+    {prefix}:{id}:meta               结果集元数据（total、来源、创建时间等）
+    {prefix}:{id}:items              HASH  code -> 结果条目 JSON
+    {prefix}:{id}:order:{sort_hash}  LIST  按该排序规格排好序的 code（未指定排序时为服务默认顺序）
+
+数据版本在技术因子快照等数据更新后递增（bump_data_version），旧结果集自然失效。
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "screening:rs"
+DATA_VERSION_KEY = "screening:data_version"
+
+
+def _hash(payload: Any) -> str:
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:20]
+
+
+def normalize_order_by(order_by: Optional[List[Dict[str, str]]]) -> List[Dict[str, str]]:
+    return [{"field": o.get("field"), "direction": (o.get("direction") or "desc").lower()}
+            for o in (order_by or []) if o.get("field")]
+
+
+def sort_items(items: List[Dict[str, Any]], order_by: List[Dict[str, str]]) -> Optional[List[Dict[str, Any]]]:
+    """
+    按排序规格对结果条目排序（空值始终排在最后）
+
+    Returns:
+        排序后的列表；排序字段在结果条目中不存在时返回 None（无法从结果集重排）
+    """
+    for order in order_by:
+        if items and not any(order["field"] in it for it in items):
+            return None
+    ordered = list(items)
+    try:
+        for order in reversed(order_by):
+            f = order["field"]
+            present = [it for it in ordered if it.get(f) is not None]
+            missing = [it for it in ordered if it.get(f) is None]
+            present.sort(key=lambda x: x[f], reverse=order["direction"] == "desc")
+            ordered = present + missing
+    except TypeError:
+        # 字段类型混杂无法比较
+        return None
+    return ordered
+
+
+class ScreeningResultSetStore:
+    """筛选结果集存储"""
+
+    def __init__(self, redis=None, ttl: int = 300, max_items: int = 5000, enabled: bool = True):
+        """
+        Args:
+            redis: redis.asyncio 客户端（decode_responses=True），None 时使用 get_redis_client()
+            ttl: 结果集过期时间（秒）
+            max_items: 单个结果集最多物化的条目数
+            enabled: 是否启用
+        """
+        self._redis = redis
+        self.ttl = ttl
+        self.max_items = max_items
+        self.enabled = enabled
+
+    @classmethod
+    def from_settings(cls) -> "ScreeningResultSetStore":
+        from app.core.config import settings
+        return cls(
+            ttl=settings.SCREENING_RESULT_SET_TTL_SECONDS,
+            max_items=settings.SCREENING_RESULT_SET_MAX_ITEMS,
+            enabled=settings.SCREENING_RESULT_SET_ENABLED,
+        )
+
+    @property
+    def redis(self):
+        if self._redis is None:
+            from app.core.database import get_redis_client
+            self._redis = get_redis_client()
+        return self._redis
+
+    async def get_data_version(self) -> str:
+        version = await self.redis.get(DATA_VERSION_KEY)
+        return str(version or "0")
+
+    async def bump_data_version(self) -> int:
+        """数据更新后递增数据版本，使已有结果集失效"""
+        return int(await self.redis.incr(DATA_VERSION_KEY))
+
+    async def make_id(self, request: Dict[str, Any]) -> str:
+        """结果集ID：条件（含市场/日期/复权口径等）哈希 + 数据版本"""
+        return f"{_hash(request)}.{await self.get_data_version()}"
+
+    async def get_page(self, result_id: str, order_by: Optional[List[Dict[str, str]]],
+                       offset: int, limit: int) -> Optional[Dict[str, Any]]:
+        """
+        从结果集读取一页
+
+        Returns:
+            {"total", "items", "cursor", "meta"}；结果集不存在或无法满足本次请求时返回 None
+        """
+        base = f"{KEY_PREFIX}:{result_id}"
+        raw_meta = await self.redis.get(f"{base}:meta")
+        if not raw_meta:
+            return None
+        meta = json.loads(raw_meta)
+        order_by = normalize_order_by(order_by)
+        stored = meta["stored"]
+
+        # 截断的结果集只能按物化时的排序读取前 stored 条
+        truncated = meta["total"] > stored
+        if truncated and (offset + limit > stored or order_by != meta.get("order_by")):
+            return None
+
+        order_key = f"{base}:order:{_hash(order_by)}"
+        if not await self.redis.exists(order_key):
+            # 未指定排序时的默认顺序由筛选服务决定，只能读取未排序筛选物化的视图
+            if not order_by:
+                return None
+            raw_items = await self.redis.hgetall(f"{base}:items")
+            ordered = sort_items([json.loads(v) for v in raw_items.values()], order_by)
+            if ordered is None:
+                return None
+            codes = [it["code"] for it in ordered]
+            if codes:
+                await self.redis.rpush(order_key, *codes)
+                await self.redis.expire(order_key, max(1, int(await self.redis.ttl(f"{base}:meta"))))
+
+        codes = await self.redis.lrange(order_key, offset, offset + limit - 1)
+        items = [json.loads(v) for v in await self.redis.hmget(f"{base}:items", codes) if v] if codes else []
+        return {"total": meta["total"], "items": items, "cursor": result_id, "meta": meta}
+
+    async def save(self, result_id: str, items: List[Dict[str, Any]], total: int,
+                   order_by: Optional[List[Dict[str, str]]], meta: Optional[Dict[str, Any]] = None):
+        """物化完整有序结果"""
+        base = f"{KEY_PREFIX}:{result_id}"
+        order_by = normalize_order_by(order_by)
+        items = items[:self.max_items]
+        codes = [str(it.get("code")) for it in items]
+
+        await self.redis.delete(f"{base}:items", f"{base}:meta")
+        if items:
+            await self.redis.hset(f"{base}:items", mapping={
+                code: json.dumps(it, ensure_ascii=False, default=str) for code, it in zip(codes, items)
+            })
+            order_key = f"{base}:order:{_hash(order_by)}"
+            await self.redis.delete(order_key)
+            await self.redis.rpush(order_key, *codes)
+            await self.redis.expire(order_key, self.ttl)
+            await self.redis.expire(f"{base}:items", self.ttl)
+        await self.redis.set(f"{base}:meta", json.dumps({
+            **(meta or {}),
+            "total": total,
+            "stored": len(items),
+            "order_by": order_by,
+            "created_at": time.time(),
+        }, ensure_ascii=False, default=str), ex=self.ttl)
+
+
+# 全局实例
+_result_set_store: Optional[ScreeningResultSetStore] = None
+
+
+def get_screening_result_store() -> ScreeningResultSetStore:
+    """获取筛选结果集存储"""
+    global _result_set_store
+    if _result_set_store is None:
+        _result_set_store = ScreeningResultSetStore.from_settings()
+    return _result_set_store
@@ -0,0 +1,364 @@
+"""
+全市场向量化筛选引擎
+
+一次性从 stock_daily_quotes 批量读取最近一段时间的日线，组装为 (日期 x 标的) 的列式面板；
+技术指标按面板整体计算（tradingagents.tools.analysis.panel），
+条件树在面板的最新横截面上以布尔掩码求值，排序与分页使用 NumPy 完成。
+
+语义与逐只股票的 eval_utils.evaluate_conditions 保持一致：
+- 普通比较使用每只股票最近一根有效K线
+- cross_up / cross_down 使用最近两根有效K线（停牌日自动跳过）
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.services.screening.compiler import compile_conditions
+from tradingagents.tools.analysis.indicators import IndicatorSpec
+from tradingagents.tools.analysis.panel import compute_panel
+
+logger = logging.getLogger("agents")
+
+
+# 筛选使用的固定参数技术指标（列名与 compute_indicator 一致）
+SCREENING_SPECS = [
+    IndicatorSpec("ma", {"n": 5}),
+    IndicatorSpec("ma", {"n": 10}),
+    IndicatorSpec("ma", {"n": 20}),
+    IndicatorSpec("ma", {"n": 60}),
+    IndicatorSpec("ema", {"n": 12}),
+    IndicatorSpec("ema", {"n": 26}),
+    IndicatorSpec("macd"),
+    IndicatorSpec("rsi", {"n": 14}),
+    IndicatorSpec("boll", {"n": 20, "k": 2}),
+    IndicatorSpec("atr", {"n": 14}),
+    IndicatorSpec("kdj", {"n": 9, "m1": 3, "m2": 3}),
+]
+
+# stock_daily_quotes 字段 -> 面板字段
+QUOTE_FIELDS = {"open": "open", "high": "high", "low": "low", "close": "close", "volume": "vol", "amount": "amount"}
+
+# 同一标的同一天存在多个数据源时的取值优先级（越靠前越优先）
+SOURCE_PRIORITY = ("tushare", "akshare", "baostock")
+
+# 面板最新交易日落后于筛选日期超过该天数（自然日）时视为行情未同步，默认覆盖春节等长假
+DEFAULT_MAX_LAG_DAYS = 10
+
+# 结果条目中返回的字段（与逐只筛选的返回结构一致）
+ITEM_BASE_FIELDS = ("close", "pct_chg", "amount")
+ITEM_TECH_FIELDS = ("ma20", "rsi14", "kdj_k", "kdj_d", "kdj_j", "dif", "dea", "macd_hist")
+
+
+class PanelUnavailableError(RuntimeError):
+    """stock_daily_quotes 为空或未同步到筛选日期，面板无法代表全市场"""
+
+
+@dataclass
+class ScreeningPanel:
+    """列式行情面板：每个字段一个 (日期 x 标的) 的 float 数组"""
+    dates: np.ndarray
+    symbols: np.ndarray
+    fields: Dict[str, np.ndarray] = field(default_factory=dict)
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return len(self.dates), len(self.symbols)
+
+    def last_positions(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        每个标的最近两根有效K线（close 非空）的行号
+
+        Returns:
+            (last, prev)，不存在时为 -1
+        """
+        n_dates, n_symbols = self.shape
+        valid = ~np.isnan(self.fields["close"])
+        if n_dates == 0:
+            empty = np.full(n_symbols, -1, dtype=np.int64)
+            return empty, empty.copy()
+        rows = np.arange(n_dates)[:, None]
+        last = np.where(valid, rows, -1).max(axis=0)
+        prev = np.where(valid & (rows < last[None, :]), rows, -1).max(axis=0)
+        return last, prev
+
+    def take(self, name: str, positions: np.ndarray) -> np.ndarray:
+        """按每个标的的行号取值，字段不存在或行号为 -1 时为 NaN"""
+        values = self.fields.get(name)
+        if values is None or not len(positions):
+            return np.full(len(positions), np.nan)
+        out = values[np.clip(positions, 0, None), np.arange(len(positions))]
+        return np.where(positions >= 0, out, np.nan)
+
+
+def build_panel(columns: Dict[str, np.ndarray]) -> ScreeningPanel:
+    """
+    把长表列（symbol、trade_date、data_source 及价格字段）组装为面板
+
+    同一 (标的, 日期) 存在多个数据源时按 SOURCE_PRIORITY 取值。
+    """
+    symbol_codes, symbols = pd.factorize(columns["symbol"], sort=True)
+    date_codes, dates = pd.factorize(columns["trade_date"], sort=True)
+    n_dates, n_symbols = len(dates), len(symbols)
+
+    rank = {name: i for i, name in enumerate(SOURCE_PRIORITY)}
+    source_rank = np.fromiter((rank.get(s, len(rank)) for s in columns["data_source"]),
+                              dtype=np.int64, count=len(symbol_codes))
+    cell = date_codes.astype(np.int64) * n_symbols + symbol_codes
+    # 稳定排序后每个单元格第一条即优先级最高的记录
+    order = np.lexsort((source_rank, cell))
+    _, first = np.unique(cell[order], return_index=True)
+    keep = order[first]
+    rows, cols = date_codes[keep], symbol_codes[keep]
+
+    fields: Dict[str, np.ndarray] = {}
+    for name in QUOTE_FIELDS.values():
+        if name not in columns:
+            continue
+        grid = np.full((n_dates, n_symbols), np.nan)
+        grid[rows, cols] = np.asarray(columns[name], dtype=float)[keep]
+        fields[name] = grid
+    return ScreeningPanel(dates=np.asarray(dates), symbols=np.asarray(symbols), fields=fields)
+
+
+def add_derived_fields(panel: ScreeningPanel, with_technical: bool = True) -> ScreeningPanel:
+    """计算派生字段 pct_chg 以及（可选）全部技术指标面板"""
+    close = panel.fields["close"]
+    prev_close = pd.DataFrame(close).ffill().shift(1).to_numpy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        panel.fields["pct_chg"] = (close / prev_close - 1.0) * 100.0
+
+    if with_technical and close.size:
+        inputs = {name: panel.fields[name] for name in ("close", "high", "low") if name in panel.fields}
+        specs = SCREENING_SPECS if {"high", "low"} <= set(inputs) else [
+            s for s in SCREENING_SPECS if s.name not in ("atr", "kdj")
+        ]
+        panel.fields.update(compute_panel(inputs, specs))
+    return panel
+
+
+def evaluate_mask(
+    panel: ScreeningPanel,
+    node: Dict[str, Any],
+    allowed_fields: Iterable[str],
+    allowed_ops: Iterable[str],
+    positions: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+) -> np.ndarray:
+    """
+    在面板上对条件树求值（条件树编译为缓存的查询计划）
+
+    Returns:
+        长度为标的数的布尔数组
+    """
+    plan = compile_conditions(node, allowed_fields, allowed_ops)
+    last, prev = positions if positions is not None else panel.last_positions()
+    return plan.mask(lambda name, previous: panel.take(name, prev if previous else last), len(panel.symbols))
+
+
+def sort_and_page(
+    panel: ScreeningPanel,
+    selected: np.ndarray,
+    order_by: Optional[List[Dict[str, str]]],
+    allowed_fields: Iterable[str],
+    offset: int = 0,
+    limit: int = 50,
+    positions: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+) -> np.ndarray:
+    """
+    对选中的标的排序并分页
+
+    Args:
+        selected: 选中标的的列号
+        order_by: [{field, direction}]，前者优先；空值始终排在最后
+
+    Returns:
+        当前页标的的列号
+    """
+    allowed_fields = set(allowed_fields)
+    last = positions[0] if positions is not None else panel.last_positions()[0]
+    keys: List[np.ndarray] = [selected]  # 最低优先级：保持原有顺序
+    for order in reversed(order_by or []):
+        name = order.get("field")
+        if name not in allowed_fields:
+            continue
+        values = panel.take(name, last[selected])
+        missing = np.isnan(values)
+        values = np.where(missing, 0.0, values)
+        if (order.get("direction") or "desc").lower() == "desc":
+            values = -values
+        keys.extend([values, missing])
+    ordered = selected[np.lexsort(keys)] if len(keys) > 1 else selected
+    start = offset or 0
+    return ordered[start:start + (limit or 50)]
+
+
+class VectorizedScreeningEngine:
+    """基于 stock_daily_quotes 的全市场向量化筛选"""
+
+    def __init__(self, db=None, lookback_days: int = 220, cache_ttl: Optional[float] = None,
+                 max_lag_days: Optional[int] = None):
+        """
+        初始化
+
+        Args:
+            db: 同步 MongoDB 数据库（pymongo），None 时使用 get_mongo_db_sync()
+            lookback_days: 向前读取的自然日天数（需覆盖 MA60 等指标的预热期）
+            cache_ttl: 面板缓存时间（秒），None 时读取 TA_SCREENING_PANEL_TTL_SECONDS（默认300）
+            max_lag_days: 面板最新交易日允许落后筛选日期的自然日天数，
+                None 时读取 TA_SCREENING_PANEL_MAX_LAG_DAYS（默认10）
+        """
+        self._db = db
+        self.lookback_days = lookback_days
+        self.cache_ttl = float(os.getenv("TA_SCREENING_PANEL_TTL_SECONDS", "300")) if cache_ttl is None else cache_ttl
+        self.max_lag_days = int(os.getenv("TA_SCREENING_PANEL_MAX_LAG_DAYS", str(DEFAULT_MAX_LAG_DAYS))) \
+            if max_lag_days is None else max_lag_days
+        self._cache: Dict[Tuple[str, bool], Tuple[float, ScreeningPanel]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def db(self):
+        if self._db is None:
+            from app.core.database import get_mongo_db_sync
+            self._db = get_mongo_db_sync()
+        return self._db
+
+    def load_columns(self, end_date: str) -> Dict[str, np.ndarray]:
+        """一次批量读取 [end_date - lookback_days, end_date] 的全部日线，返回长表列"""
+        start_date = (datetime.strptime(end_date, "%Y-%m-%d") - timedelta(days=self.lookback_days)).strftime("%Y-%m-%d")
+        projection = {"_id": 0, "symbol": 1, "code": 1, "trade_date": 1, "data_source": 1}
+        projection.update({name: 1 for name in QUOTE_FIELDS})
+        cursor = self.db["stock_daily_quotes"].find(
+            {"period": "daily", "trade_date": {"$gte": start_date, "$lte": end_date}},
+            projection,
+            batch_size=10000,
+        )
+
+        symbols: List[str] = []
+        dates: List[str] = []
+        sources: List[str] = []
+        values: Dict[str, List[Any]] = {name: [] for name in QUOTE_FIELDS}
+        for doc in cursor:
+            code = doc.get("symbol") or doc.get("code")
+            if not code or not doc.get("trade_date"):
+                continue
+            symbols.append(str(code).zfill(6))
+            dates.append(str(doc["trade_date"]))
+            sources.append(doc.get("data_source") or "")
+            for name in QUOTE_FIELDS:
+                v = doc.get(name)
+                values[name].append(np.nan if v is None else v)
+
+        columns: Dict[str, np.ndarray] = {
+            "symbol": np.asarray(symbols, dtype=object),
+            "trade_date": np.asarray(dates, dtype=object),
+            "data_source": np.asarray(sources, dtype=object),
+        }
+        for name, target in QUOTE_FIELDS.items():
+            columns[target] = pd.to_numeric(pd.Series(values[name], dtype=object), errors="coerce").to_numpy(dtype=float)
+        return columns
+
+    def load_panel(self, end_date: Optional[str] = None, with_technical: bool = True) -> ScreeningPanel:
+        """读取并计算面板（按 截止日期 + 是否含技术指标 缓存 cache_ttl 秒）"""
+        end_date = end_date or datetime.now().strftime("%Y-%m-%d")
+        key = (end_date, with_technical)
+        now = time.time()
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None and now - cached[0] < self.cache_ttl:
+                return cached[1]
+
+        t0 = time.time()
+        columns = self.load_columns(end_date)
+        t1 = time.time()
+        panel = add_derived_fields(build_panel(columns), with_technical=with_technical)
+        t2 = time.time()
+        logger.info(
+            f"📊 [向量化筛选] 面板 {panel.shape[0]} 日 x {panel.shape[1]} 只，"
+            f"读取 {t1 - t0:.2f}s，计算 {t2 - t1:.2f}s"
+        )
+
+        with self._lock:
+            self._cache = {k: v for k, v in self._cache.items() if now - v[0] < self.cache_ttl}
+            self._cache[key] = (time.time(), panel)
+        return panel
+
+    def screen(
+        self,
+        conditions: Dict[str, Any],
+        allowed_fields: Iterable[str],
+        allowed_ops: Iterable[str],
+        need_tech: bool = True,
+        end_date: Optional[str] = None,
+        order_by: Optional[List[Dict[str, str]]] = None,
+        offset: int = 0,
+        limit: int = 50,
+    ) -> Dict[str, Any]:
+        """
+        执行筛选
+
+        Returns:
+            {"total": 命中数, "items": 当前页结果}
+
+        Raises:
+            PanelUnavailableError: 面板没有标的，或最新交易日落后筛选日期超过 max_lag_days
+        """
+        end_date = end_date or datetime.now().strftime("%Y-%m-%d")
+        panel = self.load_panel(end_date, with_technical=need_tech)
+        self._check_panel(panel, end_date)
+        positions = panel.last_positions()
+        # 没有有效K线的标的不参与筛选（与逐只筛选跳过空数据一致）
+        mask = evaluate_mask(panel, conditions, allowed_fields, allowed_ops, positions) & (positions[0] >= 0)
+        selected = np.flatnonzero(mask)
+        page = sort_and_page(panel, selected, order_by, allowed_fields, offset, limit, positions)
+
+        last = positions[0][page]
+        item_fields = ITEM_BASE_FIELDS + ITEM_TECH_FIELDS
+        columns = {name: panel.fields[name][last, page] if name in panel.fields else None for name in item_fields}
+        items: List[Dict[str, Any]] = []
+        for i, col in enumerate(page):
+            item: Dict[str, Any] = {"code": str(panel.symbols[col])}
+            for name in item_fields:
+                if name in ITEM_TECH_FIELDS and not need_tech:
+                    item[name] = None
+                    continue
+                values = columns[name]
+                v = None if values is None else float(values[i])
+                item[name] = None if v is None or np.isnan(v) else v
+            items.append(item)
+
+        return {"total": int(len(selected)), "items": items}
+
+    def _check_panel(self, panel: ScreeningPanel, end_date: str):
+        """面板为空或行情未同步到筛选日期时拒绝筛选，避免静默返回 0 条结果"""
+        if not len(panel.symbols) or not len(panel.dates):
+            raise PanelUnavailableError(f"stock_daily_quotes 在 {end_date} 前 {self.lookback_days} 天内没有日线数据")
+        latest = pd.Timestamp(str(panel.dates[-1]))
+        lag = (pd.Timestamp(end_date) - latest).days
+        if lag > self.max_lag_days:
+            raise PanelUnavailableError(
+                f"stock_daily_quotes 最新交易日 {latest:%Y-%m-%d} 落后筛选日期 {end_date} {lag} 天"
+                f"（上限 {self.max_lag_days} 天），行情可能未同步"
+            )
+
+
+# 全局实例
+_engine: Optional[VectorizedScreeningEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_vectorized_screening_engine() -> VectorizedScreeningEngine:
+    """获取全局向量化筛选引擎"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = VectorizedScreeningEngine()
+    return _engine
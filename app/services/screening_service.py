@@ -13,6 +13,7 @@ from tradingagents.tools.analysis.indicators import IndicatorSpec, compute_many
 from tradingagents.dataflows.data_source_manager import get_data_source_manager
 from tradingagents.dataflows.providers.china.fundamentals_snapshot import get_cn_fund_snapshot
 
+from app.services.screening.vectorized import PanelUnavailableError, get_vectorized_screening_engine
 
 from app.services.screening.eval_utils import (
     collect_fields_from_conditions as _collect_fields_from_conditions_util,
@@ -75,6 +76,34 @@ class ScreeningService:
 
     # --- 公共入口 ---
     def run(self, conditions: Dict[str, Any], params: ScreeningParams) -> Dict[str, Any]:
+        needed_fields = self._collect_fields_from_conditions(conditions)
+        order_fields = {o.get("field") for o in (params.order_by or []) if o.get("field")}
+        all_needed = set(needed_fields) | set(order_fields)
+        need_tech = any(f in TECH_FIELDS for f in all_needed)
+        need_base = any(f in BASE_FIELDS for f in all_needed) or need_tech
+
+        # 涉及行情/技术指标：全市场向量化筛选（stock_daily_quotes 面板）
+        if need_base:
+            try:
+                return get_vectorized_screening_engine().screen(
+                    conditions,
+                    ALLOWED_FIELDS,
+                    ALLOWED_OPS,
+                    need_tech=need_tech,
+                    end_date=params.date,
+                    order_by=params.order_by,
+                    offset=params.offset,
+                    limit=params.limit,
+                )
+            except PanelUnavailableError as e:
+                logger.warning(f"⚠️ 行情面板不可用，回退到逐只筛选（请检查 stock_daily_quotes 同步任务）: {e}")
+            except Exception as e:
+                logger.warning(f"⚠️ 向量化筛选失败，回退到逐只筛选: {e}")
+
+        return self._run_per_symbol(conditions, params)
+
+    def _run_per_symbol(self, conditions: Dict[str, Any], params: ScreeningParams) -> Dict[str, Any]:
+        """逐只股票筛选（纯基本面条件或向量化筛选不可用时的回退路径）"""
         symbols = self._get_universe()
         # 为控制时长，先限制样本规模（后续用批量/缓存优化）
         symbols = symbols[:120]
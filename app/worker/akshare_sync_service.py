@@ -590,11 +590,20 @@ class AKShareSyncService:
 
             logger.info(f"📊 历史数据同步: 结束日期={end_date}, 股票数量={len(symbols)}, 模式={'增量' if incremental else '全量'}")
 
+            # 增量同步：一次读取同步状态，批量确定每只股票的起始日期
+            start_dates: Dict[str, str] = {}
+            if incremental and not start_date:
+                if self.historical_service is None:
+                    self.historical_service = await get_historical_data_service()
+                start_dates = await self.historical_service.get_incremental_start_dates(
+                    symbols, "akshare", period=period
+                ) or {}
+
             # 4. 批量处理
             for i in range(0, len(symbols), self.batch_size):
                 batch = symbols[i:i + self.batch_size]
                 batch_stats = await self._process_historical_batch(
-                    batch, start_date, end_date, period, incremental
+                    batch, start_date, end_date, period, incremental, start_dates
                 )
 
                 # 更新统计
@@ -635,9 +644,10 @@ class AKShareSyncService:
         start_date: str,
         end_date: str,
         period: str = "daily",
-        incremental: bool = False
+        incremental: bool = False,
+        start_dates: Dict[str, str] = None
     ) -> Dict[str, Any]:
-        """处理历史数据批次"""
+        """处理历史数据批次（start_dates 为批量解析的增量起始日期）"""
         batch_stats = {
             "success_count": 0,
             "error_count": 0,
@@ -651,8 +661,8 @@ class AKShareSyncService:
                 symbol_start_date = start_date
                 if not symbol_start_date:
                     if incremental:
-                        # 增量同步：获取该股票的最后日期
-                        symbol_start_date = await self._get_last_sync_date(symbol)
+                        # 增量同步：该股票最后日期的下一天（未批量解析到时单独查询）
+                        symbol_start_date = (start_dates or {}).get(symbol) or await self._get_last_sync_date(symbol)
                         logger.debug(f"📅 {symbol}: 从 {symbol_start_date} 开始同步")
                     else:
                         # 全量同步：最近1年
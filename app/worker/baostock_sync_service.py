@@ -387,10 +387,21 @@ class BaoStockSyncService:
 
             logger.info(f"📊 开始同步{len(stock_codes)}只股票的历史数据...")
 
+            # 增量同步：一次读取同步状态，批量确定每只股票的起始日期
+            start_dates: Dict[str, str] = {}
+            if use_incremental:
+                if self.historical_service is None:
+                    self.historical_service = await get_historical_data_service()
+                start_dates = await self.historical_service.get_incremental_start_dates(
+                    stock_codes, "baostock", period=period, use_list_date=False
+                ) or {}
+
             # 批量处理
             for i in range(0, len(stock_codes), batch_size):
                 batch = stock_codes[i:i + batch_size]
-                batch_stats = await self._sync_historical_batch(batch, days, end_date, period, use_incremental)
+                batch_stats = await self._sync_historical_batch(
+                    batch, days, end_date, period, use_incremental, start_dates
+                )
                 
                 stats.historical_records += batch_stats.historical_records
                 stats.errors.extend(batch_stats.errors)
@@ -416,17 +427,18 @@ class BaoStockSyncService:
         days: int,
         end_date: str,
         period: str = "daily",
-        incremental: bool = False
+        incremental: bool = False,
+        start_dates: Dict[str, str] = None
     ) -> BaoStockSyncStats:
-        """同步历史数据批次"""
+        """同步历史数据批次（start_dates 为批量解析的增量起始日期）"""
         stats = BaoStockSyncStats()
 
         for code in code_batch:
             try:
                 # 确定该股票的起始日期
                 if incremental:
-                    # 增量同步：获取该股票的最后日期
-                    start_date = await self._get_last_sync_date(code)
+                    # 增量同步：该股票最后日期的下一天（未批量解析到时单独查询）
+                    start_date = (start_dates or {}).get(code) or await self._get_last_sync_date(code)
                     logger.debug(f"📅 {code}: 从 {start_date} 开始同步")
                 elif days >= 3650:
                     # 全历史同步
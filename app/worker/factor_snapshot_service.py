@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+技术因子快照服务
+每日收盘同步完成后，基于 stock_daily_quotes 为全市场计算最新技术因子，
+批量写入 stock_factor_snapshot（按 code + trade_date 唯一），
+供 DatabaseScreeningService 直接以索引查询完成技术指标筛选。
+筛选只查询最新交易日，写入后删除超出保留天数的旧快照。
+"""
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from pymongo import ASCENDING, DESCENDING, UpdateOne
+
+from app.services.screening.vectorized import ScreeningPanel, VectorizedScreeningEngine
+
+logger = logging.getLogger(__name__)
+
+
+FACTOR_SNAPSHOT_COLLECTION = "stock_factor_snapshot"
+
+# 写入快照的因子字段
+FACTOR_FIELDS = (
+    "open", "high", "low", "close", "vol", "amount", "pct_chg",
+    "ma5", "ma10", "ma20", "ma60", "ema12", "ema26",
+    "dif", "dea", "macd_hist", "rsi14",
+    "boll_mid", "boll_upper", "boll_lower", "atr14",
+    "kdj_k", "kdj_d", "kdj_j",
+)
+
+# 建立 (trade_date, 因子) 复合索引的筛选常用字段
+INDEXED_FACTOR_FIELDS = (
+    "close", "pct_chg", "amount", "ma5", "ma10", "ma20", "rsi14",
+    "kdj_k", "kdj_d", "kdj_j", "dif", "dea", "macd_hist", "atr14",
+)
+
+
+@dataclass
+class FactorSnapshotStats:
+    """因子快照统计"""
+    trade_date: Optional[str] = None
+    symbols: int = 0
+    upserted: int = 0
+    modified: int = 0
+    pruned: int = 0
+    errors: List[str] = field(default_factory=list)
+
+
+def build_snapshot_docs(panel: ScreeningPanel) -> List[Dict[str, Any]]:
+    """从面板中取每只股票最近一根有效K线的因子，生成快照文档"""
+    last, _ = panel.last_positions()
+    now = datetime.utcnow()
+    columns = {name: panel.take(name, last) for name in FACTOR_FIELDS if name in panel.fields}
+
+    docs: List[Dict[str, Any]] = []
+    for j in np.flatnonzero(last >= 0):
+        doc: Dict[str, Any] = {
+            "code": str(panel.symbols[j]),
+            "trade_date": str(panel.dates[last[j]]),
+            "updated_at": now,
+        }
+        for name, values in columns.items():
+            v = values[j]
+            doc[name] = None if np.isnan(v) else float(v)
+        docs.append(doc)
+    return docs
+
+
+class FactorSnapshotService:
+    """全市场技术因子快照"""
+
+    def __init__(self, db=None, engine: Optional[VectorizedScreeningEngine] = None, batch_size: int = 1000,
+                 retention_days: int = 30):
+        """
+        Args:
+            db: 异步 MongoDB 数据库（motor），None 时使用 get_mongo_db()
+            engine: 面板加载引擎，None 时新建（不使用面板缓存）
+            batch_size: bulk_write 批大小
+            retention_days: 快照保留天数（按交易日期），<= 0 表示不清理
+        """
+        self.db = db
+        self.engine = engine or VectorizedScreeningEngine(cache_ttl=0)
+        self.batch_size = batch_size
+        self.retention_days = retention_days
+
+    async def initialize(self):
+        if self.db is None:
+            from app.core.database import get_mongo_db
+            self.db = get_mongo_db()
+        await self.ensure_indexes()
+
+    async def ensure_indexes(self):
+        """确保快照集合索引存在"""
+        collection = self.db[FACTOR_SNAPSHOT_COLLECTION]
+        try:
+            await collection.create_index([("code", ASCENDING), ("trade_date", ASCENDING)],
+                                          unique=True, name="code_date_unique", background=True)
+            await collection.create_index([("trade_date", DESCENDING)], name="trade_date_index", background=True)
+            for name in INDEXED_FACTOR_FIELDS:
+                await collection.create_index([("trade_date", DESCENDING), (name, ASCENDING)],
+                                              name=f"trade_date_{name}", background=True)
+        except Exception as e:
+            logger.warning(f"⚠️ 创建因子快照索引时出现警告（可能已存在）: {e}")
+
+    async def build_snapshot(self, end_date: Optional[str] = None) -> FactorSnapshotStats:
+        """
+        计算并写入最新技术因子快照
+
+        Args:
+            end_date: 截止日期 YYYY-MM-DD，None 表示今天
+        """
+        stats = FactorSnapshotStats()
+        start = datetime.now()
+
+        # 面板读取与计算为同步 CPU/IO 操作，放到线程中执行
+        panel = await asyncio.to_thread(self.engine.load_panel, end_date, True)
+        docs = build_snapshot_docs(panel)
+        stats.symbols = len(docs)
+        if not docs:
+            logger.warning("⚠️ stock_daily_quotes 中没有可用的日线数据，跳过因子快照")
+            return stats
+        stats.trade_date = max(d["trade_date"] for d in docs)
+
+        collection = self.db[FACTOR_SNAPSHOT_COLLECTION]
+        for i in range(0, len(docs), self.batch_size):
+            operations = [
+                UpdateOne({"code": d["code"], "trade_date": d["trade_date"]}, {"$set": d}, upsert=True)
+                for d in docs[i:i + self.batch_size]
+            ]
+            try:
+                result = await collection.bulk_write(operations, ordered=False)
+                stats.upserted += result.upserted_count
+                stats.modified += result.modified_count
+            except Exception as e:
+                stats.errors.append(str(e))
+                logger.error(f"❌ 因子快照批量写入失败: {e}")
+
+        if not stats.errors:
+            stats.pruned = await self.prune(stats.trade_date)
+
+        logger.info(
+            f"✅ 因子快照完成: 交易日={stats.trade_date}, 股票={stats.symbols}, "
+            f"新增={stats.upserted}, 更新={stats.modified}, 清理={stats.pruned}, "
+            f"耗时={(datetime.now() - start).total_seconds():.2f}秒"
+        )
+        return stats
+
+    async def prune(self, latest_date: str) -> int:
+        """删除交易日期早于 latest_date 前 retention_days 天的快照，返回删除数量"""
+        if self.retention_days <= 0:
+            return 0
+        cutoff = (datetime.strptime(latest_date, "%Y-%m-%d") - timedelta(days=self.retention_days)).strftime("%Y-%m-%d")
+        try:
+            result = await self.db[FACTOR_SNAPSHOT_COLLECTION].delete_many({"trade_date": {"$lt": cutoff}})
+            return result.deleted_count
+        except Exception as e:
+            logger.warning(f"⚠️ 清理旧因子快照失败: {e}")
+            return 0
+
+
+# APScheduler兼容的任务函数
+async def run_factor_snapshot_job():
+    """运行技术因子快照任务"""
+    try:
+        from app.core.config import settings
+        service = FactorSnapshotService(retention_days=settings.FACTOR_SNAPSHOT_RETENTION_DAYS)
+        await service.initialize()
+        stats = await service.build_snapshot()
+        logger.info(f"🎯 技术因子快照任务完成: {stats.symbols}只股票, {len(stats.errors)}个错误")
+        if stats.upserted or stats.modified:
+            # 数据已更新，使已物化的筛选结果集失效
+            try:
+                from app.services.screening.result_set import get_screening_result_store
+                await get_screening_result_store().bump_data_version()
+            except Exception as e:
+                logger.warning(f"⚠️ 更新筛选数据版本失败: {e}")
+    except Exception as e:
+        logger.error(f"❌ 技术因子快照任务失败: {e}")
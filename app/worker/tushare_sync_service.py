@@ -7,6 +7,8 @@ from datetime import datetime, timedelta, timezone
 from typing import List, Dict, Any, Optional
 import logging
 
+import pandas as pd
+
 from tradingagents.dataflows.providers.china.tushare import TushareProvider
 from app.services.stock_data_service import get_stock_data_service
 from app.services.historical_data_service import get_historical_data_service
@@ -548,7 +550,8 @@ class TushareSyncService:
         incremental: bool = True,
         all_history: bool = False,
         period: str = "daily",
-        job_id: str = None
+        job_id: str = None,
+        mode: str = None
     ) -> Dict[str, Any]:
         """
         同步历史数据
@@ -561,6 +564,7 @@ class TushareSyncService:
             all_history: 是否同步所有历史数据
             period: 数据周期 (daily/weekly/monthly)
             job_id: 任务ID（用于进度跟踪）
+            mode: 同步方式 auto/by_symbol/by_date，None 表示使用 TUSHARE_HISTORICAL_SYNC_MODE
 
         Returns:
             同步结果统计
@@ -624,7 +628,31 @@ class TushareSyncService:
 
             logger.info(f"📊 历史数据同步: 结束日期={end_date}, 股票数量={len(symbols)}, 模式={'增量' if incremental else '全量'}")
 
-            # 4. 批量处理
+            # 4. 选择同步方式：缺失交易日少时按交易日获取全市场横截面，否则逐只股票同步
+            plan = await self._plan_historical_sync(
+                symbols, start_date, end_date, incremental, all_history, period, mode
+            )
+            stats["mode"] = plan["mode"]
+            if plan["mode"] == "by_date":
+                await self._sync_historical_by_date(plan["trade_dates"], symbols, stats, job_id)
+                # 没有历史数据（如新股）或落后超出检查窗口的股票仍逐只同步
+                symbols = [] if stats.get("stopped") else plan["backfill_symbols"]
+                if symbols:
+                    logger.info(f"📋 {len(symbols)} 只股票没有近期历史数据，逐只补齐")
+            else:
+                # 只逐只同步需要更新的股票
+                symbols = plan["backfill_symbols"]
+
+            # 增量同步：一次读取同步状态，批量确定每只股票的起始日期
+            start_dates: Dict[str, str] = {}
+            if symbols and incremental and not start_date and not all_history:
+                if self.historical_service is None:
+                    self.historical_service = await get_historical_data_service()
+                start_dates = await self.historical_service.get_incremental_start_dates(
+                    symbols, "tushare", period=period
+                ) or {}
+
+            # 5. 逐只股票处理
             for i, symbol in enumerate(symbols):
                 # 记录单个股票开始时间
                 stock_start_time = datetime.now()
@@ -645,8 +673,8 @@ class TushareSyncService:
                         if all_history:
                             symbol_start_date = "1990-01-01"
                         elif incremental:
-                            # 增量同步：获取该股票的最后日期
-                            symbol_start_date = await self._get_last_sync_date(symbol)
+                            # 增量同步：该股票最后日期的下一天（未批量解析到时单独查询）
+                            symbol_start_date = start_dates.get(symbol) or await self._get_last_sync_date(symbol)
                             logger.debug(f"📅 {symbol}: 从 {symbol_start_date} 开始同步")
                         else:
                             symbol_start_date = (datetime.now() - timedelta(days=365)).strftime('%Y-%m-%d')
@@ -727,7 +755,7 @@ class TushareSyncService:
                         f"   堆栈跟踪:\n{error_details}"
                     )
 
-            # 4. 完成统计
+            # 6. 完成统计
             stats["end_time"] = datetime.utcnow()
             stats["duration"] = (stats["end_time"] - stats["start_time"]).total_seconds()
 
@@ -756,6 +784,194 @@ class TushareSyncService:
             })
             return stats
 
+    async def _plan_historical_sync(
+        self,
+        symbols: List[str],
+        start_date: Optional[str],
+        end_date: str,
+        incremental: bool,
+        all_history: bool,
+        period: str,
+        mode: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        选择历史数据同步方式
+
+        - by_symbol：逐只股票调用 pro_bar，调用次数 = 需同步的股票数
+        - by_date：按交易日调用 daily + adj_factor 获取全市场横截面，调用次数 = 2 × 缺失交易日数
+
+        增量同步按每只股票的同步状态判断是否落后，只要有股票落后就不会返回空计划。
+        auto 模式选择调用次数较少的方式：日常增量同步只缺几个交易日，几千次调用降为个位数；
+        缺口很深（首次同步、全历史）时仍逐只股票同步。
+
+        Returns:
+            {"mode": "by_date"/"by_symbol", "trade_dates": 需获取的交易日, "backfill_symbols": 需逐只同步的股票}
+        """
+        mode = (mode or getattr(self.settings, "TUSHARE_HISTORICAL_SYNC_MODE", "auto") or "auto").lower()
+        by_symbol = {"mode": "by_symbol", "trade_dates": [], "backfill_symbols": symbols}
+        if mode == "by_symbol" or period != "daily" or all_history or not symbols:
+            return by_symbol
+
+        try:
+            if self.historical_service is None:
+                self.historical_service = await get_historical_data_service()
+
+            backfill: List[str] = []
+            targets = symbols
+            if start_date:
+                # 指定了日期范围：整个范围内的交易日都重新获取
+                trade_dates = await self.provider.get_trade_calendar(start_date, end_date)
+                missing = trade_dates or []
+            elif incremental:
+                # 增量同步：按每只股票的同步状态确定缺失的交易日
+                lookback = int(getattr(self.settings, "TUSHARE_BY_DATE_LOOKBACK_DAYS", 60))
+                end_obj = datetime.strptime(end_date.replace('-', ''), '%Y%m%d')
+                # 交易日约占自然日的 2/3，多取一些再截取
+                trade_dates = await self.provider.get_trade_calendar(end_obj - timedelta(days=lookback * 2), end_obj)
+                trade_dates = (trade_dates or [])[-lookback:]
+                if not trade_dates:
+                    logger.warning("⚠️ 交易日历为空，使用逐只股票同步")
+                    return by_symbol
+
+                latest = await self.historical_service.get_latest_dates("tushare", period)
+                if latest is None:
+                    logger.warning("⚠️ 读取同步状态失败，使用逐只股票同步")
+                    return by_symbol
+
+                # 最新交易日早于窗口末尾的股票都需要同步
+                targets = [s for s in symbols if not latest.get(s) or latest[s] < trade_dates[-1]]
+                if not targets:
+                    logger.info(f"📅 {len(symbols)} 只股票均已同步到 {trade_dates[-1]}")
+                    return {"mode": "by_date", "trade_dates": [], "backfill_symbols": []}
+
+                # 没有历史数据或落后超出检查窗口的股票逐只补齐，其余股票按缺失交易日获取横截面
+                backfill = [s for s in targets if not latest.get(s) or latest[s] < trade_dates[0]]
+                lagging = [latest[s] for s in targets if s not in backfill]
+                missing = [d for d in trade_dates if lagging and d > min(lagging)]
+            else:
+                start = (datetime.now() - timedelta(days=365)).strftime('%Y-%m-%d')
+                trade_dates = await self.provider.get_trade_calendar(start, end_date)
+                missing = trade_dates or []
+
+            if trade_dates is None:
+                logger.warning("⚠️ 获取交易日历失败，使用逐只股票同步")
+                return by_symbol
+
+        except Exception as e:
+            logger.warning(f"⚠️ 规划按交易日同步失败，使用逐只股票同步: {e}")
+            return by_symbol
+
+        by_date_calls = 2 * len(missing) + len(backfill)
+        if mode == "auto" and by_date_calls >= len(targets):
+            logger.info(
+                f"📅 缺失 {len(missing)} 个交易日，按交易日同步需 {by_date_calls} 次调用，"
+                f"不少于逐只同步的 {len(targets)} 次，使用逐只股票同步"
+            )
+            return {"mode": "by_symbol", "trade_dates": [], "backfill_symbols": targets}
+
+        logger.info(
+            f"📅 按交易日同步: 缺失 {len(missing)} 个交易日, 需补齐 {len(backfill)} 只股票, "
+            f"约 {by_date_calls} 次调用（逐只同步需 {len(targets)} 次）"
+        )
+        return {"mode": "by_date", "trade_dates": missing, "backfill_symbols": backfill}
+
+    async def _sync_historical_by_date(
+        self,
+        trade_dates: List[str],
+        symbols: List[str],
+        stats: Dict[str, Any],
+        job_id: str = None
+    ) -> None:
+        """
+        按交易日获取全市场日线横截面，拆分为每只股票的记录批量写入
+
+        价格换算为前复权（与 pro_bar qfq 一致，基准为本次同步范围内该股票最新交易日的复权因子），
+        因此从最新交易日开始倒序处理。
+        """
+        symbol_set = set(symbols)
+        anchors: Dict[str, float] = {}
+        synced_symbols = set()
+        ordered = sorted(trade_dates, reverse=True)
+        stats["trade_dates"] = len(ordered)
+
+        for i, trade_date in enumerate(ordered):
+            try:
+                if job_id and await self._should_stop(job_id):
+                    logger.warning(f"⚠️ 任务 {job_id} 收到停止信号，正在退出...")
+                    stats["stopped"] = True
+                    break
+
+                # daily + adj_factor 两次调用
+                await self.rate_limiter.acquire()
+                await self.rate_limiter.acquire()
+
+                api_start = datetime.now()
+                df = await self.provider.get_daily_by_trade_date(trade_date)
+                api_duration = (datetime.now() - api_start).total_seconds()
+                if df is None or df.empty:
+                    logger.warning(f"⚠️ {trade_date}: 无日线数据（非交易日或尚未收盘）")
+                    continue
+
+                df = self._apply_qfq_cross_section(df, anchors)
+                df = df[df["symbol"].isin(symbol_set)]
+
+                save_start = datetime.now()
+                records_saved = await self.historical_service.save_cross_section(
+                    df, data_source="tushare", market="CN", period="daily"
+                )
+                save_duration = (datetime.now() - save_start).total_seconds()
+
+                stats["total_records"] += records_saved
+                synced_symbols.update(df["symbol"])
+                logger.info(
+                    f"✅ {trade_date}: 保存 {records_saved} 条日线记录 "
+                    f"(API: {api_duration:.2f}秒, 保存: {save_duration:.2f}秒)"
+                )
+
+            except Exception as e:
+                stats["error_count"] += 1
+                stats["errors"].append({
+                    "trade_date": trade_date,
+                    "error": str(e),
+                    "error_type": type(e).__name__,
+                    "context": "sync_historical_data_by_date"
+                })
+                logger.error(f"❌ {trade_date} 全市场日线同步失败: {e}")
+
+            if job_id:
+                progress_percent = int(((i + 1) / len(ordered)) * 100)
+                await self._update_progress(
+                    job_id,
+                    progress_percent,
+                    f"正在同步 {trade_date} 全市场日线 ({i + 1}/{len(ordered)})"
+                )
+
+        stats["success_count"] += len(synced_symbols)
+
+    @staticmethod
+    def _apply_qfq_cross_section(df: pd.DataFrame, anchors: Dict[str, float]) -> pd.DataFrame:
+        """
+        把一个交易日的未复权横截面换算为前复权价格
+
+        Args:
+            df: daily 接口数据（含 adj_factor 列）
+            anchors: {股票代码: 基准复权因子}，首次出现的股票以当前交易日的因子为基准（原地更新）
+        """
+        df = df.copy()
+        df["symbol"] = df["ts_code"].astype(str).str.split(".").str[0]
+        factor = pd.to_numeric(df["adj_factor"], errors="coerce") if "adj_factor" in df.columns \
+            else pd.Series(float("nan"), index=df.index)
+
+        first_seen = factor.notna() & ~df["symbol"].isin(list(anchors))
+        anchors.update(zip(df.loc[first_seen, "symbol"], factor[first_seen]))
+
+        # 缺少复权因子时保持未复权价格
+        ratio = (factor / df["symbol"].map(anchors)).fillna(1.0)
+        for col in ("open", "high", "low", "close", "pre_close"):
+            if col in df.columns:
+                df[col] = (df[col] * ratio).round(2)
+        return df
+
     async def _save_historical_data(self, symbol: str, df, period: str = "daily") -> int:
         """保存历史数据到数据库"""
         try:
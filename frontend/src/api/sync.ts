@@ -3,6 +3,27 @@
  */
 import { ApiClient } from './request'
 
+// 数据源熔断器状态
+export interface CircuitBreakerStatus {
+  name: string
+  state: 'closed' | 'open' | 'half_open'
+  error_rate: number
+  latency_ewma: number | null
+  p90_latency: Record<string, number>
+  calls: number
+  failures: number
+  rejected: number
+  retry_in_seconds: number | null
+  last_error: string | null
+}
+
+// 数据源容错状态（熔断器 + 对冲请求统计）
+export interface DataSourceResilienceStatus {
+  hedging_enabled: boolean
+  breakers: Record<string, CircuitBreakerStatus>
+  hedges: Record<string, { fired: number; wins: number }>
+}
+
 // 数据源状态接口
 export interface DataSourceStatus {
   name: string
@@ -10,6 +31,7 @@ export interface DataSourceStatus {
   available: boolean
   description: string
   token_source?: 'database' | 'env'  // Token 来源（仅 Tushare）
+  circuit_breaker?: CircuitBreakerStatus | null  // 熔断器状态
 }
 
 // 同步状态接口
@@ -80,6 +102,13 @@ export const getDataSourcesStatus = (): Promise<ApiResponse<DataSourceStatus[]>>
   return ApiClient.get('/api/sync/multi-source/sources/status')
 }
 
+/**
+ * 获取数据源熔断器状态与对冲请求统计
+ */
+export const getDataSourcesResilience = (): Promise<ApiResponse<DataSourceResilienceStatus>> => {
+  return ApiClient.get('/api/sync/multi-source/sources/resilience')
+}
+
 /**
  * 获取当前正在使用的数据源
  */
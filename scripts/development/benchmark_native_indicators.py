@@ -0,0 +1,81 @@
+"""
+原生指标实现与 stockstats 的性能对比
+
+对 15 年日线数据（约 3,800 根K线）分别用 stockstats.wrap 和
+indicators.compute_stockstats_indicator 计算 get_stock_stats_indicators_window
+支持的全部指标，并校验两者结果一致。计时前每个实现先预热一次，
+并关闭指标结果缓存（TA_INDICATOR_CACHE_ENABLED=false），保证测的是实际计算耗时。
+
+用法：
+    python scripts/development/benchmark_native_indicators.py [--bars 3800] [--repeat 20]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+# 关闭指标结果缓存，否则重复调用命中缓存，测不到计算耗时（须在导入 tradingagents 之前设置）
+os.environ["TA_INDICATOR_CACHE_ENABLED"] = "false"
+
+import numpy as np
+import pandas as pd
+from stockstats import wrap
+
+from tradingagents.tools.analysis.indicators import STOCKSTATS_INDICATORS, compute_stockstats_indicator
+
+
+def make_data(bars: int) -> pd.DataFrame:
+    rng = np.random.default_rng(42)
+    close = 100 + np.cumsum(rng.normal(0, 1.5, bars))
+    return pd.DataFrame({
+        'Date': pd.bdate_range('2010-01-04', periods=bars).strftime('%Y-%m-%d'),
+        'Open': close,
+        'High': close + rng.uniform(0, 2, bars),
+        'Low': close - rng.uniform(0, 2, bars),
+        'Close': close,
+        'Volume': rng.integers(10_000, 90_000, bars).astype(float),
+    })
+
+
+def timeit(fn, repeat: int) -> float:
+    # 预热：排除首次调用的延迟导入、列名解析等一次性开销
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="原生指标与 stockstats 性能对比")
+    parser.add_argument("--bars", type=int, default=3800, help="K线数量（默认约 15 年日线）")
+    parser.add_argument("--repeat", type=int, default=20, help="每个指标重复次数")
+    args = parser.parse_args()
+
+    data = make_data(args.bars)
+    print("=" * 72)
+    print(f"📊 {args.bars} 根K线，每个指标重复 {args.repeat} 次（单位: ms）")
+    print("=" * 72)
+    print(f"{'indicator':<16}{'stockstats':>12}{'native':>12}{'speedup':>10}  parity")
+
+    total_ss = total_native = 0.0
+    for name in STOCKSTATS_INDICATORS:
+        # stockstats 每次调用都会 wrap（复制）并解析列名，与原热路径一致
+        ss_ms = timeit(lambda: wrap(data.copy())[name], args.repeat)
+        native_ms = timeit(lambda: compute_stockstats_indicator(data, name), args.repeat)
+        expected = wrap(data.copy())[name].to_numpy(dtype=float)
+        actual = compute_stockstats_indicator(data, name).to_numpy(dtype=float)
+        parity = np.allclose(actual, expected, rtol=1e-9, atol=1e-9, equal_nan=True)
+        total_ss += ss_ms
+        total_native += native_ms
+        print(f"{name:<16}{ss_ms:>12.2f}{native_ms:>12.2f}{ss_ms / native_ms:>9.1f}x  {'✅' if parity else '❌'}")
+
+    print("-" * 72)
+    print(f"{'total':<16}{total_ss:>12.2f}{total_native:>12.2f}{total_ss / total_native:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
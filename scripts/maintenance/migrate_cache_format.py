@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+缓存格式迁移工具
+将文件缓存中的 CSV DataFrame 转换为 Arrow IPC / Parquet 列式格式
+"""
+
+import sys
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('scripts')
+
+
+def main():
+    """主函数"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="迁移TradingAgents文件缓存的DataFrame格式")
+    parser.add_argument("--cache-dir", default=None, help="缓存目录 (默认: tradingagents/dataflows/cache/data_cache)")
+    parser.add_argument("--to", dest="target_format", choices=["arrow", "parquet", "csv"],
+                        default=None, help="目标格式 (默认: TA_CACHE_DATAFRAME_FORMAT)")
+    parser.add_argument("--from", dest="source_format", choices=["arrow", "parquet", "csv"],
+                        default="csv", help="源格式 (默认: csv)")
+
+    args = parser.parse_args()
+
+    from tradingagents.dataflows.cache.file_cache import StockDataCache
+
+    cache = StockDataCache(args.cache_dir)
+    logger.info(f"🔄 开始迁移缓存格式: {args.source_format} -> {args.target_format or cache.dataframe_serializer.name}")
+    migrated = cache.migrate_dataframe_cache(args.target_format, args.source_format)
+    logger.info(f"🎉 迁移完成，共转换 {migrated} 个缓存条目")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+import asyncio
+
+import numpy as np
+
+from app.services.screening.vectorized import VectorizedScreeningEngine
+from app.services.screening_service import ALLOWED_FIELDS, ALLOWED_OPS
+from app.worker.factor_snapshot_service import FactorSnapshotService, build_snapshot_docs
+
+from test_screening_vectorized import _FakeDB, make_docs
+
+
+class _BulkResult:
+    def __init__(self, n):
+        self.upserted_count = n
+        self.modified_count = 0
+
+
+class _DeleteResult:
+    def __init__(self, n):
+        self.deleted_count = n
+
+
+class _FakeSnapshotColl:
+    def __init__(self, latest=None, facet=None):
+        self.latest = latest
+        self.facet = facet or {}
+        self.pipelines = []
+        self.written = []
+        self.deleted = []
+
+    async def find_one(self, *_args, **_kwargs):
+        return {"trade_date": self.latest} if self.latest else None
+
+    def aggregate(self, pipeline):
+        self.pipelines.append(pipeline)
+        facet = self.facet
+
+        class _Cursor:
+            async def to_list(self, length=None):
+                return [facet]
+
+        return _Cursor()
+
+    async def bulk_write(self, operations, ordered=True):
+        self.written.extend(operations)
+        return _BulkResult(len(operations))
+
+    async def delete_many(self, query):
+        self.deleted.append(query)
+        return _DeleteResult(3)
+
+    async def create_index(self, *_args, **_kwargs):
+        return None
+
+
+class _FakeAsyncDB:
+    def __init__(self, coll):
+        self.coll = coll
+
+    def __getitem__(self, name):
+        return self.coll
+
+
+def test_snapshot_docs_match_screening_engine():
+    docs, end = make_docs()
+    engine = VectorizedScreeningEngine(db=_FakeDB(docs), cache_ttl=0)
+    snapshot = {d["code"]: d for d in build_snapshot_docs(engine.load_panel(end))}
+
+    screened = engine.screen({}, ALLOWED_FIELDS, ALLOWED_OPS, end_date=end, limit=1000)
+    assert len(snapshot) == screened["total"]
+    for item in screened["items"]:
+        doc = snapshot[item["code"]]
+        for name in ("close", "ma20", "rsi14", "kdj_k", "macd_hist"):
+            assert np.isclose(doc[name], item[name], rtol=1e-6, equal_nan=True), name
+    # 停牌股票的快照日期为其最后一个交易日
+    assert all(d["trade_date"] <= end for d in snapshot.values())
+
+
+def test_build_snapshot_bulk_upserts_by_code_and_date():
+    docs, end = make_docs(symbols=5, days=80)
+    coll = _FakeSnapshotColl()
+    service = FactorSnapshotService(db=_FakeAsyncDB(coll),
+                                    engine=VectorizedScreeningEngine(db=_FakeDB(docs), cache_ttl=0),
+                                    batch_size=2)
+    stats = asyncio.run(service.build_snapshot(end))
+    assert stats.symbols == 5 and stats.upserted == 5
+    assert stats.trade_date == end
+    assert {tuple(sorted(op._filter)) for op in coll.written} == {("code", "trade_date")}
+
+
+def test_build_snapshot_prunes_snapshots_past_retention():
+    docs, end = make_docs(symbols=3, days=60)
+    coll = _FakeSnapshotColl()
+    service = FactorSnapshotService(db=_FakeAsyncDB(coll),
+                                    engine=VectorizedScreeningEngine(db=_FakeDB(docs), cache_ttl=0),
+                                    retention_days=10)
+    stats = asyncio.run(service.build_snapshot(end))
+    assert end == "2024-03-25"
+    assert coll.deleted == [{"trade_date": {"$lt": "2024-03-15"}}] and stats.pruned == 3
+
+    keep_all = FactorSnapshotService(db=_FakeAsyncDB(_FakeSnapshotColl()), retention_days=0)
+    assert asyncio.run(keep_all.prune(end)) == 0
+
+
+def test_snapshot_factor_fields_route_to_database(monkeypatch):
+    from app.models.screening import ScreeningCondition
+    from app.services.database_screening_service import DatabaseScreeningService
+    from app.services.enhanced_screening.utils import analyze_conditions
+    from app.worker.factor_snapshot_service import FACTOR_FIELDS
+    import app.services.database_screening_service as mod
+
+    monkeypatch.setattr(mod, "get_mongo_db", lambda: _FakeAsyncDB(_FakeSnapshotColl(latest="2024-06-03")))
+    svc = DatabaseScreeningService()
+    # 快照中可筛选的因子都登记为字段，条件分析才会路由到数据库筛选
+    for name in svc.factor_fields:
+        assert name in FACTOR_FIELDS
+        analysis = analyze_conditions([ScreeningCondition(field=name, operator=">", value=1)])
+        assert analysis["can_use_database"], name
+    conditions = [{"field": "ma5", "operator": ">", "value": 10}, {"field": "atr14", "operator": "<", "value": 1}]
+    assert asyncio.run(svc.can_handle_conditions(conditions))
+
+
+def test_database_screening_queries_factor_snapshot(monkeypatch):
+    from app.services.database_screening_service import DatabaseScreeningService
+    import app.services.database_screening_service as mod
+
+    facet = {
+        "total": [{"count": 1}],
+        "items": [{
+            "code": "600000", "trade_date": "2024-06-03", "rsi14": 62.5, "ma20": 10.1, "close": 10.4,
+            "basic": {"code": "600000", "name": "浦发银行", "total_mv": 2000.0, "source": "tushare"},
+        }],
+    }
+    coll = _FakeSnapshotColl(latest="2024-06-03", facet=facet)
+    monkeypatch.setattr(mod, "get_mongo_db", lambda: _FakeAsyncDB(coll))
+
+    svc = DatabaseScreeningService()
+
+    async def _no_enrich(*_args, **_kwargs):
+        return None
+
+    monkeypatch.setattr(svc, "_enrich_with_financial_data", _no_enrich)
+
+    conditions = [
+        {"field": "rsi14", "operator": ">", "value": 60},
+        {"field": "total_mv", "operator": ">=", "value": 100},
+    ]
+
+    async def _run():
+        assert await svc.can_handle_conditions(conditions)
+        return await svc.screen_stocks(conditions, limit=10, offset=0,
+                                       order_by=[{"field": "rsi14", "direction": "desc"}], source="tushare")
+
+    items, total = asyncio.run(_run())
+    assert total == 1
+    assert items[0]["rsi14"] == 62.5 and items[0]["name"] == "浦发银行"
+
+    pipeline = coll.pipelines[0]
+    assert pipeline[0]["$match"] == {"rsi14": {"$gt": 60}, "trade_date": "2024-06-03"}
+    lookup_match = pipeline[1]["$lookup"]["pipeline"][0]["$match"]
+    assert lookup_match["total_mv"] == {"$gte": 100} and lookup_match["source"] == "tushare"
+    assert pipeline[-1]["$facet"]["items"][0] == {"$sort": {"rsi14": -1}}
+
+
+def test_factor_conditions_unsupported_without_snapshot(monkeypatch):
+    from app.services.database_screening_service import DatabaseScreeningService
+    import app.services.database_screening_service as mod
+
+    monkeypatch.setattr(mod, "get_mongo_db", lambda: _FakeAsyncDB(_FakeSnapshotColl()))
+    svc = DatabaseScreeningService()
+    assert not asyncio.run(svc.can_handle_conditions([{"field": "kdj_k", "operator": "<", "value": 20}]))
+    assert asyncio.run(svc.can_handle_conditions([{"field": "pe", "operator": "<", "value": 20}]))
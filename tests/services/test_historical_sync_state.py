@@ -0,0 +1,185 @@
+import asyncio
+from types import SimpleNamespace
+
+import pandas as pd
+
+from app.services.historical_data_service import SYNC_STATE_MARKER, HistoricalDataService
+
+
+class _Cursor:
+    def __init__(self, docs):
+        self._docs = list(docs)
+
+    def __aiter__(self):
+        return self._iter()
+
+    async def _iter(self):
+        for doc in self._docs:
+            yield doc
+
+
+def _matches(doc, query):
+    for key, cond in query.items():
+        if isinstance(cond, dict) and "$in" in cond:
+            if doc.get(key) not in cond["$in"]:
+                return False
+        elif doc.get(key) != cond:
+            return False
+    return True
+
+
+class _FakeQuotes:
+    """stock_daily_quotes：支持 ReplaceOne 批量写入和按股票分组取最大交易日的聚合"""
+
+    def __init__(self, docs):
+        self.docs = {(d["symbol"], d["trade_date"], d["data_source"], d["period"]): d for d in docs}
+        self.aggregations = 0
+
+    async def bulk_write(self, ops, ordered=False):
+        for op in ops:
+            f = op._filter
+            self.docs[(f["symbol"], f["trade_date"], f["data_source"], f["period"])] = op._doc
+        return SimpleNamespace(upserted_count=len(ops), modified_count=0)
+
+    def aggregate(self, pipeline, **kwargs):
+        self.aggregations += 1
+        match = pipeline[0]["$match"]
+        latest = {}
+        for doc in self.docs.values():
+            if _matches(doc, match):
+                latest[doc["symbol"]] = max(latest.get(doc["symbol"], ""), doc["trade_date"])
+        return _Cursor({"_id": s, "last_trade_date": d} for s, d in latest.items())
+
+
+class _FakeState:
+    """historical_sync_state：支持 $max/$set 的 upsert"""
+
+    def __init__(self):
+        self.docs = {}
+        self.finds = 0
+
+    def _upsert(self, f, update):
+        key = (f["data_source"], f["period"], f["symbol"])
+        doc = self.docs.setdefault(key, dict(f))
+        for field, value in update.get("$max", {}).items():
+            doc[field] = max(doc.get(field, value), value)
+        doc.update(update.get("$set", {}))
+
+    async def bulk_write(self, ops, ordered=False):
+        for op in ops:
+            self._upsert(op._filter, op._doc)
+
+    async def update_one(self, f, update, upsert=False):
+        self._upsert(f, update)
+
+    def find(self, query, projection=None):
+        self.finds += 1
+        return _Cursor(d for d in self.docs.values() if _matches(d, query))
+
+
+class _FakeBasicInfo:
+    def __init__(self, docs):
+        self.docs = docs
+        self.finds = 0
+
+    def find(self, query, projection=None):
+        self.finds += 1
+        return _Cursor(d for d in self.docs if _matches(d, query))
+
+
+def _quote(symbol, trade_date, data_source="tushare", period="daily"):
+    return {"symbol": symbol, "trade_date": trade_date, "data_source": data_source, "period": period}
+
+
+def _make_service(quotes, basic_info=()):
+    service = HistoricalDataService()
+    service.collection = _FakeQuotes(quotes)
+    service.sync_state = _FakeState()
+    service.db = SimpleNamespace(stock_basic_info=_FakeBasicInfo(list(basic_info)))
+    return service
+
+
+def test_sync_state_rebuilt_once_then_maintained_by_writes():
+    service = _make_service([
+        _quote("000001", "2025-01-02"),
+        _quote("000001", "2025-01-03"),
+        _quote("600000", "2025-01-02"),
+        _quote("600000", "2025-01-06", data_source="akshare"),
+        _quote("600000", "2024-12-27", period="weekly"),
+    ])
+
+    async def run():
+        first = await service.get_latest_dates("tushare")
+        # 保存单只股票历史数据和横截面数据后，同步状态随之前进
+        await service.save_historical_data(
+            "600000", pd.DataFrame({"trade_date": ["20250103", "20250106"], "close": [8.0, 8.1]}), "tushare"
+        )
+        await service.save_cross_section(
+            pd.DataFrame({"symbol": ["000001", "300750"], "trade_date": ["20250107"] * 2, "close": [11.0, 180.0]}),
+            "tushare"
+        )
+        second = await service.get_latest_dates("tushare")
+        weekly = await service.get_latest_dates("tushare", period="weekly")
+        return first, second, weekly
+
+    first, second, weekly = asyncio.run(run())
+
+    assert first == {"000001": "2025-01-03", "600000": "2025-01-02"}
+    assert second == {"000001": "2025-01-07", "600000": "2025-01-06", "300750": "2025-01-07"}
+    assert weekly == {"600000": "2024-12-27"}
+    # 每个数据源/周期只聚合重建一次，之后一次读取同步状态
+    assert service.collection.aggregations == 2
+    assert ("tushare", "daily", SYNC_STATE_MARKER) in service.sync_state.docs
+
+
+def test_incremental_start_dates_resolved_in_bulk():
+    service = _make_service(
+        [_quote("000001", "2025-01-03"), _quote("600000", "2024-12-31")],
+        basic_info=[
+            {"code": "688981", "list_date": "20200716"},
+            {"code": "000001", "list_date": "19910403"},
+        ],
+    )
+
+    symbols = ["000001", "600000", "688981", "920001"]
+    start_dates = asyncio.run(service.get_incremental_start_dates(symbols, "tushare"))
+
+    assert start_dates == {"000001": "2025-01-04", "600000": "2025-01-01", "688981": "2020-07-16"}
+    assert service.sync_state.finds == 1
+    assert service.db.stock_basic_info.finds == 1
+
+    without_list_date = asyncio.run(service.get_incremental_start_dates(symbols, "tushare", use_list_date=False))
+    assert set(without_list_date) == {"000001", "600000"}
+
+
+def test_tushare_incremental_sync_uses_bulk_start_dates():
+    from app.worker.tushare_sync_service import TushareSyncService
+
+    history = _make_service([_quote("000001", "2025-01-03"), _quote("600000", "2025-01-02")])
+    requested = {}
+
+    class _Provider:
+        async def get_historical_data(self, symbol, start_date, end_date, period="daily"):
+            requested[symbol] = start_date
+            return None
+
+    class _Limiter:
+        async def acquire(self):
+            return None
+
+        def get_stats(self):
+            return {"current_calls": 0, "max_calls": 0, "total_waits": 0, "total_wait_time": 0.0}
+
+    async def _no_single_lookup(symbol=None):
+        raise AssertionError("不应逐只查询最后同步日期")
+
+    service = TushareSyncService.__new__(TushareSyncService)
+    service.provider = _Provider()
+    service.historical_service = history
+    service.rate_limiter = _Limiter()
+    service.settings = SimpleNamespace(TUSHARE_HISTORICAL_SYNC_MODE="by_symbol")
+    service._get_last_sync_date = _no_single_lookup
+
+    asyncio.run(service.sync_historical_data(symbols=["000001", "600000"], end_date="2025-01-07"))
+
+    assert requested == {"000001": "2025-01-04", "600000": "2025-01-03"}
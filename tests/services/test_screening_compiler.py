@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+
+from app.models.screening import ScreeningCondition
+from app.services.screening.compiler import compile_conditions
+from app.services.screening_service import ALLOWED_FIELDS, ALLOWED_OPS
+
+
+BASIC_FIELDS = {"pe": "pe", "industry": "industry", "market_cap": "total_mv"}
+
+
+def frame_getter(current, previous=None):
+    def get(name, prev):
+        src = previous if prev else current
+        if src is None or name not in src:
+            return np.full(len(current), np.nan)
+        return src[name].to_numpy(dtype=float)
+    return get
+
+
+def test_mask_on_cross_section():
+    current = pd.DataFrame({
+        "close": [10.0, 12.0, np.nan, 9.0],
+        "ma20": [9.5, 12.5, 10.0, 9.0],
+        "rsi14": [55.0, 75.0, 40.0, np.nan],
+        "kdj_k": [30.0, 50.0, 20.0, 60.0],
+        "kdj_d": [25.0, 55.0, 30.0, 40.0],
+    })
+    previous = current.assign(kdj_k=[20.0, 60.0, 10.0, 30.0], kdj_d=[25.0, 50.0, 30.0, 50.0])
+    tree = {"logic": "OR", "children": [
+        {"logic": "AND", "children": [
+            {"field": "close", "op": ">", "right_field": "ma20"},
+            {"field": "rsi14", "op": "between", "value": [50, 70]},
+        ]},
+        {"field": "kdj_k", "op": "cross_up", "right_field": "kdj_d"},
+        {"field": "unknown", "op": ">", "value": 0},
+    ]}
+    plan = compile_conditions(tree, ALLOWED_FIELDS, ALLOWED_OPS)
+    mask = plan.mask(frame_getter(current, previous), len(current))
+    # 0: close>ma20 且 rsi 在区间；1: kdj 死叉；2: close 缺失；3: kdj 金叉
+    assert mask.tolist() == [True, False, False, True]
+    assert plan.fields == ("close", "ma20", "rsi14", "kdj_k", "kdj_d")
+    assert plan.needs_previous
+
+
+def test_mongo_pushdown_and_residual():
+    conditions = {"logic": "AND", "children": [
+        {"field": "pe", "op": "<", "value": 20},
+        {"field": "rsi14", "op": ">", "value": 50},
+        {"logic": "OR", "children": [
+            {"field": "industry", "op": "==", "value": "银行"},
+            {"field": "market_cap", "op": ">=", "value": 1000},
+        ]},
+        {"field": "pe", "op": ">", "value": 5},
+    ]}
+    plan = compile_conditions(conditions)
+    query, residual = plan.to_mongo_filter(BASIC_FIELDS)
+    assert query == {
+        "pe": {"$lt": 20, "$gt": 5},
+        "$or": [{"industry": {"$eq": "银行"}}, {"total_mv": {"$gte": 1000}}],
+    }
+    assert residual.field == "rsi14"
+
+    current = pd.DataFrame({"rsi14": [40.0, 60.0]})
+    assert plan.mask(frame_getter(current), 2, node=residual).tolist() == [False, True]
+    assert plan.projection(BASIC_FIELDS) == {"pe": 1, "rsi14": 1, "industry": 1, "total_mv": 1}
+
+
+def test_plans_cached_by_normalized_condition():
+    a = {"logic": "AND", "children": [{"field": "rsi14", "op": ">", "value": 70}]}
+    b = {"children": [{"value": 70, "op": ">", "field": "rsi14"}], "logic": "AND"}
+    assert compile_conditions(a, ALLOWED_FIELDS, ALLOWED_OPS) is compile_conditions(b, ALLOWED_FIELDS, ALLOWED_OPS)
+
+    models = [ScreeningCondition(field="pe", operator="between", value=[10, 20])]
+    dicts = [{"field": "pe", "operator": "between", "value": [10, 20]}]
+    assert compile_conditions(models) is compile_conditions(dicts)
+    assert compile_conditions(models).to_mongo_filter(BASIC_FIELDS)[0] == {"pe": {"$gte": 10, "$lte": 20}}
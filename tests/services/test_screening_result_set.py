@@ -0,0 +1,149 @@
+import asyncio
+
+from app.services.screening.result_set import ScreeningResultSetStore
+
+
+class FakeAsyncRedis:
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    async def incr(self, key):
+        self.data[key] = str(int(self.data.get(key, 0)) + 1)
+        return int(self.data[key])
+
+    async def exists(self, key):
+        return int(key in self.data)
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    async def hset(self, key, mapping):
+        self.data.setdefault(key, {}).update(mapping)
+
+    async def hgetall(self, key):
+        return dict(self.data.get(key, {}))
+
+    async def hmget(self, key, fields):
+        h = self.data.get(key, {})
+        return [h.get(f) for f in fields]
+
+    async def rpush(self, key, *values):
+        self.data.setdefault(key, []).extend(values)
+
+    async def lrange(self, key, start, end):
+        return self.data.get(key, [])[start:end + 1]
+
+    async def expire(self, key, ttl):
+        return True
+
+    async def ttl(self, key):
+        return 300
+
+
+ITEMS = [{"code": f"{600000 + i}", "pe": float(30 - i), "roe": float(i % 7) if i % 5 else None} for i in range(30)]
+
+
+def make_service(monkeypatch, store):
+    from app.services import enhanced_screening_service as mod
+
+    monkeypatch.setattr(mod, "get_screening_result_store", lambda: store)
+    svc = mod.EnhancedScreeningService.__new__(mod.EnhancedScreeningService)
+    calls = []
+
+    async def _execute(conditions, market, date, adj, limit, offset, order_by, use_db):
+        calls.append((limit, offset))
+        ordered = sorted(ITEMS, key=lambda x: x["pe"], reverse=True)
+        return {"total": len(ordered), "items": ordered[offset:offset + limit],
+                "optimization_used": "database", "source": "mongodb"}
+
+    svc._execute_screen = _execute
+    return svc, calls
+
+
+def test_pages_and_resorts_served_from_result_set(monkeypatch):
+    store = ScreeningResultSetStore(redis=FakeAsyncRedis(), ttl=300, max_items=1000)
+    svc, calls = make_service(monkeypatch, store)
+    conditions = [{"field": "pe", "operator": "<", "value": 40}]
+    order = [{"field": "pe", "direction": "desc"}]
+
+    async def _run():
+        first = await svc.screen_stocks(conditions, limit=10, offset=0, order_by=order)
+        second = await svc.screen_stocks(conditions, limit=10, offset=10, order_by=order, cursor=first["cursor"])
+        resorted = await svc.screen_stocks(conditions, limit=30, offset=0,
+                                           order_by=[{"field": "roe", "direction": "asc"}])
+        refreshed = await svc.screen_stocks(conditions, limit=10, offset=0, order_by=order, refresh=True)
+        await store.bump_data_version()
+        after_bump = await svc.screen_stocks(conditions, limit=10, offset=0, order_by=order)
+        return first, second, resorted, refreshed, after_bump
+
+    first, second, resorted, refreshed, after_bump = asyncio.run(_run())
+    assert [it["pe"] for it in first["items"]] == [30.0 - i for i in range(10)]
+    assert second["cached"] and [it["pe"] for it in second["items"]] == [20.0 - i for i in range(10)]
+    roe = [it.get("roe") for it in resorted["items"]]
+    assert resorted["cached"] and roe[:24] == sorted(roe[:24]) and roe[24:] == [None] * 6
+    assert not refreshed["cached"] and after_bump["cursor"] != first["cursor"]
+    # 首次、refresh、数据版本更新各执行一次完整筛选
+    assert calls == [(1000, 0), (1000, 0), (1000, 0)]
+
+
+def test_truncated_result_set_falls_back_for_deep_pages(monkeypatch):
+    store = ScreeningResultSetStore(redis=FakeAsyncRedis(), ttl=300, max_items=20)
+    svc, calls = make_service(monkeypatch, store)
+    conditions = [{"field": "pe", "operator": "<", "value": 40}]
+
+    async def _run():
+        await svc.screen_stocks(conditions, limit=10, offset=0)
+        cached = await svc.screen_stocks(conditions, limit=10, offset=10)
+        deep = await svc.screen_stocks(conditions, limit=10, offset=20)
+        return cached, deep
+
+    cached, deep = asyncio.run(_run())
+    assert cached["cached"] and len(cached["items"]) == 10
+    assert "cached" not in deep and len(deep["items"]) == 10
+    assert calls == [(20, 0), (10, 20)]
+
+
+def test_client_cursor_is_validated_against_request(monkeypatch):
+    redis = FakeAsyncRedis()
+    store = ScreeningResultSetStore(redis=redis, ttl=300, max_items=1000)
+    svc, calls = make_service(monkeypatch, store)
+    pe_conditions = [{"field": "pe", "operator": "<", "value": 40}]
+    roe_conditions = [{"field": "roe", "operator": ">", "value": 1}]
+
+    async def _run():
+        pe_first = await svc.screen_stocks(pe_conditions, limit=10)
+        # 另一组条件携带 pe 的游标，不能读到 pe 的结果集
+        roe_first = await svc.screen_stocks(roe_conditions, limit=10, cursor=pe_first["cursor"])
+        forged = await svc.screen_stocks(pe_conditions, limit=10, cursor="../../*")
+        return pe_first, roe_first, forged
+
+    pe_first, roe_first, forged = asyncio.run(_run())
+    assert not roe_first["cached"] and roe_first["cursor"] != pe_first["cursor"]
+    assert forged["cached"] and forged["cursor"] == pe_first["cursor"]
+    assert not any("../../*" in key for key in redis.data)
+    assert calls == [(1000, 0), (1000, 0)]
+
+
+def test_unsorted_request_does_not_reuse_another_requesters_order(monkeypatch):
+    store = ScreeningResultSetStore(redis=FakeAsyncRedis(), ttl=300, max_items=1000)
+    svc, calls = make_service(monkeypatch, store)
+    conditions = [{"field": "pe", "operator": "<", "value": 40}]
+
+    async def _run():
+        await svc.screen_stocks(conditions, limit=10, order_by=[{"field": "pe", "direction": "asc"}])
+        unsorted = await svc.screen_stocks(conditions, limit=10)
+        unsorted_next = await svc.screen_stocks(conditions, limit=10, offset=10)
+        return unsorted, unsorted_next
+
+    unsorted, unsorted_next = asyncio.run(_run())
+    # 未指定排序时返回服务默认顺序，而不是首个请求者指定的升序
+    assert not unsorted["cached"] and [it["pe"] for it in unsorted["items"]] == [30.0 - i for i in range(10)]
+    assert unsorted_next["cached"] and [it["pe"] for it in unsorted_next["items"]] == [20.0 - i for i in range(10)]
+    assert calls == [(1000, 0), (1000, 0)]
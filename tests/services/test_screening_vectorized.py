@@ -0,0 +1,142 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.screening.eval_utils import evaluate_conditions
+from app.services.screening.vectorized import SCREENING_SPECS, PanelUnavailableError, VectorizedScreeningEngine
+from app.services.screening_service import ALLOWED_FIELDS, ALLOWED_OPS
+from tradingagents.tools.analysis.indicators import compute_many
+
+
+class _FakeColl:
+    def __init__(self, docs):
+        self._docs = docs
+        self.calls = 0
+
+    def find(self, query, projection=None, **_kwargs):
+        self.calls += 1
+        lo, hi = query["trade_date"]["$gte"], query["trade_date"]["$lte"]
+        return iter([d for d in self._docs if lo <= d["trade_date"] <= hi])
+
+
+class _FakeDB:
+    def __init__(self, docs):
+        self.coll = _FakeColl(docs)
+
+    def __getitem__(self, name):
+        return self.coll
+
+
+def make_docs(symbols=30, days=120, seed=21):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2024-01-02", periods=days).strftime("%Y-%m-%d")
+    docs = []
+    for j in range(symbols):
+        code = f"{600000 + j}"
+        close = 20 + np.cumsum(rng.normal(0, 0.6, days))
+        start = int(rng.integers(0, 30))
+        for i in range(start, days):
+            if j == 4 and 100 <= i < 104:  # 停牌
+                continue
+            docs.append({
+                "symbol": code, "trade_date": dates[i], "data_source": "tushare", "period": "daily",
+                "open": close[i], "high": close[i] + 0.4, "low": close[i] - 0.4, "close": close[i],
+                "volume": float(rng.integers(1000, 9000)), "amount": float(rng.integers(1e6, 9e6)),
+            })
+    return docs, dates[-1]
+
+
+def per_symbol_frames(docs):
+    df = pd.DataFrame(docs).rename(columns={"volume": "vol"}).sort_values("trade_date")
+    frames = {}
+    for code, g in df.groupby("symbol"):
+        g = g.reset_index(drop=True)
+        g["pct_chg"] = g["close"].pct_change() * 100.0
+        frames[code] = compute_many(g, SCREENING_SPECS)
+    return frames
+
+
+CONDITIONS = [
+    {"field": "close", "op": ">", "right_field": "ma20"},
+    {"logic": "OR", "children": [
+        {"field": "rsi14", "op": "between", "value": [40, 70]},
+        {"field": "kdj_k", "op": "cross_up", "right_field": "kdj_d"},
+    ]},
+    {"logic": "AND", "children": [
+        {"field": "dif", "op": ">", "value": 0},
+        {"field": "pct_chg", "op": "<=", "value": 1.5},
+    ]},
+    {"field": "ma5", "op": "cross_down", "right_field": "ma10"},
+]
+
+
+def test_vectorized_matches_per_symbol_evaluation():
+    docs, end = make_docs()
+    frames = per_symbol_frames(docs)
+    engine = VectorizedScreeningEngine(db=_FakeDB(docs), cache_ttl=60)
+
+    for cond in CONDITIONS:
+        result = engine.screen(cond, ALLOWED_FIELDS, ALLOWED_OPS, end_date=end, limit=1000)
+        expected = sorted(code for code, f in frames.items()
+                          if evaluate_conditions(f, cond, ALLOWED_FIELDS, ALLOWED_OPS))
+        assert sorted(it["code"] for it in result["items"]) == expected, cond
+        assert result["total"] == len(expected)
+
+    # 面板在 TTL 内复用，只读取一次
+    assert engine._db.coll.calls == 1
+
+
+def test_order_by_and_pagination():
+    docs, end = make_docs()
+    engine = VectorizedScreeningEngine(db=_FakeDB(docs), cache_ttl=60)
+    cond = {"field": "close", "op": ">", "value": 0}
+    full = engine.screen(cond, ALLOWED_FIELDS, ALLOWED_OPS, end_date=end,
+                         order_by=[{"field": "rsi14", "direction": "desc"}], limit=1000)
+    rsi = [it["rsi14"] for it in full["items"]]
+    assert rsi == sorted(rsi, reverse=True)
+
+    page = engine.screen(cond, ALLOWED_FIELDS, ALLOWED_OPS, end_date=end,
+                         order_by=[{"field": "rsi14", "direction": "desc"}], offset=5, limit=5)
+    assert page["total"] == full["total"]
+    assert page["items"] == full["items"][5:10]
+
+
+def test_source_priority_for_duplicate_bars():
+    docs, end = make_docs(symbols=2, days=40)
+    last = next(d for d in reversed(docs) if d["symbol"] == "600000")
+    docs.append(dict(last, data_source="baostock", close=last["close"] + 100))
+    engine = VectorizedScreeningEngine(db=_FakeDB(docs), cache_ttl=0)
+    result = engine.screen({"field": "close", "op": ">", "value": 0}, ALLOWED_FIELDS, ALLOWED_OPS,
+                           need_tech=False, end_date=end)
+    item = next(it for it in result["items"] if it["code"] == "600000")
+    assert item["close"] == last["close"]
+    assert item["ma20"] is None
+
+
+def test_empty_or_stale_panel_is_rejected():
+    cond = {"field": "close", "op": ">", "value": 0}
+    empty = VectorizedScreeningEngine(db=_FakeDB([]), cache_ttl=0)
+    with pytest.raises(PanelUnavailableError):
+        empty.screen(cond, ALLOWED_FIELDS, ALLOWED_OPS, end_date="2024-06-28")
+
+    docs, end = make_docs(symbols=2, days=40)
+    engine = VectorizedScreeningEngine(db=_FakeDB(docs), cache_ttl=0, max_lag_days=10)
+    stale_date = (pd.Timestamp(end) + pd.Timedelta(days=30)).strftime("%Y-%m-%d")
+    with pytest.raises(PanelUnavailableError):
+        engine.screen(cond, ALLOWED_FIELDS, ALLOWED_OPS, end_date=stale_date)
+    # 周末/短假期内的筛选日期仍使用面板
+    recent = (pd.Timestamp(end) + pd.Timedelta(days=3)).strftime("%Y-%m-%d")
+    assert engine.screen(cond, ALLOWED_FIELDS, ALLOWED_OPS, end_date=recent)["total"] == 2
+
+
+def test_service_falls_back_to_per_symbol_when_panel_unavailable(monkeypatch):
+    from app.services import screening_service as mod
+
+    engine = VectorizedScreeningEngine(db=_FakeDB([]), cache_ttl=0)
+    monkeypatch.setattr(mod, "get_vectorized_screening_engine", lambda: engine)
+    svc = mod.ScreeningService()
+    fallback = {"total": 1, "items": [{"code": "600000"}]}
+    monkeypatch.setattr(svc, "_run_per_symbol", lambda conditions, params: fallback)
+
+    result = svc.run({"field": "close", "op": ">", "value": 0}, mod.ScreeningParams(date="2024-06-28"))
+    assert result == fallback
@@ -0,0 +1,151 @@
+import asyncio
+from types import SimpleNamespace
+
+import pandas as pd
+
+from app.worker.tushare_sync_service import TushareSyncService
+
+TRADE_DATES = ["2025-01-02", "2025-01-03", "2025-01-06", "2025-01-07"]
+
+
+class _FakeProvider:
+    def __init__(self):
+        self.daily_calls = []
+        self.history_calls = []
+
+    async def get_trade_calendar(self, start_date, end_date=None, exchange="SSE"):
+        return list(TRADE_DATES)
+
+    async def get_daily_by_trade_date(self, trade_date):
+        self.daily_calls.append(trade_date)
+        # 000001 在 01-07 除权：复权因子从 1.0 变为 1.1
+        factor = 1.1 if trade_date == "2025-01-07" else 1.0
+        return pd.DataFrame({
+            "ts_code": ["000001.SZ", "600000.SH", "900901.SH"],
+            "trade_date": [trade_date.replace("-", "")] * 3,
+            "open": [11.0, 8.0, 1.0],
+            "high": [11.0, 8.0, 1.0],
+            "low": [11.0, 8.0, 1.0],
+            "close": [11.0, 8.0, 1.0],
+            "pre_close": [11.0, 8.0, 1.0],
+            "vol": [100.0, 200.0, 1.0],
+            "amount": [1100.0, 1600.0, 1.0],
+            "adj_factor": [factor, 2.0, None],
+        })
+
+    async def get_historical_data(self, symbol, start_date, end_date, period="daily"):
+        self.history_calls.append(symbol)
+        return None
+
+
+class _FakeHistoricalService:
+    def __init__(self, latest_dates):
+        self.latest_dates = latest_dates
+        self.saved = []
+
+    async def get_latest_dates(self, data_source, period="daily"):
+        return self.latest_dates
+
+    async def save_cross_section(self, data, data_source, market="CN", period="daily", symbol_column="symbol"):
+        self.saved.append(data)
+        return len(data)
+
+    async def get_latest_date(self, symbol, data_source):
+        return None
+
+    async def get_incremental_start_dates(self, symbols, data_source, period="daily", use_list_date=True):
+        return {}
+
+
+class _FakeLimiter:
+    async def acquire(self):
+        return None
+
+    def get_stats(self):
+        return {"current_calls": 0, "max_calls": 0, "total_waits": 0, "total_wait_time": 0.0}
+
+
+def _make_service(latest_dates, mode="auto"):
+    service = TushareSyncService.__new__(TushareSyncService)
+    service.provider = _FakeProvider()
+    service.historical_service = _FakeHistoricalService(latest_dates)
+    service.rate_limiter = _FakeLimiter()
+    service.settings = SimpleNamespace(
+        TUSHARE_HISTORICAL_SYNC_MODE=mode,
+        TUSHARE_BY_DATE_LOOKBACK_DAYS=60,
+    )
+    service.db = SimpleNamespace(stock_basic_info=SimpleNamespace(find_one=_no_basic_info))
+    return service
+
+
+async def _no_basic_info(*args, **kwargs):
+    return None
+
+
+def test_auto_mode_picks_strategy_from_gap_shape():
+    symbols = [f"{i:06d}" for i in range(100)]
+
+    async def plan(latest_dates, requested=symbols):
+        service = _make_service(latest_dates)
+        return await service._plan_historical_sync(requested, None, "2025-01-07", True, False, "daily")
+
+    # 只缺最近两个交易日：4 次调用远少于 100 次逐只调用
+    shallow = asyncio.run(plan({s: "2025-01-03" for s in symbols[:-1]}))
+    assert shallow["mode"] == "by_date"
+    assert shallow["trade_dates"] == ["2025-01-06", "2025-01-07"]
+    assert shallow["backfill_symbols"] == ["000099"]
+
+    # 整个窗口都没有数据：缺口较深，逐只同步
+    deep = asyncio.run(plan({}))
+    assert deep["mode"] == "by_symbol" and deep["backfill_symbols"] == symbols
+
+    # 股票很少时逐只同步更省调用
+    few = asyncio.run(plan({"000001": "2025-01-02", "600000": "2025-01-02"}, ["000001", "600000"]))
+    assert few["mode"] == "by_symbol"
+
+    # 全部已同步到最新交易日：空计划
+    done = asyncio.run(plan({s: "2025-01-07" for s in symbols}))
+    assert done["trade_dates"] == [] and done["backfill_symbols"] == []
+
+
+def test_plan_repairs_lagging_symbols_even_when_market_is_covered():
+    symbols = [f"{i:06d}" for i in range(100)]
+    latest_dates = {s: "2025-01-07" for s in symbols}
+
+    async def plan(requested, mode="auto"):
+        service = _make_service(latest_dates, mode=mode)
+        return await service._plan_historical_sync(requested, None, "2025-01-07", True, False, "daily")
+
+    # 单只股票缺最新一个交易日，全市场覆盖率不受影响也要补齐
+    latest_dates["000042"] = "2025-01-06"
+    single = asyncio.run(plan(symbols, mode="by_date"))
+    assert single["trade_dates"] == ["2025-01-07"]
+
+    # 只请求少量落后的股票：逐只同步这些股票，而不是返回空计划
+    latest_dates.update({"000001": "2025-01-02", "000002": "2025-01-03"})
+    few = asyncio.run(plan(["000001", "000002", "000003"]))
+    assert few["mode"] == "by_symbol"
+    assert few["backfill_symbols"] == ["000001", "000002"]
+
+
+def test_by_date_sync_fans_out_cross_sections_with_qfq_prices():
+    symbols = ["000001", "600000", "300750"]
+    service = _make_service({"000001": "2025-01-03", "600000": "2025-01-03"}, mode="by_date")
+
+    stats = asyncio.run(service.sync_historical_data(symbols=symbols, end_date="2025-01-07"))
+
+    assert stats["mode"] == "by_date"
+    # 每个缺失交易日一次横截面调用，从最新交易日开始
+    assert service.provider.daily_calls == ["2025-01-07", "2025-01-06"]
+    # 没有历史数据的股票逐只补齐
+    assert service.provider.history_calls == ["300750"]
+
+    latest, earlier = service.historical_service.saved
+    # 只保存同步范围内的股票
+    assert set(latest["symbol"]) == {"000001", "600000"}
+    # 除权前的价格按最新复权因子换算为前复权：11.0 * 1.0 / 1.1
+    assert earlier.set_index("symbol").loc["000001", "close"] == 10.0
+    assert latest.set_index("symbol").loc["000001", "close"] == 11.0
+    assert earlier.set_index("symbol").loc["600000", "close"] == 8.0
+    assert stats["total_records"] == 4
+    assert stats["success_count"] == 2
@@ -0,0 +1,92 @@
+import pandas as pd
+
+from tradingagents.dataflows.cache.bar_store import BarStore, missing_intervals
+
+
+def _make_fetcher(calls, scale=1.0):
+    def fetch(start, end):
+        calls.append((start, end))
+        dates = pd.bdate_range(start, end)
+        return pd.DataFrame({'date': dates, 'close': [float(d.day) * scale for d in dates]})
+    return fetch
+
+
+def test_missing_intervals_head_and_tail():
+    day = pd.Timestamp
+    covered = [(day('2024-02-01'), day('2024-02-29'))]
+    gaps = missing_intervals(covered, day('2024-01-15'), day('2024-03-10'))
+    assert gaps == [(day('2024-01-15'), day('2024-01-31')), (day('2024-03-01'), day('2024-03-10'))]
+    assert missing_intervals(covered, day('2024-02-05'), day('2024-02-20')) == []
+
+
+def test_sub_range_served_locally(tmp_path):
+    store = BarStore(tmp_path)
+    calls = []
+    fetch = _make_fetcher(calls)
+
+    full = store.get_bars('000001', '2023-01-01', '2023-06-30', fetch)
+    assert len(calls) == 1
+
+    sub = store.get_bars('000001', '2023-02-01', '2023-03-31', fetch)
+    assert len(calls) == 1
+    assert sub['date'].min() >= pd.Timestamp('2023-02-01')
+    assert sub['date'].max() <= pd.Timestamp('2023-03-31')
+    assert len(sub) == len(full[(full['date'] >= '2023-02-01') & (full['date'] <= '2023-03-31')])
+
+
+def test_only_tail_is_fetched(tmp_path):
+    store = BarStore(tmp_path)
+    calls = []
+    fetch = _make_fetcher(calls)
+
+    store.get_bars('000001', '2023-01-02', '2023-06-30', fetch)
+    out = store.get_bars('000001', '2023-01-02', '2023-07-31', fetch)
+
+    # 第二次只请求尾部（带一个重叠锚点）
+    assert calls[1] == ('2023-06-30', '2023-07-31')
+    assert out['date'].is_monotonic_increasing
+    assert out['date'].is_unique
+    assert out['date'].max() == pd.Timestamp('2023-07-31')
+
+
+def test_adjust_change_triggers_refetch(tmp_path):
+    store = BarStore(tmp_path)
+    calls = []
+    store.get_bars('000001', '2023-01-02', '2023-06-30', _make_fetcher(calls))
+
+    # 复权因子变化：重叠日收盘价不一致 -> 重新获取整个区间
+    out = store.get_bars('000001', '2023-01-02', '2023-07-31', _make_fetcher(calls, scale=0.5))
+    assert calls[-1] == ('2023-01-02', '2023-07-31')
+    assert out.loc[out['date'] == pd.Timestamp('2023-01-03'), 'close'].iloc[0] == 1.5
+    assert store.get_stats()['resets'] == 1
+
+
+def test_sources_are_stored_separately(tmp_path):
+    store = BarStore(tmp_path)
+    tushare_calls, akshare_calls = [], []
+    store.get_bars('000001', '2023-01-02', '2023-03-31', _make_fetcher(tushare_calls), source='tushare')
+    out = store.get_bars('000001', '2023-01-02', '2023-03-31', _make_fetcher(akshare_calls, scale=100.0),
+                         source='akshare')
+
+    # 另一个数据源不会复用或拼接 tushare 的K线
+    assert len(akshare_calls) == 1
+    assert out.loc[out['date'] == pd.Timestamp('2023-01-03'), 'close'].iloc[0] == 300.0
+    assert (tmp_path / 'tushare' / 'daily_qfq' / '000001.json').exists()
+    assert (tmp_path / 'akshare' / 'daily_qfq' / '000001.json').exists()
+
+
+def test_empty_fetch_is_not_marked_covered(tmp_path):
+    store = BarStore(tmp_path)
+    calls = []
+    store.get_bars('000001', '2023-01-02', '2023-06-30', _make_fetcher(calls))
+
+    def empty_fetch(start, end):
+        calls.append((start, end))
+        return pd.DataFrame({'date': [], 'close': []})
+
+    out = store.get_bars('000001', '2023-01-02', '2023-07-31', empty_fetch)
+    assert out['date'].max() == pd.Timestamp('2023-06-30')
+
+    # 尾部区间仍未覆盖，下次继续请求
+    store.get_bars('000001', '2023-01-02', '2023-07-31', _make_fetcher(calls))
+    assert calls[-1] == ('2023-06-30', '2023-07-31')
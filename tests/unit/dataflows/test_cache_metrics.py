@@ -0,0 +1,41 @@
+import pandas as pd
+
+from tradingagents.dataflows.cache.file_cache import StockDataCache
+from tradingagents.dataflows.cache.metrics import CacheMetrics
+
+
+def test_snapshot_percentiles_and_prometheus_output():
+    metrics = CacheMetrics()
+    for ms in range(1, 101):
+        metrics.record_lookup('redis', 'stock_data', 'china', hit=ms % 4 != 0, seconds=ms / 1000, bytes_read=10)
+    metrics.record_write('redis', 'stock_data', 'china', 500)
+    metrics.record_decode('redis', 'stock_data', 'china', 0.002)
+
+    (row,) = metrics.snapshot()
+    assert row['hits'] == 75 and row['misses'] == 25
+    assert row['hit_ratio'] == 0.75
+    assert 49 <= row['lookup_p50_ms'] <= 51
+    assert 94 <= row['lookup_p95_ms'] <= 96
+    assert row['bytes_read'] == 1000 and row['bytes_written'] == 500
+    assert metrics.summary()['redis']['hit_ratio'] == 0.75
+
+    text = metrics.to_prometheus()
+    assert 'tradingagents_cache_lookups_total{backend="redis",data_type="stock_data",market="china",result="hit"} 75' in text
+    assert 'tradingagents_cache_lookup_seconds_count{backend="redis",data_type="stock_data",market="china"} 100' in text
+    assert 'tradingagents_cache_decode_seconds{backend="redis",data_type="stock_data",market="china",quantile="0.95"}' in text
+
+
+def test_file_cache_records_hits_misses_and_bytes(tmp_path):
+    cache = StockDataCache(tmp_path)
+    cache.metrics = CacheMetrics()
+    cache.memory_cache.clear()
+
+    key = cache.save_stock_data('000001', pd.DataFrame({'close': [1.0, 2.0]}), '2024-01-01', '2024-01-31', 'tushare')
+    cache.memory_cache.clear()
+    assert cache.load_stock_data(key) is not None
+    assert cache.find_cached_stock_data('000002') is None
+
+    rows = {(r['backend'], r['data_type'], r['market']): r for r in cache.metrics.snapshot()}
+    file_row = rows[('file', 'stock_data', 'china')]
+    assert file_row['hits'] == 1 and file_row['misses'] == 1
+    assert file_row['bytes_read'] > 0 and file_row['bytes_written'] == file_row['bytes_read']
@@ -0,0 +1,78 @@
+import time
+
+from tradingagents.dataflows.datasource_routing import DataSourceRoutingCache
+
+
+class _SystemConfigs:
+    def __init__(self, doc):
+        self.doc = doc
+        self.calls = []
+
+    def find_one(self, query, projection=None, sort=None):
+        self.calls.append(projection)
+        if projection:
+            return {k: v for k, v in self.doc.items() if k in projection}
+        return dict(self.doc)
+
+
+class _FakeDB:
+    def __init__(self, doc):
+        self.system_configs = _SystemConfigs(doc)
+
+
+def make_config(version, akshare_priority=2):
+    return {
+        "version": version,
+        "is_active": True,
+        "data_source_configs": [
+            {"name": "Tushare", "type": "tushare", "priority": 3, "enabled": True,
+             "market_categories": ["a_shares"], "api_key": "token"},
+            {"name": "AKShare", "type": "akshare", "priority": akshare_priority, "enabled": True},
+            {"name": "BaoStock", "type": "baostock", "priority": 1, "enabled": False},
+            {"name": "yfinance", "type": "yfinance", "priority": 5, "enabled": True,
+             "market_categories": ["us_stocks"]},
+        ],
+    }
+
+
+def test_routing_table_priority_and_configs():
+    db = _FakeDB(make_config(1))
+    routing = DataSourceRoutingCache(ttl=60, db_getter=lambda: db).get()
+
+    assert routing.priority("a_shares") == ["tushare", "akshare"]
+    assert routing.priority("us_stocks") == ["yfinance", "akshare"]
+    assert routing.priority() == ["yfinance", "tushare", "akshare"]
+    assert routing.enabled_types() == {"tushare", "akshare", "yfinance"}
+    assert routing.configs_by_name()["tushare"]["api_key"] == "token"
+
+
+def test_cached_within_ttl_and_invalidated_explicitly():
+    db = _FakeDB(make_config(1))
+    cache = DataSourceRoutingCache(ttl=60, db_getter=lambda: db)
+
+    for _ in range(5):
+        assert cache.get().priority("a_shares") == ["tushare", "akshare"]
+    assert len(db.system_configs.calls) == 1
+
+    db.system_configs.doc = make_config(2, akshare_priority=9)
+    assert cache.get().version == 1
+    cache.invalidate()
+    assert cache.get().priority("a_shares") == ["akshare", "tushare"]
+    assert len(db.system_configs.calls) == 2
+
+
+def test_expired_table_renewed_when_version_unchanged():
+    db = _FakeDB(make_config(7))
+    cache = DataSourceRoutingCache(ttl=0.01, db_getter=lambda: db)
+    cache.get()
+    time.sleep(0.02)
+
+    assert cache.get().version == 7
+    # 版本未变时只查询了版本号
+    assert db.system_configs.calls == [None, {"version": 1}]
+    assert cache.stats["renewals"] == 1
+
+    db.system_configs.doc = make_config(8, akshare_priority=9)
+    time.sleep(0.02)
+    assert cache.get().priority("a_shares") == ["akshare", "tushare"]
+    assert cache.stats["reloads"] == 2
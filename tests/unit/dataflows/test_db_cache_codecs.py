@@ -0,0 +1,101 @@
+import json
+
+import pandas as pd
+
+from tradingagents.dataflows.cache.codecs import (
+    CodecStats, decode_payload, encode_payload, pack_redis_value, unpack_redis_value,
+)
+from tradingagents.dataflows.cache.db_cache import DatabaseCacheManager
+from tradingagents.dataflows.cache.memory_cache import MemoryCache
+from tradingagents.dataflows.cache.metrics import CacheMetrics
+
+
+class FakeRedis:
+    def __init__(self, store, decode):
+        self.store = store
+        self.decode = decode
+
+    def setex(self, key, ttl, value):
+        self.store[key] = value.encode('utf-8') if isinstance(value, str) else value
+
+    def get(self, key):
+        value = self.store.get(key)
+        if value is not None and self.decode:
+            return value.decode('utf-8')
+        return value
+
+    def exists(self, key):
+        return key in self.store
+
+
+def make_manager():
+    manager = DatabaseCacheManager.__new__(DatabaseCacheManager)
+    store = {}
+    manager.mongodb_client = None
+    manager.mongodb_db = None
+    manager.redis_client = FakeRedis(store, decode=True)
+    manager.redis_binary_client = FakeRedis(store, decode=False)
+    manager.memory_cache = MemoryCache(enabled=False)
+    manager.codec_stats = CodecStats()
+    manager.metrics = CacheMetrics()
+    return manager, store
+
+
+def sample_frame(rows=500):
+    return pd.DataFrame({
+        'date': pd.date_range('2020-01-01', periods=rows).strftime('%Y-%m-%d'),
+        'close': [10.0 + i * 0.01 for i in range(rows)],
+        'volume': list(range(rows)),
+    })
+
+
+def test_dataframe_payload_roundtrip_is_smaller_than_json():
+    df = sample_frame()
+    payload, data_format, codec = encode_payload(df)
+    assert data_format == 'dataframe_arrow'
+    assert len(payload) < len(df.to_json(orient='records', date_format='iso'))
+    pd.testing.assert_frame_equal(decode_payload(payload, data_format, codec), df)
+
+    header, body = unpack_redis_value(pack_redis_value(payload, {'codec': codec}))
+    assert header['codec'] == codec and body == payload
+
+
+def test_save_and_load_through_redis_reports_codec_stats():
+    manager, store = make_manager()
+    df = sample_frame()
+    key = manager.save_stock_data('000001', df, '2020-01-01', '2021-05-14', 'tushare')
+
+    assert store[key].startswith(b'TAC')
+    pd.testing.assert_frame_equal(manager.load_stock_data(key), df)
+
+    text_key = manager.save_fundamentals_data('000001', '基本面' * 100, data_source='test')
+    assert manager.load_fundamentals_data(text_key) == '基本面' * 100
+
+    stats = manager.codec_stats.get_stats()
+    assert stats['stock_data']['decoded'] == 1
+    assert stats['stock_data']['avg_encoded_bytes'] > 0
+    assert stats['fundamentals_data']['codecs']
+
+
+def test_legacy_json_entries_still_decode():
+    manager, store = make_manager()
+    df = sample_frame(5)
+    store['stock:000001:legacy'] = json.dumps({
+        'data': df.to_json(orient='records', date_format='iso'),
+        'data_format': 'dataframe_json',
+        'symbol': '000001',
+    }).encode('utf-8')
+    store['news:000001:legacy'] = json.dumps({'data': 'old news'}).encode('utf-8')
+
+    loaded = manager.load_stock_data('stock:000001:legacy')
+    assert list(loaded['close']) == list(df['close'])
+    assert manager.load_news_data('news:000001:legacy') == 'old news'
+    assert manager.codec_stats.get_stats()['stock_data']['legacy_decoded'] == 1
+
+
+def test_json_codec_can_be_forced(monkeypatch):
+    monkeypatch.setenv('TA_DB_CACHE_CODEC', 'json')
+    manager, store = make_manager()
+    key = manager.save_stock_data('000001', sample_frame(3), data_source='tushare')
+    assert json.loads(store[key])['data_format'] == 'dataframe_json'
+    assert len(manager.load_stock_data(key)) == 3
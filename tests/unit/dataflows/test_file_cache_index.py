@@ -0,0 +1,134 @@
+import json
+import time
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from tradingagents.dataflows.cache.file_cache import StockDataCache
+
+
+def test_partial_match_uses_index(tmp_path):
+    cache = StockDataCache(tmp_path)
+    df = pd.DataFrame({'close': [1.0, 2.0]})
+    key = cache.save_stock_data('000001', df, '2024-01-01', '2024-02-01', 'tushare')
+
+    # 不同日期区间 -> 精确键未命中，走索引部分匹配
+    assert cache.find_cached_stock_data('000001', '2023-01-01', '2024-02-01') == key
+    assert cache.find_cached_stock_data('000001', data_source='akshare') is None
+    assert cache.find_cache_keys('000001', 'stock_data') == [key]
+
+
+def test_index_rebuilt_from_existing_meta_files(tmp_path):
+    cache = StockDataCache(tmp_path)
+    key = cache.save_fundamentals_data('AAPL', 'fundamentals text', 'finnhub')
+    cache.metadata_index.close()
+    (tmp_path / 'metadata' / 'metadata_index.sqlite3').unlink()
+
+    rebuilt = StockDataCache(tmp_path)
+    assert rebuilt.metadata_index.count() == 1
+    assert rebuilt.find_cached_fundamentals_data('AAPL') == key
+
+    stats = rebuilt.get_cache_stats()
+    assert stats['fundamentals_count'] == 1
+    assert stats['total_size'] > 0
+
+    assert rebuilt.clear_old_cache(0) == 1
+    assert rebuilt.get_cache_stats()['total_files'] == 0
+
+
+def test_rebuild_infers_category_for_legacy_metadata(tmp_path):
+    cache = StockDataCache(tmp_path)
+    news_file = cache.china_news_dir / 'legacy_news.txt'
+    news_file.write_text('news', encoding='utf-8')
+    stock_file = tmp_path / 'legacy_stock.txt'
+    stock_file.write_text('stock', encoding='utf-8')
+    # 旧版元数据没有 market_type（新闻也没有 data_type），分类来自目录或股票代码
+    (cache.metadata_dir / 'legacy_news_meta.json').write_text(
+        json.dumps({'symbol': '000001', 'file_path': str(news_file)}), encoding='utf-8')
+    (cache.metadata_dir / 'legacy_stock_meta.json').write_text(
+        json.dumps({'symbol': 'AAPL', 'data_type': 'stock_data', 'file_path': str(stock_file)}), encoding='utf-8')
+
+    cache.metadata_index.rebuild(cache.metadata_dir)
+    usage = cache.metadata_index.get_category_usage()
+    assert set(usage) == {'china_news', 'us_stock_data'}
+
+
+def test_dataframe_roundtrip_preserves_schema(tmp_path):
+    cache = StockDataCache(tmp_path)
+    df = pd.DataFrame(
+        {'close': [1.5, 2.5, 3.5], 'vol': [100, 200, 300]},
+        index=pd.date_range('2024-01-01', periods=3, name='date'),
+    )
+    key = cache.save_stock_data('000001', df, '2024-01-01', '2024-01-03', 'tushare')
+
+    loaded = cache.load_stock_data(key)
+    pd.testing.assert_frame_equal(loaded, df, check_freq=False)
+
+
+def test_migrate_csv_entries(tmp_path, monkeypatch):
+    monkeypatch.setenv('TA_CACHE_DATAFRAME_FORMAT', 'csv')
+    cache = StockDataCache(tmp_path)
+    df = pd.DataFrame({'close': [1.0, 2.0]})
+    key = cache.save_stock_data('000001', df, '2024-01-01', '2024-01-02', 'tushare')
+    assert cache.load_stock_data(key)['close'].tolist() == [1.0, 2.0]
+
+    assert cache.migrate_dataframe_cache('parquet') == 1
+    assert cache._load_metadata(key)['file_format'] == 'parquet'
+    assert cache.load_stock_data(key)['close'].tolist() == [1.0, 2.0]
+
+
+def test_budget_evicts_least_recently_used(tmp_path, monkeypatch):
+    monkeypatch.setenv('TA_FILE_CACHE_EVICTION_INTERVAL', '1')
+    cache = StockDataCache(tmp_path)
+    cache.cache_config['china_fundamentals']['max_files'] = 2
+
+    k1 = cache.save_fundamentals_data('600001', 'a' * 10, 'src1')
+    time.sleep(0.01)
+    k2 = cache.save_fundamentals_data('600002', 'b' * 10, 'src1')
+    time.sleep(0.01)
+    # 读取 k1，使 k2 成为最近最少访问的条目
+    cache.memory_cache.clear()
+    assert cache.load_fundamentals_data(k1) == 'a' * 10
+    time.sleep(0.01)
+    k3 = cache.save_fundamentals_data('600003', 'c' * 10, 'src1')
+
+    keys = {e['cache_key'] for e in cache.metadata_index.find_least_recently_used(10)}
+    assert keys == {k1, k3}
+    assert not cache._get_metadata_path(k2).exists()
+
+    stats = cache.get_cache_stats()
+    assert stats['evictions'] == 1
+    assert stats['evictions_by_category'] == {'china_fundamentals': 1}
+    assert stats['categories']['china_fundamentals']['entries'] == 2
+
+
+def test_total_byte_budget(tmp_path):
+    cache = StockDataCache(tmp_path)
+    for i in range(4):
+        cache.save_fundamentals_data(f'60000{i}', 'x' * 1000, 'src1')
+        time.sleep(0.01)
+    cache.max_total_bytes = 2500
+
+    assert cache.enforce_budgets() == 2
+    assert cache.metadata_index.total_size() <= 2500
+    assert cache.find_cache_keys('600000', 'fundamentals') == []
+    assert cache.find_cache_keys('600003', 'fundamentals') != []
+
+
+def test_mixed_type_column_falls_back_to_csv(tmp_path, monkeypatch):
+    pytest.importorskip('pyarrow')
+    monkeypatch.setenv('TA_CACHE_DATAFRAME_FORMAT', 'arrow')
+    cache = StockDataCache(tmp_path)
+    key = cache.save_stock_data('000001', pd.DataFrame({'close': [1.0, 2.0]}), '2024-01-01', '2024-01-31', 'tushare')
+    arrow_path = cache._load_metadata(key)['file_path']
+
+    # 混合类型的 object 列无法转换为 Arrow，退回 CSV 并删除旧格式文件
+    mixed = pd.DataFrame({'close': [1.0, 2.0], 'note': [1, 'a']})
+    assert cache.save_stock_data('000001', mixed, '2024-01-01', '2024-01-31', 'tushare') == key
+    metadata = cache._load_metadata(key)
+    assert metadata['file_format'] == 'csv'
+    assert metadata['file_path'].endswith('.csv')
+    assert not Path(arrow_path).exists()
+    cache.memory_cache.clear()
+    assert cache.load_stock_data(key)['note'].tolist() == ['1', 'a']
@@ -0,0 +1,96 @@
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from dateutil.relativedelta import relativedelta
+
+from tradingagents.dataflows import interface
+from tradingagents.dataflows.technical import stockstats as stockstats_module
+from tradingagents.dataflows.technical.stockstats import StockstatsUtils
+
+
+def _price_frame(periods=320):
+    rng = np.random.default_rng(7)
+    close = 100 + np.cumsum(rng.normal(0, 1, periods))
+    return pd.DataFrame({
+        'Date': pd.bdate_range('2024-01-01', periods=periods).strftime('%Y-%m-%d'),
+        'Open': close + rng.normal(0, 0.5, periods),
+        'High': close + 2,
+        'Low': close - 2,
+        'Close': close,
+        'Volume': rng.integers(1_000, 10_000, periods).astype(float),
+    })
+
+
+def _per_day_window(symbol, indicator, curr_date, look_back_days, online, trading_dates=None):
+    """逐日调用 get_stockstats_indicator 的旧实现，作为对照"""
+    day = datetime.strptime(curr_date, "%Y-%m-%d")
+    before = day - relativedelta(days=look_back_days)
+    lines = ""
+    while day >= before:
+        date_str = day.strftime("%Y-%m-%d")
+        if trading_dates is None or date_str in trading_dates:
+            value = interface.get_stockstats_indicator(symbol, indicator, date_str, online)
+            lines += f"{date_str}: {value}\n"
+        day = day - relativedelta(days=1)
+    return lines
+
+
+def _count_loads(monkeypatch):
+    calls = []
+    original = StockstatsUtils.load_price_data
+
+    def counting(*args, **kwargs):
+        calls.append(args)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(StockstatsUtils, 'load_price_data', staticmethod(counting))
+    return calls
+
+
+def test_offline_window_matches_per_day_and_reads_once(tmp_path, monkeypatch):
+    price_dir = tmp_path / 'market_data' / 'price_data'
+    price_dir.mkdir(parents=True)
+    data = _price_frame()
+    data.to_csv(price_dir / 'TEST-YFin-data-2015-01-01-2025-03-25.csv', index=False)
+    monkeypatch.setattr(interface, 'DATA_DIR', str(tmp_path))
+
+    trading_dates = set(data['Date'])
+    for indicator in ('close_50_sma', 'macd', 'rsi', 'boll_ub'):
+        expected = _per_day_window('TEST', indicator, '2025-03-14', 30, False, trading_dates)
+        calls = _count_loads(monkeypatch)
+        result = interface.get_stock_stats_indicators_window('TEST', indicator, '2025-03-14', 30, False)
+        monkeypatch.undo()
+        monkeypatch.setattr(interface, 'DATA_DIR', str(tmp_path))
+
+        assert len(calls) == 1
+        assert result.startswith(f"## {indicator} values from 2025-02-12 to 2025-03-14:\n\n" + expected)
+        assert "2025-03-09" not in result  # 周末被过滤
+
+
+def test_online_window_matches_per_day_including_non_trading_days(tmp_path, monkeypatch):
+    cache_dir = tmp_path / 'cache'
+    cache_dir.mkdir()
+    today = pd.Timestamp.today()
+    start = (today - pd.DateOffset(years=15)).strftime('%Y-%m-%d')
+    cache_file = os.path.join(cache_dir, f"TEST-YFin-data-{start}-{today.strftime('%Y-%m-%d')}.csv")
+    _price_frame().to_csv(cache_file, index=False)
+    monkeypatch.setattr(stockstats_module, 'get_config', lambda: {'data_cache_dir': str(cache_dir)})
+
+    expected = _per_day_window('TEST', 'atr', '2025-03-14', 10, True)
+    calls = _count_loads(monkeypatch)
+    result = interface.get_stock_stats_indicators_window('TEST', 'atr', '2025-03-14', 10, True)
+
+    assert len(calls) == 1
+    assert expected in result
+    assert f"2025-03-09: {stockstats_module.NOT_TRADING_DAY}" in result
+
+
+def test_window_load_failure_yields_empty_values(tmp_path, monkeypatch):
+    def fail(*args, **kwargs):
+        raise RuntimeError('network down')
+
+    monkeypatch.setattr(StockstatsUtils, 'load_price_data', staticmethod(fail))
+    result = interface.get_stock_stats_indicators_window('TEST', 'rsi', '2025-03-14', 2, True)
+    assert "2025-03-14: \n2025-03-13: \n2025-03-12: \n" in result
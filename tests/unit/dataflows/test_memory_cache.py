@@ -0,0 +1,44 @@
+import time
+
+import pandas as pd
+
+from tradingagents.dataflows.cache.memory_cache import MemoryCache
+
+
+def test_lru_eviction_by_entries():
+    cache = MemoryCache(max_entries=2, max_bytes=10 * 1024 * 1024)
+    cache.set('a', 'A')
+    cache.set('b', 'B')
+    assert cache.get('a') == 'A'  # a 成为最近使用
+    cache.set('c', 'C')
+
+    assert cache.get('b') is None
+    assert cache.get('a') == 'A'
+    stats = cache.get_stats()
+    assert stats['evictions'] == 1
+    assert stats['hits'] == 2 and stats['misses'] == 1
+
+
+def test_byte_budget_and_ttl():
+    cache = MemoryCache(max_entries=100, max_bytes=1000, default_ttl=0.05)
+    cache.set('big', 'x' * 5000)
+    assert cache.get('big') is None
+
+    cache.set('small', 'y')
+    time.sleep(0.1)
+    assert cache.get('small') is None
+    assert cache.get_stats()['expirations'] == 1
+
+
+def test_dataframe_copies_and_tag_invalidation():
+    cache = MemoryCache()
+    df = pd.DataFrame({'close': [1.0, 2.0]})
+    cache.set('k', df, tags=('000001',))
+
+    got = cache.get('k')
+    got['ma5'] = 0
+    assert 'ma5' not in cache.get('k').columns
+
+    cache.invalidate_tag('000001')
+    assert cache.get('k') is None
+    assert cache.get_stats()['entries'] == 0
@@ -0,0 +1,49 @@
+from types import SimpleNamespace
+
+from tradingagents.dataflows import data_source_manager
+from tradingagents.dataflows import optimized_china_data as ocd
+from tradingagents.dataflows.cache.file_cache import StockDataCache
+
+
+class _FakeStockCache:
+    def __init__(self):
+        self.saved = []
+
+    def find_cached_stock_data(self, **kwargs):
+        return None
+
+    def save_stock_data(self, **kwargs):
+        self.saved.append(kwargs)
+
+
+def _provider(monkeypatch, tmp_path):
+    monkeypatch.setattr(ocd, 'get_mongodb_cache_adapter', lambda: SimpleNamespace(use_app_cache=False))
+    file_cache = StockDataCache(tmp_path)
+    monkeypatch.setattr(ocd, 'get_file_cache', lambda: file_cache)
+    provider = ocd.OptimizedChinaDataProvider()
+    provider.cache = _FakeStockCache()
+    provider.min_api_interval = 0
+    return provider, file_cache
+
+
+def test_get_stock_data_fetches_from_unified_api_on_cache_miss(monkeypatch, tmp_path):
+    provider, _ = _provider(monkeypatch, tmp_path)
+    monkeypatch.setattr(data_source_manager, 'get_china_stock_data_unified',
+                        lambda symbol, start_date, end_date: f"行情 {symbol}")
+    monkeypatch.setattr(provider, '_generate_and_cache_fundamentals',
+                        lambda symbol: (_ for _ in ()).throw(AssertionError('不应生成基本面')))
+
+    result = provider.get_stock_data('000001', '2024-01-01', '2024-01-31')
+
+    assert result == '行情 000001'
+    assert provider.cache.saved[0]['data_source'] == 'unified'
+
+
+def test_get_fundamentals_data_serves_file_cache(monkeypatch, tmp_path):
+    provider, file_cache = _provider(monkeypatch, tmp_path)
+    file_cache.save_fundamentals_data('600519', '# 600519 基本面', data_source='unified_analysis')
+    monkeypatch.setattr(provider, '_generate_and_cache_fundamentals',
+                        lambda symbol: (_ for _ in ()).throw(AssertionError('应命中缓存')))
+
+    assert provider.get_fundamentals_data('600519') == '# 600519 基本面'
+    assert hasattr(ocd.OptimizedChinaDataProvider.get_fundamentals_data, '__wrapped__')
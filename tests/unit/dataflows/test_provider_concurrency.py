@@ -0,0 +1,96 @@
+import asyncio
+import threading
+import time
+
+import pandas as pd
+
+from tradingagents.dataflows.providers import concurrency
+from tradingagents.dataflows.providers.concurrency import ProviderCallLimiter, fetch_concurrently
+
+
+def test_fetch_concurrently_latency_is_max_and_keeps_partial_results():
+    def slow(value, delay):
+        def call():
+            time.sleep(delay)
+            return value
+        return call
+
+    def broken():
+        raise ValueError("no permission")
+
+    calls = {
+        "income": slow(1, 0.2),
+        "balance": slow(2, 0.2),
+        "cashflow": slow(3, 0.2),
+        "mainbz": broken,
+        "indicator": slow(4, 2.0),
+    }
+
+    async def run():
+        start = time.monotonic()
+        outcome = await fetch_concurrently(calls, ProviderCallLimiter("test", 5), timeout=0.5)
+        return outcome, time.monotonic() - start
+
+    (results, errors), elapsed = asyncio.run(run())
+
+    assert results == {"income": 1, "balance": 2, "cashflow": 3}
+    assert isinstance(errors["mainbz"], ValueError)
+    assert isinstance(errors["indicator"], TimeoutError)
+    assert elapsed < 1.0
+
+
+def test_limiter_caps_concurrency_and_spaces_calls():
+    limiter = ProviderCallLimiter("test", max_concurrency=2, min_interval=0.05)
+    active, peak, starts = [0], [0], []
+    lock = threading.Lock()
+
+    def call():
+        with lock:
+            starts.append(time.monotonic())
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.1)
+        with lock:
+            active[0] -= 1
+        return True
+
+    results, errors = asyncio.run(fetch_concurrently({str(i): call for i in range(5)}, limiter))
+
+    assert len(results) == 5 and not errors
+    assert peak[0] == 2
+    starts.sort()
+    assert all(b - a >= 0.045 for a, b in zip(starts, starts[1:]))
+
+
+class _FakeAK:
+    def stock_financial_abstract(self, symbol):
+        time.sleep(0.3)
+        return pd.DataFrame({"指标": ["ROE"], "值": [12.5]})
+
+    def stock_balance_sheet_by_report_em(self, symbol):
+        time.sleep(0.3)
+        return pd.DataFrame({"TOTAL_ASSETS": [100.0]})
+
+    def stock_profit_sheet_by_report_em(self, symbol):
+        raise RuntimeError("upstream error")
+
+    def stock_cash_flow_sheet_by_report_em(self, symbol):
+        time.sleep(0.3)
+        return pd.DataFrame()
+
+
+def test_akshare_financial_data_fetched_concurrently(monkeypatch):
+    from tradingagents.dataflows.providers.china.akshare import AKShareProvider
+
+    provider = AKShareProvider.__new__(AKShareProvider)
+    provider.ak = _FakeAK()
+    provider.connected = True
+    monkeypatch.setitem(concurrency._limiters, "akshare", ProviderCallLimiter("akshare", max_concurrency=4))
+
+    start = time.monotonic()
+    data = asyncio.run(provider.get_financial_data("000001"))
+
+    assert set(data) == {"main_indicators", "balance_sheet"}
+    assert data["balance_sheet"] == [{"TOTAL_ASSETS": 100.0}]
+    # 顺序执行至少需要 0.9 秒
+    assert time.monotonic() - start < 0.6
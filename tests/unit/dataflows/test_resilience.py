@@ -0,0 +1,180 @@
+import asyncio
+import time
+
+import pandas as pd
+import pytest
+
+from tradingagents.dataflows import resilience
+from tradingagents.dataflows.resilience import (
+    CLOSED, HALF_OPEN, OPEN, acall_with_fallback, call_with_fallback, get_circuit_breaker,
+    get_resilience_status,
+)
+
+
+@pytest.fixture(autouse=True)
+def _clean_state(monkeypatch):
+    monkeypatch.setenv("TA_CIRCUIT_MIN_CALLS", "3")
+    monkeypatch.setenv("TA_CIRCUIT_COOLDOWN_SECONDS", "60")
+    monkeypatch.setenv("TA_HEDGE_MIN_DELAY_SECONDS", "0.05")
+    monkeypatch.setenv("TA_HEDGE_MAX_DELAY_SECONDS", "0.1")
+    resilience.reset_resilience_state()
+    yield
+    resilience.reset_resilience_state()
+
+
+def test_breaker_opens_skips_source_and_recovers_after_probe():
+    calls = {"tushare": 0, "akshare": 0}
+    tushare_ok = [False]
+
+    def tushare():
+        calls["tushare"] += 1
+        if not tushare_ok[0]:
+            raise ConnectionError("timeout")
+        return pd.DataFrame({"close": [10.0]})
+
+    def akshare():
+        calls["akshare"] += 1
+        return pd.DataFrame({"close": [10.1]})
+
+    candidates = [("tushare", tushare), ("akshare", akshare)]
+    for _ in range(5):
+        _, source = call_with_fallback(candidates, op="history", hedge=False)
+        assert source == "akshare"
+
+    breaker = get_circuit_breaker("tushare")
+    assert breaker.state == OPEN
+    # 熔断后不再调用 tushare
+    assert calls["tushare"] == 3
+    assert breaker.rejected == 2
+
+    # 冷却结束后放行一次探测，成功则恢复
+    breaker.opened_at -= 61
+    tushare_ok[0] = True
+    value, source = call_with_fallback(candidates, op="history", hedge=False)
+    assert source == "tushare" and value["close"].iloc[0] == 10.0
+    assert breaker.state == CLOSED
+    assert get_resilience_status()["breakers"]["tushare"]["state"] == CLOSED
+
+
+def test_failed_probe_doubles_cooldown():
+    breaker = get_circuit_breaker("finnhub")
+    for _ in range(3):
+        breaker.record(False, 0.1, error="boom")
+    assert breaker.state == OPEN
+
+    breaker.opened_at -= 61
+    assert breaker.allow() is True
+    assert breaker.state == HALF_OPEN
+    # 探测进行中，其它调用仍被拒绝
+    assert breaker.allow() is False
+    breaker.record(False, 0.1, error="boom")
+    assert breaker.state == OPEN and breaker.cooldown == 120
+
+
+def test_hedged_request_takes_fastest_valid_result():
+    def slow_primary():
+        time.sleep(1.0)
+        return "primary"
+
+    def fast_backup():
+        return "backup"
+
+    start = time.monotonic()
+    value, source = call_with_fallback([("yfinance", slow_primary), ("alpha_vantage", fast_backup)],
+                                       op="quote", hedge=True)
+    assert (value, source) == ("backup", "alpha_vantage")
+    assert time.monotonic() - start < 0.5
+
+    async def run():
+        started = time.monotonic()
+        outcome = await acall_with_fallback([("yfinance", slow_primary), ("alpha_vantage", fast_backup)],
+                                            op="quote", hedge=True)
+        return outcome, time.monotonic() - started
+
+    outcome, elapsed = asyncio.run(run())
+    assert outcome == ("backup", "alpha_vantage")
+    assert elapsed < 0.5
+    assert get_resilience_status()["hedges"]["alpha_vantage"] == {"fired": 2, "wins": 2}
+
+
+def test_invalid_result_falls_through_without_tripping_breaker():
+    candidates = [("tushare", lambda: pd.DataFrame()), ("akshare", lambda: pd.DataFrame({"close": [1.0]}))]
+    for _ in range(5):
+        _, source = call_with_fallback(candidates, op="history", hedge=False)
+        assert source == "akshare"
+
+    breaker = get_circuit_breaker("tushare")
+    assert breaker.state == CLOSED
+    assert breaker.failures == 0 and breaker.error_rate == 0.0
+
+
+def test_stock_dataframe_reads_mongodb_cache_outside_breakers(monkeypatch):
+    from tradingagents.dataflows.cache import mongodb_cache_adapter
+    from tradingagents.dataflows.data_source_manager import ChinaDataSource, DataSourceManager
+
+    class _Adapter:
+        def get_historical_data(self, symbol, start_date, end_date, period="daily"):
+            return None
+
+    monkeypatch.setattr(mongodb_cache_adapter, "get_mongodb_cache_adapter", lambda: _Adapter())
+    manager = DataSourceManager.__new__(DataSourceManager)
+    manager.current_source = ChinaDataSource.MONGODB
+    manager.available_sources = [ChinaDataSource.MONGODB, ChinaDataSource.TUSHARE]
+    monkeypatch.setattr(manager, "_get_history_from_provider",
+                        lambda source, *args: pd.DataFrame({"date": ["2024-01-02"], "close": [10.0]}))
+
+    for _ in range(5):
+        df = manager.get_stock_dataframe("000001", "2024-01-01", "2024-01-31")
+        assert not df.empty
+
+    assert "mongodb" not in get_resilience_status()["breakers"]
+
+
+class _SwallowingProvider:
+    """模拟 China 提供器：默认吞掉异常返回 None，raise_on_error=True 时抛出"""
+
+    def __init__(self, error=None, df=None):
+        self.error = error
+        self.df = df
+
+    async def get_historical_data(self, symbol, start_date, end_date, period="daily", raise_on_error=False):
+        if self.error is not None:
+            if raise_on_error:
+                raise self.error
+            return None
+        return self.df
+
+
+def _manager(monkeypatch, tushare, akshare):
+    from tradingagents.dataflows.data_source_manager import ChinaDataSource, DataSourceManager
+
+    monkeypatch.setenv("TA_BAR_STORE_ENABLED", "false")
+    manager = DataSourceManager.__new__(DataSourceManager)
+    manager.current_source = ChinaDataSource.TUSHARE
+    manager.available_sources = [ChinaDataSource.TUSHARE, ChinaDataSource.AKSHARE]
+    monkeypatch.setattr(manager, "_get_tushare_adapter", lambda: tushare)
+    monkeypatch.setattr(manager, "_get_akshare_adapter", lambda: akshare)
+    return manager
+
+
+def test_provider_that_swallows_errors_opens_its_breaker(monkeypatch):
+    backup = _SwallowingProvider(df=pd.DataFrame({"date": ["2024-01-02"], "close": [10.0]}))
+    manager = _manager(monkeypatch, _SwallowingProvider(error=ConnectionError("timeout")), backup)
+
+    for _ in range(5):
+        assert not manager.get_stock_dataframe("000001", "2024-01-01", "2024-01-31").empty
+
+    breaker = get_circuit_breaker("tushare")
+    assert breaker.state == OPEN and breaker.failures == 3
+    assert get_circuit_breaker("akshare").state == CLOSED
+
+
+def test_provider_without_data_does_not_open_its_breaker(monkeypatch):
+    backup = _SwallowingProvider(df=pd.DataFrame({"date": ["2024-01-02"], "close": [10.0]}))
+    manager = _manager(monkeypatch, _SwallowingProvider(df=None), backup)
+
+    for _ in range(5):
+        assert not manager.get_stock_dataframe("000001", "2024-01-01", "2024-01-31").empty
+
+    breaker = get_circuit_breaker("tushare")
+    assert breaker.state == CLOSED and breaker.failures == 0
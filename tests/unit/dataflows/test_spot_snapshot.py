@@ -0,0 +1,98 @@
+import asyncio
+import threading
+import time
+
+import pandas as pd
+
+from tradingagents.dataflows.providers.china import spot_snapshot
+from tradingagents.dataflows.providers.china.spot_snapshot import SpotSnapshotService
+
+
+def _spot_frame(prefix=""):
+    return pd.DataFrame({
+        "代码": [f"{prefix}000001", f"{prefix}600000", f"{prefix}300750"],
+        "名称": ["平安银行", "浦发银行", "宁德时代"],
+        "最新价": [10.5, 8.2, 180.0],
+        "涨跌额": [0.1, -0.1, 2.0],
+        "涨跌幅": [0.96, -1.2, 1.1],
+        "成交量": [1000, 2000, 3000],
+        "成交额": [1.0e7, 2.0e7, 3.0e7],
+        "今开": [10.4, 8.3, 178.0],
+        "最高": [10.6, 8.3, 181.0],
+        "最低": [10.3, 8.1, 177.0],
+        "昨收": [10.4, 8.3, 178.0],
+    })
+
+
+def test_concurrent_callers_share_one_download():
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        time.sleep(0.1)
+        return _spot_frame("sh")
+
+    service = SpotSnapshotService(ttl=30, fetchers={"sina": fetch})
+    snapshots = []
+    threads = [threading.Thread(target=lambda: snapshots.append(service.get("sina"))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert all(s is snapshots[0] for s in snapshots)
+    snapshot = snapshots[0]
+    assert snapshot.get("600000")["名称"] == "浦发银行"
+    assert snapshot.get("sh000001")["最新价"] == 10.5
+    assert set(snapshot.get_many(["000001", "300750", "688981"])) == {"000001", "300750"}
+
+
+def test_failed_refresh_serves_stale_snapshot_within_limit():
+    frames = [_spot_frame(), RuntimeError("被限流")]
+
+    def fetch():
+        item = frames.pop(0)
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+    service = SpotSnapshotService(ttl=0.05, max_stale=60, fetchers={"eastmoney": fetch})
+    first = service.get("eastmoney")
+    time.sleep(0.06)
+
+    assert service.get("eastmoney") is first
+    assert service.get("eastmoney", allow_stale=False) is None
+    assert service.stats == {"fetches": 1, "hits": 0, "errors": 1}
+
+
+def test_akshare_provider_quotes_served_from_shared_snapshot(monkeypatch):
+    from tradingagents.dataflows.providers.china.akshare import AKShareProvider
+
+    calls = {"sina": 0, "eastmoney": 0}
+
+    def fetcher(name, frame):
+        def fetch():
+            calls[name] += 1
+            return frame
+        return fetch
+
+    service = SpotSnapshotService(ttl=30, fetchers={
+        "sina": fetcher("sina", _spot_frame("sz")),
+        "eastmoney": fetcher("eastmoney", _spot_frame()),
+    })
+    monkeypatch.setattr(spot_snapshot, "_spot_snapshot_service", service)
+
+    provider = AKShareProvider.__new__(AKShareProvider)
+    provider.connected = True
+
+    async def run():
+        batch = await provider.get_batch_stock_quotes(["000001", "600000"])
+        single = [await provider._get_realtime_quotes_data(code) for code in ("300750", "000001")]
+        return batch, single
+
+    batch, single = asyncio.run(run())
+
+    assert batch["600000"]["price"] == 8.2 and batch["000001"]["name"] == "平安银行"
+    assert [q["price"] for q in single] == [180.0, 10.5]
+    assert calls == {"sina": 1, "eastmoney": 1}
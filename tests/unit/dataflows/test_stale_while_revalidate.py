@@ -0,0 +1,67 @@
+import json
+import threading
+from datetime import datetime, timedelta
+
+from tradingagents.dataflows.cache.file_cache import StockDataCache
+from tradingagents.dataflows.cache.swr import StaleWhileRevalidate
+
+
+def test_fresh_entry_is_returned_without_refresh():
+    swr = StaleWhileRevalidate()
+    refreshed = []
+    value = swr.get('k', lambda: ('cached', 1.0), lambda: refreshed.append(1), 12, 72)
+    assert value == 'cached'
+    assert refreshed == []
+    assert swr.get_stats()['fresh_hits'] == 1
+
+
+def test_stale_entry_is_returned_and_refreshed_in_background():
+    swr = StaleWhileRevalidate()
+    release = threading.Event()
+    done = threading.Event()
+    calls = []
+
+    def refresh():
+        calls.append(1)
+        release.wait(5)
+        done.set()
+        return 'new'
+
+    assert swr.get('k', lambda: ('old', 20.0), refresh, 12, 72) == 'old'
+    # 刷新进行中时不会重复提交
+    assert swr.get('k', lambda: ('old', 20.0), refresh, 12, 72) == 'old'
+    assert swr.is_refreshing('k')
+    release.set()
+    assert done.wait(5)
+
+    assert calls == [1]
+    stats = swr.get_stats()
+    assert stats['stale_hits'] == 2
+    assert stats['background_refreshes'] == 1
+
+
+def test_expired_or_missing_entry_blocks_on_refresh():
+    swr = StaleWhileRevalidate()
+    assert swr.get('k', lambda: ('old', 100.0), lambda: 'new', 12, 72) == 'new'
+    assert swr.get('k', lambda: None, lambda: 'new', 12, 72) == 'new'
+    assert swr.get_stats()['misses'] == 2
+
+
+def test_file_cache_reports_entry_age_and_ttl_policy(tmp_path):
+    cache = StockDataCache(tmp_path)
+    assert cache.get_ttl_policy('000001', 'fundamentals') == (12, 72)
+
+    key = cache.save_company_info('600519', {'name': '贵州茅台', 'industry': '白酒'}, 'tushare')
+    # 模拟 30 小时前写入的缓存
+    meta_path = cache._get_metadata_path(key)
+    metadata = json.loads(meta_path.read_text(encoding='utf-8'))
+    metadata['cached_at'] = (datetime.now() - timedelta(hours=30)).isoformat()
+    meta_path.write_text(json.dumps(metadata), encoding='utf-8')
+    cache.metadata_index.upsert(key, metadata)
+
+    cache_key, age_hours = cache.find_latest_cache_entry('600519', 'company_info')
+    assert cache_key == key
+    assert 29.9 < age_hours < 30.1
+    assert cache.load_company_info(key)['name'] == '贵州茅台'
+    # 超过给定最大时长的条目不返回
+    assert cache.find_latest_cache_entry('600519', 'company_info', max_age_hours=24) is None
@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+
+from tradingagents.tools.analysis.incremental import IncrementalIndicatorEngine
+from tradingagents.tools.analysis.indicators import IndicatorSpec, compute_many
+
+
+SPECS = [
+    IndicatorSpec('ma', {'n': 5}),
+    IndicatorSpec('ma', {'n': 20}),
+    IndicatorSpec('ema', {'n': 12}),
+    IndicatorSpec('macd'),
+    IndicatorSpec('rsi', {'n': 14}),
+    IndicatorSpec('rsi', {'n': 6, 'method': 'china'}),
+    IndicatorSpec('rsi', {'n': 24, 'method': 'sma'}),
+    IndicatorSpec('boll', {'n': 20, 'k': 2}),
+    IndicatorSpec('atr', {'n': 14}),
+    IndicatorSpec('kdj', {'n': 9, 'm1': 3, 'm2': 3}),
+]
+
+
+def make_df(n=300, seed=3):
+    rng = np.random.default_rng(seed)
+    close = pd.Series(np.cumsum(rng.normal(0, 1, n)) + 100)
+    high = close + rng.uniform(0, 2, n)
+    low = close - rng.uniform(0, 2, n)
+    # 构造几段平盘，覆盖 KDJ 除零和 RSI 无下跌的分支
+    close.iloc[40:55] = 100.0
+    high.iloc[40:55] = 100.0
+    low.iloc[40:55] = 100.0
+    return pd.DataFrame({'open': close, 'high': high, 'low': low, 'close': close})
+
+
+def assert_matches_batch(rows, batch):
+    stream = pd.DataFrame(rows, dtype=float)
+    for col in stream.columns:
+        expected = batch[col].to_numpy(dtype=float)
+        actual = stream[col].to_numpy(dtype=float)
+        assert np.array_equal(np.isnan(expected), np.isnan(actual)), col
+        assert np.allclose(actual, expected, rtol=1e-9, atol=1e-9, equal_nan=True), col
+
+
+def test_streaming_matches_batch_for_every_bar():
+    df = make_df()
+    batch = compute_many(df, SPECS)
+    engine = IncrementalIndicatorEngine(SPECS)
+    rows = [engine.update(bar) for bar in df[['close', 'high', 'low']].to_dict('records')]
+    assert_matches_batch(rows, batch)
+
+
+def test_seed_from_history_then_append():
+    df = make_df()
+    batch = compute_many(df, SPECS)
+    engine = IncrementalIndicatorEngine.from_history(df.iloc[:250], SPECS)
+    rows = [engine.update(bar) for bar in df.iloc[250:][['close', 'high', 'low']].to_dict('records')]
+    assert_matches_batch(rows, batch.iloc[250:].reset_index(drop=True))
+    assert engine.bars == len(df)
+
+
+def test_state_round_trip_through_json():
+    df = make_df()
+    batch = compute_many(df, SPECS)
+    engine = IncrementalIndicatorEngine.from_history(df.iloc[:200], SPECS)
+    restored = IncrementalIndicatorEngine.from_json(engine.to_json())
+    assert restored.values() == engine.values()
+
+    rows = [restored.update(bar) for bar in df.iloc[200:][['close', 'high', 'low']].to_dict('records')]
+    assert_matches_batch(rows, batch.iloc[200:].reset_index(drop=True))
+
+
+def test_preview_does_not_change_state():
+    df = make_df(60)
+    engine = IncrementalIndicatorEngine.from_history(df, [IndicatorSpec('ma', {'n': 5}), IndicatorSpec('kdj')])
+    before = engine.to_state()
+    preview = engine.preview({'close': 120.0, 'high': 121.0, 'low': 119.0})
+    assert engine.to_state() == before
+    assert preview == engine.update({'close': 120.0, 'high': 121.0, 'low': 119.0})
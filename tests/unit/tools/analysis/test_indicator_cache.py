@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from tradingagents.dataflows.cache.memory_cache import MemoryCache
+from tradingagents.tools.analysis import indicator_cache
+from tradingagents.tools.analysis.indicator_cache import IndicatorCache, data_fingerprint
+from tradingagents.tools.analysis.indicators import IndicatorSpec, compute_indicator, compute_many
+
+
+class FakeRedis:
+    def __init__(self):
+        self.store = {}
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def setex(self, key, ttl, value):
+        self.store[key] = value
+
+
+def make_df(n=120, seed=7):
+    rng = np.random.default_rng(seed)
+    close = 20 + np.cumsum(rng.normal(0, 0.5, n))
+    df = pd.DataFrame({
+        'trade_date': pd.bdate_range('2024-01-02', periods=n).strftime('%Y%m%d'),
+        'open': close, 'high': close + 0.5, 'low': close - 0.5, 'close': close,
+        'vol': rng.integers(1_000, 9_000, n).astype(float),
+    })
+    df.attrs['symbol'] = '000001'
+    return df
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    instance = IndicatorCache(memory=MemoryCache(max_entries=64))
+    monkeypatch.setattr(indicator_cache, '_indicator_cache', instance)
+    return instance
+
+
+SPECS = [IndicatorSpec('boll', {'n': 5}), IndicatorSpec('macd'), IndicatorSpec('rsi', {'n': 14})]
+
+
+def test_repeated_compute_hits_cache(cache):
+    df = make_df()
+    first = compute_many(df, SPECS)
+    assert cache.get_stats()['stores'] == len(SPECS)
+
+    second = compute_many(df, SPECS)
+    pd.testing.assert_frame_equal(first, second)
+    assert cache.get_stats()['memory_hits'] == len(SPECS)
+
+    # 新K线 / 数据修正都会改变指纹
+    changed = df.copy()
+    changed.loc[changed.index[-1], 'close'] += 1
+    assert data_fingerprint(changed) != data_fingerprint(df)
+    compute_indicator(changed, SPECS[0])
+    assert cache.get_stats()['misses'] == len(SPECS) + 1
+
+
+def test_cached_result_uses_caller_index(cache):
+    df = make_df()
+    expected = compute_indicator(df, SPECS[0])
+    shifted = df.set_index(pd.RangeIndex(100, 100 + len(df)))
+    shifted.attrs = df.attrs
+    result = compute_indicator(shifted, SPECS[0])
+    assert cache.get_stats()['memory_hits'] == 1
+    assert list(result.index) == list(shifted.index)
+    assert np.allclose(result['boll_mid'].to_numpy(), expected['boll_mid'].to_numpy(), equal_nan=True)
+
+
+def test_redis_layer_shared_between_processes(monkeypatch):
+    redis_client = FakeRedis()
+    writer = IndicatorCache(memory=MemoryCache(max_entries=64), redis_client=redis_client)
+    reader = IndicatorCache(memory=MemoryCache(max_entries=64), redis_client=redis_client)
+
+    df = make_df()
+    monkeypatch.setattr(indicator_cache, '_indicator_cache', writer)
+    expected = compute_many(df, SPECS)
+
+    monkeypatch.setattr(indicator_cache, '_indicator_cache', reader)
+    result = compute_many(df, SPECS)
+    pd.testing.assert_frame_equal(result, expected)
+    assert reader.get_stats()['redis_hits'] == len(SPECS)
+    assert reader.get_stats()['misses'] == 0
+
+
+def test_cheap_specs_bypass_cache_and_unused_columns_are_not_hashed(cache):
+    df = make_df()
+    compute_many(df, [IndicatorSpec('ma', {'n': 5}), IndicatorSpec('ema', {'n': 10})])
+    assert cache.get_stats()['stores'] == 0
+
+    # 只依赖收盘价的指标，成交量变化不影响指纹
+    compute_indicator(df, SPECS[1])
+    changed = df.copy()
+    changed.loc[changed.index[-1], 'vol'] += 1
+    compute_indicator(changed, SPECS[1])
+    assert cache.get_stats()['memory_hits'] == 1
+
+
+def test_non_numeric_column_falls_back_to_direct_computation(cache):
+    df = make_df()
+    df['vol'] = ['1,000'] * len(df)
+    assert 'ma5' in compute_indicator(df, IndicatorSpec('ma', {'n': 5})).columns
+    assert 'dif' in compute_indicator(df, SPECS[1]).columns
+
+    df['close'] = df['close'].astype(object)
+    df.loc[df.index[0], 'close'] = 'n/a'
+    assert data_fingerprint(df, ('close',)) is None
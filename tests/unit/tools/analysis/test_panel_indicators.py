@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+
+from tradingagents.tools.analysis.indicators import IndicatorSpec, compute_many
+from tradingagents.tools.analysis.panel import compute_panel, last_cross_section, panel_from_long
+
+
+SPECS = [
+    IndicatorSpec('ma', {'n': 5}),
+    IndicatorSpec('ema', {'n': 10}),
+    IndicatorSpec('macd'),
+    IndicatorSpec('rsi', {'n': 14}),
+    IndicatorSpec('rsi', {'n': 6, 'method': 'china'}),
+    IndicatorSpec('rsi', {'n': 24, 'method': 'sma'}),
+    IndicatorSpec('boll', {'n': 20, 'k': 2}),
+    IndicatorSpec('atr', {'n': 14}),
+    IndicatorSpec('kdj', {'n': 9, 'm1': 3, 'm2': 3}),
+]
+
+
+def make_panels(dates=200, symbols=12, seed=11):
+    rng = np.random.default_rng(seed)
+    close = 50 + np.cumsum(rng.normal(0, 1, (dates, symbols)), axis=0)
+    high = close + rng.uniform(0, 2, (dates, symbols))
+    low = close - rng.uniform(0, 2, (dates, symbols))
+    # 上市前空值（预热期不同）
+    for j in range(symbols):
+        start = int(rng.integers(0, 60))
+        close[:start, j] = high[:start, j] = low[:start, j] = np.nan
+    # 停牌空洞
+    close[120:125, 3] = high[120:125, 3] = low[120:125, 3] = np.nan
+    close[150, 7] = high[150, 7] = low[150, 7] = np.nan
+
+    index = pd.date_range('2024-01-01', periods=dates, freq='B')
+    columns = [f"{600000 + j}" for j in range(symbols)]
+    return {name: pd.DataFrame(arr, index=index, columns=columns)
+            for name, arr in (('close', close), ('high', high), ('low', low))}
+
+
+def test_panel_matches_per_symbol_batch():
+    panels = make_panels()
+    results = compute_panel(panels, SPECS)
+
+    for symbol in panels['close'].columns:
+        df = pd.DataFrame({name: panel[symbol] for name, panel in panels.items()}).dropna(subset=['close'])
+        expected = compute_many(df, SPECS)
+        for col, panel in results.items():
+            actual = panel[symbol].loc[df.index].to_numpy()
+            assert np.allclose(actual, expected[col].to_numpy(), rtol=1e-9, atol=1e-9, equal_nan=True), (symbol, col)
+            # 无效K线位置输出 NaN
+            assert panel[symbol].drop(df.index).isna().all()
+
+
+def test_ndarray_input_returns_ndarray():
+    panels = make_panels()
+    arrays = {name: panel.to_numpy() for name, panel in panels.items()}
+    results = compute_panel(arrays, [IndicatorSpec('rsi', {'n': 14}), IndicatorSpec('kdj')])
+    expected = compute_panel(panels, [IndicatorSpec('rsi', {'n': 14}), IndicatorSpec('kdj')])
+    assert isinstance(results['rsi14'], np.ndarray)
+    assert np.allclose(results['kdj_j'], expected['kdj_j'].to_numpy(), equal_nan=True)
+
+
+def test_long_to_panel_and_cross_section():
+    panels = make_panels(dates=160, symbols=8)
+    long_df = (
+        panels['close'].stack().rename('close').to_frame()
+        .join(panels['high'].stack().rename('high'))
+        .join(panels['low'].stack().rename('low'))
+        .rename_axis(['trade_date', 'code']).reset_index()
+    )
+    rebuilt = panel_from_long(long_df)
+    pd.testing.assert_frame_equal(rebuilt['close'], panels['close'].dropna(how='all'), check_names=False, check_freq=False)
+
+    latest = last_cross_section(compute_panel(rebuilt, [IndicatorSpec('ma', {'n': 5})]))
+    assert list(latest.columns) == ['ma5']
+    assert np.isclose(latest.loc['600000', 'ma5'], panels['close']['600000'].iloc[-5:].mean())
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+from stockstats import wrap
+
+from tradingagents.tools.analysis.indicators import (
+    STOCKSTATS_INDICATORS,
+    compute_stockstats_indicator,
+    resolve_stockstats_indicator,
+)
+
+
+def make_yfin_df(n=400, seed=5):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1.5, n))
+    high = close + rng.uniform(0, 2, n)
+    low = close - rng.uniform(0, 2, n)
+    volume = rng.integers(10_000, 90_000, n).astype(float)
+    # 平盘与零成交量，覆盖除零分支
+    close[100:110] = high[100:110] = low[100:110] = close[99]
+    volume[200:203] = 0
+    return pd.DataFrame({
+        'Date': pd.bdate_range('2023-01-02', periods=n).strftime('%Y-%m-%d'),
+        'Open': close, 'High': high, 'Low': low, 'Close': close, 'Volume': volume,
+    })
+
+
+EXTRA_NAMES = ['close_20_sma', 'close_5_ema', 'rsi_6', 'atr_10', 'vwma_20', 'mfi_10']
+
+
+@pytest.mark.parametrize('name', sorted(STOCKSTATS_INDICATORS) + EXTRA_NAMES)
+def test_native_matches_stockstats(name):
+    data = make_yfin_df()
+    expected = wrap(data.copy())[name].to_numpy(dtype=float)
+    actual = compute_stockstats_indicator(data, name).to_numpy(dtype=float)
+    assert np.allclose(actual, expected, rtol=1e-9, atol=1e-9, equal_nan=True)
+
+
+@pytest.mark.parametrize('name', ['vwma', 'mfi'])
+def test_amount_column_used_as_typical_price(name):
+    data = make_yfin_df(120)
+    data['Amount'] = data['Volume'] * (data['Close'] + 0.3)
+    expected = wrap(data.copy())[name].to_numpy(dtype=float)
+    actual = compute_stockstats_indicator(data, name).to_numpy(dtype=float)
+    assert np.allclose(actual, expected, rtol=1e-9, atol=1e-9, equal_nan=True)
+
+
+def test_unknown_names_fall_back():
+    assert resolve_stockstats_indicator('kdjk') is None
+    assert resolve_stockstats_indicator('close_0_sma') is None
+    with pytest.raises(ValueError):
+        compute_stockstats_indicator(make_yfin_df(), 'kdjk')
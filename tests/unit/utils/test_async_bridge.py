@@ -0,0 +1,76 @@
+import asyncio
+import threading
+
+import pytest
+
+from tradingagents.utils.async_bridge import BackgroundLoop, get_background_loop, run_coro_sync
+
+
+class _PooledProvider:
+    """在所属事件循环上懒加载连接池的数据源"""
+
+    def __init__(self):
+        self.pool_loop = None
+        self.pools_created = 0
+
+    async def fetch(self, symbol):
+        loop = asyncio.get_running_loop()
+        if self.pool_loop is not loop:
+            self.pool_loop = loop
+            self.pools_created += 1
+        await asyncio.sleep(0)
+        return symbol
+
+
+def test_calls_share_one_long_lived_loop():
+    provider = _PooledProvider()
+    results = [run_coro_sync(provider.fetch(f"00000{i}")) for i in range(5)]
+
+    # 多个线程调用同样复用同一个循环
+    threads = [threading.Thread(target=lambda: results.append(run_coro_sync(provider.fetch("600000"))))
+               for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(results) == 8
+    assert provider.pools_created == 1
+    assert provider.pool_loop is get_background_loop()
+
+
+def test_usable_from_running_loop_and_times_out():
+    async def caller():
+        # 调用方线程已有运行中的事件循环
+        return run_coro_sync(asyncio.sleep(0, result="ok"))
+
+    assert asyncio.run(caller()) == "ok"
+
+    cancelled = threading.Event()
+
+    async def slow():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    with pytest.raises(TimeoutError):
+        run_coro_sync(slow(), timeout=0.05)
+    assert cancelled.wait(1)
+
+
+def test_rejects_calls_from_loop_thread_and_stops():
+    bridge = BackgroundLoop(name="test-bridge")
+
+    async def nested():
+        return bridge.run(asyncio.sleep(0))
+
+    with pytest.raises(RuntimeError):
+        bridge.run(nested(), timeout=1)
+
+    loop = bridge.loop
+    bridge.stop()
+    assert loop.is_closed()
+    assert bridge.run(asyncio.sleep(0, result=1), timeout=1) == 1
+    bridge.stop()
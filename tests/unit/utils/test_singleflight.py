@@ -0,0 +1,94 @@
+import asyncio
+import threading
+import time
+
+from tradingagents.utils.singleflight import SingleFlight
+
+
+def test_concurrent_threads_share_one_execution():
+    sf = SingleFlight()
+    calls = []
+    started = threading.Event()
+
+    def fetch(symbol):
+        calls.append(symbol)
+        started.set()
+        time.sleep(0.2)
+        return {"symbol": symbol}
+
+    results = []
+
+    def worker():
+        results.append(sf.do(("get_stock_info", "000001"), fetch, "000001"))
+
+    threads = [threading.Thread(target=worker) for _ in range(5)]
+    threads[0].start()
+    started.wait()
+    for t in threads[1:]:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert calls == ["000001"]
+    assert results == [{"symbol": "000001"}] * 5
+    # 跟随者拿到的是副本
+    assert len({id(r) for r in results}) == 5
+
+    stats = sf.get_stats()["by_name"]["get_stock_info"]
+    assert stats == {"calls": 5, "executions": 1, "coalesced": 4}
+    assert sf.get_stats()["in_flight"] == 0
+
+
+def test_errors_propagate_to_followers_and_are_not_cached():
+    sf = SingleFlight()
+    started = threading.Event()
+
+    def failing():
+        started.set()
+        time.sleep(0.1)
+        raise RuntimeError("boom")
+
+    errors = []
+
+    def worker():
+        try:
+            sf.do(("k",), failing)
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    threads = [threading.Thread(target=worker) for _ in range(3)]
+    threads[0].start()
+    started.wait()
+    for t in threads[1:]:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == ["boom"] * 3
+    # 失败后不保留结果，下一次调用重新执行
+    assert sf.do(("k",), lambda: "ok") == "ok"
+
+
+def test_async_callers_share_one_execution():
+    sf = SingleFlight()
+    calls = []
+
+    async def fetch(symbol):
+        calls.append(symbol)
+        await asyncio.sleep(0.05)
+        return symbol.upper()
+
+    async def main():
+        return await asyncio.gather(*[sf.do_async(("fetch", "aapl"), fetch, "aapl") for _ in range(4)])
+
+    assert asyncio.run(main()) == ["AAPL"] * 4
+    assert calls == ["aapl"]
+    assert sf.get_stats()["total_coalesced"] == 3
+
+
+def test_disabled_executes_every_call():
+    sf = SingleFlight(enabled=False)
+    calls = []
+    for _ in range(3):
+        sf.do(("k",), lambda: calls.append(1))
+    assert len(calls) == 3
@@ -26,6 +26,7 @@ class DataSourceConfig:
             "token": os.getenv("TUSHARE_TOKEN", ""),
             "timeout": self._get_int_env("TUSHARE_TIMEOUT", 30),
             "rate_limit": self._get_float_env("TUSHARE_RATE_LIMIT", 0.1),
+            "max_concurrency": self._get_int_env("TUSHARE_MAX_CONCURRENCY", 4),
             "max_retries": self._get_int_env("TUSHARE_MAX_RETRIES", 3),
             "cache_enabled": self._get_bool_env("TUSHARE_CACHE_ENABLED", True),
             "cache_ttl": self._get_int_env("TUSHARE_CACHE_TTL", 3600),
@@ -36,6 +37,7 @@ class DataSourceConfig:
             "enabled": self._get_bool_env("AKSHARE_ENABLED", True),
             "timeout": self._get_int_env("AKSHARE_TIMEOUT", 30),
             "rate_limit": self._get_float_env("AKSHARE_RATE_LIMIT", 0.2),
+            "max_concurrency": self._get_int_env("AKSHARE_MAX_CONCURRENCY", 4),
             "max_retries": self._get_int_env("AKSHARE_MAX_RETRIES", 3),
             "cache_enabled": self._get_bool_env("AKSHARE_CACHE_ENABLED", True),
             "cache_ttl": self._get_int_env("AKSHARE_CACHE_TTL", 1800),
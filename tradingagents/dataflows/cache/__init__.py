@@ -113,9 +113,21 @@ def get_cache() -> Union[StockDataCache, IntegratedCacheManager]:
 
     return _cache_instance
 
+
+def get_file_cache() -> StockDataCache:
+    """
+    获取文件缓存实例
+
+    集成缓存模式下返回其内部的文件缓存（legacy_cache），
+    用于依赖元数据索引的查找（如 stale-while-revalidate）。
+    """
+    cache = get_cache()
+    return getattr(cache, 'legacy_cache', cache)
+
 __all__ = [
     # 统一入口（推荐使用）
     'get_cache',
+    'get_file_cache',
 
     # 缓存类（供高级用户直接使用）
     'StockDataCache',
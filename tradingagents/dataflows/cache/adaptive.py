@@ -9,6 +9,7 @@ import json
 import pickle
 import hashlib
 import logging
+import time
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Any, Dict, Optional, Union
@@ -16,6 +17,9 @@ import pandas as pd
 
 from tradingagents.config.database_manager import get_database_manager
 
+from .memory_cache import get_memory_cache
+from .metrics import get_cache_metrics, infer_market
+
 class AdaptiveCacheSystem:
     """自适应缓存系统"""
     
@@ -40,6 +44,12 @@ class AdaptiveCacheSystem:
         self.primary_backend = self.cache_config["primary_backend"]
         self.fallback_enabled = self.cache_config["fallback_enabled"]
         
+        # 进程内L1缓存（保存已反序列化的数据）
+        self.memory_cache = get_memory_cache()
+
+        # 命中率/耗时指标
+        self.metrics = get_cache_metrics()
+
         self.logger.info(f"自适应缓存系统初始化 - 主要后端: {self.primary_backend}")
     
     def _get_cache_key(self, symbol: str, start_date: str = "", end_date: str = "", 
@@ -249,6 +259,9 @@ class AdaptiveCacheSystem:
         # 获取TTL
         ttl_seconds = self._get_ttl_seconds(symbol, data_type)
         
+        # 写入时使L1中的旧数据失效
+        self.memory_cache.invalidate(('adaptive', cache_key))
+
         # 根据主要后端保存
         success = False
         
@@ -272,21 +285,39 @@ class AdaptiveCacheSystem:
         return cache_key
     
     def load_data(self, cache_key: str) -> Optional[Any]:
-        """从缓存加载数据"""
-        cache_data = None
-        
+        """从缓存加载数据（先查进程内L1缓存）"""
+        cached = self.memory_cache.get(('adaptive', cache_key))
+        if cached is not None:
+            return cached
+
+        data = self._load_data_from_backends(cache_key)
+        self.memory_cache.set(('adaptive', cache_key), data)
+        return data
+
+    def _timed_load(self, backend: str, cache_key: str) -> Optional[Dict]:
+        """从指定后端加载并记录命中与耗时（缓存键不含股票信息，未命中时维度为 unknown）"""
+        loaders = {"redis": self._load_from_redis, "mongodb": self._load_from_mongodb, "file": self._load_from_file}
+        loader = loaders.get(backend)
+        if loader is None:
+            return None
+
+        started = time.perf_counter()
+        cache_data = loader(cache_key)
+        metadata = (cache_data or {}).get('metadata') or {}
+        self.metrics.record_lookup(backend, metadata.get('data_type', 'unknown'),
+                                   infer_market(metadata.get('symbol')),
+                                   hit=bool(cache_data), seconds=time.perf_counter() - started)
+        return cache_data
+
+    def _load_data_from_backends(self, cache_key: str) -> Optional[Any]:
+        """从Redis/MongoDB/文件后端加载数据"""
         # 根据主要后端加载
-        if self.primary_backend == "redis":
-            cache_data = self._load_from_redis(cache_key)
-        elif self.primary_backend == "mongodb":
-            cache_data = self._load_from_mongodb(cache_key)
-        elif self.primary_backend == "file":
-            cache_data = self._load_from_file(cache_key)
+        cache_data = self._timed_load(self.primary_backend, cache_key)
         
         # 如果主要后端失败，尝试降级
         if not cache_data and self.fallback_enabled:
             self.logger.debug(f"主要后端({self.primary_backend})加载失败，尝试文件缓存")
-            cache_data = self._load_from_file(cache_key)
+            cache_data = self._timed_load("file", cache_key)
         
         if not cache_data:
             return None
@@ -398,6 +429,7 @@ class AdaptiveCacheSystem:
 
         # 添加后端详细信息
         stats['backend_info'] = backend_info
+        stats['memory_cache'] = self.memory_cache.get_stats()
 
         return stats
     
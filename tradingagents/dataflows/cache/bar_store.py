@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+K线区间缓存（Bar Store）
+按 (source, symbol, period, adjust) 存储历史K线，并记录已覆盖的日期区间：
+- 请求区间已被覆盖时直接从本地切片返回
+- 只向数据源请求缺失的头部/尾部区间，然后与本地数据合并
+- 不同数据源的成交量/成交额单位不同，按数据源分开存储，不会拼接到同一序列
+
+配置：
+    export TA_BAR_STORE_ENABLED=false   # 关闭K线区间缓存
+    export TA_BAR_STORE_DIR=/path/bars  # 自定义存储目录
+"""
+
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from .serialization import dump_dataframe, get_default_serializer, get_serializer, is_dataframe_format
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+
+# 数据源获取函数：fetcher(start_date, end_date) -> DataFrame/None，日期格式 YYYY-MM-DD
+BarFetcher = Callable[[str, str], Optional[pd.DataFrame]]
+
+# 前复权价格在除权除息后会整体变化，拼接前用重叠K线校验收盘价
+_ADJUST_CHECK_TOLERANCE = 1e-4
+
+
+def _to_day(value) -> pd.Timestamp:
+    """把日期字符串/时间戳统一为当天零点的 Timestamp"""
+    return pd.Timestamp(value).normalize()
+
+
+def _fmt(day: pd.Timestamp) -> str:
+    return day.strftime('%Y-%m-%d')
+
+
+def merge_intervals(intervals: List[Tuple[pd.Timestamp, pd.Timestamp]]) -> List[Tuple[pd.Timestamp, pd.Timestamp]]:
+    """合并重叠或相邻（相差一天）的闭区间"""
+    merged: List[Tuple[pd.Timestamp, pd.Timestamp]] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1] + timedelta(days=1):
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def missing_intervals(covered: List[Tuple[pd.Timestamp, pd.Timestamp]],
+                      start: pd.Timestamp, end: pd.Timestamp) -> List[Tuple[pd.Timestamp, pd.Timestamp]]:
+    """计算 [start, end] 中未被 covered 覆盖的闭区间"""
+    gaps = []
+    cursor = start
+    for c_start, c_end in merge_intervals(covered):
+        if c_end < cursor:
+            continue
+        if c_start > end:
+            break
+        if c_start > cursor:
+            gaps.append((cursor, min(end, c_start - timedelta(days=1))))
+        cursor = max(cursor, c_end + timedelta(days=1))
+        if cursor > end:
+            break
+    if cursor <= end:
+        gaps.append((cursor, end))
+    return gaps
+
+
+class BarStore:
+    """按 (source, symbol, period, adjust) 存储K线的区间感知缓存"""
+
+    def __init__(self, store_dir: str = None):
+        """
+        初始化K线区间缓存
+
+        Args:
+            store_dir: 存储目录，默认为 tradingagents/dataflows/cache/data_cache/bars
+        """
+        if store_dir is None:
+            store_dir = os.getenv("TA_BAR_STORE_DIR") or (Path(__file__).parent / "data_cache" / "bars")
+        self.store_dir = Path(store_dir)
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        self.serializer = get_default_serializer()
+
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+        # 统计信息
+        self.stats = {'full_hits': 0, 'partial_hits': 0, 'misses': 0, 'segments_fetched': 0, 'resets': 0}
+
+        logger.info(f"📦 K线区间缓存初始化完成: {self.store_dir}")
+
+    # ==================== 存储 ====================
+
+    def _key_lock(self, key: str) -> threading.Lock:
+        with self._locks_guard:
+            if key not in self._locks:
+                self._locks[key] = threading.Lock()
+            return self._locks[key]
+
+    def _paths(self, source: str, symbol: str, period: str, adjust: str) -> Tuple[Path, Path]:
+        base = self.store_dir / source / f"{period}_{adjust}"
+        base.mkdir(parents=True, exist_ok=True)
+        return base / f"{symbol}.{self.serializer.extension}", base / f"{symbol}.json"
+
+    def _load(self, source: str, symbol: str, period: str,
+              adjust: str) -> Tuple[Optional[pd.DataFrame], List[Tuple[pd.Timestamp, pd.Timestamp]]]:
+        """加载本地K线和已覆盖区间"""
+        _, meta_path = self._paths(source, symbol, period, adjust)
+        if not meta_path.exists():
+            return None, []
+
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            data_path = Path(meta['file_path'])
+            file_format = meta.get('file_format', self.serializer.name)
+            if not data_path.exists() or not is_dataframe_format(file_format):
+                return None, []
+            df = get_serializer(file_format).load(data_path)
+            df['date'] = pd.to_datetime(df['date'])
+            covered = [(_to_day(s), _to_day(e)) for s, e in meta.get('covered', [])]
+            return df, covered
+        except Exception as e:
+            logger.warning(f"⚠️ 读取K线区间缓存失败 {symbol}: {e}")
+            return None, []
+
+    def _save(self, source: str, symbol: str, period: str, adjust: str, df: pd.DataFrame,
+              covered: List[Tuple[pd.Timestamp, pd.Timestamp]]):
+        """保存K线和已覆盖区间（先写数据，再写区间）"""
+        data_path, meta_path = self._paths(source, symbol, period, adjust)
+        serializer, data_path = dump_dataframe(self.serializer, df.reset_index(drop=True), data_path)
+        # 格式变化（如 arrow 退回 csv）时删除另一种格式的旧文件
+        for stale in data_path.parent.glob(f"{symbol}.*"):
+            if stale != data_path and stale != meta_path:
+                stale.unlink(missing_ok=True)
+
+        meta = {
+            'source': source,
+            'symbol': symbol,
+            'period': period,
+            'adjust': adjust,
+            'file_path': str(data_path),
+            'file_format': serializer.name,
+            'covered': [[_fmt(s), _fmt(e)] for s, e in merge_intervals(covered)],
+            'updated_at': datetime.now().isoformat(),
+        }
+        tmp_path = meta_path.with_name(f".{meta_path.name}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, meta_path)
+
+    @staticmethod
+    def _normalize(df: Optional[pd.DataFrame]) -> Optional[pd.DataFrame]:
+        """统一为带 date 列（datetime64）、按日期升序且无重复的 DataFrame"""
+        if df is None:
+            return None
+        out = df.copy()
+        if 'date' not in out.columns:
+            if 'trade_date' in out.columns:
+                out = out.rename(columns={'trade_date': 'date'})
+            elif out.index.name in ('date', 'trade_date') or isinstance(out.index, pd.DatetimeIndex):
+                out.index.name = 'date'
+                out = out.reset_index()
+            else:
+                return None
+        out['date'] = pd.to_datetime(out['date'])
+        out = out.drop_duplicates(subset='date', keep='last').sort_values('date')
+        return out.reset_index(drop=True)
+
+    @staticmethod
+    def _adjust_consistent(stored: pd.DataFrame, fetched: pd.DataFrame) -> bool:
+        """比较重叠日期的收盘价，判断复权因子是否一致"""
+        if 'close' not in stored.columns or 'close' not in fetched.columns:
+            return True
+        overlap = stored[['date', 'close']].merge(fetched[['date', 'close']], on='date', suffixes=('_old', '_new'))
+        if overlap.empty:
+            return True
+        old = pd.to_numeric(overlap['close_old'], errors='coerce')
+        new = pd.to_numeric(overlap['close_new'], errors='coerce')
+        diff = ((old - new).abs() / old.abs().where(old.abs() > 0, 1)).max()
+        return not (diff > _ADJUST_CHECK_TOLERANCE)
+
+    # ==================== 查询 ====================
+
+    def get_bars(self, symbol: str, start_date: str, end_date: str, fetcher: BarFetcher,
+                 period: str = "daily", adjust: str = "qfq", source: str = "default") -> Optional[pd.DataFrame]:
+        """
+        获取 [start_date, end_date] 的K线，只从数据源拉取本地缺失的区间
+
+        Args:
+            symbol: 股票代码
+            start_date: 开始日期
+            end_date: 结束日期
+            fetcher: 数据源获取函数 fetcher(start, end)，失败时返回 None
+            period: 数据周期（daily/weekly/monthly）
+            adjust: 复权方式（qfq/hfq/none）
+            source: 数据源名称（tushare/akshare/baostock），各数据源分别存储
+
+        Returns:
+            DataFrame（包含 date 列），任一缺失区间获取失败时返回 None
+        """
+        start = _to_day(start_date)
+        end = _to_day(end_date)
+        if start > end:
+            return None
+
+        # 当天K线在收盘前会变化，覆盖区间最多记到昨天
+        today = _to_day(datetime.now())
+        last_final_day = today - timedelta(days=1)
+
+        with self._key_lock(f"{source}_{symbol}_{period}_{adjust}"):
+            stored, covered = self._load(source, symbol, period, adjust)
+            gaps = missing_intervals(covered, start, end)
+
+            if not gaps:
+                self.stats['full_hits'] += 1
+                logger.debug(f"📦 [K线区间缓存] 命中: {symbol} {_fmt(start)}~{_fmt(end)}")
+                return self._slice(stored, start, end)
+
+            self.stats['partial_hits' if stored is not None else 'misses'] += 1
+
+            for gap_start, gap_end in gaps:
+                # 只有周末的区间没有K线，直接标记为已覆盖
+                if len(pd.bdate_range(gap_start, gap_end)) == 0:
+                    covered.append((gap_start, gap_end))
+                    continue
+
+                # 扩展一个已有交易日作为重叠锚点，用于校验复权一致性
+                fetch_start, fetch_end = gap_start, gap_end
+                if stored is not None and not stored.empty:
+                    before = stored.loc[stored['date'] < gap_start, 'date']
+                    after = stored.loc[stored['date'] > gap_end, 'date']
+                    if not before.empty:
+                        fetch_start = before.iloc[-1]
+                    if not after.empty:
+                        fetch_end = after.iloc[0]
+
+                logger.info(f"📥 [K线区间缓存] 拉取缺失区间: {symbol} {_fmt(fetch_start)}~{_fmt(fetch_end)}")
+                fetched = self._normalize(fetcher(_fmt(fetch_start), _fmt(fetch_end)))
+                self.stats['segments_fetched'] += 1
+                if fetched is None:
+                    logger.warning(f"⚠️ [K线区间缓存] 缺失区间获取失败: {symbol} {_fmt(gap_start)}~{_fmt(gap_end)}")
+                    if stored is not None:
+                        self._save(source, symbol, period, adjust, stored, covered)
+                    return None
+
+                if self._slice(fetched, gap_start, gap_end).empty:
+                    # 缺失区间内没有K线（空数据或只有重叠锚点）：可能是停牌，也可能是数据源暂时缺数据，
+                    # 不标记为已覆盖，下次重新请求
+                    logger.info(f"ℹ️ [K线区间缓存] 缺失区间无数据: {symbol} {_fmt(gap_start)}~{_fmt(gap_end)}")
+                    continue
+
+                if stored is not None and not self._adjust_consistent(stored, fetched):
+                    # 复权因子已变化：丢弃本地数据，整段重新获取
+                    logger.info(f"🔄 [K线区间缓存] {symbol} 复权价格已变化，重新获取完整区间")
+                    self.stats['resets'] += 1
+                    fetched = self._normalize(fetcher(_fmt(start), _fmt(end)))
+                    if fetched is None or fetched.empty:
+                        return None
+                    stored = fetched
+                    covered = [(start, min(end, last_final_day))] if start <= last_final_day else []
+                    break
+
+                stored = fetched if stored is None else self._normalize(pd.concat([stored, fetched], ignore_index=True))
+                if gap_start <= last_final_day:
+                    covered.append((gap_start, min(gap_end, last_final_day)))
+
+            if stored is None:
+                return None
+            self._save(source, symbol, period, adjust, stored, covered)
+            return self._slice(stored, start, end)
+
+    @staticmethod
+    def _slice(df: Optional[pd.DataFrame], start: pd.Timestamp, end: pd.Timestamp) -> Optional[pd.DataFrame]:
+        if df is None:
+            return None
+        mask = (df['date'] >= start) & (df['date'] < end + timedelta(days=1))
+        return df.loc[mask].reset_index(drop=True).copy()
+
+    def invalidate(self, symbol: str, period: str = "daily", adjust: str = "qfq", source: str = "default"):
+        """删除某只股票在某个数据源下的K线区间缓存"""
+        with self._key_lock(f"{source}_{symbol}_{period}_{adjust}"):
+            for path in self._paths(source, symbol, period, adjust):
+                if path.exists():
+                    path.unlink()
+
+    def get_stats(self) -> Dict[str, int]:
+        """获取命中统计"""
+        return dict(self.stats)
+
+
+# 全局K线区间缓存实例
+_bar_store = None
+_bar_store_lock = threading.Lock()
+
+
+def is_bar_store_enabled() -> bool:
+    """是否启用K线区间缓存（TA_BAR_STORE_ENABLED，默认启用）"""
+    return os.getenv("TA_BAR_STORE_ENABLED", "true").lower() in ("true", "1", "yes", "on")
+
+
+def get_bar_store() -> BarStore:
+    """获取全局K线区间缓存实例"""
+    global _bar_store
+    if _bar_store is None:
+        with _bar_store_lock:
+            if _bar_store is None:
+                _bar_store = BarStore()
+    return _bar_store
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+数据库缓存载荷编解码
+将 DataFrame 编码为压缩的 Arrow IPC 流，文本编码为 zstd/zlib 压缩的 UTF-8，
+替代 to_json(orient='records') + json.dumps 的大体积字符串。
+
+Redis 中的值格式：
+    MAGIC(4字节) + 头部长度(2字节, 大端) + JSON头部 + 载荷
+JSON头部包含 data_format、codec、codec_version 以及调用方附加的元数据。
+不以 MAGIC 开头的值视为旧版 JSON 字符串，按原方式解析。
+
+配置：
+    export TA_DB_CACHE_CODEC=json   # 关闭二进制编码，仍写入旧版 JSON
+"""
+
+import io
+import json
+import os
+import struct
+import threading
+import zlib
+from typing import Any, Dict, Optional, Tuple
+
+import pandas as pd
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+# pyarrow（可选）
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+    PYARROW_AVAILABLE = True
+except ImportError:
+    pa = None
+    pa_ipc = None
+    PYARROW_AVAILABLE = False
+
+# zstandard（可选）
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    zstandard = None
+    ZSTD_AVAILABLE = False
+
+
+# 编码版本，编码格式不兼容变化时递增
+CODEC_VERSION = 1
+
+# 二进制载荷标识
+PAYLOAD_MAGIC = b"TAC\x01"
+
+# 旧版格式（JSON 字符串）
+LEGACY_CODEC = "json"
+
+
+def _arrow_compression() -> Optional[str]:
+    """Arrow IPC 内置压缩：优先 zstd，其次 lz4"""
+    for name in ("zstd", "lz4"):
+        try:
+            if pa.Codec.is_available(name):
+                return name
+        except Exception:
+            continue
+    return None
+
+
+def _compress_text(text: str) -> Tuple[bytes, str]:
+    raw = text.encode("utf-8")
+    if ZSTD_AVAILABLE:
+        return zstandard.ZstdCompressor(level=3).compress(raw), "utf8+zstd"
+    return zlib.compress(raw, 6), "utf8+zlib"
+
+
+def _decompress_text(payload: bytes, codec: str) -> str:
+    if codec == "utf8+zstd":
+        return zstandard.ZstdDecompressor().decompress(payload).decode("utf-8")
+    if codec == "utf8+zlib":
+        return zlib.decompress(payload).decode("utf-8")
+    raise ValueError(f"不支持的文本编码: {codec}")
+
+
+def binary_codec_enabled() -> bool:
+    """是否使用二进制编码（TA_DB_CACHE_CODEC，默认 binary）"""
+    return os.getenv("TA_DB_CACHE_CODEC", "binary").lower() != LEGACY_CODEC
+
+
+def encode_payload(data: Any) -> Tuple[bytes, str, str]:
+    """
+    编码缓存数据
+
+    Args:
+        data: DataFrame 或文本
+
+    Returns:
+        (载荷字节, data_format, codec)
+    """
+    if isinstance(data, pd.DataFrame):
+        if PYARROW_AVAILABLE:
+            table = pa.Table.from_pandas(data, preserve_index=True)
+            compression = _arrow_compression()
+            options = pa_ipc.IpcWriteOptions(compression=compression)
+            sink = pa.BufferOutputStream()
+            with pa_ipc.new_stream(sink, table.schema, options=options) as writer:
+                writer.write_table(table)
+            codec = f"arrow-ipc+{compression}" if compression else "arrow-ipc"
+            return sink.getvalue().to_pybytes(), "dataframe_arrow", codec
+
+        payload, codec = _compress_text(data.to_json(orient='records', date_format='iso'))
+        return payload, "dataframe_json", codec
+
+    payload, codec = _compress_text(str(data))
+    return payload, "text", codec
+
+
+def decode_payload(payload: bytes, data_format: str, codec: str) -> Any:
+    """
+    解码缓存数据
+
+    Args:
+        payload: 载荷字节
+        data_format: dataframe_arrow / dataframe_json / text
+        codec: 编码方式
+
+    Returns:
+        DataFrame 或文本
+    """
+    if data_format == "dataframe_arrow":
+        if not PYARROW_AVAILABLE:
+            raise ValueError("解码 Arrow 载荷需要安装 pyarrow")
+        with pa_ipc.open_stream(pa.py_buffer(payload)) as reader:
+            return reader.read_all().to_pandas()
+
+    text = _decompress_text(payload, codec)
+    if data_format == "dataframe_json":
+        return pd.read_json(io.StringIO(text), orient='records')
+    return text
+
+
+def pack_redis_value(payload: bytes, header: Dict[str, Any]) -> bytes:
+    """把载荷和头部打包为 Redis 值"""
+    header_bytes = json.dumps(header, ensure_ascii=False, default=str).encode("utf-8")
+    return PAYLOAD_MAGIC + struct.pack(">H", len(header_bytes)) + header_bytes + payload
+
+
+def unpack_redis_value(value: bytes) -> Optional[Tuple[Dict[str, Any], bytes]]:
+    """
+    解包 Redis 值
+
+    Returns:
+        (头部, 载荷)；旧版 JSON 值返回 None
+    """
+    if not isinstance(value, (bytes, bytearray)) or not value.startswith(PAYLOAD_MAGIC):
+        return None
+    offset = len(PAYLOAD_MAGIC)
+    (header_len,) = struct.unpack(">H", value[offset:offset + 2])
+    offset += 2
+    header = json.loads(value[offset:offset + header_len].decode("utf-8"))
+    return header, bytes(value[offset + header_len:])
+
+
+def decode_legacy(data: Any, data_format: str) -> Any:
+    """解码旧版 JSON 条目（dataframe_json 字符串或文本）"""
+    if data_format == "dataframe_json":
+        return pd.read_json(io.StringIO(data), orient='records')
+    return data
+
+
+class CodecStats:
+    """按条目类型统计载荷大小和解码耗时"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, Any]] = {}
+
+    def _entry(self, entry_type: str) -> Dict[str, Any]:
+        return self._stats.setdefault(entry_type, {
+            'encoded': 0,
+            'encoded_bytes': 0,
+            'decoded': 0,
+            'decoded_bytes': 0,
+            'decode_seconds': 0.0,
+            'max_decode_seconds': 0.0,
+            'legacy_decoded': 0,
+            'codecs': {},
+        })
+
+    def record_encode(self, entry_type: str, codec: str, size: int):
+        with self._lock:
+            entry = self._entry(entry_type)
+            entry['encoded'] += 1
+            entry['encoded_bytes'] += size
+            entry['codecs'][codec] = entry['codecs'].get(codec, 0) + 1
+
+    def record_decode(self, entry_type: str, codec: str, size: int, seconds: float):
+        with self._lock:
+            entry = self._entry(entry_type)
+            entry['decoded'] += 1
+            entry['decoded_bytes'] += size
+            entry['decode_seconds'] += seconds
+            entry['max_decode_seconds'] = max(entry['max_decode_seconds'], seconds)
+            if codec == LEGACY_CODEC:
+                entry['legacy_decoded'] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """每种条目类型的平均载荷大小和解码耗时"""
+        with self._lock:
+            result = {}
+            for entry_type, entry in self._stats.items():
+                result[entry_type] = {
+                    'encoded': entry['encoded'],
+                    'avg_encoded_bytes': round(entry['encoded_bytes'] / entry['encoded']) if entry['encoded'] else 0,
+                    'decoded': entry['decoded'],
+                    'avg_decoded_bytes': round(entry['decoded_bytes'] / entry['decoded']) if entry['decoded'] else 0,
+                    'avg_decode_ms': round(entry['decode_seconds'] * 1000 / entry['decoded'], 3) if entry['decoded'] else 0.0,
+                    'max_decode_ms': round(entry['max_decode_seconds'] * 1000, 3),
+                    'legacy_decoded': entry['legacy_decoded'],
+                    'codecs': dict(entry['codecs']),
+                }
+            return result
+
@@ -8,6 +8,7 @@ import os
 import json
 import pickle
 import hashlib
+import time
 from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
 from tradingagents.config.runtime_settings import get_timezone_name
@@ -15,6 +16,13 @@ from tradingagents.config.runtime_settings import get_timezone_name
 from typing import Optional, Dict, Any, List, Union
 import pandas as pd
 
+from .codecs import (
+    CODEC_VERSION, LEGACY_CODEC, CodecStats, binary_codec_enabled, decode_legacy,
+    decode_payload, encode_payload, pack_redis_value, unpack_redis_value,
+)
+from .memory_cache import get_memory_cache
+from .metrics import get_cache_metrics, infer_market
+
 # 导入日志模块
 from tradingagents.utils.logging_manager import get_logger
 logger = get_logger('agents')
@@ -70,6 +78,17 @@ class DatabaseCacheManager:
         self.mongodb_client = None
         self.mongodb_db = None
         self.redis_client = None
+        # 二进制载荷使用不解码响应的 Redis 客户端
+        self.redis_binary_client = None
+
+        # 进程内L1缓存（保存已反序列化的数据）
+        self.memory_cache = get_memory_cache()
+
+        # 载荷编码统计（按条目类型）
+        self.codec_stats = CodecStats()
+
+        # 命中率/耗时/字节数指标
+        self.metrics = get_cache_metrics()
 
         self._init_mongodb()
         self._init_redis()
@@ -127,11 +146,20 @@ class DatabaseCacheManager:
             # 测试连接
             self.redis_client.ping()
 
+            self.redis_binary_client = redis.from_url(
+                self.redis_url,
+                db=self.redis_db,
+                socket_timeout=5,
+                socket_connect_timeout=5,
+                decode_responses=False
+            )
+
             logger.info(f"✅ Redis连接成功: {self.redis_url}")
 
         except Exception as e:
             logger.error(f"❌ Redis连接失败: {e}")
             self.redis_client = None
+            self.redis_binary_client = None
 
     def _create_mongodb_indexes(self):
         """创建MongoDB索引"""
@@ -181,6 +209,119 @@ class DatabaseCacheManager:
         cache_key = hashlib.md5(params_str.encode()).hexdigest()[:16]
         return f"{data_type}:{symbol}:{cache_key}"
 
+    # ==================== 载荷编解码 ====================
+
+    def _encode_entry(self, data: Any, entry_type: str) -> Dict[str, Any]:
+        """
+        编码要写入 MongoDB/Redis 的数据
+
+        Returns:
+            包含 data、data_format、codec 的字典；二进制编码时还包含 codec_version、payload_size
+        """
+        if binary_codec_enabled():
+            try:
+                payload, data_format, codec = encode_payload(data)
+                self.codec_stats.record_encode(entry_type, codec, len(payload))
+                return {
+                    "data": payload,
+                    "data_format": data_format,
+                    "codec": codec,
+                    "codec_version": CODEC_VERSION,
+                    "payload_size": len(payload),
+                }
+            except Exception as e:
+                logger.warning(f"⚠️ 二进制编码失败，使用JSON格式: {e}")
+
+        if isinstance(data, pd.DataFrame):
+            encoded, data_format = data.to_json(orient='records', date_format='iso'), "dataframe_json"
+        else:
+            encoded, data_format = str(data), "text"
+        self.codec_stats.record_encode(entry_type, LEGACY_CODEC, len(encoded.encode('utf-8')))
+        return {"data": encoded, "data_format": data_format, "codec": LEGACY_CODEC}
+
+    @staticmethod
+    def _market_of_key(cache_key: str) -> str:
+        """从 {data_type}:{symbol}:{hash} 形式的缓存键推断市场类型"""
+        parts = cache_key.split(':')
+        return infer_market(parts[1] if len(parts) >= 3 else None)
+
+    def _decode_entry(self, entry: Dict[str, Any], entry_type: str, backend: str, market: str) -> Any:
+        """解码 MongoDB 文档或 Redis 头部描述的数据，兼容旧版 JSON 条目"""
+        data_format = entry.get("data_format", "text")
+        codec = entry.get("codec") or LEGACY_CODEC
+
+        started = time.perf_counter()
+        if codec != LEGACY_CODEC:
+            payload = bytes(entry["data"])
+            data = decode_payload(payload, data_format, codec)
+            size = len(payload)
+        else:
+            data = decode_legacy(entry["data"], data_format)
+            size = len(str(entry["data"]).encode('utf-8'))
+        seconds = time.perf_counter() - started
+
+        self.codec_stats.record_decode(entry_type, codec, size, seconds)
+        self.metrics.record_decode(backend, entry_type, market, seconds)
+        return data
+
+    def _write_redis(self, cache_key: str, ttl_seconds: int, entry: Dict[str, Any],
+                     meta: Dict[str, Any], entry_type: str):
+        """写入 Redis：二进制条目打包为带头部的字节串，旧版条目写入 JSON 字符串"""
+        if entry["codec"] != LEGACY_CODEC:
+            header = {
+                "data_format": entry["data_format"],
+                "codec": entry["codec"],
+                "codec_version": entry.get("codec_version") or CODEC_VERSION,
+                **meta,
+            }
+            value = pack_redis_value(entry["data"], header)
+            self.redis_binary_client.setex(cache_key, ttl_seconds, value)
+        else:
+            redis_data = {"data": entry["data"], "data_format": entry["data_format"], **meta}
+            value = json.dumps(redis_data, ensure_ascii=False)
+            self.redis_client.setex(cache_key, ttl_seconds, value)
+
+        self.metrics.record_write('redis', entry_type, self._market_of_key(cache_key), len(value))
+
+    def _write_mongodb(self, collection_name: str, doc: Dict[str, Any], entry_type: str):
+        """写入 MongoDB 并记录写入字节数"""
+        self.mongodb_db[collection_name].replace_one({"_id": doc["_id"]}, doc, upsert=True)
+        size = doc.get("payload_size") or len(str(doc.get("data", "")).encode('utf-8'))
+        self.metrics.record_write('mongodb', entry_type, self._market_of_key(doc["_id"]), size)
+
+    def _read_redis(self, cache_key: str, entry_type: str) -> Optional[Any]:
+        """从 Redis 读取并解码，不存在时返回 None"""
+        market = self._market_of_key(cache_key)
+        started = time.perf_counter()
+        value = self.redis_binary_client.get(cache_key)
+        if not value:
+            self.metrics.record_lookup('redis', entry_type, market, hit=False,
+                                       seconds=time.perf_counter() - started)
+            return None
+
+        unpacked = unpack_redis_value(value)
+        if unpacked is not None:
+            header, payload = unpacked
+            entry = {"data": payload, "data_format": header["data_format"], "codec": header["codec"]}
+        else:
+            # 旧版 JSON 条目
+            entry = json.loads(value.decode('utf-8') if isinstance(value, (bytes, bytearray)) else value)
+            entry.setdefault("data_format", "text")
+
+        data = self._decode_entry(entry, entry_type, 'redis', market)
+        self.metrics.record_lookup('redis', entry_type, market, hit=True,
+                                   seconds=time.perf_counter() - started, bytes_read=len(value))
+        return data
+
+    def _read_mongodb(self, collection_name: str, cache_key: str, entry_type: str) -> Optional[Dict[str, Any]]:
+        """从 MongoDB 读取文档并记录命中情况"""
+        started = time.perf_counter()
+        doc = self.mongodb_db[collection_name].find_one({"_id": cache_key})
+        size = (doc.get("payload_size") or len(str(doc.get("data", "")).encode('utf-8'))) if doc else 0
+        self.metrics.record_lookup('mongodb', entry_type, self._market_of_key(cache_key), hit=doc is not None,
+                                   seconds=time.perf_counter() - started, bytes_read=size)
+        return doc
+
     def save_stock_data(self, symbol: str, data: Union[pd.DataFrame, str],
                        start_date: str = None, end_date: str = None,
                        data_source: str = "unknown", market_type: str = None) -> str:
@@ -226,19 +367,16 @@ class DatabaseCacheManager:
             "updated_at": datetime.now(ZoneInfo(get_timezone_name()))
         }
 
-        # 处理数据格式
-        if isinstance(data, pd.DataFrame):
-            doc["data"] = data.to_json(orient='records', date_format='iso')
-            doc["data_format"] = "dataframe_json"
-        else:
-            doc["data"] = str(data)
-            doc["data_format"] = "text"
+        # 编码数据（压缩的 Arrow IPC / 文本，或旧版 JSON）
+        doc.update(self._encode_entry(data, "stock_data"))
+
+        # 写入前使L1中的旧数据和查找结果失效
+        self._invalidate_memory_cache(cache_key, symbol)
 
         # 保存到MongoDB（持久化）
         if self.mongodb_db is not None:
             try:
-                collection = self.mongodb_db.stock_data
-                collection.replace_one({"_id": cache_key}, doc, upsert=True)
+                self._write_mongodb("stock_data", doc, "stock_data")
                 logger.info(f"💾 股票数据已保存到MongoDB: {symbol} -> {cache_key}")
             except Exception as e:
                 logger.error(f"⚠️ MongoDB保存失败: {e}")
@@ -246,47 +384,53 @@ class DatabaseCacheManager:
         # 保存到Redis（快速缓存，6小时过期）
         if self.redis_client:
             try:
-                redis_data = {
-                    "data": doc["data"],
-                    "data_format": doc["data_format"],
+                self._write_redis(cache_key, 6 * 3600, doc, {
                     "symbol": symbol,
                     "data_source": data_source,
                     "created_at": doc["created_at"].isoformat()
-                }
-                self.redis_client.setex(
-                    cache_key,
-                    6 * 3600,  # 6小时过期
-                    json.dumps(redis_data, ensure_ascii=False)
-                )
+                }, "stock_data")
                 logger.info(f"⚡ 股票数据已缓存到Redis: {symbol} -> {cache_key}")
             except Exception as e:
                 logger.error(f"⚠️ Redis缓存失败: {e}")
 
         return cache_key
 
+    def _invalidate_memory_cache(self, cache_key: str, symbol: str):
+        """使L1中该缓存键和该股票的查找结果失效"""
+        self.memory_cache.invalidate(('db', cache_key))
+        self.memory_cache.invalidate_tag(f"db:{symbol}")
+
     def load_stock_data(self, cache_key: str) -> Optional[Union[pd.DataFrame, str]]:
+        """从L1、Redis或MongoDB加载股票数据"""
+        started = time.perf_counter()
+        cached = self.memory_cache.get(('db', cache_key))
+        if self.memory_cache.enabled:
+            self.metrics.record_lookup('memory', 'stock_data', self._market_of_key(cache_key),
+                                       hit=cached is not None, seconds=time.perf_counter() - started)
+        if cached is not None:
+            return cached
+
+        data = self._load_stock_data_from_backends(cache_key)
+        self.memory_cache.set(('db', cache_key), data, tags=('db',))
+        return data
+
+    def _load_stock_data_from_backends(self, cache_key: str) -> Optional[Union[pd.DataFrame, str]]:
         """从Redis或MongoDB加载股票数据"""
 
         # 首先尝试从Redis加载（更快）
         if self.redis_client:
             try:
-                redis_data = self.redis_client.get(cache_key)
-                if redis_data:
-                    data_dict = json.loads(redis_data)
+                data = self._read_redis(cache_key, "stock_data")
+                if data is not None:
                     logger.info(f"⚡ 从Redis加载数据: {cache_key}")
-
-                    if data_dict["data_format"] == "dataframe_json":
-                        return pd.read_json(data_dict["data"], orient='records')
-                    else:
-                        return data_dict["data"]
+                    return data
             except Exception as e:
                 logger.error(f"⚠️ Redis加载失败: {e}")
 
         # 如果Redis没有，从MongoDB加载
         if self.mongodb_db is not None:
             try:
-                collection = self.mongodb_db.stock_data
-                doc = collection.find_one({"_id": cache_key})
+                doc = self._read_mongodb("stock_data", cache_key, "stock_data")
 
                 if doc:
                     logger.info(f"💾 从MongoDB加载数据: {cache_key}")
@@ -294,26 +438,22 @@ class DatabaseCacheManager:
                     # 同时更新到Redis缓存
                     if self.redis_client:
                         try:
-                            redis_data = {
+                            entry = {
                                 "data": doc["data"],
                                 "data_format": doc["data_format"],
+                                "codec": doc.get("codec") or LEGACY_CODEC,
+                                "codec_version": doc.get("codec_version"),
+                            }
+                            self._write_redis(cache_key, 6 * 3600, entry, {
                                 "symbol": doc["symbol"],
                                 "data_source": doc["data_source"],
                                 "created_at": doc["created_at"].isoformat()
-                            }
-                            self.redis_client.setex(
-                                cache_key,
-                                6 * 3600,
-                                json.dumps(redis_data, ensure_ascii=False)
-                            )
+                            }, "stock_data")
                             logger.info(f"⚡ 数据已同步到Redis缓存")
                         except Exception as e:
                             logger.error(f"⚠️ Redis同步失败: {e}")
 
-                    if doc["data_format"] == "dataframe_json":
-                        return pd.read_json(doc["data"], orient='records')
-                    else:
-                        return doc["data"]
+                    return self._decode_entry(doc, "stock_data", 'mongodb', self._market_of_key(cache_key))
 
             except Exception as e:
                 logger.error(f"⚠️ MongoDB加载失败: {e}")
@@ -325,6 +465,21 @@ class DatabaseCacheManager:
                               max_age_hours: int = 6) -> Optional[str]:
         """查找匹配的缓存数据"""
 
+        # L1中的查找结果（写入该股票时失效）
+        find_key = ('db_find', symbol, start_date, end_date, data_source, max_age_hours)
+        cached_key = self.memory_cache.get(find_key)
+        if cached_key is not None:
+            return cached_key
+
+        cache_key = self._find_cached_stock_data_in_backends(symbol, start_date, end_date,
+                                                             data_source, max_age_hours)
+        self.memory_cache.set(find_key, cache_key, tags=('db', f"db:{symbol}"))
+        return cache_key
+
+    def _find_cached_stock_data_in_backends(self, symbol: str, start_date: str = None,
+                                            end_date: str = None, data_source: str = None,
+                                            max_age_hours: int = 6) -> Optional[str]:
+        """在Redis和MongoDB中查找匹配的缓存数据"""
         # 生成精确匹配的缓存键
         exact_key = self._generate_cache_key("stock", symbol,
                                            start_date=start_date,
@@ -365,6 +520,8 @@ class DatabaseCacheManager:
                 logger.error(f"⚠️ MongoDB查询失败: {e}")
 
         logger.error(f"❌ 未找到有效缓存: {symbol}")
+        if self.mongodb_db is not None:
+            self.metrics.record_lookup('mongodb', 'stock_data', infer_market(symbol), hit=False)
         return None
 
     def save_news_data(self, symbol: str, news_data: str,
@@ -384,16 +541,17 @@ class DatabaseCacheManager:
             "start_date": start_date,
             "end_date": end_date,
             "data_source": data_source,
-            "data": news_data,
             "created_at": datetime.now(ZoneInfo(get_timezone_name())),
             "updated_at": datetime.now(ZoneInfo(get_timezone_name()))
         }
+        doc.update(self._encode_entry(news_data, "news_data"))
+
+        self._invalidate_memory_cache(cache_key, symbol)
 
         # 保存到MongoDB
         if self.mongodb_db is not None:
             try:
-                collection = self.mongodb_db.news_data
-                collection.replace_one({"_id": cache_key}, doc, upsert=True)
+                self._write_mongodb("news_data", doc, "news_data")
                 logger.info(f"📰 新闻数据已保存到MongoDB: {symbol} -> {cache_key}")
             except Exception as e:
                 logger.error(f"⚠️ MongoDB保存失败: {e}")
@@ -401,17 +559,11 @@ class DatabaseCacheManager:
         # 保存到Redis（24小时过期）
         if self.redis_client:
             try:
-                redis_data = {
-                    "data": news_data,
+                self._write_redis(cache_key, 24 * 3600, doc, {  # 24小时过期
                     "symbol": symbol,
                     "data_source": data_source,
                     "created_at": doc["created_at"].isoformat()
-                }
-                self.redis_client.setex(
-                    cache_key,
-                    24 * 3600,  # 24小时过期
-                    json.dumps(redis_data, ensure_ascii=False)
-                )
+                }, "news_data")
                 logger.info(f"⚡ 新闻数据已缓存到Redis: {symbol} -> {cache_key}")
             except Exception as e:
                 logger.error(f"⚠️ Redis缓存失败: {e}")
@@ -435,16 +587,17 @@ class DatabaseCacheManager:
             "data_type": "fundamentals_data",
             "analysis_date": analysis_date,
             "data_source": data_source,
-            "data": fundamentals_data,
             "created_at": datetime.now(ZoneInfo(get_timezone_name())),
             "updated_at": datetime.now(ZoneInfo(get_timezone_name()))
         }
+        doc.update(self._encode_entry(fundamentals_data, "fundamentals_data"))
+
+        self._invalidate_memory_cache(cache_key, symbol)
 
         # 保存到MongoDB
         if self.mongodb_db is not None:
             try:
-                collection = self.mongodb_db.fundamentals_data
-                collection.replace_one({"_id": cache_key}, doc, upsert=True)
+                self._write_mongodb("fundamentals_data", doc, "fundamentals_data")
                 logger.info(f"💼 基本面数据已保存到MongoDB: {symbol} -> {cache_key}")
             except Exception as e:
                 logger.error(f"⚠️ MongoDB保存失败: {e}")
@@ -452,24 +605,46 @@ class DatabaseCacheManager:
         # 保存到Redis（24小时过期）
         if self.redis_client:
             try:
-                redis_data = {
-                    "data": fundamentals_data,
+                self._write_redis(cache_key, 24 * 3600, doc, {  # 24小时过期
                     "symbol": symbol,
                     "data_source": data_source,
                     "analysis_date": analysis_date,
                     "created_at": doc["created_at"].isoformat()
-                }
-                self.redis_client.setex(
-                    cache_key,
-                    24 * 3600,  # 24小时过期
-                    json.dumps(redis_data, ensure_ascii=False)
-                )
+                }, "fundamentals_data")
                 logger.info(f"⚡ 基本面数据已缓存到Redis: {symbol} -> {cache_key}")
             except Exception as e:
                 logger.error(f"⚠️ Redis缓存失败: {e}")
 
         return cache_key
 
+    def _load_text_entry(self, cache_key: str, collection_name: str, entry_type: str) -> Optional[str]:
+        """从Redis或MongoDB加载新闻/基本面等文本条目"""
+        if self.redis_client:
+            try:
+                data = self._read_redis(cache_key, entry_type)
+                if data is not None:
+                    return data
+            except Exception as e:
+                logger.error(f"⚠️ Redis加载失败: {e}")
+
+        if self.mongodb_db is not None:
+            try:
+                doc = self._read_mongodb(collection_name, cache_key, entry_type)
+                if doc:
+                    return self._decode_entry(doc, entry_type, 'mongodb', self._market_of_key(cache_key))
+            except Exception as e:
+                logger.error(f"⚠️ MongoDB加载失败: {e}")
+
+        return None
+
+    def load_news_data(self, cache_key: str) -> Optional[str]:
+        """从Redis或MongoDB加载新闻数据"""
+        return self._load_text_entry(cache_key, "news_data", "news_data")
+
+    def load_fundamentals_data(self, cache_key: str) -> Optional[str]:
+        """从Redis或MongoDB加载基本面数据"""
+        return self._load_text_entry(cache_key, "fundamentals_data", "fundamentals_data")
+
     def get_cache_stats(self) -> Dict[str, Any]:
         """获取缓存统计信息"""
         # 标准统计格式（与 file_cache 保持一致）
@@ -532,6 +707,9 @@ class DatabaseCacheManager:
 
         # 添加后端详细信息
         stats['backend_info'] = backend_info
+        stats['memory_cache'] = self.memory_cache.get_stats()
+        # 各类条目的载荷大小和解码耗时
+        stats['codec'] = self.codec_stats.get_stats()
 
         return stats
 
@@ -551,6 +729,9 @@ class DatabaseCacheManager:
             except Exception as e:
                 logger.error(f"⚠️ MongoDB清理失败: {e}")
 
+        # 清理L1中的数据库缓存条目
+        self.memory_cache.invalidate_tag('db')
+
         # Redis会自动过期，不需要手动清理
         logger.info(f"🧹 总共清理了 {cleared_count} 条过期记录")
         return cleared_count
@@ -563,6 +744,8 @@ class DatabaseCacheManager:
 
         if self.redis_client:
             self.redis_client.close()
+            if self.redis_binary_client is not None:
+                self.redis_binary_client.close()
             logger.info(f"🔒 Redis连接已关闭")
 
 
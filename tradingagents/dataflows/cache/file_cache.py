@@ -10,8 +10,15 @@ import pickle
 import pandas as pd
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Optional, Dict, Any, Union, List
+from typing import Optional, Dict, Any, Union, List, Tuple, Callable
 import hashlib
+import threading
+import time
+
+from .memory_cache import get_memory_cache
+from .metadata_index import CacheMetadataIndex
+from .metrics import get_cache_metrics
+from .serialization import dump_dataframe, get_default_serializer, get_serializer, is_dataframe_format
 
 # 导入日志模块
 from tradingagents.utils.logging_manager import get_logger
@@ -43,15 +50,33 @@ class StockDataCache:
         self.china_news_dir = self.cache_dir / "china_news"
         self.us_fundamentals_dir = self.cache_dir / "us_fundamentals"
         self.china_fundamentals_dir = self.cache_dir / "china_fundamentals"
+        self.us_company_info_dir = self.cache_dir / "us_company_info"
+        self.china_company_info_dir = self.cache_dir / "china_company_info"
         self.metadata_dir = self.cache_dir / "metadata"
 
         # 创建所有目录
         for dir_path in [self.us_stock_dir, self.china_stock_dir, self.us_news_dir,
                         self.china_news_dir, self.us_fundamentals_dir,
-                        self.china_fundamentals_dir, self.metadata_dir]:
+                        self.china_fundamentals_dir, self.us_company_info_dir,
+                        self.china_company_info_dir, self.metadata_dir]:
             dir_path.mkdir(exist_ok=True)
 
+        # 元数据索引（首次启动时从现有 *_meta.json 重建）
+        self.metadata_index = CacheMetadataIndex(self.metadata_dir / "metadata_index.sqlite3")
+        if not self.metadata_index.is_built():
+            self.metadata_index.rebuild(self.metadata_dir)
+
+        # 进程内L1缓存（保存已反序列化的数据）
+        self.memory_cache = get_memory_cache()
+
+        # 命中率/耗时/字节数指标
+        self.metrics = get_cache_metrics()
+
+        # DataFrame 序列化格式（TA_CACHE_DATAFRAME_FORMAT，默认 Arrow IPC）
+        self.dataframe_serializer = get_default_serializer()
+
         # 缓存配置 - 针对不同市场设置不同的TTL
+        # stale_ttl_hours: 硬TTL，超过 ttl_hours 但未超过该值的缓存会先返回、再后台刷新
         self.cache_config = {
             'us_stock_data': {
                 'ttl_hours': 2,  # 美股数据缓存2小时（考虑到API限制）
@@ -75,13 +100,27 @@ class StockDataCache:
             },
             'us_fundamentals': {
                 'ttl_hours': 24,  # 美股基本面数据缓存24小时
+                'stale_ttl_hours': 168,  # 7天内的旧数据可先返回再后台刷新
                 'max_files': 200,
                 'description': '美股基本面数据'
             },
             'china_fundamentals': {
                 'ttl_hours': 12,  # A股基本面数据缓存12小时
+                'stale_ttl_hours': 72,  # 3天内的旧数据可先返回再后台刷新
                 'max_files': 200,
                 'description': 'A股基本面数据'
+            },
+            'us_company_info': {
+                'ttl_hours': 24,
+                'stale_ttl_hours': 168,
+                'max_files': 500,
+                'description': '美股公司信息'
+            },
+            'china_company_info': {
+                'ttl_hours': 4,  # 附带行情快照，软TTL较短
+                'stale_ttl_hours': 72,
+                'max_files': 500,
+                'description': 'A股公司信息'
             }
         }
 
@@ -92,6 +131,14 @@ class StockDataCache:
             'enable_length_check': os.getenv('ENABLE_CACHE_LENGTH_CHECK', 'false').lower() == 'true'  # 文件缓存默认不限制
         }
 
+        # 容量预算：每类最多 max_files 个条目，全部条目合计不超过 TA_FILE_CACHE_MAX_MB，
+        # 超出时按最近访问时间淘汰（每写入 TA_FILE_CACHE_EVICTION_INTERVAL 次检查一次）
+        self.max_total_bytes = int(float(os.getenv('TA_FILE_CACHE_MAX_MB', '2048')) * 1024 * 1024)
+        self.eviction_check_interval = max(1, int(os.getenv('TA_FILE_CACHE_EVICTION_INTERVAL', '20')))
+        self._writes_since_eviction_check = 0
+        self._eviction_lock = threading.Lock()
+        self.eviction_stats = {'evictions': 0, 'evicted_bytes': 0, 'by_category': {}, 'last_run': None}
+
         logger.info(f"📁 缓存管理器初始化完成，缓存目录: {self.cache_dir}")
         logger.info(f"🗄️ 数据库缓存管理器初始化完成")
         logger.info(f"   美股数据: ✅ 已配置")
@@ -199,6 +246,8 @@ class StockDataCache:
             base_dir = self.china_news_dir if market_type == 'china' else self.us_news_dir
         elif data_type == "fundamentals":
             base_dir = self.china_fundamentals_dir if market_type == 'china' else self.us_fundamentals_dir
+        elif data_type == "company_info":
+            base_dir = self.china_company_info_dir if market_type == 'china' else self.us_company_info_dir
         else:
             base_dir = self.cache_dir
 
@@ -213,9 +262,209 @@ class StockDataCache:
         metadata_path = self._get_metadata_path(cache_key)
         metadata_path.parent.mkdir(parents=True, exist_ok=True)  # 确保目录存在
         metadata['cached_at'] = datetime.now().isoformat()
+        if not metadata.get('market_type') and metadata.get('symbol'):
+            metadata['market_type'] = self._determine_market_type(metadata['symbol'])
         
         with open(metadata_path, 'w', encoding='utf-8') as f:
             json.dump(metadata, f, ensure_ascii=False, indent=2)
+
+        try:
+            self.metadata_index.upsert(cache_key, metadata)
+        except Exception as e:
+            logger.warning(f"⚠️ 更新缓存元数据索引失败: {e}")
+
+        file_path = metadata.get('file_path')
+        if file_path and os.path.exists(file_path):
+            self.metrics.record_write('file', metadata.get('data_type'), metadata.get('market_type'),
+                                      os.path.getsize(file_path))
+
+        self._maybe_enforce_budgets()
+
+    def _maybe_enforce_budgets(self):
+        """摊销式容量检查：每写入 eviction_check_interval 次执行一次淘汰"""
+        self._writes_since_eviction_check += 1
+        if self._writes_since_eviction_check < self.eviction_check_interval:
+            return
+        self._writes_since_eviction_check = 0
+        try:
+            self.enforce_budgets()
+        except Exception as e:
+            logger.warning(f"⚠️ 缓存容量淘汰失败: {e}")
+
+    def _delete_cache_entries(self, entries: List[Dict[str, Any]]) -> List[str]:
+        """删除缓存条目的数据文件、元数据文件、索引记录和L1缓存，返回成功删除的缓存键"""
+        deleted_keys = []
+        for entry in entries:
+            cache_key = entry['cache_key']
+            try:
+                # 删除数据文件
+                data_file = Path(entry['file_path']) if entry.get('file_path') else None
+                if data_file and data_file.exists():
+                    data_file.unlink()
+
+                # 删除元数据文件
+                metadata_path = self._get_metadata_path(cache_key)
+                if metadata_path.exists():
+                    metadata_path.unlink()
+                deleted_keys.append(cache_key)
+
+            except Exception as e:
+                logger.warning(f"⚠️ 删除缓存条目时出错 {cache_key}: {e}")
+
+        self.metadata_index.remove(deleted_keys)
+        for cache_key in deleted_keys:
+            self.memory_cache.invalidate(('file', cache_key))
+        return deleted_keys
+
+    def _record_evictions(self, entries: List[Dict[str, Any]], deleted_keys: List[str]):
+        deleted = set(deleted_keys)
+        for entry in entries:
+            if entry['cache_key'] not in deleted:
+                continue
+            category = f"{entry.get('market_type')}_{entry.get('data_type')}"
+            self.eviction_stats['evictions'] += 1
+            self.eviction_stats['evicted_bytes'] += entry.get('size_bytes') or 0
+            by_category = self.eviction_stats['by_category']
+            by_category[category] = by_category.get(category, 0) + 1
+
+    def enforce_budgets(self) -> int:
+        """
+        按容量预算淘汰最近最少访问的缓存条目
+
+        先保证每类条目数不超过 cache_config 中的 max_files，
+        再保证全部条目的总字节数不超过 max_total_bytes。
+
+        Returns:
+            淘汰的条目数量
+        """
+        if not self._eviction_lock.acquire(blocking=False):
+            # 其他线程正在淘汰
+            return 0
+
+        try:
+            evicted = 0
+            for category, usage in self.metadata_index.get_category_usage().items():
+                max_files = self.cache_config.get(category, {}).get('max_files')
+                if not max_files or usage['entries'] <= max_files:
+                    continue
+                market_type, data_type = category.split('_', 1)
+                entries = self.metadata_index.find_least_recently_used(
+                    usage['entries'] - max_files, market_type=market_type, data_type=data_type)
+                deleted_keys = self._delete_cache_entries(entries)
+                self._record_evictions(entries, deleted_keys)
+                evicted += len(deleted_keys)
+
+            total_bytes = self.metadata_index.total_size()
+            while total_bytes > self.max_total_bytes:
+                entries = self.metadata_index.find_least_recently_used(100)
+                if not entries:
+                    break
+                over = total_bytes - self.max_total_bytes
+                batch, freed = [], 0
+                for entry in entries:
+                    batch.append(entry)
+                    freed += entry.get('size_bytes') or 0
+                    if freed >= over:
+                        break
+                deleted_keys = self._delete_cache_entries(batch)
+                if not deleted_keys:
+                    break
+                self._record_evictions(batch, deleted_keys)
+                evicted += len(deleted_keys)
+                total_bytes = self.metadata_index.total_size()
+
+            self.eviction_stats['last_run'] = datetime.now().isoformat()
+            if evicted:
+                logger.info(f"🧹 缓存超出容量预算，已淘汰 {evicted} 个最近最少访问的条目")
+            return evicted
+        finally:
+            self._eviction_lock.release()
+
+    def _find_indexed_cache_key(self, symbol: str, data_type: str, market_type: str,
+                                data_source: str = None, max_age_hours: float = None) -> Optional[str]:
+        """通过元数据索引查找最新的有效缓存键"""
+        min_cached_at = time.time() - max_age_hours * 3600 if max_age_hours is not None else None
+        candidates = self.metadata_index.find(symbol, data_type, market_type,
+                                              data_source=data_source,
+                                              min_cached_at=min_cached_at)
+        stale_keys = []
+        found = None
+        for cache_key in candidates:
+            if not self._get_metadata_path(cache_key).exists():
+                # 元数据文件已被外部删除，同步清理索引
+                stale_keys.append(cache_key)
+                continue
+            if max_age_hours is None or self.is_cache_valid(cache_key, max_age_hours, symbol, data_type):
+                found = cache_key
+                break
+
+        if stale_keys:
+            self.metadata_index.remove(stale_keys)
+        return found
+
+    def get_ttl_policy(self, symbol: str, data_type: str) -> Tuple[float, float]:
+        """
+        获取软/硬TTL（小时）
+
+        Returns:
+            (ttl_hours, stale_ttl_hours)，未配置 stale_ttl_hours 时两者相同
+        """
+        cache_type = f"{self._determine_market_type(symbol)}_{data_type}"
+        config = self.cache_config.get(cache_type, {})
+        soft_ttl = config.get('ttl_hours', 24)
+        return soft_ttl, max(soft_ttl, config.get('stale_ttl_hours', soft_ttl))
+
+    def find_latest_cache_entry(self, symbol: str, data_type: str, data_source: str = None,
+                                max_age_hours: float = None) -> Optional[Tuple[str, float]]:
+        """
+        查找最新的缓存条目及其缓存时长，用于 stale-while-revalidate
+
+        Args:
+            symbol: 股票代码
+            data_type: 数据类型
+            data_source: 数据源，None表示不限
+            max_age_hours: 最大缓存时长（小时），默认使用硬TTL
+
+        Returns:
+            (cache_key, age_hours)，没有符合条件的缓存时返回None
+        """
+        if max_age_hours is None:
+            max_age_hours = self.get_ttl_policy(symbol, data_type)[1]
+        market_type = self._determine_market_type(symbol)
+        min_cached_at = time.time() - max_age_hours * 3600
+
+        stale_keys = []
+        found = None
+        for cache_key in self.metadata_index.find(symbol, data_type, market_type,
+                                                  data_source=data_source,
+                                                  min_cached_at=min_cached_at):
+            metadata = self._load_metadata(cache_key)
+            if not metadata:
+                stale_keys.append(cache_key)
+                continue
+            age = datetime.now() - datetime.fromisoformat(metadata['cached_at'])
+            found = (cache_key, age.total_seconds() / 3600)
+            break
+
+        if stale_keys:
+            self.metadata_index.remove(stale_keys)
+        return found
+
+    def find_cache_keys(self, symbol: str, data_type: str, market_type: str = None,
+                        data_source: str = None) -> List[str]:
+        """
+        列出某只股票的全部缓存键（不考虑TTL），按缓存时间从新到旧排序
+
+        Args:
+            symbol: 股票代码
+            data_type: 数据类型（stock_data/news/fundamentals）
+            market_type: 市场类型，None表示不限
+            data_source: 数据源，None表示不限
+
+        Returns:
+            缓存键列表
+        """
+        return self.metadata_index.find(symbol, data_type, market_type, data_source=data_source)
     
     def _load_metadata(self, cache_key: str) -> Optional[Dict[str, Any]]:
         """加载元数据"""
@@ -302,14 +551,25 @@ class StockDataCache:
 
         # 保存数据
         if isinstance(data, pd.DataFrame):
-            cache_path = self._get_cache_path("stock_data", cache_key, "csv", symbol)
-            cache_path.parent.mkdir(parents=True, exist_ok=True)  # 确保目录存在
-            data.to_csv(cache_path, index=True)
+            serializer = self.dataframe_serializer
+            cache_path = self._get_cache_path("stock_data", cache_key, serializer.extension, symbol)
+            serializer, cache_path = dump_dataframe(serializer, data, cache_path)
+            file_format = serializer.name
         else:
             cache_path = self._get_cache_path("stock_data", cache_key, "txt", symbol)
             cache_path.parent.mkdir(parents=True, exist_ok=True)  # 确保目录存在
             with open(cache_path, 'w', encoding='utf-8') as f:
                 f.write(str(data))
+            file_format = 'txt'
+
+        # 同一缓存键的数据格式变化时（如 arrow 退回 csv、DataFrame 变为文本），删除旧数据文件
+        old_metadata = self._load_metadata(cache_key)
+        old_path = old_metadata.get('file_path') if old_metadata else None
+        if old_path and Path(old_path) != cache_path and os.path.exists(old_path):
+            try:
+                os.remove(old_path)
+            except OSError as e:
+                logger.warning(f"⚠️ 删除旧缓存文件失败 {old_path}: {e}")
 
         # 保存元数据
         metadata = {
@@ -320,10 +580,11 @@ class StockDataCache:
             'end_date': end_date,
             'data_source': data_source,
             'file_path': str(cache_path),
-            'file_format': 'csv' if isinstance(data, pd.DataFrame) else 'txt',
+            'file_format': file_format,
             'content_length': len(content_to_check)
         }
         self._save_metadata(cache_key, metadata)
+        self.memory_cache.invalidate(('file', cache_key))
 
         # 获取描述信息
         cache_type = f"{market_type}_stock_data"
@@ -331,25 +592,65 @@ class StockDataCache:
         logger.info(f"💾 {desc}已缓存: {symbol} ({data_source}) -> {cache_key}")
         return cache_key
     
-    def load_stock_data(self, cache_key: str) -> Optional[Union[pd.DataFrame, str]]:
-        """从缓存加载股票数据"""
+    def _load_entry(self, cache_key: str, data_type: str,
+                    read_file: Callable[[Path, Dict[str, Any]], Any], desc: str) -> Any:
+        """
+        按 L1 -> 文件 的顺序加载缓存条目，并记录命中、耗时和读取字节数
+
+        Args:
+            cache_key: 缓存键
+            data_type: 数据类型（用于指标维度）
+            read_file: 从数据文件读取数据的函数 read_file(path, metadata)
+            desc: 日志中的数据描述
+        """
+        started = time.perf_counter()
+        market_type = self._determine_market_type(cache_key.split('_', 1)[0])
+
+        cached = self.memory_cache.get(('file', cache_key))
+        if cached is not None:
+            self.metadata_index.touch(cache_key)
+            self.metrics.record_lookup('memory', data_type, market_type, hit=True,
+                                       seconds=time.perf_counter() - started)
+            return cached
+        if self.memory_cache.enabled:
+            self.metrics.record_lookup('memory', data_type, market_type, hit=False)
+
         metadata = self._load_metadata(cache_key)
-        if not metadata:
-            return None
-        
-        cache_path = Path(metadata['file_path'])
-        if not cache_path.exists():
+        cache_path = Path(metadata['file_path']) if metadata else None
+        if cache_path is None or not cache_path.exists():
+            self.metrics.record_lookup('file', data_type, market_type, hit=False,
+                                       seconds=time.perf_counter() - started)
             return None
-        
+
         try:
-            if metadata['file_format'] == 'csv':
-                return pd.read_csv(cache_path, index_col=0)
-            else:
-                with open(cache_path, 'r', encoding='utf-8') as f:
-                    return f.read()
+            decode_started = time.perf_counter()
+            data = read_file(cache_path, metadata)
+            finished = time.perf_counter()
+            self.metrics.record_decode('file', data_type, market_type, finished - decode_started)
+            self.metrics.record_lookup('file', data_type, market_type, hit=True, seconds=finished - started,
+                                       bytes_read=cache_path.stat().st_size)
+            self.memory_cache.set(('file', cache_key), data, tags=(metadata.get('symbol', ''),))
+            self.metadata_index.touch(cache_key)
+            return data
         except Exception as e:
-            logger.error(f"⚠️ 加载缓存数据失败: {e}")
+            logger.error(f"⚠️ 加载{desc}失败: {e}")
+            self.metrics.record_lookup('file', data_type, market_type, hit=False,
+                                       seconds=time.perf_counter() - started)
             return None
+
+    @staticmethod
+    def _read_text_file(cache_path: Path, metadata: Dict[str, Any]) -> str:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def load_stock_data(self, cache_key: str) -> Optional[Union[pd.DataFrame, str]]:
+        """从缓存加载股票数据"""
+        def read_file(cache_path: Path, metadata: Dict[str, Any]):
+            if is_dataframe_format(metadata['file_format']):
+                return get_serializer(metadata['file_format']).load(cache_path)
+            return self._read_text_file(cache_path, metadata)
+
+        return self._load_entry(cache_key, 'stock_data', read_file, '缓存数据')
     
     def find_cached_stock_data(self, symbol: str, start_date: str = None,
                               end_date: str = None, data_source: str = None,
@@ -387,27 +688,18 @@ class StockDataCache:
             logger.info(f"🎯 找到精确匹配的{desc}: {symbol} -> {search_key}")
             return search_key
 
-        # 如果没有精确匹配，查找部分匹配（相同股票代码的其他缓存）
-        for metadata_file in self.metadata_dir.glob(f"*_meta.json"):
-            try:
-                with open(metadata_file, 'r', encoding='utf-8') as f:
-                    metadata = json.load(f)
-
-                if (metadata.get('symbol') == symbol and
-                    metadata.get('data_type') == 'stock_data' and
-                    metadata.get('market_type') == market_type and
-                    (data_source is None or metadata.get('data_source') == data_source)):
-
-                    cache_key = metadata_file.stem.replace('_meta', '')
-                    if self.is_cache_valid(cache_key, max_age_hours, symbol, 'stock_data'):
-                        desc = self.cache_config.get(f"{market_type}_stock_data", {}).get('description', '数据')
-                        logger.info(f"📋 找到部分匹配的{desc}: {symbol} -> {cache_key}")
-                        return cache_key
-            except Exception:
-                continue
+        # 如果没有精确匹配，通过元数据索引查找部分匹配（相同股票代码的其他缓存）
+        cache_key = self._find_indexed_cache_key(symbol, 'stock_data', market_type,
+                                                 data_source=data_source,
+                                                 max_age_hours=max_age_hours)
+        if cache_key:
+            desc = self.cache_config.get(f"{market_type}_stock_data", {}).get('description', '数据')
+            logger.info(f"📋 找到部分匹配的{desc}: {symbol} -> {cache_key}")
+            return cache_key
 
         desc = self.cache_config.get(f"{market_type}_stock_data", {}).get('description', '数据')
         logger.error(f"❌ 未找到有效的{desc}缓存: {symbol}")
+        self.metrics.record_lookup('file', 'stock_data', market_type, hit=False)
         return None
     
     def save_news_data(self, symbol: str, news_data: str, 
@@ -446,6 +738,7 @@ class StockDataCache:
             'content_length': len(news_data)
         }
         self._save_metadata(cache_key, metadata)
+        self.memory_cache.invalidate(('file', cache_key))
         
         logger.info(f"📰 新闻数据已缓存: {symbol} ({data_source}) -> {cache_key}")
         return cache_key
@@ -486,6 +779,7 @@ class StockDataCache:
             'content_length': len(fundamentals_data)
         }
         self._save_metadata(cache_key, metadata)
+        self.memory_cache.invalidate(('file', cache_key))
         
         desc = self.cache_config.get(f"{market_type}_fundamentals", {}).get('description', '基本面数据')
         logger.info(f"💼 {desc}已缓存: {symbol} ({data_source}) -> {cache_key}")
@@ -493,21 +787,54 @@ class StockDataCache:
     
     def load_fundamentals_data(self, cache_key: str) -> Optional[str]:
         """从缓存加载基本面数据"""
-        metadata = self._load_metadata(cache_key)
-        if not metadata:
-            return None
-        
-        cache_path = Path(metadata['file_path'])
-        if not cache_path.exists():
-            return None
-        
-        try:
-            with open(cache_path, 'r', encoding='utf-8') as f:
-                return f.read()
-        except Exception as e:
-            logger.error(f"⚠️ 加载基本面缓存数据失败: {e}")
-            return None
+        return self._load_entry(cache_key, 'fundamentals', self._read_text_file, '基本面缓存数据')
     
+    def save_company_info(self, symbol: str, info: Dict[str, Any], data_source: str = "unknown") -> str:
+        """
+        保存公司基本信息到缓存
+
+        Args:
+            symbol: 股票代码
+            info: 公司信息字典
+            data_source: 数据源
+
+        Returns:
+            cache_key: 缓存键
+        """
+        market_type = self._determine_market_type(symbol)
+        cache_key = self._generate_cache_key("company_info", symbol,
+                                             source=data_source,
+                                             market=market_type)
+
+        cache_path = self._get_cache_path("company_info", cache_key, "json", symbol)
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(cache_path, 'w', encoding='utf-8') as f:
+            json.dump(info, f, ensure_ascii=False, default=str)
+
+        metadata = {
+            'symbol': symbol,
+            'data_type': 'company_info',
+            'data_source': data_source,
+            'market_type': market_type,
+            'file_path': str(cache_path),
+            'file_format': 'json'
+        }
+        self._save_metadata(cache_key, metadata)
+        self.memory_cache.invalidate(('file', cache_key))
+
+        desc = self.cache_config.get(f"{market_type}_company_info", {}).get('description', '公司信息')
+        logger.info(f"🏢 {desc}已缓存: {symbol} ({data_source}) -> {cache_key}")
+        return cache_key
+
+    def load_company_info(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """从缓存加载公司基本信息"""
+        def read_file(cache_path: Path, metadata: Dict[str, Any]) -> Dict[str, Any]:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+
+        info = self._load_entry(cache_key, 'company_info', read_file, '公司信息缓存')
+        return dict(info) if info is not None else None
+
     def find_cached_fundamentals_data(self, symbol: str, data_source: str = None,
                                     max_age_hours: int = None) -> Optional[str]:
         """
@@ -528,55 +855,74 @@ class StockDataCache:
             cache_type = f"{market_type}_fundamentals"
             max_age_hours = self.cache_config.get(cache_type, {}).get('ttl_hours', 24)
         
-        # 查找匹配的缓存
-        for metadata_file in self.metadata_dir.glob(f"*_meta.json"):
-            try:
-                with open(metadata_file, 'r', encoding='utf-8') as f:
-                    metadata = json.load(f)
-                
-                if (metadata.get('symbol') == symbol and
-                    metadata.get('data_type') == 'fundamentals' and
-                    metadata.get('market_type') == market_type and
-                    (data_source is None or metadata.get('data_source') == data_source)):
-                    
-                    cache_key = metadata_file.stem.replace('_meta', '')
-                    if self.is_cache_valid(cache_key, max_age_hours, symbol, 'fundamentals'):
-                        desc = self.cache_config.get(f"{market_type}_fundamentals", {}).get('description', '基本面数据')
-                        logger.info(f"🎯 找到匹配的{desc}缓存: {symbol} ({data_source}) -> {cache_key}")
-                        return cache_key
-            except Exception:
-                continue
-        
+        # 通过元数据索引查找匹配的缓存
+        cache_key = self._find_indexed_cache_key(symbol, 'fundamentals', market_type,
+                                                 data_source=data_source,
+                                                 max_age_hours=max_age_hours)
+        if cache_key:
+            desc = self.cache_config.get(f"{market_type}_fundamentals", {}).get('description', '基本面数据')
+            logger.info(f"🎯 找到匹配的{desc}缓存: {symbol} ({data_source}) -> {cache_key}")
+            return cache_key
+
         desc = self.cache_config.get(f"{market_type}_fundamentals", {}).get('description', '基本面数据')
         logger.error(f"❌ 未找到有效的{desc}缓存: {symbol} ({data_source})")
+        self.metrics.record_lookup('file', 'fundamentals', market_type, hit=False)
         return None
     
     def clear_old_cache(self, max_age_days: int = 7):
         """清理过期缓存"""
         cutoff_time = datetime.now() - timedelta(days=max_age_days)
-        cleared_count = 0
-        
-        for metadata_file in self.metadata_dir.glob("*_meta.json"):
+        cleared_keys = self._delete_cache_entries(self.metadata_index.find_older_than(cutoff_time.timestamp()))
+        logger.info(f"🧹 已清理 {len(cleared_keys)} 个过期缓存文件")
+        return len(cleared_keys)
+
+    def migrate_dataframe_cache(self, target_format: str = None, source_format: str = 'csv') -> int:
+        """
+        将已缓存的 DataFrame 转换为新的序列化格式
+
+        Args:
+            target_format: 目标格式（csv/parquet/arrow），None时使用当前默认格式
+            source_format: 需要转换的旧格式，默认 csv
+
+        Returns:
+            转换成功的条目数量
+        """
+        target = get_serializer(target_format) if target_format else self.dataframe_serializer
+        if target.name == source_format:
+            logger.info(f"ℹ️ 目标格式与源格式相同({source_format})，无需迁移")
+            return 0
+
+        source = get_serializer(source_format)
+        migrated = 0
+        for cache_key in self.metadata_index.find_by_format(source_format):
+            metadata = self._load_metadata(cache_key)
+            if not metadata:
+                continue
+
+            old_path = Path(metadata['file_path'])
+            if not old_path.exists():
+                continue
+
             try:
-                with open(metadata_file, 'r', encoding='utf-8') as f:
-                    metadata = json.load(f)
-                
-                cached_at = datetime.fromisoformat(metadata['cached_at'])
-                if cached_at < cutoff_time:
-                    # 删除数据文件
-                    data_file = Path(metadata['file_path'])
-                    if data_file.exists():
-                        data_file.unlink()
-                    
-                    # 删除元数据文件
-                    metadata_file.unlink()
-                    cleared_count += 1
-                    
+                df = source.load(old_path)
+                new_path = old_path.with_suffix(f".{target.extension}")
+                target.dump(df, new_path)
+
+                # 保留原缓存时间，避免迁移刷新TTL
+                metadata['file_path'] = str(new_path)
+                metadata['file_format'] = target.name
+                with open(self._get_metadata_path(cache_key), 'w', encoding='utf-8') as f:
+                    json.dump(metadata, f, ensure_ascii=False, indent=2)
+                self.metadata_index.upsert(cache_key, metadata)
+
+                old_path.unlink()
+                migrated += 1
             except Exception as e:
-                logger.warning(f"⚠️ 清理缓存时出错: {e}")
-        
-        logger.info(f"🧹 已清理 {cleared_count} 个过期缓存文件")
-    
+                logger.warning(f"⚠️ 迁移缓存失败 {cache_key}: {e}")
+
+        logger.info(f"🔄 已将 {migrated} 个缓存从 {source_format} 迁移为 {target.name}")
+        return migrated
+
     def get_cache_stats(self) -> Dict[str, Any]:
         """获取缓存统计信息"""
         stats = {
@@ -591,35 +937,21 @@ class StockDataCache:
 
         total_size_bytes = 0
 
-        # 统计有元数据的缓存文件
+        # 统计有元数据的缓存文件（来自元数据索引）
         metadata_files_count = 0
-        for metadata_file in self.metadata_dir.glob("*_meta.json"):
-            try:
-                with open(metadata_file, 'r', encoding='utf-8') as f:
-                    metadata = json.load(f)
-
-                data_type = metadata.get('data_type', 'unknown')
-                if data_type == 'stock_data':
-                    stats['stock_data_count'] += 1
-                elif data_type == 'news':
-                    stats['news_count'] += 1
-                elif data_type == 'fundamentals':
-                    stats['fundamentals_count'] += 1
-
-                # 检查是否为跳过的缓存（没有实际文件）
-                data_file = Path(metadata.get('file_path', ''))
-                if not data_file.exists():
-                    stats['skipped_count'] += 1
-                else:
-                    # 计算文件大小（字节）
-                    file_size = data_file.stat().st_size
-                    total_size_bytes += file_size
-
-                stats['total_files'] += 1
-                metadata_files_count += 1
-
-            except Exception:
-                continue
+        for data_type, type_stats in self.metadata_index.get_stats().items():
+            if data_type == 'stock_data':
+                stats['stock_data_count'] += type_stats['entries']
+            elif data_type == 'news':
+                stats['news_count'] += type_stats['entries']
+            elif data_type == 'fundamentals':
+                stats['fundamentals_count'] += type_stats['entries']
+
+            # 跳过的缓存（没有实际文件）
+            stats['skipped_count'] += type_stats['skipped']
+            total_size_bytes += type_stats['size_bytes']
+            stats['total_files'] += type_stats['entries']
+            metadata_files_count += type_stats['entries']
 
         # 如果没有元数据文件，则直接统计缓存目录中的文件（兼容旧缓存）
         if metadata_files_count == 0:
@@ -654,6 +986,18 @@ class StockDataCache:
 
         stats['total_size'] = total_size_bytes  # 字节
         stats['total_size_mb'] = round(total_size_bytes / (1024 * 1024), 2)  # MB
+
+        # 容量预算与淘汰统计
+        stats['max_total_size_mb'] = round(self.max_total_bytes / (1024 * 1024), 2)
+        stats['categories'] = {
+            category: {**usage, 'max_files': self.cache_config.get(category, {}).get('max_files')}
+            for category, usage in self.metadata_index.get_category_usage().items()
+        }
+        stats['evictions'] = self.eviction_stats['evictions']
+        stats['evicted_size_mb'] = round(self.eviction_stats['evicted_bytes'] / (1024 * 1024), 2)
+        stats['evictions_by_category'] = dict(self.eviction_stats['by_category'])
+
+        stats['memory_cache'] = self.memory_cache.get_stats()
         return stats
 
     def get_content_length_config_status(self) -> Dict[str, Any]:
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+进程内 L1 缓存
+位于 Redis / MongoDB / 文件缓存之前，保存已经反序列化的对象（DataFrame、字符串等），
+按条目数和字节数双重限制，LRU 淘汰 + TTL 过期。
+
+配置（环境变量）：
+    TA_MEMORY_CACHE_ENABLED=true        # 是否启用（默认启用）
+    TA_MEMORY_CACHE_MAX_ENTRIES=512     # 最大条目数
+    TA_MEMORY_CACHE_MAX_MB=256          # 最大占用内存（MB，估算值）
+    TA_MEMORY_CACHE_TTL_SECONDS=300     # 默认过期时间（秒）
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Optional, Tuple
+
+import pandas as pd
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+
+def estimate_size(value: Any) -> int:
+    """估算对象占用的字节数"""
+    try:
+        if isinstance(value, pd.DataFrame):
+            return int(value.memory_usage(index=True, deep=True).sum())
+        if isinstance(value, pd.Series):
+            return int(value.memory_usage(index=True, deep=True))
+        if isinstance(value, (str, bytes, bytearray)):
+            return sys.getsizeof(value)
+        if isinstance(value, dict):
+            return sys.getsizeof(value) + sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+        if isinstance(value, (list, tuple)):
+            return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+        return sys.getsizeof(value)
+    except Exception:
+        return sys.getsizeof(value)
+
+
+def _copy_value(value: Any) -> Any:
+    """DataFrame/Series 返回副本，防止调用方原地修改缓存中的对象"""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy()
+    return value
+
+
+class MemoryCache:
+    """按条目数和字节数限制的线程安全 LRU + TTL 缓存"""
+
+    def __init__(self, max_entries: int = 512, max_bytes: int = 256 * 1024 * 1024,
+                 default_ttl: float = 300, enabled: bool = True):
+        """
+        初始化进程内缓存
+
+        Args:
+            max_entries: 最大条目数
+            max_bytes: 最大字节数（估算）
+            default_ttl: 默认过期时间（秒）
+            enabled: 是否启用
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.enabled = enabled
+
+        # key -> (value, expires_at, size, tags)
+        self._data: "OrderedDict[Hashable, Tuple[Any, float, int, Tuple[str, ...]]]" = OrderedDict()
+        self._tags: Dict[str, set] = {}
+        self._bytes = 0
+        self._lock = threading.RLock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @classmethod
+    def from_env(cls) -> "MemoryCache":
+        """根据环境变量创建缓存实例"""
+        return cls(
+            max_entries=int(os.getenv("TA_MEMORY_CACHE_MAX_ENTRIES", "512")),
+            max_bytes=int(float(os.getenv("TA_MEMORY_CACHE_MAX_MB", "256")) * 1024 * 1024),
+            default_ttl=float(os.getenv("TA_MEMORY_CACHE_TTL_SECONDS", "300")),
+            enabled=os.getenv("TA_MEMORY_CACHE_ENABLED", "true").lower() in ("true", "1", "yes", "on"),
+        )
+
+    # ==================== 内部操作（调用方持有锁） ====================
+
+    def _remove(self, key: Hashable):
+        _, _, size, tags = self._data.pop(key)
+        self._bytes -= size
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def _evict_if_needed(self):
+        while self._data and (len(self._data) > self.max_entries or self._bytes > self.max_bytes):
+            oldest_key = next(iter(self._data))
+            self._remove(oldest_key)
+            self.evictions += 1
+
+    # ==================== 公共接口 ====================
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """读取缓存，未命中或过期时返回 default"""
+        if not self.enabled:
+            return default
+
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            value, expires_at, _, _ = entry
+            if expires_at and expires_at < time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return _copy_value(value)
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None, tags: Iterable[str] = ()):
+        """
+        写入缓存
+
+        Args:
+            key: 缓存键
+            value: 缓存值（None 不缓存）
+            ttl: 过期时间（秒），None 使用默认值，0 表示不过期
+            tags: 标签，用于按标签批量失效（例如股票代码）
+        """
+        if not self.enabled or value is None:
+            return
+
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            # 单个对象超过总预算，不进入 L1
+            return
+
+        ttl = self.default_ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl else 0
+        tags = tuple(tags)
+
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = (_copy_value(value), expires_at, size, tags)
+            self._bytes += size
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            self._evict_if_needed()
+
+    def invalidate(self, key: Hashable):
+        """删除指定键"""
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+                self.invalidations += 1
+
+    def invalidate_tag(self, tag: str):
+        """删除带有指定标签的所有键"""
+        with self._lock:
+            for key in list(self._tags.get(tag, ())):
+                if key in self._data:
+                    self._remove(key)
+                    self.invalidations += 1
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._data.clear()
+            self._tags.clear()
+            self._bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取命中/未命中/淘汰统计"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'entries': len(self._data),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+            }
+
+
+# 全局进程内缓存实例
+_memory_cache = None
+_memory_cache_lock = threading.Lock()
+
+
+def get_memory_cache() -> MemoryCache:
+    """获取全局进程内缓存实例"""
+    global _memory_cache
+    if _memory_cache is None:
+        with _memory_cache_lock:
+            if _memory_cache is None:
+                _memory_cache = MemoryCache.from_env()
+                logger.info(
+                    f"🧠 进程内L1缓存: {'✅ 已启用' if _memory_cache.enabled else '❌ 未启用'} "
+                    f"(max_entries={_memory_cache.max_entries}, max_mb={_memory_cache.max_bytes // (1024 * 1024)})"
+                )
+    return _memory_cache
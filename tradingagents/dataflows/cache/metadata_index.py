@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+"""
+文件缓存元数据索引
+使用内嵌 SQLite 表索引 *_meta.json，避免每次未命中都遍历并解析全部元数据文件；
+同时记录最近访问时间，供按容量预算的 LRU 淘汰使用
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+
+# 索引结构版本，结构变化时递增以触发重建
+INDEX_SCHEMA_VERSION = 2
+
+# 访问时间先缓冲在内存中，累积到该数量后批量写入
+_TOUCH_FLUSH_THRESHOLD = 100
+
+# 旧版元数据可能缺少 market_type/data_type，按数据文件所在目录（如 china_news）推断
+_DIR_DATA_TYPES = {
+    'stocks': 'stock_data',
+    'news': 'news',
+    'fundamentals': 'fundamentals',
+    'company_info': 'company_info',
+}
+
+
+class CacheMetadataIndex:
+    """
+    文件缓存元数据索引
+
+    每个缓存条目一行，按 (symbol, data_type, market_type, data_source) 与 cached_at 建索引。
+    *_meta.json 仍然是权威数据，索引可随时从元数据文件重建。
+    """
+
+    _COLUMNS = (
+        'cache_key', 'symbol', 'data_type', 'market_type', 'data_source',
+        'start_date', 'end_date', 'file_path', 'file_format',
+        'content_length', 'size_bytes', 'cached_at', 'last_access',
+    )
+
+    def __init__(self, index_path: Path):
+        """
+        初始化元数据索引
+
+        Args:
+            index_path: SQLite 索引文件路径
+        """
+        self.index_path = Path(index_path)
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.index_path), check_same_thread=False, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        self._pending_touches: Dict[str, float] = {}
+        self._init_schema()
+
+    def _init_schema(self):
+        """创建表结构和索引"""
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS index_info (key TEXT PRIMARY KEY, value TEXT)"
+            )
+            row = self._conn.execute(
+                "SELECT value FROM index_info WHERE key = 'schema_version'"
+            ).fetchone()
+            if row is not None and int(row['value']) != INDEX_SCHEMA_VERSION:
+                # 结构不兼容：丢弃旧索引，稍后从元数据文件重建
+                self._conn.execute("DROP TABLE IF EXISTS cache_entries")
+                self._conn.execute("DELETE FROM index_info")
+
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS cache_entries (
+                    cache_key TEXT PRIMARY KEY,
+                    symbol TEXT,
+                    data_type TEXT,
+                    market_type TEXT,
+                    data_source TEXT,
+                    start_date TEXT,
+                    end_date TEXT,
+                    file_path TEXT,
+                    file_format TEXT,
+                    content_length INTEGER,
+                    size_bytes INTEGER,
+                    cached_at REAL,
+                    last_access REAL
+                )
+            """)
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_cache_lookup "
+                "ON cache_entries (symbol, data_type, market_type, data_source, cached_at)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_cache_cached_at ON cache_entries (cached_at)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_cache_lru "
+                "ON cache_entries (market_type, data_type, last_access)"
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO index_info (key, value) VALUES ('schema_version', ?)",
+                (str(INDEX_SCHEMA_VERSION),)
+            )
+
+    @staticmethod
+    def _to_timestamp(cached_at: Any) -> float:
+        """将元数据中的 cached_at 转换为时间戳"""
+        if isinstance(cached_at, (int, float)):
+            return float(cached_at)
+        if isinstance(cached_at, datetime):
+            return cached_at.timestamp()
+        if cached_at:
+            return datetime.fromisoformat(str(cached_at)).timestamp()
+        return time.time()
+
+    @staticmethod
+    def _infer_category(file_path: str, symbol: Any) -> tuple:
+        """从数据文件目录推断 (market_type, data_type)，目录无法识别时按股票代码推断市场"""
+        market_type, data_type = None, None
+        if file_path:
+            market, _, kind = Path(file_path).parent.name.partition('_')
+            if market in ('china', 'us') and kind in _DIR_DATA_TYPES:
+                market_type, data_type = market, _DIR_DATA_TYPES[kind]
+        if market_type is None and symbol:
+            market_type = 'china' if str(symbol).isdigit() and len(str(symbol)) == 6 else 'us'
+        return market_type, data_type
+
+    def _row_from_metadata(self, cache_key: str, metadata: Dict[str, Any]) -> tuple:
+        """把元数据字典转换为索引行"""
+        file_path = metadata.get('file_path') or ''
+        market_type = metadata.get('market_type')
+        data_type = metadata.get('data_type')
+        if not market_type or not data_type:
+            inferred_market, inferred_type = self._infer_category(file_path, metadata.get('symbol'))
+            market_type = market_type or inferred_market
+            data_type = data_type or inferred_type
+        size_bytes = None
+        if file_path:
+            try:
+                size_bytes = Path(file_path).stat().st_size
+            except OSError:
+                # 数据文件不存在（例如因内容过长被跳过）
+                size_bytes = None
+
+        cached_at = self._to_timestamp(metadata.get('cached_at'))
+        return (
+            cache_key,
+            metadata.get('symbol'),
+            data_type,
+            market_type,
+            metadata.get('data_source'),
+            metadata.get('start_date'),
+            metadata.get('end_date'),
+            file_path,
+            metadata.get('file_format'),
+            metadata.get('content_length'),
+            size_bytes,
+            cached_at,
+            cached_at,  # 写入即视为一次访问
+        )
+
+    # ==================== 写入 ====================
+
+    def upsert(self, cache_key: str, metadata: Dict[str, Any]):
+        """写入或更新一条索引记录"""
+        row = self._row_from_metadata(cache_key, metadata)
+        placeholders = ', '.join('?' for _ in self._COLUMNS)
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO cache_entries ({', '.join(self._COLUMNS)}) VALUES ({placeholders})",
+                row
+            )
+
+    def remove(self, cache_keys: Iterable[str]):
+        """删除索引记录"""
+        keys = [(k,) for k in cache_keys]
+        if not keys:
+            return
+        with self._lock, self._conn:
+            for (k,) in keys:
+                self._pending_touches.pop(k, None)
+            self._conn.executemany("DELETE FROM cache_entries WHERE cache_key = ?", keys)
+
+    def touch(self, cache_key: str, accessed_at: float = None):
+        """记录一次读取（缓冲在内存中，批量写入）"""
+        with self._lock:
+            self._pending_touches[cache_key] = accessed_at or time.time()
+            if len(self._pending_touches) >= _TOUCH_FLUSH_THRESHOLD:
+                self.flush_touches()
+
+    def flush_touches(self):
+        """把缓冲的访问时间写入索引"""
+        with self._lock:
+            if not self._pending_touches:
+                return
+            touches = [(ts, k) for k, ts in self._pending_touches.items()]
+            self._pending_touches.clear()
+            with self._conn:
+                self._conn.executemany(
+                    "UPDATE cache_entries SET last_access = MAX(COALESCE(last_access, 0), ?) WHERE cache_key = ?",
+                    touches
+                )
+
+    def is_built(self) -> bool:
+        """索引是否已经从元数据文件构建过"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM index_info WHERE key = 'built_at'"
+            ).fetchone()
+        return row is not None
+
+    def rebuild(self, metadata_dir: Path) -> int:
+        """
+        从元数据文件重建索引
+
+        Args:
+            metadata_dir: *_meta.json 所在目录
+
+        Returns:
+            索引的条目数量
+        """
+        rows = []
+        for metadata_file in Path(metadata_dir).glob("*_meta.json"):
+            try:
+                with open(metadata_file, 'r', encoding='utf-8') as f:
+                    metadata = json.load(f)
+                cache_key = metadata_file.name[:-len("_meta.json")]
+                rows.append(self._row_from_metadata(cache_key, metadata))
+            except Exception as e:
+                logger.debug(f"跳过无法解析的元数据文件 {metadata_file}: {e}")
+                continue
+
+        placeholders = ', '.join('?' for _ in self._COLUMNS)
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM cache_entries")
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO cache_entries ({', '.join(self._COLUMNS)}) VALUES ({placeholders})",
+                rows
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO index_info (key, value) VALUES ('built_at', ?)",
+                (datetime.now().isoformat(),)
+            )
+
+        logger.info(f"🗂️ 缓存元数据索引已重建: {len(rows)} 条记录")
+        return len(rows)
+
+    # ==================== 查询 ====================
+
+    def find(self, symbol: str, data_type: str, market_type: str = None,
+             data_source: str = None, min_cached_at: float = None) -> List[str]:
+        """
+        查找匹配的缓存键，按缓存时间从新到旧排序
+
+        Args:
+            symbol: 股票代码
+            data_type: 数据类型
+            market_type: 市场类型，None表示不限
+            data_source: 数据源，None表示不限
+            min_cached_at: 最早缓存时间戳，None表示不限（即包含过期条目）
+
+        Returns:
+            缓存键列表
+        """
+        sql = "SELECT cache_key FROM cache_entries WHERE symbol = ? AND data_type = ?"
+        params: List[Any] = [symbol, data_type]
+        if market_type is not None:
+            sql += " AND market_type = ?"
+            params.append(market_type)
+        if data_source is not None:
+            sql += " AND data_source = ?"
+            params.append(data_source)
+        if min_cached_at is not None:
+            sql += " AND cached_at >= ?"
+            params.append(min_cached_at)
+        sql += " ORDER BY cached_at DESC"
+
+        with self._lock:
+            return [row['cache_key'] for row in self._conn.execute(sql, params)]
+
+    def find_by_format(self, file_format: str) -> List[str]:
+        """查找指定文件格式的缓存键"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT cache_key FROM cache_entries WHERE file_format = ?",
+                (file_format,)
+            ).fetchall()
+        return [row['cache_key'] for row in rows]
+
+    def find_older_than(self, cutoff: float) -> List[Dict[str, Any]]:
+        """查找缓存时间早于 cutoff 的条目"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT cache_key, file_path, size_bytes, market_type, data_type FROM cache_entries WHERE cached_at < ?",
+                (cutoff,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def get_category_usage(self) -> Dict[str, Dict[str, int]]:
+        """按 {market_type}_{data_type} 汇总条目数和字节数"""
+        with self._lock:
+            rows = self._conn.execute("""
+                SELECT market_type, data_type,
+                       COUNT(*) AS entries,
+                       COALESCE(SUM(size_bytes), 0) AS size_bytes
+                FROM cache_entries
+                GROUP BY market_type, data_type
+            """).fetchall()
+        return {
+            f"{row['market_type']}_{row['data_type']}": {'entries': row['entries'], 'size_bytes': row['size_bytes']}
+            for row in rows
+        }
+
+    def find_least_recently_used(self, limit: int, market_type: str = None,
+                                 data_type: str = None) -> List[Dict[str, Any]]:
+        """
+        按最近访问时间从旧到新返回条目
+
+        Args:
+            limit: 最多返回条目数
+            market_type: 市场类型，None表示不限
+            data_type: 数据类型，None表示不限
+
+        Returns:
+            包含 cache_key、file_path、size_bytes、market_type、data_type 的字典列表
+        """
+        sql = "SELECT cache_key, file_path, size_bytes, market_type, data_type FROM cache_entries"
+        conditions, params = [], []
+        if market_type is not None:
+            conditions.append("market_type = ?")
+            params.append(market_type)
+        if data_type is not None:
+            conditions.append("data_type = ?")
+            params.append(data_type)
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY last_access ASC LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            self.flush_touches()
+            rows = self._conn.execute(sql, params).fetchall()
+        return [dict(row) for row in rows]
+
+    def total_size(self) -> int:
+        """所有条目的数据文件总字节数"""
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM cache_entries").fetchone()[0]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """按数据类型汇总条目数、字节数和跳过数"""
+        with self._lock:
+            rows = self._conn.execute("""
+                SELECT data_type,
+                       COUNT(*) AS entries,
+                       COALESCE(SUM(size_bytes), 0) AS size_bytes,
+                       SUM(CASE WHEN size_bytes IS NULL THEN 1 ELSE 0 END) AS skipped
+                FROM cache_entries
+                GROUP BY data_type
+            """).fetchall()
+        return {row['data_type']: dict(row) for row in rows}
+
+    def count(self) -> int:
+        """索引中的条目总数"""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM cache_entries").fetchone()[0]
+
+    def close(self):
+        """关闭索引连接"""
+        with self._lock:
+            try:
+                self.flush_touches()
+            except sqlite3.Error:
+                pass
+            self._conn.close()
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+缓存观测指标
+统一记录各缓存后端按 (backend, data_type, market) 维度的：
+- 命中/未命中次数
+- 查找与解码耗时（p50/p95，基于最近的采样）
+- 读取与写入字节数
+
+使用方法：
+    from tradingagents.dataflows.cache.metrics import get_cache_metrics
+    metrics = get_cache_metrics()
+    metrics.record_lookup('redis', 'stock_data', 'china', hit=True, seconds=0.002, bytes_read=1024)
+    print(metrics.to_prometheus())
+"""
+
+import re
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+# 每个维度保留的最近耗时采样数
+_LATENCY_SAMPLES = 1024
+
+SeriesKey = Tuple[str, str, str]
+
+
+def infer_market(symbol: Optional[str]) -> str:
+    """根据股票代码推断市场类型（china/us），无法判断时返回 unknown"""
+    if not symbol:
+        return 'unknown'
+    return 'china' if re.match(r'^\d{6}$', str(symbol)) else 'us'
+
+
+def _percentile(samples: List[float], q: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(q * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+class _Series:
+    """单个 (backend, data_type, market) 维度的计数与采样"""
+
+    __slots__ = ('hits', 'misses', 'bytes_read', 'bytes_written', 'writes',
+                 'lookup_seconds', 'lookup_count', 'lookup_samples',
+                 'decode_seconds', 'decode_count', 'decode_samples')
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.writes = 0
+        self.lookup_seconds = 0.0
+        self.lookup_count = 0
+        self.lookup_samples: Deque[float] = deque(maxlen=_LATENCY_SAMPLES)
+        self.decode_seconds = 0.0
+        self.decode_count = 0
+        self.decode_samples: Deque[float] = deque(maxlen=_LATENCY_SAMPLES)
+
+
+class CacheMetrics:
+    """线程安全的缓存指标收集器"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._series: Dict[SeriesKey, _Series] = {}
+
+    def _get(self, backend: str, data_type: str, market: str) -> _Series:
+        key = (backend or 'unknown', data_type or 'unknown', market or 'unknown')
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = _Series()
+        return series
+
+    # ==================== 记录 ====================
+
+    def record_lookup(self, backend: str, data_type: str, market: str, hit: bool,
+                      seconds: float = None, bytes_read: int = 0):
+        """
+        记录一次缓存查找
+
+        Args:
+            backend: 缓存后端（memory/file/redis/mongodb）
+            data_type: 数据类型
+            market: 市场类型
+            hit: 是否命中
+            seconds: 查找耗时（秒）
+            bytes_read: 读取的字节数
+        """
+        with self._lock:
+            series = self._get(backend, data_type, market)
+            if hit:
+                series.hits += 1
+            else:
+                series.misses += 1
+            series.bytes_read += bytes_read or 0
+            if seconds is not None:
+                series.lookup_seconds += seconds
+                series.lookup_count += 1
+                series.lookup_samples.append(seconds)
+
+    def record_decode(self, backend: str, data_type: str, market: str, seconds: float):
+        """记录一次反序列化耗时"""
+        with self._lock:
+            series = self._get(backend, data_type, market)
+            series.decode_seconds += seconds
+            series.decode_count += 1
+            series.decode_samples.append(seconds)
+
+    def record_write(self, backend: str, data_type: str, market: str, bytes_written: int):
+        """记录一次缓存写入"""
+        with self._lock:
+            series = self._get(backend, data_type, market)
+            series.writes += 1
+            series.bytes_written += bytes_written or 0
+
+    def reset(self):
+        """清空所有指标"""
+        with self._lock:
+            self._series.clear()
+
+    # ==================== 导出 ====================
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """按维度导出指标"""
+        with self._lock:
+            items = [(key, series, list(series.lookup_samples), list(series.decode_samples))
+                     for key, series in self._series.items()]
+
+        result = []
+        for (backend, data_type, market), series, lookup_samples, decode_samples in sorted(items, key=lambda x: x[0]):
+            lookups = series.hits + series.misses
+            result.append({
+                'backend': backend,
+                'data_type': data_type,
+                'market': market,
+                'hits': series.hits,
+                'misses': series.misses,
+                'hit_ratio': round(series.hits / lookups, 4) if lookups else 0.0,
+                'lookup_p50_ms': round(_percentile(lookup_samples, 0.5) * 1000, 3),
+                'lookup_p95_ms': round(_percentile(lookup_samples, 0.95) * 1000, 3),
+                'decode_p50_ms': round(_percentile(decode_samples, 0.5) * 1000, 3),
+                'decode_p95_ms': round(_percentile(decode_samples, 0.95) * 1000, 3),
+                'bytes_read': series.bytes_read,
+                'bytes_written': series.bytes_written,
+                'writes': series.writes,
+            })
+        return result
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """按后端汇总命中率和字节数"""
+        totals: Dict[str, Dict[str, Any]] = {}
+        for row in self.snapshot():
+            total = totals.setdefault(row['backend'], {'hits': 0, 'misses': 0, 'bytes_read': 0, 'bytes_written': 0})
+            for field in ('hits', 'misses', 'bytes_read', 'bytes_written'):
+                total[field] += row[field]
+        for total in totals.values():
+            lookups = total['hits'] + total['misses']
+            total['hit_ratio'] = round(total['hits'] / lookups, 4) if lookups else 0.0
+        return totals
+
+    def to_prometheus(self, prefix: str = "tradingagents_cache") -> str:
+        """导出为 Prometheus 文本格式"""
+        with self._lock:
+            items = [(key, series, list(series.lookup_samples), list(series.decode_samples))
+                     for key, series in self._series.items()]
+        items.sort(key=lambda x: x[0])
+
+        def labels(key: SeriesKey, **extra) -> str:
+            backend, data_type, market = key
+            pairs = [('backend', backend), ('data_type', data_type), ('market', market)] + list(extra.items())
+            return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+        lines = [
+            f"# HELP {prefix}_lookups_total Cache lookups by result.",
+            f"# TYPE {prefix}_lookups_total counter",
+        ]
+        for key, series, _, _ in items:
+            lines.append(f"{prefix}_lookups_total{labels(key, result='hit')} {series.hits}")
+            lines.append(f"{prefix}_lookups_total{labels(key, result='miss')} {series.misses}")
+
+        for name, attr, help_text in (
+            ('bytes_read_total', 'bytes_read', 'Bytes read from the cache.'),
+            ('bytes_written_total', 'bytes_written', 'Bytes written to the cache.'),
+            ('writes_total', 'writes', 'Cache writes.'),
+        ):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} counter")
+            for key, series, _, _ in items:
+                lines.append(f"{prefix}_{name}{labels(key)} {getattr(series, attr)}")
+
+        for name, sum_attr, count_attr, samples_index, help_text in (
+            ('lookup_seconds', 'lookup_seconds', 'lookup_count', 2, 'Cache lookup latency.'),
+            ('decode_seconds', 'decode_seconds', 'decode_count', 3, 'Cache payload decode latency.'),
+        ):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} summary")
+            for item in items:
+                key, series, samples = item[0], item[1], item[samples_index]
+                if not getattr(series, count_attr):
+                    continue
+                for q in (0.5, 0.95):
+                    lines.append(f"{prefix}_{name}{labels(key, quantile=q)} {_percentile(samples, q):.6f}")
+                lines.append(f"{prefix}_{name}_sum{labels(key)} {getattr(series, sum_attr):.6f}")
+                lines.append(f"{prefix}_{name}_count{labels(key)} {getattr(series, count_attr)}")
+
+        return "\n".join(lines) + "\n"
+
+
+# 全局指标实例
+_cache_metrics = None
+_cache_metrics_lock = threading.Lock()
+
+
+def get_cache_metrics() -> CacheMetrics:
+    """获取全局缓存指标实例"""
+    global _cache_metrics
+    if _cache_metrics is None:
+        with _cache_metrics_lock:
+            if _cache_metrics is None:
+                _cache_metrics = CacheMetrics()
+    return _cache_metrics
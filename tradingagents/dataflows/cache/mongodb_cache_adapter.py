@@ -101,49 +101,16 @@ class MongoDBCacheAdapter:
             market_category = market_mapping.get(market)
             logger.info(f"📊 [数据源优先级] 股票代码: {symbol}, 市场分类: {market_category}")
 
-            # 2. 从数据库读取配置
+            # 2. 从进程内路由表读取配置（按激活配置版本缓存，配置变更时失效）
             if self.db is not None:
-                config_collection = self.db.system_configs
-                config_data = config_collection.find_one(
-                    {"is_active": True},
-                    sort=[("version", -1)]
-                )
+                from tradingagents.dataflows.datasource_routing import get_datasource_routing
+                routing = get_datasource_routing(self.db)
 
-                if config_data and config_data.get('data_source_configs'):
-                    configs = config_data['data_source_configs']
-                    logger.info(f"📊 [数据源优先级] 从数据库读取到 {len(configs)} 个数据源配置")
-
-                    # 3. 过滤启用的数据源
-                    enabled = []
-                    for ds in configs:
-                        ds_type = ds.get('type', '')
-                        ds_enabled = ds.get('enabled', True)
-                        ds_priority = ds.get('priority', 0)
-                        ds_categories = ds.get('market_categories', [])
-
-                        logger.info(f"📊 [数据源配置] 类型: {ds_type}, 启用: {ds_enabled}, 优先级: {ds_priority}, 市场: {ds_categories}")
-
-                        if not ds_enabled:
-                            logger.info(f"⚠️ [数据源优先级] {ds_type} 未启用，跳过")
-                            continue
-
-                        # 检查市场分类
-                        if ds_categories and market_category:
-                            if market_category not in ds_categories:
-                                logger.info(f"⚠️ [数据源优先级] {ds_type} 不支持市场 {market_category}，跳过")
-                                continue
-
-                        enabled.append(ds)
-
-                    logger.info(f"📊 [数据源优先级] 过滤后启用的数据源: {len(enabled)} 个")
-
-                    # 4. 按优先级排序（数字越大优先级越高）
-                    enabled.sort(key=lambda x: x.get('priority', 0), reverse=True)
-
-                    # 5. 返回数据源类型列表
-                    result = [ds.get('type', '').lower() for ds in enabled if ds.get('type')]
+                if routing.has_configs:
+                    # 3. 过滤启用且匹配市场分类的数据源，按优先级排序（数字越大优先级越高）
+                    result = routing.priority(market_category)
                     if result:
-                        logger.info(f"✅ [数据源优先级] {symbol} ({market_category}): {result}")
+                        logger.info(f"✅ [数据源优先级] {symbol} ({market_category}), 配置版本={routing.version}: {result}")
                         return result
                     else:
                         logger.warning(f"⚠️ [数据源优先级] 没有可用的数据源配置，使用默认顺序")
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+缓存 DataFrame 序列化层
+支持 CSV（兼容旧缓存）、Parquet 和 Arrow IPC（内存映射读取）三种格式
+
+配置默认格式：
+    export TA_CACHE_DATAFRAME_FORMAT=arrow    # Arrow IPC（默认，需要 pyarrow）
+    export TA_CACHE_DATAFRAME_FORMAT=parquet  # Parquet（需要 pyarrow）
+    export TA_CACHE_DATAFRAME_FORMAT=csv      # CSV（旧格式）
+"""
+
+import os
+from pathlib import Path
+from typing import Dict, Tuple, Union
+
+import pandas as pd
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+# pyarrow 为可选依赖
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+    PYARROW_AVAILABLE = True
+except ImportError:
+    pa = None
+    pa_ipc = None
+    PYARROW_AVAILABLE = False
+
+
+class DataFrameSerializer:
+    """DataFrame 序列化器基类"""
+
+    # 格式名称（写入元数据的 file_format）
+    name = ""
+    # 文件扩展名
+    extension = ""
+
+    def dump(self, df: pd.DataFrame, path: Union[str, Path]):
+        """保存 DataFrame 到文件（先写临时文件再替换，避免读到半截文件）"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        try:
+            self._dump(df, tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+
+    def load(self, path: Union[str, Path]) -> pd.DataFrame:
+        """从文件加载 DataFrame"""
+        raise NotImplementedError
+
+    def _dump(self, df: pd.DataFrame, path: Path):
+        raise NotImplementedError
+
+
+class CsvSerializer(DataFrameSerializer):
+    """CSV 格式（旧缓存格式，不保留 dtype）"""
+
+    name = "csv"
+    extension = "csv"
+
+    def _dump(self, df: pd.DataFrame, path: Path):
+        df.to_csv(path, index=True)
+
+    def load(self, path: Union[str, Path]) -> pd.DataFrame:
+        return pd.read_csv(path, index_col=0)
+
+
+class ParquetSerializer(DataFrameSerializer):
+    """Parquet 列式格式（压缩，保留 dtype 和索引）"""
+
+    name = "parquet"
+    extension = "parquet"
+
+    def _dump(self, df: pd.DataFrame, path: Path):
+        df.to_parquet(path, engine="pyarrow", index=True)
+
+    def load(self, path: Union[str, Path]) -> pd.DataFrame:
+        return pd.read_parquet(path, engine="pyarrow")
+
+
+class ArrowIPCSerializer(DataFrameSerializer):
+    """Arrow IPC 文件格式（不压缩，通过内存映射读取，保留 dtype 和索引）"""
+
+    name = "arrow"
+    extension = "arrow"
+
+    def _dump(self, df: pd.DataFrame, path: Path):
+        table = pa.Table.from_pandas(df, preserve_index=True)
+        with pa.OSFile(str(path), "wb") as sink:
+            with pa_ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+
+    def load(self, path: Union[str, Path]) -> pd.DataFrame:
+        with pa.memory_map(str(path), "r") as source:
+            table = pa_ipc.open_file(source).read_all()
+        return table.to_pandas()
+
+
+_SERIALIZERS: Dict[str, DataFrameSerializer] = {
+    CsvSerializer.name: CsvSerializer(),
+}
+if PYARROW_AVAILABLE:
+    _SERIALIZERS[ParquetSerializer.name] = ParquetSerializer()
+    _SERIALIZERS[ArrowIPCSerializer.name] = ArrowIPCSerializer()
+
+
+def dump_dataframe(serializer: DataFrameSerializer, df: pd.DataFrame,
+                   path: Union[str, Path]) -> Tuple[DataFrameSerializer, Path]:
+    """
+    按指定格式保存 DataFrame，pyarrow 无法转换时（如混合类型的 object 列）退回 CSV
+
+    Args:
+        serializer: 首选序列化器
+        df: 要保存的 DataFrame
+        path: 首选格式的文件路径
+
+    Returns:
+        (实际使用的序列化器, 实际写入的文件路径)，调用方据此记录 file_format 和 file_path
+    """
+    path = Path(path)
+    if serializer.name == CsvSerializer.name:
+        serializer.dump(df, path)
+        return serializer, path
+
+    try:
+        serializer.dump(df, path)
+        return serializer, path
+    except pa.ArrowException as e:
+        csv_serializer = _SERIALIZERS[CsvSerializer.name]
+        csv_path = path.with_suffix(f".{csv_serializer.extension}")
+        logger.warning(f"⚠️ {serializer.name} 格式无法保存 {path.name}，改用 CSV: {e}")
+        csv_serializer.dump(df, csv_path)
+        return csv_serializer, csv_path
+
+
+def is_dataframe_format(file_format: str) -> bool:
+    """判断元数据中的 file_format 是否为 DataFrame 序列化格式"""
+    return file_format in (CsvSerializer.name, ParquetSerializer.name, ArrowIPCSerializer.name)
+
+
+def get_serializer(file_format: str) -> DataFrameSerializer:
+    """
+    按格式名称获取序列化器
+
+    Args:
+        file_format: 格式名称（csv/parquet/arrow）
+
+    Returns:
+        DataFrameSerializer 实例
+
+    Raises:
+        ValueError: 未知格式，或格式所需的 pyarrow 未安装
+    """
+    serializer = _SERIALIZERS.get(file_format)
+    if serializer is None:
+        if file_format in (ParquetSerializer.name, ArrowIPCSerializer.name):
+            raise ValueError(f"缓存格式 {file_format} 需要安装 pyarrow")
+        raise ValueError(f"未知的缓存格式: {file_format}")
+    return serializer
+
+
+def get_default_serializer() -> DataFrameSerializer:
+    """根据环境变量 TA_CACHE_DATAFRAME_FORMAT 获取默认序列化器"""
+    default_format = ArrowIPCSerializer.name if PYARROW_AVAILABLE else CsvSerializer.name
+    file_format = os.getenv("TA_CACHE_DATAFRAME_FORMAT", default_format).lower()
+    try:
+        return get_serializer(file_format)
+    except ValueError as e:
+        logger.warning(f"⚠️ {e}，使用 {default_format} 格式")
+        return get_serializer(default_format)
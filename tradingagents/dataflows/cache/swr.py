@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Stale-While-Revalidate 缓存刷新
+按软/硬两级 TTL 处理缓存条目：
+- 未超过软 TTL：直接返回缓存（新鲜）
+- 超过软 TTL 但未超过硬 TTL：立即返回旧数据，同时在后台刷新
+- 超过硬 TTL 或无缓存：同步获取
+
+配置：
+    export TA_SWR_ENABLED=false      # 关闭后台刷新（超过软 TTL 即同步获取）
+    export TA_SWR_MAX_WORKERS=2      # 后台刷新线程数
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+
+# 缓存查找函数：返回 (缓存值, 缓存时长/小时)，无缓存时返回 None
+CacheLookup = Callable[[], Optional[Tuple[Any, float]]]
+
+
+class StaleWhileRevalidate:
+    """软/硬两级 TTL 的缓存读取与后台刷新"""
+
+    def __init__(self, max_workers: int = 2, enabled: bool = True):
+        """
+        初始化
+
+        Args:
+            max_workers: 后台刷新线程数
+            enabled: 是否允许返回过期数据并后台刷新
+        """
+        self.enabled = enabled
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="swr-refresh")
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self.stats = {
+            'fresh_hits': 0,
+            'stale_hits': 0,
+            'misses': 0,
+            'background_refreshes': 0,
+            'refresh_failures': 0,
+        }
+
+    @classmethod
+    def from_env(cls) -> "StaleWhileRevalidate":
+        """根据环境变量创建实例"""
+        return cls(
+            max_workers=int(os.getenv("TA_SWR_MAX_WORKERS", "2")),
+            enabled=os.getenv("TA_SWR_ENABLED", "true").lower() in ("true", "1", "yes", "on"),
+        )
+
+    def _count(self, field: str):
+        with self._lock:
+            self.stats[field] += 1
+
+    def _refresh_in_background(self, key: Hashable, refresh: Callable[[], Any]) -> bool:
+        """提交后台刷新；同一 key 已在刷新时不重复提交"""
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            self.stats['background_refreshes'] += 1
+
+        def run():
+            try:
+                refresh()
+                logger.info(f"🔄 [SWR] 后台刷新完成: {key}")
+            except Exception as e:
+                self._count('refresh_failures')
+                logger.warning(f"⚠️ [SWR] 后台刷新失败 {key}: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        try:
+            self._executor.submit(run)
+        except RuntimeError as e:
+            # 解释器退出时线程池已关闭
+            with self._lock:
+                self._refreshing.discard(key)
+            logger.debug(f"[SWR] 后台刷新提交失败 {key}: {e}")
+            return False
+        return True
+
+    def get(self, key: Hashable, lookup: CacheLookup, refresh: Callable[[], Any],
+            soft_ttl_hours: float, hard_ttl_hours: float) -> Any:
+        """
+        按 stale-while-revalidate 策略读取
+
+        Args:
+            key: 刷新去重键
+            lookup: 缓存查找函数，返回 (值, 缓存时长/小时) 或 None
+            refresh: 从上游获取并写回缓存的函数，返回新值
+            soft_ttl_hours: 软 TTL（小时），超过后后台刷新
+            hard_ttl_hours: 硬 TTL（小时），超过后同步获取
+
+        Returns:
+            缓存值或新获取的值
+        """
+        entry = lookup()
+        if entry is not None:
+            value, age_hours = entry
+            if age_hours < soft_ttl_hours:
+                self._count('fresh_hits')
+                return value
+            if self.enabled and age_hours < hard_ttl_hours:
+                self._count('stale_hits')
+                logger.info(f"⏳ [SWR] 返回过期缓存并后台刷新: {key} (已缓存 {age_hours:.1f}h)")
+                self._refresh_in_background(key, refresh)
+                return value
+
+        self._count('misses')
+        return refresh()
+
+    def is_refreshing(self, key: Hashable) -> bool:
+        """指定 key 是否正在后台刷新"""
+        with self._lock:
+            return key in self._refreshing
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取命中/后台刷新统计"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats['refreshing'] = len(self._refreshing)
+        stats['enabled'] = self.enabled
+        return stats
+
+
+# 全局实例
+_swr = None
+_swr_lock = threading.Lock()
+
+
+def get_stale_while_revalidate() -> StaleWhileRevalidate:
+    """获取全局 StaleWhileRevalidate 实例"""
+    global _swr
+    if _swr is None:
+        with _swr_lock:
+            if _swr is None:
+                _swr = StaleWhileRevalidate.from_env()
+    return _swr
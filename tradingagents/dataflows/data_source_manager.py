@@ -4,8 +4,10 @@
 统一管理中国股票数据源的选择和切换，支持Tushare、AKShare、BaoStock等
 """
 
+import functools
 import os
 import time
+from datetime import datetime
 from typing import Dict, List, Optional, Any
 from enum import Enum
 import warnings
@@ -24,6 +26,15 @@ logger = setup_dataflow_logging()
 # 导入统一数据源编码
 from tradingagents.constants import DataSourceCode
 
+# 相同请求的并发调用合并为一次上游请求
+from tradingagents.utils.singleflight import coalesce
+
+# 同步代码经常驻后台事件循环调用异步数据源
+from tradingagents.utils.async_bridge import run_coro_sync
+
+# 降级链熔断与对冲请求
+from tradingagents.dataflows.resilience import call_with_fallback
+
 
 class ChinaDataSource(Enum):
     """
@@ -102,38 +113,12 @@ class DataSourceManager:
         market_category = self._identify_market_category(symbol)
 
         try:
-            # 🔥 从数据库读取数据源配置（使用同步客户端）
-            from app.core.database import get_mongo_db_sync
-            db = get_mongo_db_sync()
-            config_collection = db.system_configs
-
-            # 获取最新的激活配置
-            config_data = config_collection.find_one(
-                {"is_active": True},
-                sort=[("version", -1)]
-            )
-
-            if config_data and config_data.get('data_source_configs'):
-                data_source_configs = config_data.get('data_source_configs', [])
-
-                # 🔥 过滤出启用的数据源，并按市场分类过滤
-                enabled_sources = []
-                for ds in data_source_configs:
-                    if not ds.get('enabled', True):
-                        continue
-
-                    # 检查数据源是否属于当前市场分类
-                    market_categories = ds.get('market_categories', [])
-                    if market_categories and market_category:
-                        # 如果数据源配置了市场分类，只选择匹配的数据源
-                        if market_category not in market_categories:
-                            continue
-
-                    enabled_sources.append(ds)
-
-                # 按优先级排序（数字越大优先级越高）
-                enabled_sources.sort(key=lambda x: x.get('priority', 0), reverse=True)
+            # 🔥 从进程内路由表读取数据源配置（按激活配置版本缓存）
+            from tradingagents.dataflows.datasource_routing import get_datasource_routing
+            routing = get_datasource_routing()
 
+            if routing.has_configs:
+                # 🔥 已启用且匹配市场分类的数据源，按优先级排序（数字越大优先级越高）
                 # 转换为 ChinaDataSource 枚举（使用统一编码）
                 source_mapping = {
                     DataSourceCode.TUSHARE: ChinaDataSource.TUSHARE,
@@ -142,8 +127,7 @@ class DataSourceManager:
                 }
 
                 result = []
-                for ds in enabled_sources:
-                    ds_type = ds.get('type', '').lower()
+                for ds_type in routing.priority(market_category):
                     if ds_type in source_mapping:
                         source = source_mapping[ds_type]
                         # 排除 MongoDB（MongoDB 是最高优先级，不参与降级）
@@ -151,7 +135,7 @@ class DataSourceManager:
                             result.append(source)
 
                 if result:
-                    logger.info(f"✅ [数据源优先级] 市场={market_category or '全部'}, 从数据库读取: {[s.value for s in result]}")
+                    logger.info(f"✅ [数据源优先级] 市场={market_category or '全部'}, 配置版本={routing.version}: {[s.value for s in result]}")
                     return result
                 else:
                     logger.warning(f"⚠️ [数据源优先级] 市场={market_category or '全部'}, 数据库配置中没有可用的数据源，使用默认顺序")
@@ -415,30 +399,15 @@ class DataSourceManager:
         # 🔥 从数据库读取数据源配置，获取启用状态
         enabled_sources_in_db = set()
         try:
-            from app.core.database import get_mongo_db_sync
-            db = get_mongo_db_sync()
-            config_collection = db.system_configs
-
-            # 获取最新的激活配置
-            config_data = config_collection.find_one(
-                {"is_active": True},
-                sort=[("version", -1)]
-            )
-
-            if config_data and config_data.get('data_source_configs'):
-                data_source_configs = config_data.get('data_source_configs', [])
-
-                # 提取已启用的数据源类型
-                for ds in data_source_configs:
-                    if ds.get('enabled', True):
-                        ds_type = ds.get('type', '').lower()
-                        enabled_sources_in_db.add(ds_type)
+            from tradingagents.dataflows.datasource_routing import get_datasource_routing
+            routing = get_datasource_routing()
 
+            # 提取已启用的数据源类型（数据库中没有配置时默认所有数据源都启用）
+            enabled_sources_in_db = routing.enabled_types()
+            if routing.has_configs:
                 logger.info(f"✅ [数据源配置] 从数据库读取到已启用的数据源: {enabled_sources_in_db}")
             else:
                 logger.warning("⚠️ [数据源配置] 数据库中没有数据源配置，将检查所有已安装的数据源")
-                # 如果数据库中没有配置，默认所有数据源都启用
-                enabled_sources_in_db = {'mongodb', 'tushare', 'akshare', 'baostock'}
         except Exception as e:
             logger.warning(f"⚠️ [数据源配置] 从数据库读取失败: {e}，将检查所有已安装的数据源")
             # 如果读取失败，默认所有数据源都启用
@@ -509,28 +478,9 @@ class DataSourceManager:
     def _get_datasource_configs_from_db(self) -> dict:
         """从数据库读取数据源配置（包括 API Key）"""
         try:
-            from app.core.database import get_mongo_db_sync
-            db = get_mongo_db_sync()
-
-            # 从 system_configs 集合读取激活的配置
-            config = db.system_configs.find_one({"is_active": True})
-            if not config:
-                return {}
-
-            # 提取数据源配置
-            datasource_configs = config.get('data_source_configs', [])
-
-            # 构建配置字典 {数据源名称: {api_key, api_secret, ...}}
-            result = {}
-            for ds_config in datasource_configs:
-                name = ds_config.get('name', '').lower()
-                result[name] = {
-                    'api_key': ds_config.get('api_key', ''),
-                    'api_secret': ds_config.get('api_secret', ''),
-                    'config_params': ds_config.get('config_params', {})
-                }
-
-            return result
+            # 从进程内路由表读取激活配置，构建 {数据源名称: {api_key, api_secret, ...}}
+            from tradingagents.dataflows.datasource_routing import get_datasource_routing
+            return get_datasource_routing().configs_by_name()
         except Exception as e:
             logger.warning(f"⚠️ 从数据库读取数据源配置失败: {e}")
             return {}
@@ -659,6 +609,45 @@ class DataSourceManager:
         except Exception as e:
             logger.warning(f"⚠️ 保存数据到缓存失败: {e}")
 
+    def _get_history_from_provider(self, source: ChinaDataSource, symbol: str, start_date: str = None,
+                                   end_date: str = None, period: str = "daily") -> Optional[pd.DataFrame]:
+        """
+        从指定数据源获取历史K线，经过K线区间缓存，只拉取本地缺失的头部/尾部区间
+
+        Args:
+            source: 数据源（TUSHARE/AKSHARE/BAOSTOCK）
+            symbol: 股票代码
+            start_date: 开始日期
+            end_date: 结束日期
+            period: 数据周期（daily/weekly/monthly）
+
+        Returns:
+            DataFrame: 历史数据，数据源没有数据时返回None
+
+        Raises:
+            Exception: 提供器不可用或调用失败（由熔断器计为失败，与"没有数据"区分）
+        """
+        provider_getters = {
+            ChinaDataSource.TUSHARE: self._get_tushare_adapter,
+            ChinaDataSource.AKSHARE: self._get_akshare_adapter,
+            ChinaDataSource.BAOSTOCK: self._get_baostock_adapter,
+        }
+        getter = provider_getters.get(source)
+        provider = getter() if getter else None
+        if not provider:
+            raise ConnectionError(f"{source.value} 提供器不可用")
+
+        def fetch(seg_start: str, seg_end: str) -> Optional[pd.DataFrame]:
+            return run_coro_sync(provider.get_historical_data(symbol, seg_start, seg_end, period,
+                                                              raise_on_error=True))
+
+        from .cache.bar_store import get_bar_store, is_bar_store_enabled
+        if not start_date or not is_bar_store_enabled():
+            return fetch(start_date, end_date or datetime.now().strftime('%Y-%m-%d'))
+
+        end_date = end_date or datetime.now().strftime('%Y-%m-%d')
+        return get_bar_store().get_bars(symbol, start_date, end_date, fetch, period=period, source=source.value)
+
     def _get_volume_safely(self, data: pd.DataFrame) -> float:
         """
         安全获取成交量数据
@@ -924,59 +913,37 @@ class DataSourceManager:
         logger.info(f"📊 [DataFrame接口] 获取股票数据: {symbol} ({start_date} 到 {end_date})")
 
         try:
-            # 尝试当前数据源
-            df = None
-            if self.current_source == ChinaDataSource.MONGODB:
+            # 当前数据源优先，其余可用数据源依次降级
+            sources = [self.current_source] + [s for s in self.available_sources if s != self.current_source]
+
+            # MongoDB 是本地缓存，未命中属于正常情况，不经过熔断器（否则缓存未命中会熔断所有股票的缓存读取）
+            if ChinaDataSource.MONGODB in sources:
+                sources.remove(ChinaDataSource.MONGODB)
                 from tradingagents.dataflows.cache.mongodb_cache_adapter import get_mongodb_cache_adapter
-                adapter = get_mongodb_cache_adapter()
-                df = adapter.get_historical_data(symbol, start_date, end_date, period=period)
-            elif self.current_source == ChinaDataSource.TUSHARE:
-                from .providers.china.tushare import get_tushare_provider
-                provider = get_tushare_provider()
-                df = provider.get_daily_data(symbol, start_date, end_date)
-            elif self.current_source == ChinaDataSource.AKSHARE:
-                from .providers.china.akshare import get_akshare_provider
-                provider = get_akshare_provider()
-                df = provider.get_stock_data(symbol, start_date, end_date)
-            elif self.current_source == ChinaDataSource.BAOSTOCK:
-                from .providers.china.baostock import get_baostock_provider
-                provider = get_baostock_provider()
-                df = provider.get_stock_data(symbol, start_date, end_date)
+                try:
+                    df = get_mongodb_cache_adapter().get_historical_data(symbol, start_date, end_date, period=period)
+                except Exception as e:
+                    logger.warning(f"⚠️ [DataFrame接口] MongoDB读取失败: {e}")
+                    df = None
+                if df is not None and not df.empty:
+                    logger.info(f"✅ [DataFrame接口] 从 mongodb 获取成功: {len(df)}条")
+                    return self._standardize_dataframe(df)
+
+            # 外部数据源：跳过已熔断的数据源，可选对冲请求
+            df, source_name = call_with_fallback(
+                [(source.value, functools.partial(self._get_history_from_provider, source, symbol,
+                                                  start_date, end_date, period))
+                 for source in sources],
+                op="history",
+            )
 
             if df is not None and not df.empty:
-                logger.info(f"✅ [DataFrame接口] 从 {self.current_source.value} 获取成功: {len(df)}条")
+                if source_name == self.current_source.value:
+                    logger.info(f"✅ [DataFrame接口] 从 {source_name} 获取成功: {len(df)}条")
+                else:
+                    logger.info(f"✅ [DataFrame接口] 降级到 {source_name} 成功: {len(df)}条")
                 return self._standardize_dataframe(df)
 
-            # 降级到其他数据源
-            logger.warning(f"⚠️ [DataFrame接口] {self.current_source.value} 失败，尝试降级")
-            for source in self.available_sources:
-                if source == self.current_source:
-                    continue
-                try:
-                    if source == ChinaDataSource.MONGODB:
-                        from tradingagents.dataflows.cache.mongodb_cache_adapter import get_mongodb_cache_adapter
-                        adapter = get_mongodb_cache_adapter()
-                        df = adapter.get_historical_data(symbol, start_date, end_date, period=period)
-                    elif source == ChinaDataSource.TUSHARE:
-                        from .providers.china.tushare import get_tushare_provider
-                        provider = get_tushare_provider()
-                        df = provider.get_daily_data(symbol, start_date, end_date)
-                    elif source == ChinaDataSource.AKSHARE:
-                        from .providers.china.akshare import get_akshare_provider
-                        provider = get_akshare_provider()
-                        df = provider.get_stock_data(symbol, start_date, end_date)
-                    elif source == ChinaDataSource.BAOSTOCK:
-                        from .providers.china.baostock import get_baostock_provider
-                        provider = get_baostock_provider()
-                        df = provider.get_stock_data(symbol, start_date, end_date)
-
-                    if df is not None and not df.empty:
-                        logger.info(f"✅ [DataFrame接口] 降级到 {source.value} 成功: {len(df)}条")
-                        return self._standardize_dataframe(df)
-                except Exception as e:
-                    logger.warning(f"⚠️ [DataFrame接口] {source.value} 失败: {e}")
-                    continue
-
             logger.error(f"❌ [DataFrame接口] 所有数据源都失败: {symbol}")
             return pd.DataFrame()
 
@@ -1028,6 +995,9 @@ class DataSourceManager:
 
         return out
 
+    @coalesce("data_source_manager.get_stock_data",
+              key_func=lambda self, symbol, start_date=None, end_date=None, period="daily":
+              (self.current_source.value, symbol, start_date, end_date, period))
     def get_stock_data(self, symbol: str, start_date: str = None, end_date: str = None, period: str = "daily") -> str:
         """
         获取股票数据的统一接口，支持多周期数据
@@ -1200,18 +1170,7 @@ class DataSourceManager:
                 # 获取股票基本信息
                 provider = self._get_tushare_adapter()
                 if provider:
-                    import asyncio
-                    try:
-                        loop = asyncio.get_event_loop()
-                        if loop.is_closed():
-                            loop = asyncio.new_event_loop()
-                            asyncio.set_event_loop(loop)
-                    except RuntimeError:
-                        # 在线程池中没有事件循环，创建新的
-                        loop = asyncio.new_event_loop()
-                        asyncio.set_event_loop(loop)
-
-                    stock_info = loop.run_until_complete(provider.get_stock_basic_info(symbol))
+                    stock_info = run_coro_sync(provider.get_stock_basic_info(symbol))
                     stock_name = stock_info.get('name', f'股票{symbol}') if stock_info else f'股票{symbol}'
                 else:
                     stock_name = f'股票{symbol}'
@@ -1227,26 +1186,14 @@ class DataSourceManager:
             if not provider:
                 return f"❌ Tushare提供器不可用"
 
-            # 使用异步方法获取历史数据
-            import asyncio
-            try:
-                loop = asyncio.get_event_loop()
-                if loop.is_closed():
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-            except RuntimeError:
-                # 在线程池中没有事件循环，创建新的
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-
-            data = loop.run_until_complete(provider.get_historical_data(symbol, start_date, end_date))
+            data = self._get_history_from_provider(ChinaDataSource.TUSHARE, symbol, start_date, end_date, period)
 
             if data is not None and not data.empty:
                 # 保存到缓存
                 self._save_to_cache(symbol, data, start_date, end_date)
 
                 # 获取股票基本信息（异步）
-                stock_info = loop.run_until_complete(provider.get_stock_basic_info(symbol))
+                stock_info = run_coro_sync(provider.get_stock_basic_info(symbol))
                 stock_name = stock_info.get('name', f'股票{symbol}') if stock_info else f'股票{symbol}'
 
                 # 格式化返回
@@ -1282,26 +1229,14 @@ class DataSourceManager:
             from .providers.china.akshare import get_akshare_provider
             provider = get_akshare_provider()
 
-            # 使用异步方法获取历史数据
-            import asyncio
-            try:
-                loop = asyncio.get_event_loop()
-                if loop.is_closed():
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-            except RuntimeError:
-                # 在线程池中没有事件循环，创建新的
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-
-            data = loop.run_until_complete(provider.get_historical_data(symbol, start_date, end_date, period))
+            data = self._get_history_from_provider(ChinaDataSource.AKSHARE, symbol, start_date, end_date, period)
 
             duration = time.time() - start_time
 
             if data is not None and not data.empty:
                 # 🔧 修复：使用统一的格式化方法，包含技术指标计算
                 # 获取股票基本信息
-                stock_info = loop.run_until_complete(provider.get_stock_basic_info(symbol))
+                stock_info = run_coro_sync(provider.get_stock_basic_info(symbol))
                 stock_name = stock_info.get('name', f'股票{symbol}') if stock_info else f'股票{symbol}'
 
                 # 调用统一的格式化方法（包含技术指标计算）
@@ -1318,7 +1253,7 @@ class DataSourceManager:
         except Exception as e:
             duration = time.time() - start_time
             logger.error(f"❌ [AKShare] 调用失败: {e}, 耗时={duration:.2f}s", exc_info=True)
-            return f"❌ AKShare获取{symbol}数据失败: {e}"
+            raise
 
     def _get_baostock_data(self, symbol: str, start_date: str, end_date: str, period: str = "daily") -> str:
         """使用BaoStock获取多周期数据 - 包含技术指标计算"""
@@ -1326,24 +1261,12 @@ class DataSourceManager:
         from .providers.china.baostock import get_baostock_provider
         provider = get_baostock_provider()
 
-        # 使用异步方法获取历史数据
-        import asyncio
-        try:
-            loop = asyncio.get_event_loop()
-            if loop.is_closed():
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-        except RuntimeError:
-            # 在线程池中没有事件循环，创建新的
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-
-        data = loop.run_until_complete(provider.get_historical_data(symbol, start_date, end_date, period))
+        data = self._get_history_from_provider(ChinaDataSource.BAOSTOCK, symbol, start_date, end_date, period)
 
         if data is not None and not data.empty:
             # 🔧 修复：使用统一的格式化方法，包含技术指标计算
             # 获取股票基本信息
-            stock_info = loop.run_until_complete(provider.get_stock_basic_info(symbol))
+            stock_info = run_coro_sync(provider.get_stock_basic_info(symbol))
             stock_name = stock_info.get('name', f'股票{symbol}') if stock_info else f'股票{symbol}'
 
             # 调用统一的格式化方法（包含技术指标计算）
@@ -1392,32 +1315,24 @@ class DataSourceManager:
         # 注意：不包含MongoDB，因为MongoDB是最高优先级，如果失败了就不再尝试
         fallback_order = self._get_data_source_priority_order(symbol)
 
-        for source in fallback_order:
-            if source != self.current_source and source in self.available_sources:
-                try:
-                    logger.info(f"🔄 [备用数据源] 尝试 {source.value} 获取{period}数据: {symbol}")
-
-                    # 直接调用具体的数据源方法，避免递归
-                    if source == ChinaDataSource.TUSHARE:
-                        result = self._get_tushare_data(symbol, start_date, end_date, period)
-                    elif source == ChinaDataSource.AKSHARE:
-                        result = self._get_akshare_data(symbol, start_date, end_date, period)
-                    elif source == ChinaDataSource.BAOSTOCK:
-                        result = self._get_baostock_data(symbol, start_date, end_date, period)
-                    # TDX 已移除
-                    else:
-                        logger.warning(f"⚠️ 未知数据源: {source.value}")
-                        continue
-
-                    if "❌" not in result:
-                        logger.info(f"✅ [备用数据源-{source.value}] 成功获取{period}数据: {symbol}")
-                        return result, source.value  # 返回结果和实际使用的数据源
-                    else:
-                        logger.warning(f"⚠️ [备用数据源-{source.value}] 返回错误结果: {symbol}")
-
-                except Exception as e:
-                    logger.error(f"❌ [备用数据源-{source.value}] 获取失败: {symbol}, 错误: {e}")
-                    continue
+        # 直接调用具体的数据源方法，避免递归
+        fetchers = {
+            ChinaDataSource.TUSHARE: self._get_tushare_data,
+            ChinaDataSource.AKSHARE: self._get_akshare_data,
+            ChinaDataSource.BAOSTOCK: self._get_baostock_data,
+        }
+        candidates = [
+            (source.value, functools.partial(fetchers[source], symbol, start_date, end_date, period))
+            for source in fallback_order
+            if source != self.current_source and source in self.available_sources and source in fetchers
+        ]
+        if candidates:
+            logger.info(f"🔄 [备用数据源] 依次尝试 {[name for name, _ in candidates]} 获取{period}数据: {symbol}")
+            # 跳过已熔断的数据源；启用对冲时慢数据源超过 p90 延迟后并行请求下一个
+            result, source_name = call_with_fallback(candidates, op="history")
+            if result is not None:
+                logger.info(f"✅ [备用数据源-{source_name}] 成功获取{period}数据: {symbol}")
+                return result, source_name  # 返回结果和实际使用的数据源
 
         logger.error(f"❌ [所有数据源失败] 无法获取{period}数据: {symbol}")
         return f"❌ 所有数据源都无法获取{symbol}的{period}数据", None
@@ -1849,7 +1764,7 @@ class DataSourceManager:
 
         except Exception as e:
             logger.error(f"❌ [数据来源: AKShare异常] 生成基本面分析失败: {e}")
-            return f"❌ 生成{symbol}基本面分析失败: {e}"
+            raise
 
     def _get_valuation_indicators(self, symbol: str) -> Dict:
         """从stock_basic_info集合获取估值指标"""
@@ -2023,28 +1938,22 @@ class DataSourceManager:
         # 🔥 从数据库获取数据源优先级顺序（根据股票代码识别市场）
         fallback_order = self._get_data_source_priority_order(symbol)
 
-        for source in fallback_order:
-            if source != self.current_source and source in self.available_sources:
-                try:
-                    logger.info(f"🔄 尝试备用数据源获取基本面: {source.value}")
-
-                    # 直接调用具体的数据源方法，避免递归
-                    if source == ChinaDataSource.TUSHARE:
-                        result = self._get_tushare_fundamentals(symbol)
-                    elif source == ChinaDataSource.AKSHARE:
-                        result = self._get_akshare_fundamentals(symbol)
-                    else:
-                        continue
-
-                    if result and "❌" not in result:
-                        logger.info(f"✅ [数据来源: 备用数据源] 降级成功获取基本面: {source.value}")
-                        return result
-                    else:
-                        logger.warning(f"⚠️ 备用数据源{source.value}返回错误结果")
-
-                except Exception as e:
-                    logger.error(f"❌ 备用数据源{source.value}异常: {e}")
-                    continue
+        # 直接调用具体的数据源方法，避免递归
+        fetchers = {
+            ChinaDataSource.TUSHARE: self._get_tushare_fundamentals,
+            ChinaDataSource.AKSHARE: self._get_akshare_fundamentals,
+        }
+        candidates = [
+            (source.value, functools.partial(fetchers[source], symbol))
+            for source in fallback_order
+            if source != self.current_source and source in self.available_sources and source in fetchers
+        ]
+        if candidates:
+            logger.info(f"🔄 尝试备用数据源获取基本面: {[name for name, _ in candidates]}")
+            result, source_name = call_with_fallback(candidates, op="fundamentals")
+            if result is not None:
+                logger.info(f"✅ [数据来源: 备用数据源] 降级成功获取基本面: {source_name}")
+                return result
 
         # 所有数据源都失败，生成基本分析
         logger.warning(f"⚠️ [数据来源: 生成分析] 所有数据源失败，生成基本分析: {symbol}")
@@ -2175,6 +2084,7 @@ def get_china_stock_data_unified(symbol: str, start_date: str, end_date: str) ->
     return result
 
 
+@coalesce("get_china_stock_info_unified", key_func=lambda symbol: (symbol,))
 def get_china_stock_info_unified(symbol: str) -> Dict:
     """
     统一的中国股票信息获取接口
@@ -2186,7 +2096,35 @@ def get_china_stock_info_unified(symbol: str) -> Dict:
         Dict: 股票基本信息
     """
     manager = get_data_source_manager()
-    return manager.get_stock_info(symbol)
+
+    try:
+        from .cache import get_file_cache
+        from .cache.swr import get_stale_while_revalidate
+        file_cache = get_file_cache()
+    except Exception as e:
+        logger.debug(f"公司信息缓存不可用，直接获取: {e}")
+        return manager.get_stock_info(symbol)
+
+    def lookup():
+        entry = file_cache.find_latest_cache_entry(symbol, 'company_info', max_age_hours=hard_ttl)
+        if entry is None:
+            return None
+        info = file_cache.load_company_info(entry[0])
+        return (info, entry[1]) if info else None
+
+    def refresh():
+        info = manager.get_stock_info(symbol)
+        # 只缓存有效结果，避免把降级占位信息当作公司信息
+        if info and info.get('name') and info['name'] != f'股票{symbol}':
+            file_cache.save_company_info(symbol, info, data_source=info.get('source', 'unknown'))
+        return info
+
+    # stale-while-revalidate：见过的股票直接返回缓存，过期后后台刷新
+    soft_ttl, hard_ttl = file_cache.get_ttl_policy(symbol, 'company_info')
+    return get_stale_while_revalidate().get(
+        ('company_info', symbol), lookup, refresh,
+        soft_ttl_hours=soft_ttl, hard_ttl_hours=hard_ttl,
+    )
 
 
 # 全局数据源管理器实例
@@ -2258,16 +2196,9 @@ class USDataSourceManager:
             按优先级排序的数据源列表（不包含MongoDB）
         """
         try:
-            # 从数据库读取数据源配置
-            from app.core.database import get_mongo_db_sync
-            db = get_mongo_db_sync()
-
-            # 方法1: 从 datasource_groupings 集合读取（推荐）
-            groupings_collection = db.datasource_groupings
-            groupings = list(groupings_collection.find({
-                "market_category_id": "us_stocks",
-                "enabled": True
-            }).sort("priority", -1))  # 降序排序，优先级高的在前
+            # 方法1: 从 datasource_groupings 集合读取（推荐，经进程内路由表缓存，按优先级降序）
+            from tradingagents.dataflows.datasource_routing import get_enabled_groupings
+            groupings = get_enabled_groupings("us_stocks")
 
             if groupings:
                 # 转换为 USDataSource 枚举
@@ -2389,14 +2320,9 @@ class USDataSourceManager:
     def _get_enabled_sources_from_db(self) -> List[str]:
         """从数据库读取启用的数据源列表"""
         try:
-            from app.core.database import get_mongo_db_sync
-            db = get_mongo_db_sync()
-
-            # 从 datasource_groupings 集合读取
-            groupings = list(db.datasource_groupings.find({
-                "market_category_id": "us_stocks",
-                "enabled": True
-            }))
+            # 从 datasource_groupings 集合读取（经进程内路由表缓存）
+            from tradingagents.dataflows.datasource_routing import get_enabled_groupings
+            groupings = get_enabled_groupings("us_stocks")
 
             # 🔥 数据源名称映射（数据库名称 → 代码中使用的名称）
             name_mapping = {
@@ -2422,28 +2348,9 @@ class USDataSourceManager:
     def _get_datasource_configs_from_db(self) -> dict:
         """从数据库读取数据源配置（包括 API Key）"""
         try:
-            from app.core.database import get_mongo_db_sync
-            db = get_mongo_db_sync()
-
-            # 从 system_configs 集合读取激活的配置
-            config = db.system_configs.find_one({"is_active": True})
-            if not config:
-                return {}
-
-            # 提取数据源配置
-            datasource_configs = config.get('data_source_configs', [])
-
-            # 构建配置字典 {数据源名称: {api_key, api_secret, ...}}
-            result = {}
-            for ds_config in datasource_configs:
-                name = ds_config.get('name', '').lower()
-                result[name] = {
-                    'api_key': ds_config.get('api_key', ''),
-                    'api_secret': ds_config.get('api_secret', ''),
-                    'config_params': ds_config.get('config_params', {})
-                }
-
-            return result
+            # 从进程内路由表读取激活配置，构建 {数据源名称: {api_key, api_secret, ...}}
+            from tradingagents.dataflows.datasource_routing import get_datasource_routing
+            return get_datasource_routing().configs_by_name()
         except Exception as e:
             logger.warning(f"⚠️ 从数据库读取数据源配置失败: {e}")
             return {}
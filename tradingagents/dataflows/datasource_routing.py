@@ -0,0 +1,271 @@
+"""
+数据源路由表（进程内缓存）
+
+数据源管理器、MongoDB 缓存适配器等每次取数都需要读取 system_configs 中激活配置的
+data_source_configs 来决定数据源优先级。本模块把激活配置缓存为进程内路由表：
+- 按激活配置的 version 构建，TTL 到期后只查询 version，版本未变则直接续期
+- config_service 写入配置后调用 invalidate_datasource_routing() 立即失效
+- 可选 Redis pub/sub，把失效通知广播到其他进程/实例
+
+配置（环境变量）：
+    TA_DATASOURCE_ROUTING_TTL_SECONDS=30      # 路由表有效期（秒），0 表示每次都读数据库
+    TA_DATASOURCE_ROUTING_PUBSUB=false        # 是否通过 Redis pub/sub 广播失效通知（使用 REDIS_URL）
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+# Redis（可选）
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    redis = None
+    REDIS_AVAILABLE = False
+
+
+INVALIDATION_CHANNEL = "ta:datasource_routing:invalidate"
+
+# 未配置或读取失败时视为全部启用的数据源
+ALL_SOURCE_TYPES = frozenset({'mongodb', 'tushare', 'akshare', 'baostock'})
+
+
+class DataSourceRouting:
+    """某一版本激活配置对应的路由表（只读）"""
+
+    def __init__(self, config: Optional[Dict[str, Any]]):
+        config = config or {}
+        self.version = config.get('version')
+        self.data_source_configs: List[Dict[str, Any]] = list(config.get('data_source_configs') or [])
+        self._priority: Dict[Optional[str], List[str]] = {}
+        self._groupings: Dict[str, List[Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def has_configs(self) -> bool:
+        return bool(self.data_source_configs)
+
+    def priority(self, market_category: Optional[str] = None) -> List[str]:
+        """
+        按优先级排序的已启用数据源类型（数字越大优先级越高）
+
+        Args:
+            market_category: 市场分类（a_shares/us_stocks/hk_stocks），数据源配置了市场分类时只保留匹配项
+
+        Returns:
+            小写数据源类型列表，例如 ["tushare", "akshare", "baostock"]
+        """
+        cached = self._priority.get(market_category)
+        if cached is not None:
+            return list(cached)
+
+        enabled = []
+        for ds in self.data_source_configs:
+            if not ds.get('enabled', True) or not ds.get('type'):
+                continue
+            categories = ds.get('market_categories', [])
+            if categories and market_category and market_category not in categories:
+                continue
+            enabled.append(ds)
+        enabled.sort(key=lambda x: x.get('priority', 0), reverse=True)
+
+        result = [ds.get('type', '').lower() for ds in enabled]
+        self._priority[market_category] = result
+        return list(result)
+
+    def enabled_types(self) -> set:
+        """已启用的数据源类型；没有配置时返回全部数据源"""
+        if not self.has_configs:
+            return set(ALL_SOURCE_TYPES)
+        return {ds.get('type', '').lower() for ds in self.data_source_configs if ds.get('enabled', True)}
+
+    def configs_by_name(self) -> Dict[str, Dict[str, Any]]:
+        """{数据源名称(小写): {api_key, api_secret, config_params}}"""
+        return {
+            ds.get('name', '').lower(): {
+                'api_key': ds.get('api_key', ''),
+                'api_secret': ds.get('api_secret', ''),
+                'config_params': ds.get('config_params', {}),
+            }
+            for ds in self.data_source_configs
+        }
+
+    def groupings(self, market_category_id: str, loader: Callable[[], List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """某市场分类下已启用的 datasource_groupings（按优先级降序），随路由表一起缓存"""
+        with self._lock:
+            if market_category_id not in self._groupings:
+                self._groupings[market_category_id] = list(loader())
+            return list(self._groupings[market_category_id])
+
+
+class DataSourceRoutingCache:
+    """路由表缓存：TTL + 版本校验 + 显式失效"""
+
+    def __init__(self, ttl: float = 30.0, db_getter: Optional[Callable[[], Any]] = None):
+        self.ttl = ttl
+        self._db_getter = db_getter
+        self._routing: Optional[DataSourceRouting] = None
+        self._expires_at = 0.0
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'reloads': 0, 'renewals': 0, 'invalidations': 0, 'errors': 0}
+
+    def _get_db(self, db=None):
+        if db is not None:
+            return db
+        if self._db_getter is not None:
+            return self._db_getter()
+        from app.core.database import get_mongo_db_sync
+        return get_mongo_db_sync()
+
+    @staticmethod
+    def _find_active(db, projection: Optional[Dict[str, int]] = None) -> Optional[Dict[str, Any]]:
+        return db.system_configs.find_one({"is_active": True}, projection, sort=[("version", -1)])
+
+    def get(self, db=None) -> DataSourceRouting:
+        """
+        获取当前路由表
+
+        Args:
+            db: 同步 MongoDB 数据库（pymongo），None 时使用 get_mongo_db_sync()
+
+        Raises:
+            读取数据库失败且没有可用的旧路由表时抛出原异常
+        """
+        now = time.monotonic()
+        routing = self._routing
+        if routing is not None and now < self._expires_at:
+            self.stats['hits'] += 1
+            return routing
+
+        with self._lock:
+            routing = self._routing
+            if routing is not None and time.monotonic() < self._expires_at:
+                self.stats['hits'] += 1
+                return routing
+            try:
+                database = self._get_db(db)
+                if routing is not None:
+                    # 只查询版本号，版本未变时续期（分组缓存随之清空）
+                    head = self._find_active(database, {"version": 1})
+                    if head is not None and head.get('version') == routing.version:
+                        routing = DataSourceRouting({'version': routing.version,
+                                                     'data_source_configs': routing.data_source_configs})
+                        self.stats['renewals'] += 1
+                        return self._store(routing)
+                routing = DataSourceRouting(self._find_active(database))
+                self.stats['reloads'] += 1
+                logger.debug(f"🔄 [数据源路由] 已加载配置版本: {routing.version}")
+                return self._store(routing)
+            except Exception as e:
+                self.stats['errors'] += 1
+                if self._routing is None:
+                    raise
+                logger.warning(f"⚠️ [数据源路由] 刷新失败，继续使用版本 {self._routing.version}: {e}")
+                # 短暂续期，避免数据库故障期间每次调用都重试
+                self._expires_at = time.monotonic() + min(self.ttl, 5.0)
+                return self._routing
+
+    def _store(self, routing: DataSourceRouting) -> DataSourceRouting:
+        self._routing = routing
+        self._expires_at = time.monotonic() + self.ttl
+        return routing
+
+    def invalidate(self):
+        with self._lock:
+            self._routing = None
+            self._expires_at = 0.0
+            self.stats['invalidations'] += 1
+
+
+# 全局实例
+_routing_cache: Optional[DataSourceRoutingCache] = None
+_cache_lock = threading.Lock()
+_subscriber_started = False
+
+
+def _pubsub_enabled() -> bool:
+    return REDIS_AVAILABLE and os.getenv("TA_DATASOURCE_ROUTING_PUBSUB", "false").lower() in ("true", "1", "yes", "on")
+
+
+def _redis_from_env():
+    redis_password = os.getenv("REDIS_PASSWORD", "tradingagents123")
+    redis_port = os.getenv("REDIS_PORT", "6380")
+    redis_url = os.getenv("REDIS_URL", f"redis://:{redis_password}@localhost:{redis_port}")
+    return redis.from_url(redis_url, socket_connect_timeout=2, decode_responses=True)
+
+
+def _start_subscriber():
+    """后台线程订阅失效通知（每个进程一次）"""
+    global _subscriber_started
+    if _subscriber_started or not _pubsub_enabled():
+        return
+    _subscriber_started = True
+
+    def _listen():
+        while True:
+            try:
+                pubsub = _redis_from_env().pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(INVALIDATION_CHANNEL)
+                logger.info("✅ [数据源路由] 已订阅配置失效通知")
+                for message in pubsub.listen():
+                    if message.get('type') == 'message':
+                        get_datasource_routing_cache().invalidate()
+            except Exception as e:
+                logger.warning(f"⚠️ [数据源路由] 失效通知订阅中断，30秒后重试: {e}")
+                time.sleep(30)
+
+    threading.Thread(target=_listen, name="datasource-routing-invalidation", daemon=True).start()
+
+
+def get_datasource_routing_cache() -> DataSourceRoutingCache:
+    """获取全局路由表缓存"""
+    global _routing_cache
+    if _routing_cache is None:
+        with _cache_lock:
+            if _routing_cache is None:
+                _routing_cache = DataSourceRoutingCache(
+                    ttl=float(os.getenv("TA_DATASOURCE_ROUTING_TTL_SECONDS", "30")),
+                )
+    return _routing_cache
+
+
+def get_datasource_routing(db=None) -> DataSourceRouting:
+    """获取当前数据源路由表（见 DataSourceRoutingCache.get）"""
+    _start_subscriber()
+    return get_datasource_routing_cache().get(db)
+
+
+def get_enabled_groupings(market_category_id: str, db=None) -> List[Dict[str, Any]]:
+    """某市场分类下已启用的 datasource_groupings（按优先级降序），随路由表缓存与失效"""
+    cache = get_datasource_routing_cache()
+
+    def _load():
+        database = cache._get_db(db)
+        return database.datasource_groupings.find({
+            "market_category_id": market_category_id,
+            "enabled": True
+        }).sort("priority", -1)
+
+    return get_datasource_routing(db).groupings(market_category_id, _load)
+
+
+def invalidate_datasource_routing(publish: bool = True):
+    """
+    使路由表失效（配置写入后调用）
+
+    Args:
+        publish: 是否通过 Redis 广播给其他进程（需启用 TA_DATASOURCE_ROUTING_PUBSUB）
+    """
+    get_datasource_routing_cache().invalidate()
+    if publish and _pubsub_enabled():
+        try:
+            _redis_from_env().publish(INVALIDATION_CHANNEL, str(time.time()))
+        except Exception as e:
+            logger.warning(f"⚠️ [数据源路由] 广播失效通知失败: {e}")
@@ -60,18 +60,12 @@ def _get_enabled_hk_data_sources() -> list:
         list: 按优先级排序的数据源列表，如 ['akshare', 'yfinance']
     """
     try:
-        # 尝试从数据库读取配置
-        from app.core.database import get_mongo_db_sync
-        db = get_mongo_db_sync()
-
-        # 获取最新的激活配置
-        config_data = db.system_configs.find_one(
-            {"is_active": True},
-            sort=[("version", -1)]
-        )
+        # 从进程内路由表读取最新的激活配置（按配置版本缓存）
+        from tradingagents.dataflows.datasource_routing import get_datasource_routing
+        routing = get_datasource_routing()
 
-        if config_data and config_data.get('data_source_configs'):
-            data_source_configs = config_data.get('data_source_configs', [])
+        if routing.has_configs:
+            data_source_configs = routing.data_source_configs
 
             # 过滤出启用的港股数据源
             enabled_sources = []
@@ -120,18 +114,12 @@ def _get_enabled_us_data_sources() -> list:
         list: 按优先级排序的数据源列表，如 ['yfinance', 'finnhub']
     """
     try:
-        # 尝试从数据库读取配置
-        from app.core.database import get_mongo_db_sync
-        db = get_mongo_db_sync()
-
-        # 获取最新的激活配置
-        config_data = db.system_configs.find_one(
-            {"is_active": True},
-            sort=[("version", -1)]
-        )
+        # 从进程内路由表读取最新的激活配置（按配置版本缓存）
+        from tradingagents.dataflows.datasource_routing import get_datasource_routing
+        routing = get_datasource_routing()
 
-        if config_data and config_data.get('data_source_configs'):
-            data_source_configs = config_data.get('data_source_configs', [])
+        if routing.has_configs:
+            data_source_configs = routing.data_source_configs
 
             # 过滤出启用的美股数据源
             enabled_sources = []
@@ -742,39 +730,39 @@ def get_stock_stats_indicators_window(
     curr_date = datetime.strptime(curr_date, "%Y-%m-%d")
     before = curr_date - relativedelta(days=look_back_days)
 
-    if not online:
-        # read from YFin data
-        data = pd.read_csv(
-            os.path.join(
-                DATA_DIR,
-                f"market_data/price_data/{symbol}-YFin-data-2015-01-01-2025-03-25.csv",
-            )
-        )
-        data["Date"] = pd.to_datetime(data["Date"], utc=True)
-        dates_in_df = data["Date"].astype(str).str[:10]
-
-        ind_string = ""
-        while curr_date >= before:
-            # only do the trading dates
-            if curr_date.strftime("%Y-%m-%d") in dates_in_df.values:
-                indicator_value = get_stockstats_indicator(
-                    symbol, indicator, curr_date.strftime("%Y-%m-%d"), online
-                )
+    # 窗口内的日期（从当前日期倒序）
+    window_dates = []
+    day = curr_date
+    while day >= before:
+        window_dates.append(day.strftime("%Y-%m-%d"))
+        day = day - relativedelta(days=1)
 
-                ind_string += f"{curr_date.strftime('%Y-%m-%d')}: {indicator_value}\n"
+    price_dir = os.path.join(DATA_DIR, "market_data", "price_data")
 
-            curr_date = curr_date - relativedelta(days=1)
+    if not online:
+        # read from YFin data（只读取一次，交易日过滤和指标计算共用）
+        data = StockstatsUtils.load_price_data(symbol, price_dir, online=False)
+        dates_in_df = set(pd.to_datetime(data["Date"], utc=True).astype(str).str[:10])
+        # only do the trading dates
+        window_dates = [d for d in window_dates if d in dates_in_df]
     else:
-        # online gathering
-        ind_string = ""
-        while curr_date >= before:
-            indicator_value = get_stockstats_indicator(
-                symbol, indicator, curr_date.strftime("%Y-%m-%d"), online
-            )
+        data = None
 
-            ind_string += f"{curr_date.strftime('%Y-%m-%d')}: {indicator_value}\n"
+    # 指标只在完整历史上计算一次，再按窗口日期取值
+    try:
+        if data is None:
+            data = StockstatsUtils.load_price_data(symbol, price_dir, online=True)
+        values = StockstatsUtils.compute_indicator_by_date(data, indicator)
+        window_values = {
+            d: str(StockstatsUtils.lookup_indicator(values, d)) for d in window_dates
+        }
+    except Exception as e:
+        logger.error(
+            f"❌ 获取 stockstats 指标 {indicator} 失败 ({before.strftime('%Y-%m-%d')} ~ {end_date}): {e}"
+        )
+        window_values = {d: "" for d in window_dates}
 
-            curr_date = curr_date - relativedelta(days=1)
+    ind_string = "".join(f"{d}: {window_values[d]}\n" for d in window_dates)
 
     result_str = (
         f"## {indicator} values from {before.strftime('%Y-%m-%d')} to {end_date}:\n\n"
@@ -11,12 +11,14 @@ from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
 
 from typing import Optional, Dict, Any
-from .cache import get_cache
+from .cache import get_cache, get_file_cache
+from .cache.swr import get_stale_while_revalidate
 from tradingagents.config.config_manager import config_manager
 
 from tradingagents.config.runtime_settings import get_float, get_timezone_name
 # 导入日志模块
 from tradingagents.utils.logging_manager import get_logger
+from tradingagents.utils.singleflight import coalesce
 logger = get_logger('agents')
 
 # 导入 MongoDB 缓存适配器
@@ -195,6 +197,8 @@ class OptimizedChinaDataProvider:
             # 生成备用数据
             return self._generate_fallback_data(symbol, start_date, end_date, error_msg)
 
+    @coalesce("optimized_china_data.get_fundamentals_data",
+              key_func=lambda self, symbol, force_refresh=False: (symbol, force_refresh))
     def get_fundamentals_data(self, symbol: str, force_refresh: bool = False) -> str:
         """
         获取A股基本面数据 - 优先使用缓存
@@ -218,29 +222,35 @@ class OptimizedChinaDataProvider:
                     # 将财务数据转换为基本面分析格式
                     return self._format_financial_data_to_fundamentals(financial_data, symbol)
 
-        # 2. 检查文件缓存（除非强制刷新）
-        if not force_refresh:
-            # 查找基本面数据缓存
-            for metadata_file in self.cache.metadata_dir.glob(f"*_meta.json"):
-                try:
-                    import json
-                    with open(metadata_file, 'r', encoding='utf-8') as f:
-                        metadata = json.load(f)
+        if force_refresh:
+            return self._generate_and_cache_fundamentals(symbol)
 
-                    if (metadata.get('symbol') == symbol and
-                        metadata.get('data_type') == 'fundamentals' and
-                        metadata.get('market_type') == 'china'):
+        # 2. 文件缓存（stale-while-revalidate）：软TTL内直接返回；
+        #    超过软TTL但未超过硬TTL时先返回旧数据，后台重新生成
+        file_cache = get_file_cache()
+        soft_ttl, hard_ttl = file_cache.get_ttl_policy(symbol, 'fundamentals')
 
-                        cache_key = metadata_file.stem.replace('_meta', '')
-                        if self.cache.is_cache_valid(cache_key, symbol=symbol, data_type='fundamentals'):
-                            cached_data = self.cache.load_stock_data(cache_key)
-                            if cached_data:
-                                logger.info(f"⚡ [数据来源: 文件缓存] 从缓存加载A股基本面数据: {symbol}")
-                                return cached_data
-                except Exception:
-                    continue
-
-        # 缓存未命中，生成基本面分析
+        def lookup():
+            entry = file_cache.find_latest_cache_entry(symbol, 'fundamentals', max_age_hours=hard_ttl)
+            if entry is None:
+                return None
+            cache_key, age_hours = entry
+            cached_data = file_cache.load_fundamentals_data(cache_key)
+            if not cached_data:
+                return None
+            logger.info(f"⚡ [数据来源: 文件缓存] 从缓存加载A股基本面数据: {symbol} (已缓存 {age_hours:.1f}h)")
+            return cached_data, age_hours
+
+        return get_stale_while_revalidate().get(
+            ('china_fundamentals', symbol),
+            lookup,
+            lambda: self._generate_and_cache_fundamentals(symbol),
+            soft_ttl_hours=soft_ttl,
+            hard_ttl_hours=hard_ttl,
+        )
+
+    def _generate_and_cache_fundamentals(self, symbol: str) -> str:
+        """生成基本面分析并写入文件缓存，失败时返回备用数据（不缓存）"""
         logger.debug(f"🔍 [数据来源: 生成分析] 生成A股基本面分析: {symbol}")
 
         try:
@@ -252,7 +262,7 @@ class OptimizedChinaDataProvider:
             fundamentals_data = self._generate_fundamentals_report(symbol, stock_basic_info)
 
             # 保存到缓存
-            self.cache.save_fundamentals_data(
+            get_file_cache().save_fundamentals_data(
                 symbol=symbol,
                 fundamentals_data=fundamentals_data,
                 data_source="unified_analysis"  # 统一数据源分析
@@ -896,19 +906,18 @@ class OptimizedChinaDataProvider:
 
             # 第二优先级：从AKShare API获取
             from .providers.china.akshare import get_akshare_provider
-            import asyncio
+            from tradingagents.utils.async_bridge import run_coro_sync
 
             akshare_provider = get_akshare_provider()
 
             if akshare_provider.connected:
-                # AKShare的get_financial_data是异步方法，需要使用asyncio运行
-                loop = asyncio.get_event_loop()
-                financial_data = loop.run_until_complete(akshare_provider.get_financial_data(symbol))
+                # AKShare的get_financial_data是异步方法，经常驻后台事件循环执行
+                financial_data = run_coro_sync(akshare_provider.get_financial_data(symbol))
 
                 if financial_data and any(not v.empty if hasattr(v, 'empty') else bool(v) for v in financial_data.values()):
                     logger.info(f"✅ AKShare财务数据获取成功: {symbol}")
                     # 获取股票基本信息（也是异步方法）
-                    stock_info = loop.run_until_complete(akshare_provider.get_stock_basic_info(symbol))
+                    stock_info = run_coro_sync(akshare_provider.get_stock_basic_info(symbol))
 
                     # 解析AKShare财务数据
                     logger.debug(f"🔧 调用AKShare解析函数，股价: {price_value}")
@@ -929,7 +938,7 @@ class OptimizedChinaDataProvider:
             # 第三优先级：使用Tushare数据源
             logger.info(f"🔄 使用Tushare备用数据源获取{symbol}财务数据")
             from .providers.china.tushare import get_tushare_provider
-            import asyncio
+            from tradingagents.utils.async_bridge import run_coro_sync
 
             provider = get_tushare_provider()
             if not provider.connected:
@@ -937,14 +946,13 @@ class OptimizedChinaDataProvider:
                 return None
 
             # 获取财务数据（异步方法）
-            loop = asyncio.get_event_loop()
-            financial_data = loop.run_until_complete(provider.get_financial_data(symbol))
+            financial_data = run_coro_sync(provider.get_financial_data(symbol))
             if not financial_data:
                 logger.debug(f"未获取到{symbol}的财务数据")
                 return None
 
             # 获取股票基本信息（异步方法）
-            stock_info = loop.run_until_complete(provider.get_stock_basic_info(symbol))
+            stock_info = run_coro_sync(provider.get_stock_basic_info(symbol))
 
             # 解析Tushare财务数据
             metrics = self._parse_financial_data(financial_data, stock_info, price_value)
@@ -3,12 +3,16 @@ AKShare统一数据提供器
 基于AKShare SDK的统一数据同步方案，提供标准化的数据接口
 """
 import asyncio
+import functools
 import logging
 from datetime import datetime, timedelta, timezone
 from typing import Dict, Any, List, Optional, Union
 import pandas as pd
 
 from ..base_provider import BaseStockDataProvider
+from ..concurrency import fetch_concurrently, get_provider_limiter
+from .spot_snapshot import EASTMONEY, SINA, get_spot_snapshot_service
+from tradingagents.config.providers_config import get_provider_config
 
 logger = logging.getLogger(__name__)
 
@@ -365,107 +369,59 @@ class AKShareProvider(BaseStockDataProvider):
             try:
                 logger.debug(f"📊 批量获取 {len(codes)} 只股票的实时行情... (尝试 {attempt + 1}/{max_retries})")
 
-                # 优先使用新浪财经接口（更稳定，不容易被封）
-                def fetch_spot_data_sina():
-                    import time
-                    time.sleep(0.3)  # 添加延迟避免频率限制
-                    return self.ak.stock_zh_a_spot()
+                # 优先使用新浪财经接口（更稳定，不容易被封），失败时回退到东方财富接口
+                # 全市场快照在进程内共享，TTL 内不会重复下载
+                snapshot_service = get_spot_snapshot_service()
+                snapshot = await snapshot_service.aget(SINA)
+                if snapshot is None:
+                    logger.warning("⚠️ 新浪财经接口失败，尝试东方财富接口...")
+                    snapshot = await snapshot_service.aget(EASTMONEY)
 
-                try:
-                    spot_df = await asyncio.to_thread(fetch_spot_data_sina)
-                    data_source = "sina"
-                    logger.debug("✅ 使用新浪财经接口获取数据")
-                except Exception as e:
-                    logger.warning(f"⚠️ 新浪财经接口失败: {e}，尝试东方财富接口...")
-                    # 回退到东方财富接口
-                    def fetch_spot_data_em():
-                        import time
-                        time.sleep(0.5)
-                        return self.ak.stock_zh_a_spot_em()
-                    spot_df = await asyncio.to_thread(fetch_spot_data_em)
-                    data_source = "eastmoney"
-                    logger.debug("✅ 使用东方财富接口获取数据")
-
-                if spot_df is None or spot_df.empty:
+                if snapshot is None or not len(snapshot):
                     logger.warning("⚠️ 全市场快照为空")
                     if attempt < max_retries - 1:
                         await asyncio.sleep(retry_delay)
                         continue
                     return {}
+                logger.debug(f"✅ 使用 {snapshot.source} 全市场快照 ({snapshot.age:.0f}秒前)")
 
-                # 构建代码到行情的映射
+                # 构建代码到行情的映射（快照已按 6 位代码建立索引）
                 quotes_map = {}
                 codes_set = set(codes)
-
-                # 构建代码映射表（支持带前缀的代码匹配）
-                # 例如：sh600000 -> 600000, sz000001 -> 000001
-                code_mapping = {}
-                for code in codes:
-                    code_mapping[code] = code  # 原始代码
-                    # 添加可能的前缀变体
-                    for prefix in ['sh', 'sz', 'bj']:
-                        code_mapping[f"{prefix}{code}"] = code
-
-                for _, row in spot_df.iterrows():
-                    raw_code = str(row.get("代码", ""))
-
-                    # 尝试匹配代码（支持带前缀和不带前缀）
-                    matched_code = None
-                    if raw_code in code_mapping:
-                        matched_code = code_mapping[raw_code]
-                    elif raw_code in codes_set:
-                        matched_code = raw_code
-
-                    if matched_code:
-                        quotes_data = {
-                            "name": str(row.get("名称", f"股票{matched_code}")),
-                            "price": self._safe_float(row.get("最新价", 0)),
-                            "change": self._safe_float(row.get("涨跌额", 0)),
-                            "change_percent": self._safe_float(row.get("涨跌幅", 0)),
-                            "volume": self._safe_int(row.get("成交量", 0)),
-                            "amount": self._safe_float(row.get("成交额", 0)),
-                            "open": self._safe_float(row.get("今开", 0)),
-                            "high": self._safe_float(row.get("最高", 0)),
-                            "low": self._safe_float(row.get("最低", 0)),
-                            "pre_close": self._safe_float(row.get("昨收", 0)),
-                            # 🔥 新增：财务指标字段
-                            "turnover_rate": self._safe_float(row.get("换手率", None)),  # 换手率（%）
-                            "volume_ratio": self._safe_float(row.get("量比", None)),  # 量比
-                            "pe": self._safe_float(row.get("市盈率-动态", None)),  # 动态市盈率
-                            "pb": self._safe_float(row.get("市净率", None)),  # 市净率
-                            "total_mv": self._safe_float(row.get("总市值", None)),  # 总市值（元）
-                            "circ_mv": self._safe_float(row.get("流通市值", None)),  # 流通市值（元）
-                        }
-
-                        # 转换为标准化字典（使用匹配后的代码）
-                        quotes_map[matched_code] = {
-                            "code": matched_code,
-                            "symbol": matched_code,
-                            "name": quotes_data.get("name", f"股票{matched_code}"),
-                            "price": float(quotes_data.get("price", 0)),
-                            "change": float(quotes_data.get("change", 0)),
-                            "change_percent": float(quotes_data.get("change_percent", 0)),
-                            "volume": int(quotes_data.get("volume", 0)),
-                            "amount": float(quotes_data.get("amount", 0)),
-                            "open_price": float(quotes_data.get("open", 0)),
-                            "high_price": float(quotes_data.get("high", 0)),
-                            "low_price": float(quotes_data.get("low", 0)),
-                            "pre_close": float(quotes_data.get("pre_close", 0)),
-                            # 🔥 新增：财务指标字段
-                            "turnover_rate": quotes_data.get("turnover_rate"),  # 换手率（%）
-                            "volume_ratio": quotes_data.get("volume_ratio"),  # 量比
-                            "pe": quotes_data.get("pe"),  # 动态市盈率
-                            "pe_ttm": quotes_data.get("pe"),  # TTM市盈率（与动态市盈率相同）
-                            "pb": quotes_data.get("pb"),  # 市净率
-                            "total_mv": quotes_data.get("total_mv") / 1e8 if quotes_data.get("total_mv") else None,  # 总市值（转换为亿元）
-                            "circ_mv": quotes_data.get("circ_mv") / 1e8 if quotes_data.get("circ_mv") else None,  # 流通市值（转换为亿元）
-                            # 扩展字段
-                            "full_symbol": self._get_full_symbol(matched_code),
-                            "market_info": self._get_market_info(matched_code),
-                            "data_source": "akshare",
-                            "last_sync": datetime.now(timezone.utc),
-                            "sync_status": "success"
-                        }
+                last_sync = datetime.now(timezone.utc)
+
+                for matched_code, row in snapshot.get_many(codes_set).items():
+                    quotes_data = self._parse_spot_row(row, matched_code)
+
+                    # 转换为标准化字典（使用匹配后的代码）
+                    quotes_map[matched_code] = {
+                        "code": matched_code,
+                        "symbol": matched_code,
+                        "name": quotes_data.get("name", f"股票{matched_code}"),
+                        "price": float(quotes_data.get("price", 0)),
+                        "change": float(quotes_data.get("change", 0)),
+                        "change_percent": float(quotes_data.get("change_percent", 0)),
+                        "volume": int(quotes_data.get("volume", 0)),
+                        "amount": float(quotes_data.get("amount", 0)),
+                        "open_price": float(quotes_data.get("open", 0)),
+                        "high_price": float(quotes_data.get("high", 0)),
+                        "low_price": float(quotes_data.get("low", 0)),
+                        "pre_close": float(quotes_data.get("pre_close", 0)),
+                        # 🔥 新增：财务指标字段
+                        "turnover_rate": quotes_data.get("turnover_rate"),  # 换手率（%）
+                        "volume_ratio": quotes_data.get("volume_ratio"),  # 量比
+                        "pe": quotes_data.get("pe"),  # 动态市盈率
+                        "pe_ttm": quotes_data.get("pe"),  # TTM市盈率（与动态市盈率相同）
+                        "pb": quotes_data.get("pb"),  # 市净率
+                        "total_mv": quotes_data.get("total_mv") / 1e8 if quotes_data.get("total_mv") else None,  # 总市值（转换为亿元）
+                        "circ_mv": quotes_data.get("circ_mv") / 1e8 if quotes_data.get("circ_mv") else None,  # 流通市值（转换为亿元）
+                        # 扩展字段
+                        "full_symbol": self._get_full_symbol(matched_code),
+                        "market_info": self._get_market_info(matched_code),
+                        "data_source": "akshare",
+                        "last_sync": last_sync,
+                        "sync_status": "success"
+                    }
 
                 found_count = len(quotes_map)
                 missing_count = len(codes) - found_count
@@ -586,49 +542,52 @@ class AKShareProvider(BaseStockDataProvider):
             logger.error(f"❌ 获取{code}实时行情失败: {e}", exc_info=True)
             return None
     
+    def _parse_spot_row(self, row: Dict[str, Any], code: str) -> Dict[str, Any]:
+        """解析全市场快照中的一行"""
+        return {
+            "name": str(row.get("名称", f"股票{code}")),
+            "price": self._safe_float(row.get("最新价", 0)),
+            "change": self._safe_float(row.get("涨跌额", 0)),
+            "change_percent": self._safe_float(row.get("涨跌幅", 0)),
+            "volume": self._safe_int(row.get("成交量", 0)),
+            "amount": self._safe_float(row.get("成交额", 0)),
+            "open": self._safe_float(row.get("今开", 0)),
+            "high": self._safe_float(row.get("最高", 0)),
+            "low": self._safe_float(row.get("最低", 0)),
+            "pre_close": self._safe_float(row.get("昨收", 0)),
+            # 🔥 新增：财务指标字段
+            "turnover_rate": self._safe_float(row.get("换手率", None)),  # 换手率（%）
+            "volume_ratio": self._safe_float(row.get("量比", None)),  # 量比
+            "pe": self._safe_float(row.get("市盈率-动态", None)),  # 动态市盈率
+            "pb": self._safe_float(row.get("市净率", None)),  # 市净率
+            "total_mv": self._safe_float(row.get("总市值", None)),  # 总市值（元）
+            "circ_mv": self._safe_float(row.get("流通市值", None)),  # 流通市值（元）
+        }
+
     async def _get_realtime_quotes_data(self, code: str) -> Dict[str, Any]:
         """获取实时行情数据"""
         try:
-            # 方法1: 获取A股实时行情
-            def fetch_spot_data():
-                return self.ak.stock_zh_a_spot_em()
-
+            # 方法1: 从共享的A股全市场快照中查找（TTL 内不会重复下载）
             try:
-                spot_df = await asyncio.to_thread(fetch_spot_data)
-
-                if spot_df is not None and not spot_df.empty:
-                    # 查找对应股票
-                    stock_data = spot_df[spot_df['代码'] == code]
-
-                    if not stock_data.empty:
-                        row = stock_data.iloc[0]
-
-                        # 解析行情数据
-                        return {
-                            "name": str(row.get("名称", f"股票{code}")),
-                            "price": self._safe_float(row.get("最新价", 0)),
-                            "change": self._safe_float(row.get("涨跌额", 0)),
-                            "change_percent": self._safe_float(row.get("涨跌幅", 0)),
-                            "volume": self._safe_int(row.get("成交量", 0)),
-                            "amount": self._safe_float(row.get("成交额", 0)),
-                            "open": self._safe_float(row.get("今开", 0)),
-                            "high": self._safe_float(row.get("最高", 0)),
-                            "low": self._safe_float(row.get("最低", 0)),
-                            "pre_close": self._safe_float(row.get("昨收", 0)),
-                            # 🔥 新增：财务指标字段
-                            "turnover_rate": self._safe_float(row.get("换手率", None)),  # 换手率（%）
-                            "volume_ratio": self._safe_float(row.get("量比", None)),  # 量比
-                            "pe": self._safe_float(row.get("市盈率-动态", None)),  # 动态市盈率
-                            "pb": self._safe_float(row.get("市净率", None)),  # 市净率
-                            "total_mv": self._safe_float(row.get("总市值", None)),  # 总市值（元）
-                            "circ_mv": self._safe_float(row.get("流通市值", None)),  # 流通市值（元）
-                        }
+                snapshot = await get_spot_snapshot_service().aget(EASTMONEY)
+                row = snapshot.get(code) if snapshot is not None else None
+                if row is not None:
+                    return self._parse_spot_row(row, code)
             except Exception as e:
                 logger.debug(f"获取{code}A股实时行情失败: {e}")
 
-            # 方法2: 尝试获取单只股票实时数据
+            # 方法2: 取最近几个交易日的日线，用最新一天作为当前行情
+            end_date = datetime.now()
+            start_date = end_date - timedelta(days=15)
+
             def fetch_individual_spot():
-                return self.ak.stock_zh_a_hist(symbol=code, period="daily", adjust="")
+                return self.ak.stock_zh_a_hist(
+                    symbol=code,
+                    period="daily",
+                    start_date=start_date.strftime("%Y%m%d"),
+                    end_date=end_date.strftime("%Y%m%d"),
+                    adjust=""
+                )
 
             try:
                 hist_df = await asyncio.to_thread(fetch_individual_spot)
@@ -688,7 +647,8 @@ class AKShareProvider(BaseStockDataProvider):
         code: str,
         start_date: str,
         end_date: str,
-        period: str = "daily"
+        period: str = "daily",
+        raise_on_error: bool = False
     ) -> Optional[pd.DataFrame]:
         """
         获取历史行情数据
@@ -698,11 +658,14 @@ class AKShareProvider(BaseStockDataProvider):
             start_date: 开始日期 (YYYY-MM-DD)
             end_date: 结束日期 (YYYY-MM-DD)
             period: 周期 (daily, weekly, monthly)
+            raise_on_error: 未连接或调用异常时抛出异常（而不是返回 None）
 
         Returns:
-            历史行情数据DataFrame
+            历史行情数据DataFrame，没有数据时返回 None
         """
         if not self.connected:
+            if raise_on_error:
+                raise ConnectionError("AKShare 未连接")
             return None
 
         try:
@@ -744,6 +707,8 @@ class AKShareProvider(BaseStockDataProvider):
 
         except Exception as e:
             logger.error(f"❌ 获取{code}历史数据失败: {e}")
+            if raise_on_error:
+                raise
             return None
 
     def _standardize_historical_columns(self, df: pd.DataFrame, code: str) -> pd.DataFrame:
@@ -803,55 +768,29 @@ class AKShareProvider(BaseStockDataProvider):
         try:
             logger.debug(f"💰 获取{code}财务数据...")
 
-            financial_data = {}
-
-            # 1. 获取主要财务指标
-            try:
-                def fetch_financial_abstract():
-                    return self.ak.stock_financial_abstract(symbol=code)
-
-                main_indicators = await asyncio.to_thread(fetch_financial_abstract)
-                if main_indicators is not None and not main_indicators.empty:
-                    financial_data['main_indicators'] = main_indicators.to_dict('records')
-                    logger.debug(f"✅ {code}主要财务指标获取成功")
-            except Exception as e:
-                logger.debug(f"获取{code}主要财务指标失败: {e}")
-
-            # 2. 获取资产负债表
-            try:
-                def fetch_balance_sheet():
-                    return self.ak.stock_balance_sheet_by_report_em(symbol=code)
-
-                balance_sheet = await asyncio.to_thread(fetch_balance_sheet)
-                if balance_sheet is not None and not balance_sheet.empty:
-                    financial_data['balance_sheet'] = balance_sheet.to_dict('records')
-                    logger.debug(f"✅ {code}资产负债表获取成功")
-            except Exception as e:
-                logger.debug(f"获取{code}资产负债表失败: {e}")
-
-            # 3. 获取利润表
-            try:
-                def fetch_income_statement():
-                    return self.ak.stock_profit_sheet_by_report_em(symbol=code)
-
-                income_statement = await asyncio.to_thread(fetch_income_statement)
-                if income_statement is not None and not income_statement.empty:
-                    financial_data['income_statement'] = income_statement.to_dict('records')
-                    logger.debug(f"✅ {code}利润表获取成功")
-            except Exception as e:
-                logger.debug(f"获取{code}利润表失败: {e}")
-
-            # 4. 获取现金流量表
-            try:
-                def fetch_cash_flow():
-                    return self.ak.stock_cash_flow_sheet_by_report_em(symbol=code)
+            # 主要财务指标、资产负债表、利润表、现金流量表并发获取，
+            # 受 AKShare 调用限制器约束，单个接口超时或失败时保留其余结果
+            statements = {
+                'main_indicators': ("主要财务指标", self.ak.stock_financial_abstract),
+                'balance_sheet': ("资产负债表", self.ak.stock_balance_sheet_by_report_em),
+                'income_statement': ("利润表", self.ak.stock_profit_sheet_by_report_em),
+                'cash_flow': ("现金流量表", self.ak.stock_cash_flow_sheet_by_report_em),
+            }
+            results, errors = await fetch_concurrently(
+                {key: functools.partial(ak_func, symbol=code) for key, (_, ak_func) in statements.items()},
+                limiter=get_provider_limiter("akshare"),
+                timeout=get_provider_config("akshare").get("timeout"),
+            )
 
-                cash_flow = await asyncio.to_thread(fetch_cash_flow)
-                if cash_flow is not None and not cash_flow.empty:
-                    financial_data['cash_flow'] = cash_flow.to_dict('records')
-                    logger.debug(f"✅ {code}现金流量表获取成功")
-            except Exception as e:
-                logger.debug(f"获取{code}现金流量表失败: {e}")
+            financial_data = {}
+            for key, (label, _) in statements.items():
+                if key in errors:
+                    logger.debug(f"获取{code}{label}失败: {errors[key]}")
+                    continue
+                df = results.get(key)
+                if df is not None and not df.empty:
+                    financial_data[key] = df.to_dict('records')
+                    logger.debug(f"✅ {code}{label}获取成功")
 
             if financial_data:
                 logger.debug(f"✅ {code}财务数据获取完成: {len(financial_data)}个数据集")
@@ -538,7 +538,7 @@ class BaoStockProvider(BaseStockDataProvider):
             return ""
 
     async def get_historical_data(self, code: str, start_date: str, end_date: str,
-                                period: str = "daily") -> Optional[pd.DataFrame]:
+                                period: str = "daily", raise_on_error: bool = False) -> Optional[pd.DataFrame]:
         """
         获取历史数据
 
@@ -547,11 +547,14 @@ class BaoStockProvider(BaseStockDataProvider):
             start_date: 开始日期 (YYYY-MM-DD)
             end_date: 结束日期 (YYYY-MM-DD)
             period: 数据周期 (daily, weekly, monthly)
+            raise_on_error: 未连接或调用异常时抛出异常（而不是返回 None）
 
         Returns:
-            历史数据DataFrame
+            历史数据DataFrame，没有数据时返回 None
         """
         if not self.connected:
+            if raise_on_error:
+                raise ConnectionError("BaoStock 未连接")
             return None
 
         try:
@@ -633,6 +636,8 @@ class BaoStockProvider(BaseStockDataProvider):
 
         except Exception as e:
             logger.error(f"❌ BaoStock获取{code}历史数据失败: {e}")
+            if raise_on_error:
+                raise
             return None
 
     async def get_financial_data(self, code: str, year: Optional[int] = None,
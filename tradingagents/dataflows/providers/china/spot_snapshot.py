@@ -0,0 +1,239 @@
+"""
+A股全市场实时快照（进程内共享）
+
+stock_zh_a_spot_em / stock_zh_a_spot 每次返回 5000+ 行的全市场行情表。单只股票行情、批量行情、
+行情入库任务、自选股行情富集原先各自下载整张表，同一时刻可能重复下载多次。本模块：
+
+- 每个接口（eastmoney / sina）在配置的间隔内最多下载一次，并发调用方只有一个真正发起下载（single-flight）
+- 快照按 6 位代码建立字典索引，单只/批量查询均为 O(1) 查找
+- 下载失败时在允许的陈旧时间内继续使用上一份快照，并在短时间内不再重复请求
+
+使用方法：
+    from tradingagents.dataflows.providers.china.spot_snapshot import get_spot_snapshot_service
+
+    snapshot = get_spot_snapshot_service().get("eastmoney")
+    row = snapshot.get("000001") if snapshot else None       # 原始行（中文列名）
+    rows = await get_spot_snapshot_service().aget("sina")    # 异步调用方
+
+配置（环境变量）：
+    TA_SPOT_SNAPSHOT_TTL_SECONDS=30          # 快照有效期（秒），期内不重复下载
+    TA_SPOT_SNAPSHOT_MAX_STALE_SECONDS=300   # 下载失败时仍可使用的旧快照最大年龄（秒）
+"""
+import asyncio
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+import pandas as pd
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+
+EASTMONEY = "eastmoney"
+SINA = "sina"
+
+# 代码列的常见列名（两个接口及不同 AKShare 版本）
+CODE_COLUMNS = ("代码", "code", "symbol", "股票代码")
+
+# 下载失败后的重试间隔上限（秒）
+FAILURE_RETRY_SECONDS = 10.0
+
+
+def _env_float(key: str, default: float) -> float:
+    try:
+        return float(os.getenv(key, str(default)))
+    except ValueError:
+        return default
+
+
+def normalize_code(code: Any) -> str:
+    """标准化为 6 位代码：sh600000 -> 600000，1 -> 000001"""
+    code_str = str(code or "").strip()
+    if not code_str:
+        return ""
+    if not code_str.isdigit():
+        code_str = "".join(filter(str.isdigit, code_str))
+        if not code_str:
+            return ""
+    return code_str[-6:].zfill(6)
+
+
+def _fetch_eastmoney() -> pd.DataFrame:
+    import akshare as ak
+    return ak.stock_zh_a_spot_em()
+
+
+def _fetch_sina() -> pd.DataFrame:
+    import akshare as ak
+    return ak.stock_zh_a_spot()
+
+
+DEFAULT_FETCHERS: Dict[str, Callable[[], pd.DataFrame]] = {
+    EASTMONEY: _fetch_eastmoney,
+    SINA: _fetch_sina,
+}
+
+
+class SpotSnapshot:
+    """一份全市场快照：原始 DataFrame + 按 6 位代码索引的行字典"""
+
+    def __init__(self, source: str, frame: pd.DataFrame):
+        self.source = source
+        self.frame = frame
+        self.fetched_at = time.time()
+        self._fetched_monotonic = time.monotonic()
+
+        code_col = next((c for c in CODE_COLUMNS if c in frame.columns), None)
+        self.code_column = code_col
+        self._rows: Dict[str, Dict[str, Any]] = {}
+        if code_col is not None:
+            for row in frame.to_dict("records"):
+                code = normalize_code(row.get(code_col))
+                if code and code not in self._rows:
+                    self._rows[code] = row
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self._fetched_monotonic
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, code: Any) -> bool:
+        return normalize_code(code) in self._rows
+
+    def items(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        return iter(self._rows.items())
+
+    def get(self, code: Any) -> Optional[Dict[str, Any]]:
+        """单只股票的原始行（不存在返回 None）"""
+        return self._rows.get(normalize_code(code))
+
+    def get_many(self, codes: Iterable[Any]) -> Dict[str, Dict[str, Any]]:
+        """批量查询：返回 {请求的代码: 原始行}，未找到的代码不出现在结果中"""
+        result = {}
+        for code in codes:
+            row = self._rows.get(normalize_code(code))
+            if row is not None:
+                result[code] = row
+        return result
+
+
+class SpotSnapshotService:
+    """全市场快照服务（按接口缓存，single-flight 下载）"""
+
+    def __init__(self, ttl: Optional[float] = None, max_stale: Optional[float] = None,
+                 fetchers: Optional[Dict[str, Callable[[], pd.DataFrame]]] = None):
+        self.ttl = _env_float("TA_SPOT_SNAPSHOT_TTL_SECONDS", 30.0) if ttl is None else ttl
+        self.max_stale = _env_float("TA_SPOT_SNAPSHOT_MAX_STALE_SECONDS", 300.0) if max_stale is None else max_stale
+        self._fetchers = dict(DEFAULT_FETCHERS if fetchers is None else fetchers)
+        self._snapshots: Dict[str, SpotSnapshot] = {}
+        self._failed_at: Dict[str, float] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        self.stats = {"fetches": 0, "hits": 0, "errors": 0}
+
+    def _lock_for(self, source: str) -> threading.Lock:
+        with self._locks_guard:
+            lock = self._locks.get(source)
+            if lock is None:
+                lock = self._locks[source] = threading.Lock()
+            return lock
+
+    def _usable(self, snapshot: Optional[SpotSnapshot], max_age: float) -> bool:
+        return snapshot is not None and snapshot.age < max_age
+
+    def get(self, source: str = EASTMONEY, max_age: Optional[float] = None,
+            allow_stale: bool = True) -> Optional[SpotSnapshot]:
+        """
+        获取全市场快照（阻塞，可能触发一次下载）
+
+        Args:
+            source: 接口名称，"eastmoney" 或 "sina"
+            max_age: 可接受的快照最大年龄（秒），默认使用 TTL
+            allow_stale: 下载失败时是否返回 max_stale 内的旧快照
+
+        Returns:
+            SpotSnapshot；下载失败且没有可用旧快照时返回 None
+        """
+        if source not in self._fetchers:
+            raise ValueError(f"未知的快照接口: {source}")
+        max_age = self.ttl if max_age is None else max_age
+
+        snapshot = self._snapshots.get(source)
+        if self._usable(snapshot, max_age):
+            self.stats["hits"] += 1
+            return snapshot
+
+        with self._lock_for(source):
+            # 等锁期间其它调用方可能已经完成下载
+            snapshot = self._snapshots.get(source)
+            if self._usable(snapshot, max_age):
+                self.stats["hits"] += 1
+                return snapshot
+
+            failed_at = self._failed_at.get(source)
+            if failed_at is not None and time.monotonic() - failed_at < min(self.ttl, FAILURE_RETRY_SECONDS):
+                return self._fallback(snapshot, allow_stale)
+
+            start = time.monotonic()
+            try:
+                frame = self._fetchers[source]()
+                if frame is None or frame.empty:
+                    raise ValueError("返回空数据")
+                fresh = SpotSnapshot(source, frame)
+                if not len(fresh):
+                    raise ValueError(f"缺少代码列: {list(frame.columns)}")
+            except Exception as e:
+                self.stats["errors"] += 1
+                self._failed_at[source] = time.monotonic()
+                logger.warning(f"⚠️ [全市场快照] {source} 下载失败: {e}")
+                return self._fallback(snapshot, allow_stale)
+
+            self._snapshots[source] = fresh
+            self._failed_at.pop(source, None)
+            self.stats["fetches"] += 1
+            logger.info(f"📸 [全市场快照] {source} 已刷新: {len(fresh)} 只股票，耗时 {time.monotonic() - start:.2f}秒")
+            return fresh
+
+    async def aget(self, source: str = EASTMONEY, max_age: Optional[float] = None,
+                   allow_stale: bool = True) -> Optional[SpotSnapshot]:
+        """get() 的异步版本：命中缓存时直接返回，需要下载时在线程中执行"""
+        snapshot = self._snapshots.get(source)
+        if self._usable(snapshot, self.ttl if max_age is None else max_age):
+            self.stats["hits"] += 1
+            return snapshot
+        return await asyncio.to_thread(self.get, source, max_age, allow_stale)
+
+    def _fallback(self, snapshot: Optional[SpotSnapshot], allow_stale: bool) -> Optional[SpotSnapshot]:
+        if allow_stale and snapshot is not None and snapshot.age < self.max_stale:
+            logger.info(f"ℹ️ [全市场快照] 使用 {snapshot.age:.0f}秒 前的 {snapshot.source} 快照")
+            return snapshot
+        return None
+
+    def invalidate(self, source: Optional[str] = None):
+        """丢弃快照（None 表示全部）"""
+        with self._locks_guard:
+            if source is None:
+                self._snapshots.clear()
+                self._failed_at.clear()
+            else:
+                self._snapshots.pop(source, None)
+                self._failed_at.pop(source, None)
+
+
+_spot_snapshot_service: Optional[SpotSnapshotService] = None
+_service_lock = threading.Lock()
+
+
+def get_spot_snapshot_service() -> SpotSnapshotService:
+    """获取全局全市场快照服务"""
+    global _spot_snapshot_service
+    if _spot_snapshot_service is None:
+        with _service_lock:
+            if _spot_snapshot_service is None:
+                _spot_snapshot_service = SpotSnapshotService()
+    return _spot_snapshot_service
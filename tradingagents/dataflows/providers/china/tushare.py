@@ -6,9 +6,11 @@ from typing import Optional, Dict, Any, List, Union
 from datetime import datetime, date, timedelta
 import pandas as pd
 import asyncio
+import functools
 import logging
 
 from ..base_provider import BaseStockDataProvider
+from ..concurrency import fetch_concurrently, get_provider_limiter
 from tradingagents.config.providers_config import get_provider_config
 
 # 尝试导入tushare
@@ -506,7 +508,8 @@ class TushareProvider(BaseStockDataProvider):
         symbol: str,
         start_date: Union[str, date],
         end_date: Union[str, date] = None,
-        period: str = "daily"
+        period: str = "daily",
+        raise_on_error: bool = False
     ) -> Optional[pd.DataFrame]:
         """
         获取历史数据
@@ -516,8 +519,12 @@ class TushareProvider(BaseStockDataProvider):
             start_date: 开始日期
             end_date: 结束日期
             period: 数据周期 (daily/weekly/monthly)
+            raise_on_error: 接口不可用或调用异常时抛出异常（而不是返回 None），
+                供熔断器区分"调用失败"与"没有数据"
         """
         if not self.is_available():
+            if raise_on_error:
+                raise ConnectionError("Tushare 提供器不可用")
             return None
 
         try:
@@ -583,6 +590,8 @@ class TushareProvider(BaseStockDataProvider):
                 f"   错误信息: {str(e)}\n"
                 f"   堆栈跟踪:\n{error_details}"
             )
+            if raise_on_error:
+                raise
             return None
     
     # ==================== 扩展接口 ====================
@@ -610,6 +619,75 @@ class TushareProvider(BaseStockDataProvider):
             self.logger.error(f"❌ 获取每日基础数据失败 trade_date={trade_date}: {e}")
             return None
     
+    async def get_trade_calendar(self, start_date: Union[str, date], end_date: Union[str, date] = None,
+                                 exchange: str = "SSE") -> Optional[List[str]]:
+        """
+        获取交易日历中的开市日期
+
+        Returns:
+            升序的交易日列表 (YYYY-MM-DD)，失败返回 None
+        """
+        if not self.is_available():
+            return None
+
+        try:
+            start_str = self._format_date(start_date)
+            end_str = self._format_date(end_date) if end_date else datetime.now().strftime('%Y%m%d')
+            df = await asyncio.to_thread(
+                self.api.trade_cal,
+                exchange=exchange,
+                start_date=start_str,
+                end_date=end_str,
+                is_open='1',
+                fields='cal_date'
+            )
+            if df is None or df.empty:
+                return []
+            dates = sorted(str(d) for d in df['cal_date'])
+            return [f"{d[:4]}-{d[4:6]}-{d[6:8]}" for d in dates]
+
+        except Exception as e:
+            self.logger.error(f"❌ 获取交易日历失败 start={start_date}, end={end_date}: {e}")
+            return None
+
+    async def get_daily_by_trade_date(self, trade_date: Union[str, date]) -> Optional[pd.DataFrame]:
+        """
+        获取某个交易日全市场的日线数据（横截面，一次调用）
+
+        daily 接口返回未复权价格，同时按交易日获取 adj_factor 合并到 adj_factor 列，
+        由调用方按需要的基准日换算为前复权价格。
+
+        Returns:
+            DataFrame（ts_code, trade_date, open, high, low, close, pre_close, change, pct_chg, vol, amount, adj_factor），
+            无数据返回 None
+        """
+        if not self.is_available():
+            return None
+
+        try:
+            date_str = self._format_date(trade_date)
+            df = await asyncio.to_thread(self.api.daily, trade_date=date_str)
+            if df is None or df.empty:
+                self.logger.warning(f"⚠️ Tushare daily 返回空数据: trade_date={date_str}")
+                return None
+
+            factors = await asyncio.to_thread(
+                self.api.adj_factor,
+                trade_date=date_str,
+                fields='ts_code,adj_factor'
+            )
+            if factors is not None and not factors.empty:
+                df = df.merge(factors[['ts_code', 'adj_factor']], on='ts_code', how='left')
+            else:
+                df['adj_factor'] = float('nan')
+
+            self.logger.info(f"✅ 获取全市场日线: {date_str} {len(df)}条记录")
+            return df
+
+        except Exception as e:
+            self.logger.error(f"❌ 获取全市场日线失败 trade_date={trade_date}: {e}")
+            return None
+
     async def find_latest_trade_date(self) -> Optional[str]:
         """查找最新交易日期"""
         if not self.is_available():
@@ -673,77 +751,36 @@ class TushareProvider(BaseStockDataProvider):
             if period:
                 query_params['period'] = period
 
-            financial_data = {}
-
-            # 1. 获取利润表数据 (income statement)
-            try:
-                income_df = await asyncio.to_thread(
-                    self.api.income,
-                    **query_params
-                )
-                if income_df is not None and not income_df.empty:
-                    financial_data['income_statement'] = income_df.to_dict('records')
-                    self.logger.debug(f"✅ {ts_code} 利润表数据获取成功: {len(income_df)} 条记录")
-                else:
-                    self.logger.debug(f"⚠️ {ts_code} 利润表数据为空")
-            except Exception as e:
-                self.logger.warning(f"❌ 获取{ts_code}利润表数据失败: {e}")
-
-            # 2. 获取资产负债表数据 (balance sheet)
-            try:
-                balance_df = await asyncio.to_thread(
-                    self.api.balancesheet,
-                    **query_params
-                )
-                if balance_df is not None and not balance_df.empty:
-                    financial_data['balance_sheet'] = balance_df.to_dict('records')
-                    self.logger.debug(f"✅ {ts_code} 资产负债表数据获取成功: {len(balance_df)} 条记录")
-                else:
-                    self.logger.debug(f"⚠️ {ts_code} 资产负债表数据为空")
-            except Exception as e:
-                self.logger.warning(f"❌ 获取{ts_code}资产负债表数据失败: {e}")
-
-            # 3. 获取现金流量表数据 (cash flow statement)
-            try:
-                cashflow_df = await asyncio.to_thread(
-                    self.api.cashflow,
-                    **query_params
-                )
-                if cashflow_df is not None and not cashflow_df.empty:
-                    financial_data['cashflow_statement'] = cashflow_df.to_dict('records')
-                    self.logger.debug(f"✅ {ts_code} 现金流量表数据获取成功: {len(cashflow_df)} 条记录")
-                else:
-                    self.logger.debug(f"⚠️ {ts_code} 现金流量表数据为空")
-            except Exception as e:
-                self.logger.warning(f"❌ 获取{ts_code}现金流量表数据失败: {e}")
-
-            # 4. 获取财务指标数据 (financial indicators)
-            try:
-                indicator_df = await asyncio.to_thread(
-                    self.api.fina_indicator,
-                    **query_params
-                )
-                if indicator_df is not None and not indicator_df.empty:
-                    financial_data['financial_indicators'] = indicator_df.to_dict('records')
-                    self.logger.debug(f"✅ {ts_code} 财务指标数据获取成功: {len(indicator_df)} 条记录")
-                else:
-                    self.logger.debug(f"⚠️ {ts_code} 财务指标数据为空")
-            except Exception as e:
-                self.logger.warning(f"❌ 获取{ts_code}财务指标数据失败: {e}")
+            # 利润表、资产负债表、现金流量表、财务指标、主营业务构成并发获取，
+            # 受 Tushare 调用限制器约束，单个接口超时或失败时保留其余结果
+            statements = {
+                'income_statement': ("利润表", self.api.income),
+                'balance_sheet': ("资产负债表", self.api.balancesheet),
+                'cashflow_statement': ("现金流量表", self.api.cashflow),
+                'financial_indicators': ("财务指标", self.api.fina_indicator),
+                'main_business': ("主营业务构成", self.api.fina_mainbz),
+            }
+            results, errors = await fetch_concurrently(
+                {key: functools.partial(api_func, **query_params) for key, (_, api_func) in statements.items()},
+                limiter=get_provider_limiter("tushare"),
+                timeout=self.config.get("timeout"),
+            )
 
-            # 5. 获取主营业务构成数据 (可选)
-            try:
-                mainbz_df = await asyncio.to_thread(
-                    self.api.fina_mainbz,
-                    **query_params
-                )
-                if mainbz_df is not None and not mainbz_df.empty:
-                    financial_data['main_business'] = mainbz_df.to_dict('records')
-                    self.logger.debug(f"✅ {ts_code} 主营业务构成数据获取成功: {len(mainbz_df)} 条记录")
+            financial_data = {}
+            for key, (label, _) in statements.items():
+                if key in errors:
+                    if key == 'main_business':
+                        # 主营业务数据不是必需的，保持debug级别
+                        self.logger.debug(f"获取{ts_code}{label}数据失败: {errors[key]}")
+                    else:
+                        self.logger.warning(f"❌ 获取{ts_code}{label}数据失败: {errors[key]}")
+                    continue
+                df = results.get(key)
+                if df is not None and not df.empty:
+                    financial_data[key] = df.to_dict('records')
+                    self.logger.debug(f"✅ {ts_code} {label}数据获取成功: {len(df)} 条记录")
                 else:
-                    self.logger.debug(f"⚠️ {ts_code} 主营业务构成数据为空")
-            except Exception as e:
-                self.logger.debug(f"获取{ts_code}主营业务构成数据失败: {e}")  # 主营业务数据不是必需的，保持debug级别
+                    self.logger.debug(f"⚠️ {ts_code} {label}数据为空")
 
             if financial_data:
                 # 标准化财务数据
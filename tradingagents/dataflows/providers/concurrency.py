@@ -0,0 +1,110 @@
+"""
+数据源并发调用工具
+财务报表等需要对同一数据源发起多个独立请求的场景，使用 fetch_concurrently() 并发执行：
+- 受数据源调用限制器约束（最大并发数 + 相邻调用最小间隔，按数据源全局共享）
+- 每个调用有独立的截止时间，超时或失败的调用不影响其余结果（返回部分结果）
+
+限制器参数来自 providers_config：
+    rate_limit       相邻调用的最小间隔（秒），如 TUSHARE_RATE_LIMIT=0.1
+    max_concurrency  同时进行的调用数上限，如 TUSHARE_MAX_CONCURRENCY=4
+    timeout          单个调用的截止时间（秒），如 TUSHARE_TIMEOUT=30
+"""
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ProviderCallLimiter:
+    """
+    数据源调用限制器
+
+    在工作线程中同步获取许可，与调用方所在的事件循环无关，
+    因此主服务循环和后台桥接循环上的调用可以共享同一个限制器。
+    """
+
+    def __init__(self, name: str, max_concurrency: int = 4, min_interval: float = 0.0):
+        self.name = name
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.min_interval = max(0.0, float(min_interval))
+        self._semaphore = threading.BoundedSemaphore(self.max_concurrency)
+        self._lock = threading.Lock()
+        self._next_start = 0.0
+
+    def call(self, func: Callable[[], Any]) -> Any:
+        """获取许可后执行（阻塞，在工作线程中调用）"""
+        with self._semaphore:
+            if self.min_interval > 0:
+                with self._lock:
+                    now = time.monotonic()
+                    start = max(now, self._next_start)
+                    self._next_start = start + self.min_interval
+                if start > now:
+                    time.sleep(start - now)
+            return func()
+
+
+_limiters: Dict[str, ProviderCallLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_provider_limiter(provider_name: str) -> ProviderCallLimiter:
+    """获取数据源的全局调用限制器（按 providers_config 配置创建）"""
+    key = provider_name.lower()
+    limiter = _limiters.get(key)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.get(key)
+            if limiter is None:
+                from tradingagents.config.providers_config import get_provider_config
+                config = get_provider_config(key) or {}
+                limiter = ProviderCallLimiter(
+                    name=key,
+                    max_concurrency=config.get("max_concurrency", 4),
+                    min_interval=config.get("rate_limit", 0.0),
+                )
+                _limiters[key] = limiter
+    return limiter
+
+
+async def fetch_concurrently(
+    calls: Dict[str, Callable[[], Any]],
+    limiter: Optional[ProviderCallLimiter] = None,
+    timeout: Optional[float] = None,
+) -> Tuple[Dict[str, Any], Dict[str, BaseException]]:
+    """
+    并发执行多个同步数据源调用
+
+    Args:
+        calls: {名称: 无参同步函数}
+        limiter: 调用限制器，None 表示不限制
+        timeout: 单个调用的截止时间（秒），None 表示不限制
+
+    Returns:
+        (results, errors)：成功调用的 {名称: 返回值}，失败/超时调用的 {名称: 异常}
+    """
+    async def run(func: Callable[[], Any]) -> Any:
+        task = asyncio.to_thread(limiter.call, func) if limiter else asyncio.to_thread(func)
+        if timeout:
+            # 超时后工作线程仍会自然结束，但调用方不再等待
+            return await asyncio.wait_for(task, timeout)
+        return await task
+
+    names = list(calls)
+    outcomes = await asyncio.gather(*(run(calls[name]) for name in names), return_exceptions=True)
+
+    results: Dict[str, Any] = {}
+    errors: Dict[str, BaseException] = {}
+    for name, outcome in zip(names, outcomes):
+        if isinstance(outcome, asyncio.TimeoutError):
+            errors[name] = TimeoutError(f"{name} 调用超时（{timeout}秒）")
+        elif isinstance(outcome, BaseException):
+            if isinstance(outcome, asyncio.CancelledError):
+                raise outcome
+            errors[name] = outcome
+        else:
+            results[name] = outcome
+    return results, errors
@@ -201,7 +201,7 @@ def get_technical_indicator(
     look_back_days: Annotated[int, "how many days to look back"] = 60,
 ) -> str:
     """
-    获取技术指标数据（使用 stockstats 库计算）
+    获取技术指标数据（原生向量化实现，与 stockstats 计算方式一致）
 
     参考原版 TradingAgents 的 get_stock_stats_indicators_window 实现
 
@@ -221,7 +221,7 @@ def get_technical_indicator(
     - mfi: 资金流量指标
     """
     try:
-        from stockstats import wrap
+        from tradingagents.tools.analysis.indicators import compute_stockstats_indicator
 
         # 指标说明
         indicator_descriptions = {
@@ -313,9 +313,9 @@ def get_technical_indicator(
         data = data.reset_index()
         data['Date'] = pd.to_datetime(data['Date']).dt.strftime('%Y-%m-%d')
 
-        # 使用 stockstats 计算指标
-        df = wrap(data)
-        df[indicator]  # 触发计算
+        # 计算指标（原生向量化实现，与 stockstats 结果一致）
+        df = data
+        df[indicator] = compute_stockstats_indicator(data, indicator).values
 
         # 生成指定日期范围的结果
         result_lines = []
@@ -346,8 +346,6 @@ def get_technical_indicator(
 
         return result
 
-    except ImportError:
-        return "❌ 需要安装 stockstats 库: pip install stockstats"
     except Exception as e:
         logger.error(f"❌ [yfinance] 计算技术指标失败 {symbol}/{indicator}: {e}")
         return f"Error calculating indicator {indicator} for {symbol}: {str(e)}"
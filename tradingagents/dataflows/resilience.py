@@ -0,0 +1,397 @@
+"""
+数据源容错层：熔断器 + 对冲请求
+
+降级链（Tushare → AKShare → BaoStock、yfinance → Alpha Vantage → Finnhub 等）原先严格串行，
+必须等上一个数据源失败或超时后才尝试下一个，并且会反复调用已经持续失败的数据源。本模块提供：
+
+- 熔断器（按数据源名称全局共享）：跟踪错误率 EWMA（只统计异常/超时）与延迟 EWMA，超过阈值后熔断（open），
+  冷却期内直接跳过该数据源；冷却结束后放行一次探测（half_open），成功则恢复，失败则冷却时间翻倍
+- 对冲请求（可选）：主数据源在其 p90 延迟内未返回时，提前并行请求下一个数据源，采用最先返回的有效结果
+
+同步调用方使用 call_with_fallback()，异步调用方使用 acall_with_fallback()。
+
+配置（环境变量）：
+    TA_CIRCUIT_BREAKER_ENABLED=true        # 是否启用熔断
+    TA_CIRCUIT_ERROR_THRESHOLD=0.5         # 错误率 EWMA 阈值
+    TA_CIRCUIT_MIN_CALLS=5                 # 至少统计多少次调用后才允许熔断
+    TA_CIRCUIT_SLOW_CALL_SECONDS=30        # 延迟 EWMA 超过该值也熔断，0 表示不按延迟熔断
+    TA_CIRCUIT_COOLDOWN_SECONDS=60         # 首次熔断冷却时间（秒）
+    TA_CIRCUIT_MAX_COOLDOWN_SECONDS=900    # 冷却时间上限（秒）
+    TA_HEDGED_REQUESTS=false               # 是否启用对冲请求
+    TA_HEDGE_MIN_DELAY_SECONDS=0.5         # 对冲延迟下限（秒）
+    TA_HEDGE_MAX_DELAY_SECONDS=10          # 对冲延迟上限（秒），也是没有延迟样本时的默认值
+"""
+import asyncio
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# EWMA 平滑系数
+EWMA_ALPHA = 0.2
+# 计算 p90 的延迟样本数
+LATENCY_WINDOW = 50
+
+Candidate = Tuple[str, Callable[[], Any]]
+
+
+def _env_bool(key: str, default: str) -> bool:
+    return os.getenv(key, default).lower() in ("true", "1", "yes", "on")
+
+
+def _env_float(key: str, default: float) -> float:
+    try:
+        return float(os.getenv(key, str(default)))
+    except ValueError:
+        return default
+
+
+def is_valid_result(value: Any) -> bool:
+    """默认的结果有效性判断：None/空数据/包含❌的错误字符串视为无效（继续降级，但不计入熔断失败）"""
+    if value is None:
+        return False
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return not value.empty
+    if isinstance(value, str):
+        return bool(value) and "❌" not in value
+    return bool(value)
+
+
+class CircuitBreaker:
+    """单个数据源的熔断器"""
+
+    def __init__(self, name: str, error_threshold: float = 0.5, min_calls: int = 5,
+                 slow_call_seconds: float = 30.0, cooldown: float = 60.0, max_cooldown: float = 900.0,
+                 enabled: bool = True):
+        self.name = name
+        self.error_threshold = error_threshold
+        self.min_calls = min_calls
+        self.slow_call_seconds = slow_call_seconds
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.enabled = enabled
+
+        self.state = CLOSED
+        self.error_rate = 0.0
+        self.latency_ewma: Optional[float] = None
+        self.calls = 0
+        self.failures = 0
+        self.rejected = 0
+        self.opened_at: Optional[float] = None
+        self.cooldown = cooldown
+        self.last_error: Optional[str] = None
+        self._probe_in_flight = False
+        self._latencies: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=LATENCY_WINDOW))
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, name: str) -> "CircuitBreaker":
+        return cls(
+            name=name,
+            error_threshold=_env_float("TA_CIRCUIT_ERROR_THRESHOLD", 0.5),
+            min_calls=int(_env_float("TA_CIRCUIT_MIN_CALLS", 5)),
+            slow_call_seconds=_env_float("TA_CIRCUIT_SLOW_CALL_SECONDS", 30.0),
+            cooldown=_env_float("TA_CIRCUIT_COOLDOWN_SECONDS", 60.0),
+            max_cooldown=_env_float("TA_CIRCUIT_MAX_COOLDOWN_SECONDS", 900.0),
+            enabled=_env_bool("TA_CIRCUIT_BREAKER_ENABLED", "true"),
+        )
+
+    def allow(self) -> bool:
+        """是否允许调用该数据源（half_open 状态同一时间只放行一次探测）"""
+        if not self.enabled:
+            return True
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.cooldown:
+                self.state = HALF_OPEN
+                self._probe_in_flight = False
+                logger.info(f"🔌 [熔断器] {self.name} 冷却结束，放行探测请求")
+            if self.state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record(self, success: bool, latency: float, op: str = "default", error: Optional[str] = None):
+        """记录一次调用结果"""
+        with self._lock:
+            self.calls += 1
+            # 样本较少时按累计均值计算，避免 EWMA 初值 0 拉低错误率
+            alpha = max(EWMA_ALPHA, 1.0 / self.calls)
+            self.error_rate += alpha * ((0.0 if success else 1.0) - self.error_rate)
+            self.latency_ewma = latency if self.latency_ewma is None else \
+                self.latency_ewma + alpha * (latency - self.latency_ewma)
+            if success:
+                self._latencies[op].append(latency)
+            else:
+                self.failures += 1
+                self.last_error = error
+
+            if not self.enabled:
+                return
+            if self.state == HALF_OPEN:
+                self._probe_in_flight = False
+                if success:
+                    self._close()
+                else:
+                    # 探测失败，冷却时间翻倍
+                    self._open(min(self.cooldown * 2, self.max_cooldown))
+            elif self.state == CLOSED and self.calls >= self.min_calls:
+                too_many_errors = self.error_rate >= self.error_threshold
+                too_slow = self.slow_call_seconds > 0 and self.latency_ewma >= self.slow_call_seconds
+                if too_many_errors or too_slow:
+                    self._open(self.base_cooldown)
+
+    def _open(self, cooldown: float):
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        self.cooldown = cooldown
+        logger.warning(f"🔌 [熔断器] {self.name} 已熔断 {cooldown:.0f}秒 "
+                       f"(错误率={self.error_rate:.2f}, 延迟={self.latency_ewma or 0:.2f}秒, 最近错误={self.last_error})")
+
+    def _close(self):
+        self.state = CLOSED
+        self.opened_at = None
+        self.cooldown = self.base_cooldown
+        self.error_rate = 0.0
+        self.calls = 0
+        logger.info(f"✅ [熔断器] {self.name} 已恢复")
+
+    def p90(self, op: str = "default") -> Optional[float]:
+        with self._lock:
+            samples = list(self._latencies.get(op, ()))
+        if not samples:
+            return None
+        return float(np.percentile(samples, 90))
+
+    def hedge_delay(self, op: str = "default") -> float:
+        """对冲延迟：该数据源此类请求的 p90 延迟（限制在上下限之间）"""
+        min_delay = _env_float("TA_HEDGE_MIN_DELAY_SECONDS", 0.5)
+        max_delay = _env_float("TA_HEDGE_MAX_DELAY_SECONDS", 10.0)
+        p90 = self.p90(op)
+        if p90 is None:
+            return max_delay
+        return min(max(p90, min_delay), max_delay)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            retry_in = None
+            if self.state == OPEN and self.opened_at is not None:
+                retry_in = max(0.0, self.cooldown - (time.monotonic() - self.opened_at))
+            latencies = {op: round(float(np.percentile(list(v), 90)), 3) for op, v in self._latencies.items() if v}
+        return {
+            "name": self.name,
+            "state": self.state,
+            "error_rate": round(self.error_rate, 3),
+            "latency_ewma": round(self.latency_ewma, 3) if self.latency_ewma is not None else None,
+            "p90_latency": latencies,
+            "calls": self.calls,
+            "failures": self.failures,
+            "rejected": self.rejected,
+            "retry_in_seconds": round(retry_in, 1) if retry_in is not None else None,
+            "last_error": self.last_error,
+        }
+
+
+# 全局熔断器与对冲统计
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+_hedge_stats: Dict[str, Dict[str, int]] = defaultdict(lambda: {"fired": 0, "wins": 0})
+_hedge_lock = threading.Lock()
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    """获取数据源熔断器（按名称全局共享）"""
+    key = name.lower()
+    breaker = _breakers.get(key)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.get(key)
+            if breaker is None:
+                breaker = CircuitBreaker.from_env(key)
+                _breakers[key] = breaker
+    return breaker
+
+
+def reset_resilience_state():
+    """清空所有熔断器与对冲统计"""
+    with _breakers_lock:
+        _breakers.clear()
+    with _hedge_lock:
+        _hedge_stats.clear()
+
+
+def hedging_enabled() -> bool:
+    return _env_bool("TA_HEDGED_REQUESTS", "false")
+
+
+def get_resilience_status() -> Dict[str, Any]:
+    """熔断器状态与对冲请求统计（供数据源状态接口展示）"""
+    with _hedge_lock:
+        hedges = {name: dict(stats) for name, stats in _hedge_stats.items()}
+    return {
+        "hedging_enabled": hedging_enabled(),
+        "breakers": {name: breaker.snapshot() for name, breaker in sorted(_breakers.items())},
+        "hedges": hedges,
+    }
+
+
+def _count_hedge(name: str, field: str):
+    with _hedge_lock:
+        _hedge_stats[name][field] += 1
+
+
+def _invoke(name: str, func: Callable[[], Any], is_valid: Callable[[Any], bool], op: str) -> Tuple[bool, Any]:
+    """
+    执行一次数据源调用并记录到熔断器
+
+    只有异常（含超时）计为熔断失败；数据源正常返回但结果无效（如该股票确实没有数据）
+    不计入错误率，只返回 False 让调用方继续降级
+    """
+    start = time.monotonic()
+    try:
+        value = func()
+    except Exception as e:
+        logger.warning(f"⚠️ [容错] {name} 调用失败: {e}")
+        get_circuit_breaker(name).record(False, time.monotonic() - start, op, str(e))
+        return False, None
+    get_circuit_breaker(name).record(True, time.monotonic() - start, op)
+    return bool(is_valid(value)), value
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _breakers_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="ta-hedge")
+    return _executor
+
+
+def call_with_fallback(candidates: Sequence[Candidate], is_valid: Callable[[Any], bool] = is_valid_result,
+                       op: str = "default", hedge: Optional[bool] = None) -> Tuple[Any, Optional[str]]:
+    """
+    按优先级调用数据源，跳过已熔断的数据源，可选对冲请求
+
+    Args:
+        candidates: [(数据源名称, 无参调用函数)]，按优先级排序
+        is_valid: 结果有效性判断，无效结果继续降级（不计入熔断失败）
+        op: 请求类型（用于分别统计 p90 延迟），如 "history"/"fundamentals"
+        hedge: 是否对冲，None 表示按 TA_HEDGED_REQUESTS
+
+    Returns:
+        (结果, 数据源名称)；全部失败或全部熔断时返回 (None, None)
+    """
+    hedge = hedging_enabled() if hedge is None else hedge
+    if not hedge or len(candidates) < 2:
+        for name, func in candidates:
+            if not get_circuit_breaker(name).allow():
+                logger.info(f"⏭️ [容错] {name} 处于熔断状态，跳过")
+                continue
+            ok, value = _invoke(name, func, is_valid, op)
+            if ok:
+                return value, name
+        return None, None
+
+    queue: List[Candidate] = list(candidates)
+    pending: Dict[Any, str] = {}
+    launched: List[str] = []
+    executor = _get_executor()
+
+    def launch() -> Optional[str]:
+        while queue:
+            name, func = queue.pop(0)
+            if get_circuit_breaker(name).allow():
+                pending[executor.submit(_invoke, name, func, is_valid, op)] = name
+                launched.append(name)
+                return name
+            logger.info(f"⏭️ [容错] {name} 处于熔断状态，跳过")
+        return None
+
+    if launch() is None:
+        return None, None
+    while pending:
+        delay = get_circuit_breaker(launched[-1]).hedge_delay(op) if queue else None
+        done, _ = wait(list(pending), timeout=delay, return_when=FIRST_COMPLETED)
+        if not done:
+            hedged = launch()
+            if hedged:
+                _count_hedge(hedged, "fired")
+                logger.info(f"🔀 [对冲请求] {launched[-2]} 超过 {delay:.2f}秒 未返回，并行请求 {hedged}")
+            continue
+        for future in done:
+            name = pending.pop(future)
+            ok, value = future.result()
+            if ok:
+                if name != launched[0]:
+                    _count_hedge(name, "wins")
+                return value, name
+            launch()
+    return None, None
+
+
+async def acall_with_fallback(candidates: Sequence[Candidate], is_valid: Callable[[Any], bool] = is_valid_result,
+                              op: str = "default", hedge: Optional[bool] = None) -> Tuple[Any, Optional[str]]:
+    """call_with_fallback 的异步版本：同步调用函数在线程中执行，不阻塞事件循环"""
+    hedge = hedging_enabled() if hedge is None else hedge
+    if not hedge or len(candidates) < 2:
+        for name, func in candidates:
+            if not get_circuit_breaker(name).allow():
+                logger.info(f"⏭️ [容错] {name} 处于熔断状态，跳过")
+                continue
+            ok, value = await asyncio.to_thread(_invoke, name, func, is_valid, op)
+            if ok:
+                return value, name
+        return None, None
+
+    queue: List[Candidate] = list(candidates)
+    pending: Dict[asyncio.Future, str] = {}
+    launched: List[str] = []
+
+    def launch() -> Optional[str]:
+        while queue:
+            name, func = queue.pop(0)
+            if get_circuit_breaker(name).allow():
+                task = asyncio.ensure_future(asyncio.to_thread(_invoke, name, func, is_valid, op))
+                pending[task] = name
+                launched.append(name)
+                return name
+            logger.info(f"⏭️ [容错] {name} 处于熔断状态，跳过")
+        return None
+
+    if launch() is None:
+        return None, None
+    while pending:
+        delay = get_circuit_breaker(launched[-1]).hedge_delay(op) if queue else None
+        done, _ = await asyncio.wait(list(pending), timeout=delay, return_when=asyncio.FIRST_COMPLETED)
+        if not done:
+            hedged = launch()
+            if hedged:
+                _count_hedge(hedged, "fired")
+                logger.info(f"🔀 [对冲请求] {launched[-2]} 超过 {delay:.2f}秒 未返回，并行请求 {hedged}")
+            continue
+        for task in done:
+            name = pending.pop(task)
+            ok, value = task.result()
+            if ok:
+                if name != launched[0]:
+                    _count_hedge(name, "wins")
+                return value, name
+            launch()
+    return None, None
@@ -4,22 +4,20 @@ from stockstats import wrap
 from typing import Annotated
 import os
 from tradingagents.config.config_manager import config_manager
+from tradingagents.tools.analysis.indicators import compute_stockstats_indicator, resolve_stockstats_indicator
 
 def get_config():
     """兼容性包装函数"""
     return config_manager.load_settings()
 
 
+NOT_TRADING_DAY = "N/A: Not a trading day (weekend or holiday)"
+
+
 class StockstatsUtils:
     @staticmethod
-    def get_stock_stats(
+    def load_price_data(
         symbol: Annotated[str, "ticker symbol for the company"],
-        indicator: Annotated[
-            str, "quantitative indicators based off of the stock data for the company"
-        ],
-        curr_date: Annotated[
-            str, "curr date for retrieving stock price data, YYYY-mm-dd"
-        ],
         data_dir: Annotated[
             str,
             "directory where the stock data is stored.",
@@ -28,64 +26,109 @@ class StockstatsUtils:
             bool,
             "whether to use online tools to fetch data or offline tools. If True, will use online tools.",
         ] = False,
-    ):
-        df = None
-        data = None
+    ) -> pd.DataFrame:
+        """
+        加载计算指标所需的价格数据（只读取一次，供单日和窗口查询共用）
 
+        离线模式读取本地 YFin CSV；在线模式使用当天的 15 年数据缓存文件，不存在时从 yfinance 下载。
+        在线模式返回的 Date 列已格式化为 YYYY-mm-dd 字符串。
+        """
         if not online:
             try:
-                data = pd.read_csv(
+                return pd.read_csv(
                     os.path.join(
                         data_dir,
                         f"{symbol}-YFin-data-2015-01-01-2025-03-25.csv",
                     )
                 )
-                df = wrap(data)
             except FileNotFoundError:
                 raise Exception("Stockstats fail: Yahoo Finance data not fetched yet!")
+
+        # Get today's date as YYYY-mm-dd to add to cache
+        today_date = pd.Timestamp.today()
+
+        end_date = today_date
+        start_date = today_date - pd.DateOffset(years=15)
+        start_date = start_date.strftime("%Y-%m-%d")
+        end_date = end_date.strftime("%Y-%m-%d")
+
+        # Get config and ensure cache directory exists
+        config = get_config()
+        os.makedirs(config["data_cache_dir"], exist_ok=True)
+
+        data_file = os.path.join(
+            config["data_cache_dir"],
+            f"{symbol}-YFin-data-{start_date}-{end_date}.csv",
+        )
+
+        if os.path.exists(data_file):
+            data = pd.read_csv(data_file)
+            data["Date"] = pd.to_datetime(data["Date"])
         else:
-            # Get today's date as YYYY-mm-dd to add to cache
-            today_date = pd.Timestamp.today()
-            curr_date = pd.to_datetime(curr_date)
-
-            end_date = today_date
-            start_date = today_date - pd.DateOffset(years=15)
-            start_date = start_date.strftime("%Y-%m-%d")
-            end_date = end_date.strftime("%Y-%m-%d")
-
-            # Get config and ensure cache directory exists
-            config = get_config()
-            os.makedirs(config["data_cache_dir"], exist_ok=True)
-
-            data_file = os.path.join(
-                config["data_cache_dir"],
-                f"{symbol}-YFin-data-{start_date}-{end_date}.csv",
+            data = yf.download(
+                symbol,
+                start=start_date,
+                end=end_date,
+                multi_level_index=False,
+                progress=False,
+                auto_adjust=True,
             )
+            data = data.reset_index()
+            data.to_csv(data_file, index=False)
 
-            if os.path.exists(data_file):
-                data = pd.read_csv(data_file)
-                data["Date"] = pd.to_datetime(data["Date"])
-            else:
-                data = yf.download(
-                    symbol,
-                    start=start_date,
-                    end=end_date,
-                    multi_level_index=False,
-                    progress=False,
-                    auto_adjust=True,
-                )
-                data = data.reset_index()
-                data.to_csv(data_file, index=False)
+        data["Date"] = data["Date"].dt.strftime("%Y-%m-%d")
+        return data
+
+    @staticmethod
+    def compute_indicator_by_date(
+        data: Annotated[pd.DataFrame, "price data returned by load_price_data"],
+        indicator: Annotated[
+            str, "quantitative indicators based off of the stock data for the company"
+        ],
+    ) -> pd.Series:
+        """
+        在完整历史上计算一次指标，返回以 YYYY-mm-dd 为索引的指标序列
 
+        注册表（indicators.STOCKSTATS_INDICATORS）中的指标使用原生向量化实现，
+        其余指标回退到 stockstats。
+        同一日期有多行时保留第一行，与按日期前缀匹配取第一条的行为一致。
+        """
+        if resolve_stockstats_indicator(indicator) is not None:
+            column = compute_stockstats_indicator(data, indicator)
+        else:
             df = wrap(data)
-            df["Date"] = df["Date"].dt.strftime("%Y-%m-%d")
-            curr_date = curr_date.strftime("%Y-%m-%d")
+            df[indicator]  # trigger stockstats to calculate the indicator
+            column = df[indicator]
+        dates = data["Date"].astype(str).str[:10]
+        values = pd.Series(column.values, index=dates.values)
+        return values[~values.index.duplicated(keep="first")]
 
-        df[indicator]  # trigger stockstats to calculate the indicator
-        matching_rows = df[df["Date"].str.startswith(curr_date)]
+    @staticmethod
+    def lookup_indicator(values: pd.Series, curr_date: str):
+        """从 compute_indicator_by_date 的结果中取某日的指标值，非交易日返回提示文本"""
+        if curr_date in values.index:
+            return values[curr_date]
+        return NOT_TRADING_DAY
 
-        if not matching_rows.empty:
-            indicator_value = matching_rows[indicator].values[0]
-            return indicator_value
-        else:
-            return "N/A: Not a trading day (weekend or holiday)"
+    @staticmethod
+    def get_stock_stats(
+        symbol: Annotated[str, "ticker symbol for the company"],
+        indicator: Annotated[
+            str, "quantitative indicators based off of the stock data for the company"
+        ],
+        curr_date: Annotated[
+            str, "curr date for retrieving stock price data, YYYY-mm-dd"
+        ],
+        data_dir: Annotated[
+            str,
+            "directory where the stock data is stored.",
+        ],
+        online: Annotated[
+            bool,
+            "whether to use online tools to fetch data or offline tools. If True, will use online tools.",
+        ] = False,
+    ):
+        data = StockstatsUtils.load_price_data(symbol, data_dir, online=online)
+        values = StockstatsUtils.compute_indicator_by_date(data, indicator)
+        curr_date = pd.to_datetime(curr_date).strftime("%Y-%m-%d")
+        return StockstatsUtils.lookup_indicator(values, curr_date)
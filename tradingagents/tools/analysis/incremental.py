@@ -0,0 +1,568 @@
+"""
+增量（流式）技术指标引擎
+
+批量函数（indicators.compute_many / add_all_indicators）每次都在完整历史上重算。
+盘中行情入库和每日增量同步通常只追加一根K线，本模块为每个指标维护状态：
+- MA / BOLL / ATR: 滚动和（及平方和）
+- EMA / MACD: EMA 递推状态
+- RSI: Wilder 平滑（ema）、滚动均值（sma）或中国式 SMA（china）
+- KDJ: 单调队列维护的滚动最高/最低价
+
+每根K线每个指标的更新为 O(1)，输出列名与 compute_indicator 保持一致，数值与批量函数一致。
+
+使用方法：
+    engine = IncrementalIndicatorEngine.from_history(df, [IndicatorSpec('ma', {'n': 5}), IndicatorSpec('macd')])
+    values = engine.update({'close': 10.2, 'high': 10.5, 'low': 10.0})
+    state = engine.to_json()          # 保存到 Redis / MongoDB
+    engine = IncrementalIndicatorEngine.from_json(state)
+
+说明：
+    输入K线需按时间顺序追加；盘中同一根K线反复变化时使用 preview()，收盘后再 update()。
+"""
+from __future__ import annotations
+
+import copy
+import json
+import math
+from collections import deque
+from typing import Any, Dict, List, Mapping, Optional
+
+import pandas as pd
+
+from tradingagents.tools.analysis.indicators import IndicatorSpec
+
+# 状态格式版本，状态结构不兼容变化时递增
+STATE_VERSION = 1
+
+_NAN = float("nan")
+
+
+def _isnan(x: Optional[float]) -> bool:
+    return x is None or (isinstance(x, float) and math.isnan(x))
+
+
+def _to_plain(x: float) -> Optional[float]:
+    """NaN 序列化为 None，保证状态可以写入 JSON / MongoDB"""
+    return None if _isnan(x) else float(x)
+
+
+def _from_plain(x: Optional[float]) -> float:
+    return _NAN if x is None else float(x)
+
+
+class _RollingWindow:
+    """固定长度窗口的滚动和与平方和（每满一轮窗口重新求和，避免浮点误差累积）"""
+
+    def __init__(self, n: int):
+        self.n = int(n)
+        self.values: deque = deque(maxlen=self.n)
+        self.total = 0.0
+        self.total_sq = 0.0
+        self._since_resync = 0
+
+    def push(self, x: float):
+        if len(self.values) == self.n:
+            old = self.values[0]
+            self.total -= old
+            self.total_sq -= old * old
+        self.values.append(x)
+        self.total += x
+        self.total_sq += x * x
+        self._since_resync += 1
+        if self._since_resync >= self.n:
+            self.total = math.fsum(self.values)
+            self.total_sq = math.fsum(v * v for v in self.values)
+            self._since_resync = 0
+
+    def __len__(self):
+        return len(self.values)
+
+    def mean(self, min_periods: int) -> float:
+        count = len(self.values)
+        if count < min_periods or count == 0:
+            return _NAN
+        return self.total / count
+
+    def std(self, min_periods: int) -> float:
+        """样本标准差（ddof=1），与 pandas rolling().std() 一致"""
+        count = len(self.values)
+        if count < max(min_periods, 2):
+            return _NAN
+        var = (self.total_sq - self.total * self.total / count) / (count - 1)
+        return math.sqrt(var) if var > 0 else 0.0
+
+    def get_state(self) -> Dict[str, Any]:
+        return {"n": self.n, "values": list(self.values)}
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "_RollingWindow":
+        window = cls(state["n"])
+        for v in state["values"]:
+            window.push(v)
+        return window
+
+
+class _RollingExtreme:
+    """单调队列维护的滚动最大/最小值"""
+
+    def __init__(self, n: int, mode: str):
+        self.n = int(n)
+        self.mode = mode
+        self.index = 0
+        self.items: deque = deque()  # (序号, 值)
+
+    def push(self, x: float):
+        if self.mode == "max":
+            while self.items and self.items[-1][1] <= x:
+                self.items.pop()
+        else:
+            while self.items and self.items[-1][1] >= x:
+                self.items.pop()
+        self.items.append((self.index, x))
+        self.index += 1
+        while self.items[0][0] <= self.index - 1 - self.n:
+            self.items.popleft()
+
+    def value(self) -> float:
+        if self.index < self.n:
+            return _NAN
+        return self.items[0][1]
+
+    def get_state(self) -> Dict[str, Any]:
+        return {"n": self.n, "mode": self.mode, "index": self.index, "items": [list(i) for i in self.items]}
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "_RollingExtreme":
+        extreme = cls(state["n"], state["mode"])
+        extreme.index = state["index"]
+        extreme.items = deque((int(i), float(v)) for i, v in state["items"])
+        return extreme
+
+
+class _Ema:
+    """ewm(alpha, adjust=False).mean() 的递推状态"""
+
+    def __init__(self, alpha: float):
+        self.alpha = alpha
+        self.value = _NAN
+
+    def push(self, x: float) -> float:
+        if _isnan(self.value):
+            self.value = x
+        else:
+            self.value = self.alpha * x + (1 - self.alpha) * self.value
+        return self.value
+
+
+class _AdjustedEma:
+    """ewm(com, adjust=True).mean() 的递推状态（加权和 / 权重和）"""
+
+    def __init__(self, alpha: float):
+        self.alpha = alpha
+        self.num = 0.0
+        self.den = 0.0
+
+    def push(self, x: float) -> float:
+        self.num = x + (1 - self.alpha) * self.num
+        self.den = 1.0 + (1 - self.alpha) * self.den
+        return self.num / self.den
+
+
+# ==================== 单个指标的增量状态 ====================
+
+
+class IncrementalIndicator:
+    """单个指标的增量计算基类"""
+
+    name = ""
+
+    def __init__(self, params: Optional[Dict[str, Any]] = None):
+        self.params = dict(params or {})
+        self.last: Dict[str, float] = {}
+
+    @property
+    def columns(self) -> List[str]:
+        raise NotImplementedError
+
+    def update(self, bar: Mapping[str, float]) -> Dict[str, float]:
+        raise NotImplementedError
+
+    def get_state(self) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def set_state(self, state: Dict[str, Any]):
+        raise NotImplementedError
+
+
+class IncrementalMA(IncrementalIndicator):
+    name = "ma"
+
+    def __init__(self, params=None):
+        super().__init__(params)
+        self.n = int(self.params.get("n", self.params.get("period", 20)))
+        self.window = _RollingWindow(self.n)
+
+    @property
+    def columns(self):
+        return [f"ma{self.n}"]
+
+    def update(self, bar):
+        self.window.push(float(bar["close"]))
+        self.last = {f"ma{self.n}": self.window.mean(min_periods=1)}
+        return self.last
+
+    def get_state(self):
+        return {"window": self.window.get_state()}
+
+    def set_state(self, state):
+        self.window = _RollingWindow.from_state(state["window"])
+
+
+class IncrementalEMA(IncrementalIndicator):
+    name = "ema"
+
+    def __init__(self, params=None):
+        super().__init__(params)
+        self.n = int(self.params.get("n", self.params.get("period", 20)))
+        self.ema = _Ema(2.0 / (self.n + 1))
+
+    @property
+    def columns(self):
+        return [f"ema{self.n}"]
+
+    def update(self, bar):
+        self.last = {f"ema{self.n}": self.ema.push(float(bar["close"]))}
+        return self.last
+
+    def get_state(self):
+        return {"ema": _to_plain(self.ema.value)}
+
+    def set_state(self, state):
+        self.ema.value = _from_plain(state["ema"])
+
+
+class IncrementalMACD(IncrementalIndicator):
+    name = "macd"
+
+    def __init__(self, params=None):
+        super().__init__(params)
+        self.fast = _Ema(2.0 / (int(self.params.get("fast", 12)) + 1))
+        self.slow = _Ema(2.0 / (int(self.params.get("slow", 26)) + 1))
+        self.signal = _Ema(2.0 / (int(self.params.get("signal", 9)) + 1))
+
+    @property
+    def columns(self):
+        return ["dif", "dea", "macd_hist"]
+
+    def update(self, bar):
+        close = float(bar["close"])
+        dif = self.fast.push(close) - self.slow.push(close)
+        dea = self.signal.push(dif)
+        self.last = {"dif": dif, "dea": dea, "macd_hist": dif - dea}
+        return self.last
+
+    def get_state(self):
+        return {
+            "fast": _to_plain(self.fast.value),
+            "slow": _to_plain(self.slow.value),
+            "signal": _to_plain(self.signal.value),
+        }
+
+    def set_state(self, state):
+        self.fast.value = _from_plain(state["fast"])
+        self.slow.value = _from_plain(state["slow"])
+        self.signal.value = _from_plain(state["signal"])
+
+
+class IncrementalRSI(IncrementalIndicator):
+    name = "rsi"
+
+    def __init__(self, params=None):
+        super().__init__(params)
+        self.n = int(self.params.get("n", self.params.get("period", 14)))
+        self.method = self.params.get("method", "ema")
+        self.prev_close = _NAN
+        if self.method == "ema":
+            self.gain, self.loss = _Ema(1 / float(self.n)), _Ema(1 / float(self.n))
+        elif self.method == "sma":
+            self.gain, self.loss = _RollingWindow(self.n), _RollingWindow(self.n)
+        elif self.method == "china":
+            self.gain, self.loss = _AdjustedEma(1 / float(self.n)), _AdjustedEma(1 / float(self.n))
+        else:
+            raise ValueError(f"不支持的RSI计算方法: {self.method}，支持的方法: 'ema', 'sma', 'china'")
+
+    @property
+    def columns(self):
+        return [f"rsi{self.n}"]
+
+    def update(self, bar):
+        close = float(bar["close"])
+        delta = close - self.prev_close
+        # 与 close.diff().where(...) 一致：首根K线的涨跌记为 0
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+        self.prev_close = close
+
+        if self.method == "sma":
+            self.gain.push(gain)
+            self.loss.push(loss)
+            avg_gain, avg_loss = self.gain.mean(min_periods=1), self.loss.mean(min_periods=1)
+        else:
+            avg_gain, avg_loss = self.gain.push(gain), self.loss.push(loss)
+
+        if avg_loss == 0 or _isnan(avg_loss):
+            value = _NAN
+        else:
+            value = 100 - (100 / (1 + avg_gain / avg_loss))
+        self.last = {f"rsi{self.n}": value}
+        return self.last
+
+    def get_state(self):
+        state = {"prev_close": _to_plain(self.prev_close)}
+        if self.method == "sma":
+            state.update(gain=self.gain.get_state(), loss=self.loss.get_state())
+        elif self.method == "ema":
+            state.update(gain=_to_plain(self.gain.value), loss=_to_plain(self.loss.value))
+        else:
+            state.update(gain=[self.gain.num, self.gain.den], loss=[self.loss.num, self.loss.den])
+        return state
+
+    def set_state(self, state):
+        self.prev_close = _from_plain(state["prev_close"])
+        if self.method == "sma":
+            self.gain = _RollingWindow.from_state(state["gain"])
+            self.loss = _RollingWindow.from_state(state["loss"])
+        elif self.method == "ema":
+            self.gain.value = _from_plain(state["gain"])
+            self.loss.value = _from_plain(state["loss"])
+        else:
+            self.gain.num, self.gain.den = state["gain"]
+            self.loss.num, self.loss.den = state["loss"]
+
+
+class IncrementalBOLL(IncrementalIndicator):
+    name = "boll"
+
+    def __init__(self, params=None):
+        super().__init__(params)
+        self.n = int(self.params.get("n", 20))
+        self.k = float(self.params.get("k", 2.0))
+        self.window = _RollingWindow(self.n)
+
+    @property
+    def columns(self):
+        return ["boll_mid", "boll_upper", "boll_lower"]
+
+    def update(self, bar):
+        self.window.push(float(bar["close"]))
+        mid = self.window.mean(min_periods=1)
+        std = self.window.std(min_periods=1)
+        self.last = {"boll_mid": mid, "boll_upper": mid + self.k * std, "boll_lower": mid - self.k * std}
+        return self.last
+
+    def get_state(self):
+        return {"window": self.window.get_state()}
+
+    def set_state(self, state):
+        self.window = _RollingWindow.from_state(state["window"])
+
+
+class IncrementalATR(IncrementalIndicator):
+    name = "atr"
+
+    def __init__(self, params=None):
+        super().__init__(params)
+        self.n = int(self.params.get("n", 14))
+        self.window = _RollingWindow(self.n)
+        self.prev_close = _NAN
+
+    @property
+    def columns(self):
+        return [f"atr{self.n}"]
+
+    def update(self, bar):
+        high, low, close = float(bar["high"]), float(bar["low"]), float(bar["close"])
+        tr = abs(high - low)
+        if not _isnan(self.prev_close):
+            tr = max(tr, abs(high - self.prev_close), abs(low - self.prev_close))
+        self.prev_close = close
+        self.window.push(tr)
+        self.last = {f"atr{self.n}": self.window.mean(min_periods=self.n)}
+        return self.last
+
+    def get_state(self):
+        return {"window": self.window.get_state(), "prev_close": _to_plain(self.prev_close)}
+
+    def set_state(self, state):
+        self.window = _RollingWindow.from_state(state["window"])
+        self.prev_close = _from_plain(state["prev_close"])
+
+
+class IncrementalKDJ(IncrementalIndicator):
+    name = "kdj"
+
+    def __init__(self, params=None):
+        super().__init__(params)
+        self.n = int(self.params.get("n", 9))
+        self.alpha_k = 1 / float(int(self.params.get("m1", 3)))
+        self.alpha_d = 1 / float(int(self.params.get("m2", 3)))
+        self.highest = _RollingExtreme(self.n, "max")
+        self.lowest = _RollingExtreme(self.n, "min")
+        self.last_k = 50.0
+        self.last_d = 50.0
+
+    @property
+    def columns(self):
+        return ["kdj_k", "kdj_d", "kdj_j"]
+
+    def update(self, bar):
+        self.highest.push(float(bar["high"]))
+        self.lowest.push(float(bar["low"]))
+        lowest_low, highest_high = self.lowest.value(), self.highest.value()
+        span = highest_high - lowest_low
+        if _isnan(span) or span == 0:
+            self.last = {"kdj_k": _NAN, "kdj_d": _NAN, "kdj_j": _NAN}
+            return self.last
+        rsv = (float(bar["close"]) - lowest_low) / span * 100
+        k = (1 - self.alpha_k) * self.last_k + self.alpha_k * rsv
+        d = (1 - self.alpha_d) * self.last_d + self.alpha_d * k
+        self.last_k, self.last_d = k, d
+        self.last = {"kdj_k": k, "kdj_d": d, "kdj_j": 3 * k - 2 * d}
+        return self.last
+
+    def get_state(self):
+        return {
+            "highest": self.highest.get_state(),
+            "lowest": self.lowest.get_state(),
+            "last_k": self.last_k,
+            "last_d": self.last_d,
+        }
+
+    def set_state(self, state):
+        self.highest = _RollingExtreme.from_state(state["highest"])
+        self.lowest = _RollingExtreme.from_state(state["lowest"])
+        self.last_k = state["last_k"]
+        self.last_d = state["last_d"]
+
+
+INCREMENTAL_INDICATORS = {
+    cls.name: cls
+    for cls in (IncrementalMA, IncrementalEMA, IncrementalMACD, IncrementalRSI,
+                IncrementalBOLL, IncrementalATR, IncrementalKDJ)
+}
+
+
+def create_incremental(spec: IndicatorSpec) -> IncrementalIndicator:
+    """根据 IndicatorSpec 创建增量指标"""
+    name = spec.name.lower()
+    if name not in INCREMENTAL_INDICATORS:
+        raise ValueError(f"不支持的指标: {name}")
+    params = spec.params or {}
+    # stockstats 兼容的 adjust 加权 / Wilder 平滑变体只提供批量计算
+    if params.get("adjust") or (name == "atr" and params.get("method", "sma") != "sma"):
+        raise ValueError(f"增量计算不支持该参数组合: {name} {params}")
+    return INCREMENTAL_INDICATORS[name](spec.params)
+
+
+# ==================== 引擎 ====================
+
+
+class IncrementalIndicatorEngine:
+    """一组指标的增量计算引擎（一个标的一个实例）"""
+
+    def __init__(self, specs: List[IndicatorSpec]):
+        self.specs: List[IndicatorSpec] = []
+        self.indicators: List[IncrementalIndicator] = []
+        seen = set()
+        for spec in specs:
+            key = (spec.name.lower(), tuple(sorted((spec.params or {}).items())))
+            if key in seen:
+                continue
+            seen.add(key)
+            self.specs.append(spec)
+            self.indicators.append(create_incremental(spec))
+        self.bars = 0
+        self.last_timestamp: Optional[str] = None
+
+    @property
+    def columns(self) -> List[str]:
+        return [c for ind in self.indicators for c in ind.columns]
+
+    def update(self, bar: Mapping[str, Any], timestamp: Any = None) -> Dict[str, Optional[float]]:
+        """
+        追加一根新K线并返回各指标最新值
+
+        Args:
+            bar: 至少包含 close，ATR/KDJ 需要 high、low
+            timestamp: K线时间（可选，记录到状态中）
+
+        Returns:
+            {列名: 数值}，窗口未满等情况为 None
+        """
+        values: Dict[str, Optional[float]] = {}
+        for ind in self.indicators:
+            for col, v in ind.update(bar).items():
+                values[col] = None if _isnan(v) else v
+        self.bars += 1
+        if timestamp is not None:
+            self.last_timestamp = str(timestamp)
+        return values
+
+    def preview(self, bar: Mapping[str, Any]) -> Dict[str, Optional[float]]:
+        """计算假设追加该K线后的指标值，不修改状态（用于盘中未收盘的K线）"""
+        return copy.deepcopy(self).update(bar)
+
+    def values(self) -> Dict[str, Optional[float]]:
+        """最近一次更新后的指标值"""
+        return {c: (None if _isnan(v) else v) for ind in self.indicators for c, v in ind.last.items()}
+
+    @classmethod
+    def from_history(cls, df: pd.DataFrame, specs: List[IndicatorSpec],
+                     timestamp_col: Optional[str] = None) -> "IncrementalIndicatorEngine":
+        """用历史K线初始化状态（按行顺序逐根更新）"""
+        engine = cls(specs)
+        cols = [c for c in ("close", "high", "low") if c in df.columns]
+        records = df[cols].to_dict("records")
+        timestamps = df[timestamp_col].tolist() if timestamp_col else [None] * len(records)
+        for bar, ts in zip(records, timestamps):
+            engine.update(bar, timestamp=ts)
+        return engine
+
+    # ==================== 序列化 ====================
+
+    def to_state(self) -> Dict[str, Any]:
+        """导出为纯 Python 结构（可直接写入 MongoDB 或 json.dumps 后写入 Redis）"""
+        return {
+            "version": STATE_VERSION,
+            "bars": self.bars,
+            "last_timestamp": self.last_timestamp,
+            "indicators": [
+                {
+                    "name": spec.name,
+                    "params": dict(spec.params or {}),
+                    "state": ind.get_state(),
+                    "last": {c: _to_plain(v) for c, v in ind.last.items()},
+                }
+                for spec, ind in zip(self.specs, self.indicators)
+            ],
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "IncrementalIndicatorEngine":
+        if state.get("version") != STATE_VERSION:
+            raise ValueError(f"不兼容的增量指标状态版本: {state.get('version')}")
+        specs = [IndicatorSpec(item["name"], item["params"] or None) for item in state["indicators"]]
+        engine = cls(specs)
+        for ind, item in zip(engine.indicators, state["indicators"]):
+            ind.set_state(item["state"])
+            ind.last = {c: _from_plain(v) for c, v in item.get("last", {}).items()}
+        engine.bars = state.get("bars", 0)
+        engine.last_timestamp = state.get("last_timestamp")
+        return engine
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_state(), ensure_ascii=False)
+
+    @classmethod
+    def from_json(cls, data: str) -> "IncrementalIndicatorEngine":
+        return cls.from_state(json.loads(data))
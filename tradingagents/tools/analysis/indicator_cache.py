@@ -0,0 +1,248 @@
+"""
+技术指标结果缓存
+
+市场分析师、A股分析师、选股服务和个股详情接口一天内会对同一标的、同一根最新K线反复计算相同指标。
+本模块按 (标的, 周期, 最新K线日期, 输入列哈希, IndicatorSpec) 缓存指标结果：
+- L1: 进程内 MemoryCache（LRU + TTL）
+- L2: Redis（可选，多进程/多实例共享，载荷为压缩的 Arrow IPC）
+
+indicators.compute_indicator / compute_many 会自动查询本缓存，调用方无需改动。
+只对指标实际用到的列求哈希；ma/ema 这类单次遍历的指标直接计算比哈希+查缓存更快，不经过缓存。
+标的与周期从 df.attrs['symbol'/'period'] 或 code/symbol/ts_code、period 列读取，缺失时仅按数据哈希区分。
+
+配置（环境变量）：
+    TA_INDICATOR_CACHE_ENABLED=true             # 是否启用（默认启用）
+    TA_INDICATOR_CACHE_MAX_ENTRIES=2048         # L1 最大条目数
+    TA_INDICATOR_CACHE_MAX_MB=128               # L1 最大占用内存（MB）
+    TA_INDICATOR_CACHE_TTL_SECONDS=3600         # L1 过期时间（秒）
+    TA_INDICATOR_CACHE_REDIS=false              # 是否启用 Redis 层（使用 REDIS_URL）
+    TA_INDICATOR_CACHE_REDIS_TTL_SECONDS=86400  # Redis 层过期时间（秒）
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from tradingagents.dataflows.cache.codecs import decode_payload, encode_payload, pack_redis_value, unpack_redis_value
+from tradingagents.dataflows.cache.memory_cache import MemoryCache
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+# Redis（可选）
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    redis = None
+    REDIS_AVAILABLE = False
+
+
+# 缓存格式版本，指标实现或键结构变化时递增以作废旧条目
+CACHE_VERSION = 2
+
+REDIS_KEY_PREFIX = "ta:indicator"
+
+# 参与数据哈希的价格列
+_PRICE_COLUMNS = ("open", "high", "low", "close", "volume", "vol", "amount")
+_SYMBOL_COLUMNS = ("code", "symbol", "ts_code")
+_DATE_COLUMNS = ("trade_date", "date", "datetime", "timestamp")
+
+
+def _last_value(df, columns) -> Optional[str]:
+    for col in columns:
+        if col in df.columns:
+            series = df[col]
+            if len(series):
+                return str(series.iloc[-1])
+    return None
+
+
+def data_fingerprint(df, columns=None) -> Optional[str]:
+    """
+    计算价格数据指纹：标的|周期|最新K线|行数|价格数据哈希
+
+    Args:
+        df: DataFrame（或提供 columns/__getitem__ 的只读视图）
+        columns: 参与哈希的列（指标实际用到的输入列），None 表示全部价格列
+
+    Returns:
+        指纹字符串；没有价格列或价格列无法转换为数值时返回 None（不缓存）
+    """
+    wanted = _PRICE_COLUMNS if columns is None else columns
+    price_cols = [c for c in wanted if c in df.columns]
+    if not price_cols:
+        return None
+
+    attrs = getattr(df, "attrs", None) or {}
+    symbol = attrs.get("symbol") or _last_value(df, _SYMBOL_COLUMNS) or "-"
+    period = attrs.get("period") or _last_value(df, ("period",)) or "-"
+    last_bar = _last_value(df, _DATE_COLUMNS)
+    if last_bar is None:
+        index = getattr(df, "index", None)
+        last_bar = str(index[-1]) if index is not None and len(index) else "-"
+
+    digest = hashlib.blake2b(digest_size=16)
+    rows = 0
+    for col in price_cols:
+        try:
+            values = np.ascontiguousarray(df[col].to_numpy(dtype=float))
+        except (TypeError, ValueError):
+            return None
+        rows = len(values)
+        digest.update(col.encode("utf-8"))
+        digest.update(values.tobytes())
+    return f"{symbol}|{period}|{last_bar}|{rows}|{digest.hexdigest()}"
+
+
+def spec_key(spec) -> str:
+    """IndicatorSpec 的稳定表示"""
+    params = json.dumps(spec.params or {}, sort_keys=True, default=str)
+    return f"{spec.name.lower()}:{params}"
+
+
+class IndicatorCache:
+    """指标结果的两级缓存（进程内 + Redis）"""
+
+    def __init__(self, memory: Optional[MemoryCache] = None, redis_client=None,
+                 redis_ttl: int = 86400, enabled: bool = True):
+        """
+        初始化
+
+        Args:
+            memory: 进程内缓存，None 时使用默认配置
+            redis_client: 二进制 Redis 客户端（decode_responses=False），None 表示不启用 Redis 层
+            redis_ttl: Redis 层过期时间（秒）
+            enabled: 是否启用
+        """
+        self.enabled = enabled
+        self.memory = memory if memory is not None else MemoryCache(max_entries=2048, max_bytes=128 * 1024 * 1024,
+                                                                    default_ttl=3600)
+        self.redis_client = redis_client
+        self.redis_ttl = redis_ttl
+        self._lock = threading.Lock()
+        self.stats = {'memory_hits': 0, 'redis_hits': 0, 'misses': 0, 'stores': 0, 'redis_errors': 0}
+
+    @classmethod
+    def from_env(cls) -> "IndicatorCache":
+        """根据环境变量创建实例"""
+        memory = MemoryCache(
+            max_entries=int(os.getenv("TA_INDICATOR_CACHE_MAX_ENTRIES", "2048")),
+            max_bytes=int(float(os.getenv("TA_INDICATOR_CACHE_MAX_MB", "128")) * 1024 * 1024),
+            default_ttl=float(os.getenv("TA_INDICATOR_CACHE_TTL_SECONDS", "3600")),
+        )
+        redis_client = None
+        if REDIS_AVAILABLE and os.getenv("TA_INDICATOR_CACHE_REDIS", "false").lower() in ("true", "1", "yes", "on"):
+            redis_password = os.getenv("REDIS_PASSWORD", "tradingagents123")
+            redis_port = os.getenv("REDIS_PORT", "6380")
+            redis_url = os.getenv("REDIS_URL", f"redis://:{redis_password}@localhost:{redis_port}")
+            try:
+                redis_client = redis.from_url(redis_url, socket_timeout=2, socket_connect_timeout=2,
+                                              decode_responses=False)
+                redis_client.ping()
+                logger.info("✅ [指标缓存] Redis 层已启用")
+            except Exception as e:
+                logger.warning(f"⚠️ [指标缓存] Redis 连接失败，仅使用进程内缓存: {e}")
+                redis_client = None
+        return cls(
+            memory=memory,
+            redis_client=redis_client,
+            redis_ttl=int(os.getenv("TA_INDICATOR_CACHE_REDIS_TTL_SECONDS", "86400")),
+            enabled=os.getenv("TA_INDICATOR_CACHE_ENABLED", "true").lower() in ("true", "1", "yes", "on"),
+        )
+
+    def _count(self, field: str):
+        with self._lock:
+            self.stats[field] += 1
+
+    @staticmethod
+    def make_key(fingerprint: str, spec) -> str:
+        return f"{REDIS_KEY_PREFIX}:v{CACHE_VERSION}:{fingerprint}|{spec_key(spec)}"
+
+    def get(self, key: str) -> Optional[pd.DataFrame]:
+        """
+        读取缓存的指标列
+
+        Returns:
+            指标列组成的 DataFrame（RangeIndex），未命中返回 None
+        """
+        if not self.enabled:
+            return None
+
+        frame = self.memory.get(key)
+        if frame is not None:
+            self._count('memory_hits')
+            return frame
+
+        if self.redis_client is not None:
+            try:
+                raw = self.redis_client.get(key)
+                unpacked = unpack_redis_value(raw) if raw is not None else None
+                if unpacked is not None:
+                    header, payload = unpacked
+                    frame = decode_payload(payload, header['data_format'], header['codec'])
+                    self.memory.set(key, frame, tags=(header.get('symbol', '-'),))
+                    self._count('redis_hits')
+                    return frame
+            except Exception as e:
+                self._count('redis_errors')
+                logger.debug(f"[指标缓存] Redis 读取失败 {key}: {e}")
+
+        self._count('misses')
+        return None
+
+    def set(self, key: str, frame: pd.DataFrame, symbol: str = "-"):
+        """写入指标列（RangeIndex 的 DataFrame）"""
+        if not self.enabled:
+            return
+        self.memory.set(key, frame, tags=(symbol,))
+        self._count('stores')
+
+        if self.redis_client is not None:
+            try:
+                payload, data_format, codec = encode_payload(frame)
+                header = {'data_format': data_format, 'codec': codec, 'symbol': symbol}
+                self.redis_client.setex(key, self.redis_ttl, pack_redis_value(payload, header))
+            except Exception as e:
+                self._count('redis_errors')
+                logger.debug(f"[指标缓存] Redis 写入失败 {key}: {e}")
+
+    def invalidate_symbol(self, symbol: str):
+        """删除进程内缓存中某个标的的全部指标结果"""
+        self.memory.invalidate_tag(symbol)
+
+    def clear(self):
+        self.memory.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取命中统计"""
+        with self._lock:
+            stats = dict(self.stats)
+        lookups = stats['memory_hits'] + stats['redis_hits'] + stats['misses']
+        stats['hit_ratio'] = round((stats['memory_hits'] + stats['redis_hits']) / lookups, 4) if lookups else 0.0
+        stats['enabled'] = self.enabled
+        stats['redis_enabled'] = self.redis_client is not None
+        stats['memory'] = self.memory.get_stats()
+        return stats
+
+
+# 全局实例
+_indicator_cache = None
+_indicator_cache_lock = threading.Lock()
+
+
+def get_indicator_cache() -> IndicatorCache:
+    """获取全局指标缓存实例"""
+    global _indicator_cache
+    if _indicator_cache is None:
+        with _indicator_cache_lock:
+            if _indicator_cache is None:
+                _indicator_cache = IndicatorCache.from_env()
+    return _indicator_cache
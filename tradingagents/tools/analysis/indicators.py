@@ -1,7 +1,8 @@
 from __future__ import annotations
 
+import re
 from dataclasses import dataclass
-from typing import Any, Dict, Iterable, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
@@ -13,7 +14,7 @@ class IndicatorSpec:
     params: Optional[Dict[str, Any]] = None
 
 
-SUPPORTED = {"ma", "ema", "macd", "rsi", "boll", "atr", "kdj"}
+SUPPORTED = {"ma", "ema", "macd", "rsi", "boll", "atr", "kdj", "vwma", "mfi"}
 
 
 def _require_cols(df: pd.DataFrame, cols: Iterable[str]):
@@ -39,21 +40,32 @@ def ma(close: pd.Series, n: int, min_periods: int = None) -> pd.Series:
     return close.rolling(window=int(n), min_periods=min_periods).mean()
 
 
-def ema(close: pd.Series, n: int) -> pd.Series:
+def ema(close: pd.Series, n: int, adjust: bool = False) -> pd.Series:
     """
     计算指数移动平均线（Exponential Moving Average）
 
     Args:
         close: 收盘价序列
         n: 周期
+        adjust: 是否使用 pandas 的 adjust 加权（stockstats 的 EMA 使用 adjust=True）
 
     Returns:
         指数移动平均线序列
     """
-    return close.ewm(span=int(n), adjust=False).mean()
+    return close.ewm(span=int(n), adjust=adjust).mean()
 
 
-def macd(close: pd.Series, fast: int = 12, slow: int = 26, signal: int = 9) -> pd.DataFrame:
+def smma(series: pd.Series, n: int) -> pd.Series:
+    """
+    计算平滑移动平均（Smoothed Moving Average，Wilder 平滑）
+
+    与 stockstats 一致：ewm(alpha=1/n, adjust=True)
+    """
+    return series.ewm(alpha=1.0 / int(n), adjust=True).mean()
+
+
+def macd(close: pd.Series, fast: int = 12, slow: int = 26, signal: int = 9,
+         adjust: bool = False) -> pd.DataFrame:
     """
     计算MACD指标（Moving Average Convergence Divergence）
 
@@ -62,6 +74,7 @@ def macd(close: pd.Series, fast: int = 12, slow: int = 26, signal: int = 9) -> p
         fast: 快线周期，默认12
         slow: 慢线周期，默认26
         signal: 信号线周期，默认9
+        adjust: EMA 是否使用 adjust 加权（stockstats 的 macd/macds/macdh 使用 adjust=True）
 
     Returns:
         包含 dif, dea, macd_hist 的 DataFrame
@@ -69,8 +82,8 @@ def macd(close: pd.Series, fast: int = 12, slow: int = 26, signal: int = 9) -> p
         - dea: DIF的信号线（DEA）
         - macd_hist: MACD柱状图（DIF - DEA）
     """
-    dif = ema(close, fast) - ema(close, slow)
-    dea = dif.ewm(span=int(signal), adjust=False).mean()
+    dif = ema(close, fast, adjust=adjust) - ema(close, slow, adjust=adjust)
+    dea = dif.ewm(span=int(signal), adjust=adjust).mean()
     hist = dif - dea
     return pd.DataFrame({"dif": dif, "dea": dea, "macd_hist": hist})
 
@@ -86,6 +99,7 @@ def rsi(close: pd.Series, n: int = 14, method: str = 'ema') -> pd.Series:
             - 'ema': 指数移动平均（国际标准，Wilder's方法）
             - 'sma': 简单移动平均
             - 'china': 中国式SMA（同花顺/通达信风格）
+            - 'smma': Wilder 平滑（stockstats 风格）
 
     Returns:
         RSI序列（0-100）
@@ -94,7 +108,19 @@ def rsi(close: pd.Series, n: int = 14, method: str = 'ema') -> pd.Series:
         - 'ema': 使用 ewm(alpha=1/n, adjust=False)，适用于国际市场
         - 'sma': 使用 rolling(window=n).mean()，简单移动平均
         - 'china': 使用 ewm(com=n-1, adjust=True)，与同花顺/通达信一致
+        - 'smma': 使用 ewm(alpha=1/n, adjust=True)，无涨跌时为 50、首值为 50，与 stockstats 的 rsi 一致
     """
+    if method == 'smma':
+        diff = close.diff().fillna(0).to_numpy()
+        diff[:1] = 0.0
+        up = smma(pd.Series(np.where(diff > 0, diff, 0.0), index=close.index), n).to_numpy()
+        down = smma(pd.Series(np.where(diff < 0, -diff, 0.0), index=close.index), n).to_numpy()
+        total = up + down
+        with np.errstate(divide='ignore', invalid='ignore'):
+            values = np.where(total != 0, 100 * (up / total), 50.0)
+        values[:1] = 50.0
+        return pd.Series(values, index=close.index).fillna(0)
+
     delta = close.diff()
     gain = delta.where(delta > 0, 0)
     loss = -delta.where(delta < 0, 0)
@@ -114,7 +140,7 @@ def rsi(close: pd.Series, n: int = 14, method: str = 'ema') -> pd.Series:
         avg_gain = gain.ewm(com=int(n) - 1, adjust=True).mean()
         avg_loss = loss.ewm(com=int(n) - 1, adjust=True).mean()
     else:
-        raise ValueError(f"不支持的RSI计算方法: {method}，支持的方法: 'ema', 'sma', 'china'")
+        raise ValueError(f"不支持的RSI计算方法: {method}，支持的方法: 'ema', 'sma', 'china', 'smma'")
 
     rs = avg_gain / (avg_loss.replace(0, np.nan))
     rsi_val = 100 - (100 / (1 + rs))
@@ -146,7 +172,24 @@ def boll(close: pd.Series, n: int = 20, k: float = 2.0, min_periods: int = None)
     return pd.DataFrame({"boll_mid": mid, "boll_upper": upper, "boll_lower": lower})
 
 
-def atr(high: pd.Series, low: pd.Series, close: pd.Series, n: int = 14) -> pd.Series:
+def atr(high: pd.Series, low: pd.Series, close: pd.Series, n: int = 14, method: str = 'sma') -> pd.Series:
+    """
+    计算平均真实波幅（Average True Range）
+
+    Args:
+        method: 'sma' 为 n 日简单平均（窗口未满为 NaN）；
+                'smma' 为 Wilder 平滑，首根K线的昨收取当日收盘，与 stockstats 的 atr 一致
+    """
+    if method == 'smma':
+        h = high.to_numpy(dtype=float)
+        l = low.to_numpy(dtype=float)
+        c = close.to_numpy(dtype=float)
+        prev_close = np.empty_like(c)
+        prev_close[:1] = c[:1]
+        prev_close[1:] = c[:-1]
+        tr = np.nan_to_num(np.maximum(h - l, np.maximum(np.abs(h - prev_close), np.abs(l - prev_close))))
+        return smma(pd.Series(tr, index=close.index), n).fillna(0)
+
     prev_close = close.shift(1)
     tr = pd.concat([
         (high - low).abs(),
@@ -156,6 +199,56 @@ def atr(high: pd.Series, low: pd.Series, close: pd.Series, n: int = 14) -> pd.Se
     return tr.rolling(window=int(n), min_periods=int(n)).mean()
 
 
+def typical_price(high: pd.Series, low: pd.Series, close: pd.Series,
+                  volume: pd.Series = None, amount: pd.Series = None) -> pd.Series:
+    """典型价格：提供成交额时为 成交额/成交量，否则为 (最高+最低+收盘)/3（与 stockstats 一致）"""
+    if amount is not None and volume is not None:
+        return amount / volume
+    return (close + high + low) / 3.0
+
+
+def vwma(high: pd.Series, low: pd.Series, close: pd.Series, volume: pd.Series,
+         n: int = 14, amount: pd.Series = None) -> pd.Series:
+    """
+    计算成交量加权移动平均（Volume Weighted Moving Average）
+
+    VWMA = sum(典型价格 × 成交量, n) / sum(成交量, n)，窗口不足 n 时按已有数据计算，成交量为 0 时为 0
+    """
+    tp = typical_price(high, low, close, volume, amount)
+    rolling_tpv = (volume * tp).rolling(window=int(n), min_periods=1).sum().to_numpy(dtype=float)
+    rolling_vol = volume.rolling(window=int(n), min_periods=1).sum().to_numpy(dtype=float)
+    out = np.divide(rolling_tpv, rolling_vol, out=np.zeros_like(rolling_tpv), where=rolling_vol != 0)
+    return pd.Series(out, index=close.index)
+
+
+def mfi(high: pd.Series, low: pd.Series, close: pd.Series, volume: pd.Series,
+        n: int = 14, amount: pd.Series = None, scale: float = 100.0) -> pd.Series:
+    """
+    计算资金流量指标（Money Flow Index）
+
+    Args:
+        n: 周期，默认14；前 n 根K线和无资金流动时取中性值
+        scale: 输出倍数，默认 0-100；stockstats 输出 0-1 的比例（scale=1.0）
+    """
+    tp = typical_price(high, low, close, volume, amount).to_numpy(dtype=float)
+    raw_money_flow = tp * volume.to_numpy(dtype=float)
+    tp_diff = np.zeros_like(tp)
+    tp_diff[1:] = np.diff(tp)
+
+    def rolling_sum(arr: np.ndarray) -> np.ndarray:
+        cs = np.cumsum(arr)
+        out = cs.copy()
+        out[int(n):] = cs[int(n):] - cs[:-int(n)]
+        return out
+
+    pos_sum = rolling_sum(np.where(tp_diff > 0, raw_money_flow, 0.0))
+    neg_sum = rolling_sum(np.where(tp_diff < 0, raw_money_flow, 0.0))
+    total_flow = pos_sum + neg_sum
+    ratio = np.divide(pos_sum, total_flow, out=np.full_like(pos_sum, 0.5), where=total_flow > 0)
+    ratio[:int(n)] = 0.5
+    return pd.Series(ratio, index=close.index).fillna(0) * scale
+
+
 def kdj(high: pd.Series, low: pd.Series, close: pd.Series, n: int = 9, m1: int = 3, m2: int = 3) -> pd.DataFrame:
     lowest_low = low.rolling(window=int(n), min_periods=int(n)).min()
     highest_high = high.rolling(window=int(n), min_periods=int(n)).max()
@@ -185,10 +278,11 @@ def kdj(high: pd.Series, low: pd.Series, close: pd.Series, n: int = 9, m1: int =
     return pd.DataFrame({"kdj_k": k, "kdj_d": d, "kdj_j": j})
 
 
-def compute_indicator(df: pd.DataFrame, spec: IndicatorSpec) -> pd.DataFrame:
+def _indicator_columns(df, spec: IndicatorSpec) -> Dict[str, pd.Series]:
+    """计算单个指标规格对应的全部输出列（不复制输入表）"""
     name = spec.name.lower()
     params = spec.params or {}
-    out = df.copy()
+    out: Dict[str, pd.Series] = {}
 
     if name == "ma":
         _require_cols(df, ["close"])
@@ -199,7 +293,7 @@ def compute_indicator(df: pd.DataFrame, spec: IndicatorSpec) -> pd.DataFrame:
     if name == "ema":
         _require_cols(df, ["close"])
         n = int(params.get("n", params.get("period", 20)))
-        out[f"ema{n}"] = ema(df["close"], n)
+        out[f"ema{n}"] = ema(df["close"], n, adjust=bool(params.get("adjust", False)))
         return out
 
     if name == "macd":
@@ -207,15 +301,16 @@ def compute_indicator(df: pd.DataFrame, spec: IndicatorSpec) -> pd.DataFrame:
         fast = int(params.get("fast", 12))
         slow = int(params.get("slow", 26))
         signal = int(params.get("signal", 9))
-        macd_df = macd(df["close"], fast=fast, slow=slow, signal=signal)
-        for c in macd_df.columns:
-            out[c] = macd_df[c]
+        macd_df = macd(df["close"], fast=fast, slow=slow, signal=signal,
+                       adjust=bool(params.get("adjust", False)))
+        out.update({c: macd_df[c] for c in macd_df.columns})
         return out
 
     if name == "rsi":
         _require_cols(df, ["close"])
         n = int(params.get("n", params.get("period", 14)))
-        out[f"rsi{n}"] = rsi(df["close"], n)
+        method = params.get("method", "ema")
+        out[f"rsi{n}"] = rsi(df["close"], n, method=method)
         return out
 
     if name == "boll":
@@ -223,14 +318,28 @@ def compute_indicator(df: pd.DataFrame, spec: IndicatorSpec) -> pd.DataFrame:
         n = int(params.get("n", 20))
         k = float(params.get("k", 2.0))
         boll_df = boll(df["close"], n=n, k=k)
-        for c in boll_df.columns:
-            out[c] = boll_df[c]
+        out.update({c: boll_df[c] for c in boll_df.columns})
         return out
 
     if name == "atr":
         _require_cols(df, ["high", "low", "close"])
         n = int(params.get("n", 14))
-        out[f"atr{n}"] = atr(df["high"], df["low"], df["close"], n=n)
+        method = params.get("method", "sma")
+        out[f"atr{n}"] = atr(df["high"], df["low"], df["close"], n=n, method=method)
+        return out
+
+    if name in ("vwma", "mfi"):
+        _require_cols(df, ["high", "low", "close"])
+        volume_col = "volume" if "volume" in df.columns else "vol"
+        _require_cols(df, [volume_col])
+        n = int(params.get("n", 14))
+        amount = df["amount"] if params.get("use_amount") and "amount" in df.columns else None
+        if name == "vwma":
+            out[f"vwma{n}"] = vwma(df["high"], df["low"], df["close"], df[volume_col], n=n, amount=amount)
+        else:
+            scale = float(params.get("scale", 100.0))
+            out[f"mfi{n}"] = mfi(df["high"], df["low"], df["close"], df[volume_col], n=n,
+                                 amount=amount, scale=scale)
         return out
 
     if name == "kdj":
@@ -239,13 +348,83 @@ def compute_indicator(df: pd.DataFrame, spec: IndicatorSpec) -> pd.DataFrame:
         m1 = int(params.get("m1", 3))
         m2 = int(params.get("m2", 3))
         kdj_df = kdj(df["high"], df["low"], df["close"], n=n, m1=m1, m2=m2)
-        for c in kdj_df.columns:
-            out[c] = kdj_df[c]
+        out.update({c: kdj_df[c] for c in kdj_df.columns})
         return out
 
     raise ValueError(f"不支持的指标: {name}")
 
 
+def _get_indicator_cache():
+    """获取指标结果缓存（延迟导入，缓存模块不可用时返回 None）"""
+    try:
+        from tradingagents.tools.analysis.indicator_cache import get_indicator_cache
+        cache = get_indicator_cache()
+        return cache if cache.enabled else None
+    except Exception:
+        return None
+
+
+# 单次遍历的滚动/指数均值：直接计算比计算数据哈希并查缓存更快，不经过结果缓存
+_UNCACHED_INDICATORS = frozenset({"ma", "ema"})
+
+
+def _spec_input_columns(df, spec: IndicatorSpec) -> Tuple[str, ...]:
+    """指标实际用到的输入列（数据指纹只对这些列求哈希）"""
+    name = spec.name.lower()
+    if name in ("atr", "kdj"):
+        return ("high", "low", "close")
+    if name in ("vwma", "mfi"):
+        cols = ("high", "low", "close", "volume" if "volume" in df.columns else "vol")
+        if (spec.params or {}).get("use_amount"):
+            cols += ("amount",)
+        return cols
+    return ("close",)
+
+
+def _cached_indicator_columns(df, spec: IndicatorSpec,
+                              fingerprints: Optional[Dict[Tuple[str, ...], Optional[str]]] = None) -> Dict[str, pd.Series]:
+    """
+    带结果缓存的 _indicator_columns
+
+    相同 (标的, 周期, 最新K线, 输入列哈希, spec) 的重复计算直接从缓存返回。
+    fingerprints 按输入列缓存已计算的指纹，供 compute_many 在多个指标间复用。
+    """
+    if spec.name.lower() in _UNCACHED_INDICATORS:
+        return _indicator_columns(df, spec)
+    cache = _get_indicator_cache()
+    if cache is None:
+        return _indicator_columns(df, spec)
+
+    from tradingagents.tools.analysis.indicator_cache import data_fingerprint
+    input_cols = _spec_input_columns(df, spec)
+    if fingerprints is not None and input_cols in fingerprints:
+        fingerprint = fingerprints[input_cols]
+    else:
+        fingerprint = data_fingerprint(df, input_cols)
+        if fingerprints is not None:
+            fingerprints[input_cols] = fingerprint
+    if fingerprint is None:
+        return _indicator_columns(df, spec)
+
+    key = cache.make_key(fingerprint, spec)
+    index = df.index
+    cached = cache.get(key)
+    if cached is not None and len(cached) == len(index):
+        return {c: pd.Series(cached[c].to_numpy(), index=index) for c in cached.columns}
+
+    columns = _indicator_columns(df, spec)
+    cache.set(key, pd.DataFrame({c: v.to_numpy() for c, v in columns.items()}),
+              symbol=fingerprint.split("|", 1)[0])
+    return columns
+
+
+def compute_indicator(df: pd.DataFrame, spec: IndicatorSpec) -> pd.DataFrame:
+    out = df.copy()
+    for col, values in _cached_indicator_columns(df, spec).items():
+        out[col] = values
+    return out
+
+
 def compute_many(df: pd.DataFrame, specs: List[IndicatorSpec]) -> pd.DataFrame:
     if not specs:
         return df.copy()
@@ -263,12 +442,98 @@ def compute_many(df: pd.DataFrame, specs: List[IndicatorSpec]) -> pd.DataFrame:
             seen.add(k)
             unique_specs.append(s)
 
+    # 输入列相同的指标共用同一个数据指纹
+    fingerprints: Dict[Tuple[str, ...], Optional[str]] = {}
     out = df.copy()
     for s in unique_specs:
-        out = compute_indicator(out, s)
+        for col, values in _cached_indicator_columns(df, s, fingerprints).items():
+            out[col] = values
     return out
 
 
+# ==================== stockstats 风格指标名注册表 ====================
+# 指标名 → (IndicatorSpec, 输出列)，参数与 stockstats 的计算方式保持一致，
+# 供 get_stock_stats_indicators_window / StockstatsUtils 以原生向量化实现替代 stockstats.wrap。
+
+STOCKSTATS_INDICATORS: Dict[str, Tuple[IndicatorSpec, str]] = {
+    "close_50_sma": (IndicatorSpec("ma", {"n": 50}), "ma50"),
+    "close_200_sma": (IndicatorSpec("ma", {"n": 200}), "ma200"),
+    "close_10_ema": (IndicatorSpec("ema", {"n": 10, "adjust": True}), "ema10"),
+    "macd": (IndicatorSpec("macd", {"adjust": True}), "dif"),
+    "macds": (IndicatorSpec("macd", {"adjust": True}), "dea"),
+    "macdh": (IndicatorSpec("macd", {"adjust": True}), "macd_hist"),
+    "rsi": (IndicatorSpec("rsi", {"n": 14, "method": "smma"}), "rsi14"),
+    "boll": (IndicatorSpec("boll", {"n": 20, "k": 2.0}), "boll_mid"),
+    "boll_ub": (IndicatorSpec("boll", {"n": 20, "k": 2.0}), "boll_upper"),
+    "boll_lb": (IndicatorSpec("boll", {"n": 20, "k": 2.0}), "boll_lower"),
+    "atr": (IndicatorSpec("atr", {"n": 14, "method": "smma"}), "atr14"),
+    "vwma": (IndicatorSpec("vwma", {"n": 14}), "vwma14"),
+    "mfi": (IndicatorSpec("mfi", {"n": 14, "scale": 1.0}), "mfi14"),
+}
+
+# 带周期的写法，例如 close_20_sma、close_5_ema、rsi_6、atr_10、vwma_20、mfi_10
+_STOCKSTATS_PATTERNS = [
+    (re.compile(r"^close_(\d+)_sma$"), lambda n: (IndicatorSpec("ma", {"n": n}), f"ma{n}")),
+    (re.compile(r"^close_(\d+)_ema$"), lambda n: (IndicatorSpec("ema", {"n": n, "adjust": True}), f"ema{n}")),
+    (re.compile(r"^rsi_(\d+)$"), lambda n: (IndicatorSpec("rsi", {"n": n, "method": "smma"}), f"rsi{n}")),
+    (re.compile(r"^atr_(\d+)$"), lambda n: (IndicatorSpec("atr", {"n": n, "method": "smma"}), f"atr{n}")),
+    (re.compile(r"^vwma_(\d+)$"), lambda n: (IndicatorSpec("vwma", {"n": n}), f"vwma{n}")),
+    (re.compile(r"^mfi_(\d+)$"), lambda n: (IndicatorSpec("mfi", {"n": n, "scale": 1.0}), f"mfi{n}")),
+]
+
+class _CaseInsensitiveColumns:
+    """以小写列名只读访问 DataFrame 的价格列（Close/close 均可）"""
+
+    def __init__(self, df: pd.DataFrame):
+        self._df = df
+        self._names = {c.lower(): c for c in df.columns if isinstance(c, str)}
+        self.columns = list(self._names)
+        self.index = df.index
+        self.attrs = df.attrs
+
+    def __getitem__(self, key: str) -> pd.Series:
+        return self._df[self._names[key]]
+
+
+def resolve_stockstats_indicator(name: str) -> Optional[Tuple[IndicatorSpec, str]]:
+    """把 stockstats 风格的指标名解析为 (IndicatorSpec, 输出列)，不支持时返回 None"""
+    key = name.strip().lower()
+    if key in STOCKSTATS_INDICATORS:
+        return STOCKSTATS_INDICATORS[key]
+    for pattern, build in _STOCKSTATS_PATTERNS:
+        m = pattern.match(key)
+        if m and int(m.group(1)) > 0:
+            return build(int(m.group(1)))
+    return None
+
+
+def compute_stockstats_indicator(df: pd.DataFrame, name: str) -> pd.Series:
+    """
+    按 stockstats 指标名计算指标序列（列名大小写不敏感，如 Close/close）
+
+    Args:
+        df: 价格数据（按时间升序）
+        name: stockstats 风格指标名，如 close_50_sma、macdh、boll_ub、mfi
+
+    Returns:
+        与 df 行对齐的指标序列
+
+    Raises:
+        ValueError: 指标名不受支持
+    """
+    resolved = resolve_stockstats_indicator(name)
+    if resolved is None:
+        raise ValueError(f"不支持的指标: {name}")
+    spec, column = resolved
+
+    # 按小写列名访问原表，不复制也不写回
+    frame = _CaseInsensitiveColumns(df)
+    if spec.name in ("vwma", "mfi") and "amount" in frame.columns:
+        # stockstats 在存在 amount 列时用 成交额/成交量 作为典型价格
+        spec = IndicatorSpec(spec.name, {**(spec.params or {}), "use_amount": True})
+    return _cached_indicator_columns(frame, spec)[column]
+
+
 def last_values(df: pd.DataFrame, columns: List[str]) -> Dict[str, Any]:
     if df.empty:
         return {c: None for c in columns}
@@ -0,0 +1,336 @@
+"""
+横截面（面板）技术指标计算
+
+indicators.py 中的函数一次只处理一个标的的 pd.Series，全市场使用（选股、夜间快照）时
+需要在 Python 中逐个标的循环。本模块接收二维面板（行=日期，列=标的）的 NumPy 数组或
+宽表 DataFrame，按列一次性向量化计算所有支持的指标。
+
+NaN 处理：
+    每个标的视为只包含自身有效K线（close 非 NaN）的序列，上市前的空值作为预热期，
+    停牌日的空值会先被压缩掉再计算，因此结果与对该标的单独调用 indicators.py 中的函数一致；
+    无效K线位置的输出为 NaN。
+
+使用方法：
+    panels = panel_from_long(df, date_col='trade_date', symbol_col='code')
+    results = compute_panel(panels, [IndicatorSpec('rsi', {'n': 14}), IndicatorSpec('macd')])
+    latest = last_cross_section(results)   # 行=标的，列=指标
+"""
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from tradingagents.tools.analysis.indicators import IndicatorSpec
+
+Panel = Union[np.ndarray, pd.DataFrame]
+
+
+# ==================== 面板对齐 ====================
+
+
+class _PanelLayout:
+    """
+    记录输入面板的形状和有效位置，负责把各标的的有效K线压缩到底部（去除停牌空洞），
+    计算完成后再还原到原始位置。
+    """
+
+    def __init__(self, close: Panel):
+        self.index = close.index if isinstance(close, pd.DataFrame) else None
+        self.columns = close.columns if isinstance(close, pd.DataFrame) else None
+        values = np.asarray(close, dtype=float)
+        if values.ndim != 2:
+            raise ValueError(f"面板必须是二维（日期 × 标的），实际维度: {values.ndim}")
+        self.shape = values.shape
+        self.valid = ~np.isnan(values)
+        # 只有上市前空值（每列有效值连续到末尾）时无需压缩
+        self.order: Optional[np.ndarray] = None
+        if self.shape[0] > 1 and np.any(np.diff(self.valid.astype(np.int8), axis=0) < 0):
+            self.order = np.argsort(self.valid, axis=0, kind="stable")
+
+    def compact(self, panel: Panel) -> np.ndarray:
+        values = np.asarray(panel, dtype=float)
+        if values.shape != self.shape:
+            raise ValueError(f"面板形状不一致: {values.shape} != {self.shape}")
+        if self.order is not None:
+            values = np.take_along_axis(values, self.order, axis=0)
+        return values
+
+    def restore(self, values: np.ndarray) -> Panel:
+        if self.order is not None:
+            restored = np.empty_like(values)
+            np.put_along_axis(restored, self.order, values, axis=0)
+            values = restored
+        values = np.where(self.valid, values, np.nan)
+        if self.index is None:
+            return values
+        return pd.DataFrame(values, index=self.index, columns=self.columns)
+
+
+# ==================== 面板基础运算（输入为压缩后的数组，空值只出现在列首） ====================
+# pandas 的 rolling/ewm 在宽表上按列逐个计算，数千列时开销很大；
+# 这里用沿时间轴的累积和与逐行递推，每一步都对所有标的向量化。
+
+
+def _window_sums(x: np.ndarray, n: int, squares: bool = False):
+    """滚动窗口内的有效值个数、和、平方和（先减去列基准值，降低累积和的浮点误差）"""
+    valid = ~np.isnan(x)
+    with np.errstate(invalid="ignore"):
+        first = np.where(valid.any(axis=0), x[valid.argmax(axis=0), np.arange(x.shape[1])], 0.0)
+    dev = np.where(valid, x - first, 0.0)
+
+    def rolling(values: np.ndarray) -> np.ndarray:
+        cs = np.cumsum(values, axis=0)
+        out = cs.copy()
+        out[n:] -= cs[:-n]
+        return out
+
+    total_sq = rolling(dev * dev) if squares else None
+    return rolling(valid.astype(float)), rolling(dev), total_sq, first
+
+
+def _rolling_mean(x: np.ndarray, n: int, min_periods: int = 1) -> np.ndarray:
+    count, total, _, first = _window_sums(x, int(n))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = total / count + first
+    return np.where(count >= max(min_periods, 1), mean, np.nan)
+
+
+def _rolling_std(x: np.ndarray, n: int, min_periods: int = 1) -> np.ndarray:
+    """样本标准差（ddof=1）"""
+    count, total, total_sq, _ = _window_sums(x, int(n), squares=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        var = (total_sq - total * total / count) / (count - 1)
+    std = np.sqrt(np.clip(var, 0.0, None))
+    return np.where(count >= max(min_periods, 2), std, np.nan)
+
+
+def _rolling_extreme(x: np.ndarray, n: int, mode: str) -> np.ndarray:
+    """滚动最大/最小值（窗口内有空值或未满时为 NaN，对应 min_periods=n）"""
+    out = np.full(x.shape, np.nan)
+    if x.shape[0] >= n:
+        windows = np.lib.stride_tricks.sliding_window_view(x, int(n), axis=0)
+        out[n - 1:] = windows.max(axis=-1) if mode == "max" else windows.min(axis=-1)
+    return out
+
+
+def _ewm(x: np.ndarray, alpha: float, adjust: bool = False) -> np.ndarray:
+    """
+    指数加权均值，按列首个有效值开始递推
+    adjust=False 对应 ewm(adjust=False)，adjust=True 对应 ewm(adjust=True)
+    """
+    out = np.full(x.shape, np.nan)
+    decay = 1 - alpha
+    if adjust:
+        num = np.zeros(x.shape[1])
+        den = np.zeros(x.shape[1])
+        for i in range(x.shape[0]):
+            row = x[i]
+            ok = ~np.isnan(row)
+            num = np.where(ok, row + decay * num, num)
+            den = np.where(ok, 1.0 + decay * den, den)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                out[i] = np.where(ok, num / den, np.nan)
+        return out
+
+    state = np.full(x.shape[1], np.nan)
+    for i in range(x.shape[0]):
+        row = x[i]
+        state = np.where(np.isnan(state), row, alpha * row + decay * state)
+        out[i] = state
+    return out
+
+
+def _shift(x: np.ndarray) -> np.ndarray:
+    out = np.full(x.shape, np.nan)
+    out[1:] = x[:-1]
+    return out
+
+
+# ==================== 面板指标 ====================
+
+
+def _ema(close: np.ndarray, n: int) -> np.ndarray:
+    return _ewm(close, 2.0 / (int(n) + 1))
+
+
+def _macd(close: np.ndarray, fast: int, slow: int, signal: int) -> Dict[str, np.ndarray]:
+    dif = _ema(close, fast) - _ema(close, slow)
+    dea = _ewm(dif, 2.0 / (int(signal) + 1))
+    return {"dif": dif, "dea": dea, "macd_hist": dif - dea}
+
+
+def _rsi(close: np.ndarray, n: int, method: str) -> np.ndarray:
+    delta = close - _shift(close)
+    # 与单标的实现一致：有效K线的首根涨跌记为 0；预热期保持 NaN，避免 0 混入平滑
+    warmup = np.isnan(close)
+    with np.errstate(invalid="ignore"):
+        gain = np.where(warmup, np.nan, np.where(delta > 0, delta, 0.0))
+        loss = np.where(warmup, np.nan, np.where(delta < 0, -delta, 0.0))
+
+    if method == "ema":
+        avg_gain = _ewm(gain, 1 / float(n))
+        avg_loss = _ewm(loss, 1 / float(n))
+    elif method == "sma":
+        avg_gain = _rolling_mean(gain, n)
+        avg_loss = _rolling_mean(loss, n)
+    elif method == "china":
+        avg_gain = _ewm(gain, 1 / float(n), adjust=True)
+        avg_loss = _ewm(loss, 1 / float(n), adjust=True)
+    else:
+        raise ValueError(f"不支持的RSI计算方法: {method}，支持的方法: 'ema', 'sma', 'china'")
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rs = avg_gain / np.where(avg_loss == 0, np.nan, avg_loss)
+        return 100 - (100 / (1 + rs))
+
+
+def _boll(close: np.ndarray, n: int, k: float) -> Dict[str, np.ndarray]:
+    mid = _rolling_mean(close, n)
+    std = _rolling_std(close, n)
+    return {"boll_mid": mid, "boll_upper": mid + k * std, "boll_lower": mid - k * std}
+
+
+def _atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, n: int) -> np.ndarray:
+    prev_close = _shift(close)
+    # fmax 忽略 NaN：首根有效K线没有昨收时 TR = high - low
+    tr = np.fmax(np.abs(high - low), np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+    return _rolling_mean(tr, n, min_periods=int(n))
+
+
+def _kdj(high: np.ndarray, low: np.ndarray, close: np.ndarray,
+         n: int, m1: int, m2: int) -> Dict[str, np.ndarray]:
+    lowest_low = _rolling_extreme(low, n, "min")
+    highest_high = _rolling_extreme(high, n, "max")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsv = (close - lowest_low) / (highest_high - lowest_low) * 100
+    rsv[~np.isfinite(rsv)] = np.nan
+
+    # 递推只能沿时间方向进行，但每一步对所有标的向量化
+    alpha_k = 1 / float(m1)
+    alpha_d = 1 / float(m2)
+    k = np.full(rsv.shape, np.nan)
+    d = np.full(rsv.shape, np.nan)
+    last_k = np.full(rsv.shape[1], 50.0)
+    last_d = np.full(rsv.shape[1], 50.0)
+    for i in range(rsv.shape[0]):
+        rv = rsv[i]
+        ok = ~np.isnan(rv)
+        if not ok.any():
+            continue
+        curr_k = (1 - alpha_k) * last_k + alpha_k * rv
+        curr_d = (1 - alpha_d) * last_d + alpha_d * curr_k
+        k[i, ok] = curr_k[ok]
+        d[i, ok] = curr_d[ok]
+        last_k = np.where(ok, curr_k, last_k)
+        last_d = np.where(ok, curr_d, last_d)
+    return {"kdj_k": k, "kdj_d": d, "kdj_j": 3 * k - 2 * d}
+
+
+# ==================== 对外接口 ====================
+
+
+def _require_panels(panels: Dict[str, Panel], names: Iterable[str]):
+    missing = [c for c in names if c not in panels]
+    if missing:
+        raise ValueError(f"面板缺少必要字段: {missing}, 现有字段: {list(panels)}")
+
+
+def compute_panel(panels: Dict[str, Panel], specs: List[IndicatorSpec]) -> Dict[str, Panel]:
+    """
+    对面板一次性计算多个指标
+
+    Args:
+        panels: {'close': 面板, 'high': 面板, 'low': 面板}，形状相同（行=日期，列=标的）；
+                只计算 MA/EMA/MACD/RSI/BOLL 时只需 close
+        specs: 指标规格，参数与 compute_indicator 一致
+
+    Returns:
+        {指标列名: 面板}，列名与 compute_indicator 一致（如 ma5、dif、rsi14、kdj_k），
+        输入为 DataFrame 时返回同索引/列的 DataFrame，否则返回 ndarray
+    """
+    _require_panels(panels, ["close"])
+    layout = _PanelLayout(panels["close"])
+    compacted: Dict[str, np.ndarray] = {}
+
+    def field(name: str) -> np.ndarray:
+        if name not in compacted:
+            _require_panels(panels, [name])
+            compacted[name] = layout.compact(panels[name])
+        return compacted[name]
+
+    results: Dict[str, np.ndarray] = {}
+    seen = set()
+    for spec in specs:
+        name = spec.name.lower()
+        params = spec.params or {}
+        key = (name, tuple(sorted(params.items())))
+        if key in seen:
+            continue
+        seen.add(key)
+        # stockstats 兼容的 adjust 加权 / Wilder 平滑变体只提供单标的计算
+        if params.get("adjust") or (name == "atr" and params.get("method", "sma") != "sma"):
+            raise ValueError(f"面板计算不支持该参数组合: {name} {params}")
+
+        if name == "ma":
+            n = int(params.get("n", params.get("period", 20)))
+            results[f"ma{n}"] = _rolling_mean(field("close"), n)
+        elif name == "ema":
+            n = int(params.get("n", params.get("period", 20)))
+            results[f"ema{n}"] = _ema(field("close"), n)
+        elif name == "macd":
+            results.update(_macd(field("close"), int(params.get("fast", 12)),
+                                 int(params.get("slow", 26)), int(params.get("signal", 9))))
+        elif name == "rsi":
+            n = int(params.get("n", params.get("period", 14)))
+            results[f"rsi{n}"] = _rsi(field("close"), n, params.get("method", "ema"))
+        elif name == "boll":
+            results.update(_boll(field("close"), int(params.get("n", 20)), float(params.get("k", 2.0))))
+        elif name == "atr":
+            n = int(params.get("n", 14))
+            results[f"atr{n}"] = _atr(field("high"), field("low"), field("close"), n)
+        elif name == "kdj":
+            results.update(_kdj(field("high"), field("low"), field("close"), int(params.get("n", 9)),
+                                int(params.get("m1", 3)), int(params.get("m2", 3))))
+        else:
+            raise ValueError(f"不支持的指标: {name}")
+
+    return {col: layout.restore(values) for col, values in results.items()}
+
+
+def panel_from_long(df: pd.DataFrame, date_col: str = "trade_date", symbol_col: str = "code",
+                    fields: Tuple[str, ...] = ("close", "high", "low")) -> Dict[str, pd.DataFrame]:
+    """
+    把长表（每行一个标的一天）转换为各字段的宽表面板
+
+    Args:
+        df: 长表K线数据
+        date_col: 日期列
+        symbol_col: 标的代码列
+        fields: 需要的价格字段（缺失的字段会被跳过）
+
+    Returns:
+        {字段: 宽表DataFrame}，行按日期升序
+    """
+    fields = [f for f in fields if f in df.columns]
+    wide = df.pivot_table(index=date_col, columns=symbol_col, values=fields, aggfunc="last").sort_index()
+    return {f: wide[f].astype(float) for f in fields}
+
+
+def last_cross_section(results: Dict[str, Panel], columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    取每个标的最近一个有效值，组成横截面表（行=标的，列=指标）
+
+    Args:
+        results: compute_panel 的返回值
+        columns: 面板为 ndarray 时的标的名称
+
+    Returns:
+        DataFrame
+    """
+    data = {}
+    for col, panel in results.items():
+        frame = panel if isinstance(panel, pd.DataFrame) else pd.DataFrame(panel, columns=columns)
+        data[col] = frame.ffill().iloc[-1] if len(frame) else pd.Series(dtype=float)
+    return pd.DataFrame(data)
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+同步代码调用异步数据源的桥接
+进程内维护一个常驻的后台事件循环线程，同步调用方通过 run_coro_sync() 把协程提交到该循环执行并等待结果。
+相比每次调用都 new_event_loop() + run_until_complete()：
+- 省去每次创建/销毁事件循环的开销
+- 数据源在该循环上创建的 HTTP 会话、连接池可以跨调用复用
+- 调用方线程中已有运行中的事件循环时也能安全调用（不会触发 "This event loop is already running"）
+
+使用方法：
+    from tradingagents.utils.async_bridge import run_coro_sync
+
+    stock_info = run_coro_sync(provider.get_stock_basic_info(symbol), timeout=30)
+
+配置：
+    export TA_ASYNC_BRIDGE_TIMEOUT_SECONDS=120  # 默认超时（秒），0 表示不超时
+"""
+
+import asyncio
+import atexit
+import os
+import threading
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Awaitable, Optional
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+
+class BackgroundLoop:
+    """后台事件循环线程"""
+
+    def __init__(self, name: str = "ta-async-bridge"):
+        self.name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """获取（必要时启动）后台事件循环；fork 后的子进程会重新创建"""
+        loop = self._loop
+        if loop is not None and self._pid == os.getpid() and not loop.is_closed():
+            return loop
+        with self._lock:
+            if self._loop is None or self._pid != os.getpid() or self._loop.is_closed():
+                self._start()
+            return self._loop
+
+    def _start(self):
+        loop = asyncio.new_event_loop()
+        ready = threading.Event()
+
+        def _run():
+            asyncio.set_event_loop(loop)
+            loop.call_soon(ready.set)
+            loop.run_forever()
+
+        self._thread = threading.Thread(target=_run, name=self.name, daemon=True)
+        self._thread.start()
+        ready.wait()
+        self._loop = loop
+        self._pid = os.getpid()
+        logger.debug(f"🔁 [异步桥接] 后台事件循环已启动: {self.name}")
+
+    def in_loop_thread(self) -> bool:
+        return self._thread is not None and threading.current_thread() is self._thread
+
+    def run(self, coro: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+        """
+        在后台事件循环中执行协程并阻塞等待结果
+
+        Args:
+            coro: 协程对象
+            timeout: 超时时间（秒），None 表示不超时
+
+        Raises:
+            TimeoutError: 超时（协程会被取消）
+            RuntimeError: 在后台循环线程内调用（会造成死锁）
+        """
+        if self.in_loop_thread():
+            if asyncio.iscoroutine(coro):
+                coro.close()
+            raise RuntimeError("run_coro_sync 不能在后台事件循环线程中调用，请直接 await")
+
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        try:
+            return future.result(timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise TimeoutError(f"异步调用超时（{timeout}秒）")
+
+    def stop(self):
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = None
+            self._thread = None
+        if loop is None or loop.is_closed():
+            return
+        if self._pid != os.getpid():
+            return
+        loop.call_soon_threadsafe(loop.stop)
+        if thread is not None:
+            thread.join(timeout=5)
+        if not loop.is_running():
+            loop.close()
+
+
+# 全局实例
+_background_loop = BackgroundLoop()
+atexit.register(_background_loop.stop)
+
+_DEFAULT = object()
+
+
+def _default_timeout() -> Optional[float]:
+    try:
+        value = float(os.getenv("TA_ASYNC_BRIDGE_TIMEOUT_SECONDS", "120"))
+    except ValueError:
+        value = 120.0
+    return value if value > 0 else None
+
+
+def get_background_loop() -> asyncio.AbstractEventLoop:
+    """获取常驻后台事件循环"""
+    return _background_loop.loop
+
+
+def run_coro_sync(coro: Awaitable[Any], timeout: Any = _DEFAULT) -> Any:
+    """
+    在常驻后台事件循环中执行协程并返回结果（供同步代码调用异步数据源）
+
+    Args:
+        coro: 协程对象
+        timeout: 超时时间（秒）；不传时使用 TA_ASYNC_BRIDGE_TIMEOUT_SECONDS，None 表示不超时
+    """
+    if timeout is _DEFAULT:
+        timeout = _default_timeout()
+    return _background_loop.run(coro, timeout)
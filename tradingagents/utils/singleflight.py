@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Single-flight 请求合并
+相同 key 的并发调用只执行一次上游请求，其余调用方等待并共享同一个结果。
+同时支持线程（同步函数）和 asyncio（协程函数）。
+
+使用方法：
+    from tradingagents.utils.singleflight import coalesce
+
+    @coalesce("tushare.get_stock_data")
+    def get_stock_data(symbol, start_date, end_date): ...
+
+配置：
+    export TA_SINGLEFLIGHT_ENABLED=false  # 关闭请求合并
+"""
+
+import asyncio
+import copy
+import functools
+import os
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+import pandas as pd
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+
+def _share_result(value: Any) -> Any:
+    """给跟随者返回结果副本，避免多个调用方共享可变对象"""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy()
+    if isinstance(value, (dict, list)):
+        return copy.deepcopy(value)
+    return value
+
+
+class _Call:
+    """一次进行中的同步调用"""
+
+    __slots__ = ('event', 'result', 'error', 'waiters', 'owner')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+        self.owner = threading.get_ident()
+
+
+class SingleFlight:
+    """相同 key 的并发调用合并为一次执行"""
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._async_calls: Dict[Hashable, "asyncio.Future"] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def _record(self, name: str, field: str, amount: int = 1):
+        stats = self._stats.setdefault(name, {'calls': 0, 'executions': 0, 'coalesced': 0})
+        stats[field] += amount
+
+    # ==================== 同步（线程） ====================
+
+    def do(self, key: Hashable, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        执行 fn(*args, **kwargs)；若相同 key 正在执行，则等待并共享其结果
+
+        Args:
+            key: 合并键，第一个元素作为统计名称，例如 ("tushare.get_stock_data", symbol, ...)
+            fn: 实际执行的函数
+        """
+        if not self.enabled:
+            return fn(*args, **kwargs)
+
+        name = key[0] if isinstance(key, tuple) and key else str(key)
+        with self._lock:
+            self._record(name, 'calls')
+            call = self._calls.get(key)
+            if call is not None and call.owner != threading.get_ident():
+                call.waiters += 1
+                self._record(name, 'coalesced')
+                leader = False
+            elif call is not None:
+                # 同一线程内的重入调用直接执行，避免自我等待
+                leader = None
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self._record(name, 'executions')
+                leader = True
+
+        if leader is None:
+            return fn(*args, **kwargs)
+
+        if not leader:
+            logger.debug(f"🔗 [SingleFlight] 合并请求: {key}")
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return _share_result(call.result)
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+
+    # ==================== 异步（asyncio） ====================
+
+    async def do_async(self, key: Hashable, coro_fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        await coro_fn(*args, **kwargs)；若相同 key 正在同一事件循环中执行，则等待并共享其结果
+        """
+        if not self.enabled:
+            return await coro_fn(*args, **kwargs)
+
+        name = key[0] if isinstance(key, tuple) and key else str(key)
+        loop = asyncio.get_running_loop()
+        loop_key = (id(loop), key)
+
+        with self._lock:
+            self._record(name, 'calls')
+            future = self._async_calls.get(loop_key)
+            leader = future is None
+            if leader:
+                future = loop.create_future()
+                # 没有跟随者时也要取走异常，避免 "exception was never retrieved" 警告
+                future.add_done_callback(lambda f: f.cancelled() or f.exception())
+                self._async_calls[loop_key] = future
+                self._record(name, 'executions')
+            else:
+                self._record(name, 'coalesced')
+
+        if not leader:
+            logger.debug(f"🔗 [SingleFlight] 合并异步请求: {key}")
+            return _share_result(await asyncio.shield(future))
+
+        try:
+            result = await coro_fn(*args, **kwargs)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._async_calls.pop(loop_key, None)
+
+    # ==================== 统计 ====================
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取各名称的调用次数、实际执行次数和被合并的调用方数量"""
+        with self._lock:
+            by_name = {name: dict(stats) for name, stats in self._stats.items()}
+            in_flight = len(self._calls) + len(self._async_calls)
+        return {
+            'enabled': self.enabled,
+            'in_flight': in_flight,
+            'total_calls': sum(s['calls'] for s in by_name.values()),
+            'total_coalesced': sum(s['coalesced'] for s in by_name.values()),
+            'by_name': by_name,
+        }
+
+
+# 全局 SingleFlight 实例
+_singleflight = None
+_singleflight_lock = threading.Lock()
+
+
+def get_singleflight() -> SingleFlight:
+    """获取全局 SingleFlight 实例"""
+    global _singleflight
+    if _singleflight is None:
+        with _singleflight_lock:
+            if _singleflight is None:
+                enabled = os.getenv("TA_SINGLEFLIGHT_ENABLED", "true").lower() in ("true", "1", "yes", "on")
+                _singleflight = SingleFlight(enabled=enabled)
+    return _singleflight
+
+
+def _default_key(name: str, args: tuple, kwargs: dict) -> Hashable:
+    key = (name,) + tuple(args) + tuple(sorted(kwargs.items()))
+    try:
+        hash(key)
+        return key
+    except TypeError:
+        return (name, repr(args), repr(sorted(kwargs.items())))
+
+
+def coalesce(name: str, key_func: Callable[..., tuple] = None, is_method: bool = False):
+    """
+    请求合并装饰器，同时支持同步函数和协程函数
+
+    Args:
+        name: 统计名称（同时作为合并键的前缀）
+        key_func: 自定义键函数，接收与被装饰函数相同的参数，返回键的其余部分
+        is_method: 被装饰的是否为实例方法（默认键不包含 self）
+    """
+    def decorator(fn):
+        def build_key(args, kwargs):
+            if key_func is not None:
+                return (name,) + tuple(key_func(*args, **kwargs))
+            key_args = args[1:] if is_method else args
+            return _default_key(name, key_args, kwargs)
+
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                return await get_singleflight().do_async(build_key(args, kwargs), fn, *args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            return get_singleflight().do(build_key(args, kwargs), fn, *args, **kwargs)
+        return wrapper
+
+    return decorator